@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'NH Activity',
-    'version': '1.0.2',
+    'version': '1.0.3',
     'category': 'General',
     'license': 'AGPL-3',
     'summary': '',
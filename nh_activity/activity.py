@@ -65,6 +65,34 @@ def data_model_event(callback=None):
     return decorator
 
 
+def _insert_rows(cr, model, rows):
+    """
+    Inserts `rows` into the table of `model` with a single multi-row
+    ``INSERT``. Their ids are taken from the model's sequence up front
+    so they are returned in the same order as `rows`.
+
+    :param model: model whose table the rows are inserted into
+    :param rows: column:value dicts, one per row
+    :type rows: list
+    :returns: ids of the inserted rows
+    :rtype: list
+    """
+    cr.execute("select nextval(%s) from generate_series(1, %s)",
+               (model._sequence, len(rows)))
+    ids = [row[0] for row in cr.fetchall()]
+    columns = sorted(set(['id']).union(*rows))
+    params = []
+    for row_id, row in zip(ids, rows):
+        row['id'] = row_id
+        params.extend(row.get(column) for column in columns)
+    placeholders = '({})'.format(', '.join(['%s'] * len(columns)))
+    cr.execute("insert into {table} ({columns}) values {rows}".format(
+        table=model._table,
+        columns=', '.join('"{}"'.format(column) for column in columns),
+        rows=', '.join([placeholders] * len(rows))), params)
+    return ids
+
+
 class nh_activity(orm.Model):
     """
     Class representing any event that needs to be recorded by the system.
@@ -136,6 +164,8 @@ class nh_activity(orm.Model):
         'data_ref': fields.reference('Data Reference',
                                      _get_data_type_selection, size=256,
                                      readonly=True),
+        # id part of data_ref, kept so that SQL can index and join on it
+        'data_id': fields.integer('Data ID', readonly=True),
         # order
         'sequence': fields.integer("State Switch Sequence"),
         'assign_locked': fields.boolean("Assign Locked")
@@ -149,6 +179,32 @@ class nh_activity(orm.Model):
         'assign_locked': False
     }
 
+    def init(self, cr):
+        """
+        Indexes ``data_id`` so that SQL views can join activities to
+        their data model records. Activities created before ``data_id``
+        existed are filled in by the 8.0.1.0.3 migration.
+        """
+        cr.execute("""
+            create index if not exists nh_activity_data_model_data_id_index
+                on nh_activity (data_model, data_id)
+        """)
+
+    @staticmethod
+    def _get_data_id(data_ref):
+        """
+        Gets the id of the :mod:`data model<activity.nh_activity_data>`
+        record a ``data_ref`` value refers to.
+
+        :param data_ref: ``'model,id'`` reference or ``False``
+        :returns: record id or ``False``
+        """
+        if not data_ref:
+            return False
+        if not isinstance(data_ref, basestring):
+            return data_ref.id
+        return int(data_ref.split(',')[1])
+
     def create(self, cr, uid, vals, context=None):
         """
         Creates an activity. Raises an exception if ``data_model``
@@ -173,6 +229,8 @@ class nh_activity(orm.Model):
         if 'summary' not in vals:
             summary = data_model_pool.get_description()
             vals.update({'summary': summary})
+        if 'data_ref' in vals:
+            vals['data_id'] = self._get_data_id(vals['data_ref'])
 
         activity_id = super(nh_activity, self).create(cr, uid, vals, context)
         _logger.debug("activity '%s' created, activity.id=%s",
@@ -195,7 +253,95 @@ class nh_activity(orm.Model):
             cr.execute("select coalesce(max(sequence), 0) from nh_activity")
             sequence = cr.fetchone()[0] + 1
             vals.update({'sequence': sequence})
-        return super(nh_activity, self).write(cr, uid, ids, vals, context)
+        if 'data_ref' in vals:
+            vals['data_id'] = self._get_data_id(vals['data_ref'])
+        res = super(nh_activity, self).write(cr, uid, ids, vals, context)
+        if 'state' in vals and isinstance(ids, (list, tuple)) and \
+                len(ids) > 1:
+            # Give each activity its own sequence, in id order, as if they
+            # had been written one at a time.
+            cr.execute("""
+                update nh_activity activity
+                set sequence = %s + ordered.position - 1
+                from (
+                    select id, row_number() over (order by id) as position
+                    from nh_activity
+                    where id in %s
+                ) ordered
+                where activity.id = ordered.id
+            """, (vals['sequence'], tuple(ids)))
+            self.invalidate_cache(cr, uid, ['sequence'], ids,
+                                  context=context)
+        return res
+
+    def create_many(self, cr, uid, vals_list, context=None):
+        """
+        Creates many activities with a single multi-row ``INSERT``. See
+        :meth:`create`, which modules extending it should extend this
+        method in the same way.
+
+        Values for fields that aren't stored in the activity table, e.g.
+        many2many fields, are written after the insert.
+
+        :param vals_list: values to create each activity with, each must
+            include ``data_model`` key:value pair
+        :type vals_list: list
+        :raises: osv.except_osv
+        :returns: ids of created :class:`activities<nh_activity>`, in the
+            same order as ``vals_list``
+        :rtype: list
+        """
+        if not vals_list:
+            return []
+        self.check_access_rights(cr, uid, 'create')
+        defaults = self.default_get(cr, uid, self._columns.keys(),
+                                    context=context)
+        now = datetime.now().strftime(DTF)
+        rows = []
+        write_vals = []
+        for vals in vals_list:
+            if not vals.get('data_model'):
+                raise osv.except_osv('Error!', "data_model is not defined!")
+            data_model_pool = self.pool.get(vals['data_model'])
+            if not data_model_pool:
+                raise osv.except_osv(
+                    'Error!',
+                    "data_model does not exist in the model pool!"
+                )
+            activity_vals = defaults.copy()
+            activity_vals.update(vals)
+            if 'summary' not in activity_vals:
+                activity_vals['summary'] = data_model_pool.get_description()
+            if 'data_ref' in activity_vals:
+                activity_vals['data_id'] = self._get_data_id(
+                    activity_vals['data_ref'])
+            row = {}
+            other_vals = {}
+            for field, value in activity_vals.items():
+                column = self._columns.get(field)
+                if not column:
+                    continue
+                if column._classic_write:
+                    row[field] = column._symbol_set[1](value)
+                else:
+                    other_vals[field] = value
+            row.update({
+                'create_uid': uid,
+                'create_date': now,
+                'write_uid': uid,
+                'write_date': now
+            })
+            rows.append(row)
+            write_vals.append(other_vals)
+
+        activity_ids = _insert_rows(cr, self, rows)
+        for activity_id, other_vals in zip(activity_ids, write_vals):
+            if other_vals:
+                self.write(cr, uid, activity_id, other_vals, context=context)
+        self.check_access_rule(cr, uid, activity_ids, 'create',
+                               context=context)
+        _logger.debug("%s activities created", len(activity_ids))
+        return activity_ids
 
     def get_recursive_created_ids(self, cr, uid, activity_id, context=None):
         """
@@ -263,6 +409,18 @@ class nh_activity(orm.Model):
 
         :param activity_id: :mod:`activity<activity.nh_activity>` id
         :type activity_id: int
+        :param date_scheduled: date formatted string
+        :type date_scheduled: str
+        :returns: ``True``
+        :rtype: bool
+        """
+        return self._check_date_scheduled(date_scheduled)
+
+    def _check_date_scheduled(self, date_scheduled):
+        """
+        Raises an exception if `date_scheduled` is neither a datetime
+        nor a date formatted string.
+
         :param date_scheduled: date formatted string
         :type date_scheduled: str
         :returns: ``True``
@@ -374,6 +532,101 @@ class nh_activity(orm.Model):
         """
         return True
 
+    def cancel_many(self, cr, uid, activity_ids, context=None):
+        """
+        Cancels many activities at once. The activities are grouped by
+        data model and each data model's
+        :meth:`cancel_many<activity.nh_activity_data.cancel_many>` is
+        called once with its activities.
+
+        :param activity_ids: :mod:`activity<activity.nh_activity>` ids
+        :type activity_ids: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        return self._run_many(cr, uid, 'cancel', activity_ids,
+                              context=context)
+
+    def schedule_many(self, cr, uid, activity_ids, date_scheduled=None,
+                      context=None):
+        """
+        Schedules many activities at once, see :meth:`schedule` and
+        :meth:`cancel_many`.
+
+        :param activity_ids: :mod:`activity<activity.nh_activity>` ids
+        :type activity_ids: list
+        :param date_scheduled: date formatted string
+        :type date_scheduled: str
+        :returns: ``True``
+        :rtype: bool
+        """
+        self._check_date_scheduled(date_scheduled)
+        return self._run_many(cr, uid, 'schedule', activity_ids,
+                              date_scheduled, context=context)
+
+    def start_many(self, cr, uid, activity_ids, context=None):
+        """
+        Starts many activities at once, see :meth:`start` and
+        :meth:`cancel_many`.
+
+        :param activity_ids: :mod:`activity<activity.nh_activity>` ids
+        :type activity_ids: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        return self._run_many(cr, uid, 'start', activity_ids,
+                              context=context)
+
+    def complete_many(self, cr, uid, activity_ids, context=None):
+        """
+        Completes many activities at once, see :meth:`complete` and
+        :meth:`cancel_many`.
+
+        :param activity_ids: :mod:`activity<activity.nh_activity>` ids
+        :type activity_ids: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        return self._run_many(cr, uid, 'complete', activity_ids,
+                              context=context)
+
+    def _run_many(self, cr, uid, action, activity_ids, *args, **kwargs):
+        """
+        Runs `action` on many activities. The transition is checked for
+        every activity before any of them are changed. Activities are
+        then grouped by data model and the data model's `<action>_many`
+        method is called once for each group, or `action` is called for
+        each activity if the data model doesn't support batches of it, see
+        :meth:`has_batch_action<activity.nh_activity_data.has_batch_action>`.
+
+        :param action: name of the activity method, e.g. ``complete``
+        :type action: str
+        :param activity_ids: :mod:`activity<activity.nh_activity>` ids
+        :type activity_ids: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        context = kwargs.get('context')
+        if isinstance(activity_ids, (int, long)):
+            activity_ids = [activity_ids]
+        activity_ids_by_model = {}
+        for activity in self.read(cr, uid, activity_ids,
+                                  ['data_model', 'state'], context=context):
+            data_pool = self.pool[activity['data_model']]
+            data_pool.check_action(activity['state'], action)
+            activity_ids_by_model.setdefault(
+                activity['data_model'], []).append(activity['id'])
+        for data_model, ids in activity_ids_by_model.items():
+            data_pool = self.pool[data_model]
+            if data_pool.has_batch_action(action):
+                getattr(data_pool, action + '_many')(
+                    cr, uid, ids, *args, context=context)
+            else:
+                for activity_id in ids:
+                    getattr(self, action)(
+                        cr, uid, activity_id, *args, context=context)
+        return True
+
 
 class nh_activity_data(orm.AbstractModel):
     """
@@ -429,6 +682,52 @@ class nh_activity_data(orm.AbstractModel):
                 (action, self._name, state))
         return True
 
+    def has_batch_action(self, action, batch_action=None):
+        """
+        Tells us if the batch version of an action, e.g.
+        :meth:`complete_many` for :meth:`complete`, can be used instead
+        of calling the action once per activity. That is the case unless
+        a module extending this data type overrides the action without
+        also overriding the batch version, as the batch version would
+        skip that override.
+
+        :param action: name of the action method
+        :type action: str
+        :param batch_action: name of the batch method, defaults to
+            ``<action>_many``
+        :type batch_action: str
+        :returns: ``True`` or ``False``
+        :rtype: bool
+        """
+        batch_action = batch_action or action + '_many'
+        base_classes = set(type(self.pool['nh.activity.data']).__mro__)
+        return all(
+            batch_action in vars(klass) for klass in type(self).__mro__
+            if klass not in base_classes and action in vars(klass))
+
+    def _check_actions(self, cr, uid, activity_ids, action, fields=None,
+                       context=None):
+        """
+        Checks `action` is allowed for every activity before any of them
+        are changed.
+
+        :param activity_ids: :mod:`activity<activity.nh_activity>` ids
+        :type activity_ids: list
+        :param action: action we want to execute
+        :type action: str
+        :param fields: other activity fields to read
+        :type fields: list
+        :returns: the activities read
+        :rtype: list
+        """
+        activity_pool = self.pool['nh.activity']
+        activities = activity_pool.read(
+            cr, uid, activity_ids, ['state'] + (fields or []),
+            context=context)
+        for activity in activities:
+            self.check_action(activity['state'], action)
+        return activities
+
     _columns = {
         'name': fields.char('Name', size=256),
         'activity_id': fields.many2one('nh.activity', "activity"),
@@ -451,6 +750,73 @@ class nh_activity_data(orm.AbstractModel):
     def create(self, cr, uid, vals, context=None):
         return super(nh_activity_data, self).create(cr, uid, vals, context)
 
+    def _create_many(self, cr, uid, vals_list, context=None):
+        """
+        Creates many records of the current data type with a single
+        multi-row ``INSERT``, see :meth:`create`. The records are created
+        one at a time instead if :meth:`create` is overridden or they
+        need more than an insert, i.e. the data type has constraints,
+        stored function fields or a parent store, or values are passed
+        for fields that aren't stored in its table.
+
+        :param vals_list: values to create each record with
+        :type vals_list: list
+        :returns: ids of created records, in the same order as
+            ``vals_list``
+        :rtype: list
+        """
+        if not vals_list:
+            return []
+        defaults = self.default_get(cr, uid, self._columns.keys(),
+                                    context=context)
+        if not self._can_insert_many([defaults] + vals_list):
+            return [self.create(cr, uid, vals, context)
+                    for vals in vals_list]
+        self.check_access_rights(cr, uid, 'create')
+        now = datetime.now().strftime(DTF)
+        rows = []
+        for vals in vals_list:
+            data_vals = defaults.copy()
+            data_vals.update(vals)
+            row = dict(
+                (field, self._columns[field]._symbol_set[1](value))
+                for field, value in data_vals.items())
+            if self._log_access:
+                row.update({
+                    'create_uid': uid,
+                    'create_date': now,
+                    'write_uid': uid,
+                    'write_date': now
+                })
+            rows.append(row)
+        data_ids = _insert_rows(cr, self, rows)
+        self.check_access_rule(cr, uid, data_ids, 'create', context=context)
+        _logger.debug("%s '%s' records created", len(data_ids), self._name)
+        return data_ids
+
+    def _can_insert_many(self, vals_list):
+        """
+        Tells us if :meth:`_create_many` can insert records created with
+        ``vals_list`` directly instead of calling :meth:`create` for each.
+
+        :param vals_list: values to create each record with
+        :type vals_list: list
+        :returns: ``True`` or ``False``
+        :rtype: bool
+        """
+        if not self.has_batch_action('create', '_create_many'):
+            return False
+        if self._inherits or self._parent_store or self._constraints or \
+                self._constraint_methods or \
+                self.pool._store_function.get(self._name):
+            return False
+        if any(field.compute and field.store
+               for field in self._fields.values()):
+            return False
+        return all(
+            field in self._columns and self._columns[field]._classic_write
+            for vals in vals_list for field in vals)
+
     def create_activity(self, cr, uid, vals_activity=None, vals_data=None,
                         context=None):
         """
@@ -491,6 +857,95 @@ class nh_activity_data(orm.AbstractModel):
             activity_pool.submit(cr, uid, new_activity_id, vals_data, context)
         return new_activity_id
 
+    def create_activities(self, cr, uid, vals_activity_list,
+                          vals_data_list=None, context=None):
+        """
+        Creates many :mod:`activities<activity.nh_activity>` of the
+        current data type, see :meth:`create_activity`. The activities
+        are inserted with
+        :meth:`create_many()<activity.nh_activity.create_many>` and
+        their data with :meth:`_create_many`.
+
+        :param vals_activity_list: values to save in each
+            :mod:`activity<activity.nh_activity>`
+        :type vals_activity_list: list
+        :param vals_data_list: values to save in the
+            :mod:`data model<activity.nh_activity_data>` of each
+            activity, in the same order as ``vals_activity_list``
+        :type vals_data_list: list
+        :returns: :mod:`activity<activity.nh_activity>` ids, in the same
+            order as ``vals_activity_list``
+        :rtype: list
+        """
+        if vals_data_list is None:
+            vals_data_list = [None] * len(vals_activity_list)
+        if len(vals_data_list) != len(vals_activity_list):
+            raise osv.except_osv(
+                'Value Error!',
+                'vals_data_list must be the same length as '
+                'vals_activity_list')
+        if not self.has_batch_action('create_activity',
+                                     'create_activities') or \
+                not self.has_batch_action('submit', 'create_activities'):
+            return [
+                self.create_activity(cr, uid, vals_activity, vals_data,
+                                     context=context)
+                for vals_activity, vals_data in zip(vals_activity_list,
+                                                    vals_data_list)
+            ]
+
+        vals_activity_list = [vals or {} for vals in vals_activity_list]
+        vals_data_list = [vals or {} for vals in vals_data_list]
+        for vals_activity, vals_data in zip(vals_activity_list,
+                                            vals_data_list):
+            if not isinstance(vals_activity, dict):
+                raise osv.except_osv(
+                    'Type Error!',
+                    'vals_activity must be a dict, found {}'.format(
+                        type(vals_activity)
+                    )
+                )
+            if not isinstance(vals_data, dict):
+                raise osv.except_osv(
+                    'Type Error!',
+                    'vals_data must be a dict, found {}'.format(
+                        type(vals_data)
+                    )
+                )
+            if vals_data:
+                self.check_action(vals_activity.get('state', 'new'),
+                                  'submit')
+            vals_activity.update({'data_model': self._name})
+
+        activity_pool = self.pool['nh.activity']
+        new_activity_ids = activity_pool.create_many(
+            cr, uid, vals_activity_list, context=context)
+        submitted_ids = []
+        data_vals_list = []
+        for activity_id, vals_data in zip(new_activity_ids, vals_data_list):
+            if vals_data:
+                data_vals = vals_data.copy()
+                data_vals.update({'activity_id': activity_id})
+                data_vals_list.append(data_vals)
+                submitted_ids.append(activity_id)
+        if submitted_ids:
+            self._create_many(cr, uid, data_vals_list, context=context)
+            cr.execute("""
+                update nh_activity activity
+                set data_ref = %s || ',' || data.id,
+                    data_id = data.id
+                from {table} data
+                where data.activity_id = activity.id
+                and activity.id in %s
+            """.format(table=self._table), (self._name, tuple(submitted_ids)))
+            activity_pool.invalidate_cache(cr, uid, ['data_ref', 'data_id'],
+                                           submitted_ids, context=context)
+            _logger.debug("activity '%s', %s activities data submitted",
+                          self._name, len(submitted_ids))
+            self.update_activities(cr, SUPERUSER_ID, submitted_ids,
+                                   context=context)
+        return new_activity_ids
+
     def start(self, cr, uid, activity_id, context=None):
         """
         Starts an activity and sets its ``date_started``.
@@ -538,6 +993,57 @@ class nh_activity_data(orm.AbstractModel):
                       activity.data_model, activity.id)
         return True
 
+    def start_many(self, cr, uid, activity_ids, context=None):
+        """
+        Starts many activities of the current data type with a single
+        write, see :meth:`start`. Raises an exception without starting
+        any of them if one can't be started.
+
+        :param activity_ids: :mod:`activity<activity.nh_activity>` ids
+        :type activity_ids: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        if not activity_ids:
+            return True
+        self._check_actions(cr, uid, activity_ids, 'start', context=context)
+        self.pool['nh.activity'].write(
+            cr, uid, activity_ids,
+            {'state': 'started', 'date_started': datetime.now().strftime(DTF)},
+            context=context)
+        _logger.debug("%s activities '%s' started",
+                      len(activity_ids), self._name)
+        return True
+
+    def complete_many(self, cr, uid, activity_ids, context=None):
+        """
+        Completes many activities of the current data type with a single
+        write, see :meth:`complete`. Raises an exception without
+        completing any of them if one can't be completed.
+
+        :param activity_ids: :mod:`activity<activity.nh_activity>` ids
+        :type activity_ids: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        if not activity_ids:
+            return True
+        if context is None:
+            context = {}
+        self._check_actions(cr, uid, activity_ids, 'complete',
+                            context=context)
+        now = datetime.now().strftime(DTF)
+        self.pool['nh.activity'].write(cr, uid, activity_ids, {
+            'state': 'completed',
+            'terminate_uid': uid,
+            'date_terminated': now,
+            'effective_date_terminated':
+                context.get('effective_date_terminated') or now
+        }, context=context)
+        _logger.debug("%s activities '%s' completed",
+                      len(activity_ids), self._name)
+        return True
+
     def assign(self, cr, uid, activity_id, user_id, context=None):
         """
         Assigns activity to a user. Raises an exception if it is already
@@ -626,6 +1132,31 @@ class nh_activity_data(orm.AbstractModel):
                       activity.data_model, activity.id)
         return True
 
+    def cancel_many(self, cr, uid, activity_ids, context=None):
+        """
+        Cancels many activities of the current data type with a single
+        write, see :meth:`cancel`. Raises an exception without cancelling
+        any of them if one can't be cancelled.
+
+        :param activity_ids: :mod:`activity<activity.nh_activity>` ids
+        :type activity_ids: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        if not activity_ids:
+            return True
+        self._check_actions(cr, uid, activity_ids, 'cancel', context=context)
+        now = datetime.now().strftime(DTF)
+        self.pool['nh.activity'].write(cr, uid, activity_ids, {
+            'state': 'cancelled',
+            'terminate_uid': uid,
+            'date_terminated': now,
+            'effective_date_terminated': now,
+        }, context=context)
+        _logger.debug("%s activities '%s' cancelled",
+                      len(activity_ids), self._name)
+        return True
+
     def schedule(self, cr, uid, activity_id, date_scheduled=None,
                  context=None):
         """
@@ -656,6 +1187,40 @@ class nh_activity_data(orm.AbstractModel):
             activity.data_model, activity.id, date_scheduled)
         return True
 
+    def schedule_many(self, cr, uid, activity_ids, date_scheduled=None,
+                      context=None):
+        """
+        Schedules many activities of the current data type with a single
+        write, see :meth:`schedule`. Raises an exception without
+        scheduling any of them if one can't be scheduled.
+
+        :param activity_ids: :mod:`activity<activity.nh_activity>` ids
+        :type activity_ids: list
+        :param date_scheduled: date formatted string, if not passed each
+            activity keeps the date it is already scheduled for
+        :type date_scheduled: str
+        :returns: ``True``
+        :rtype: bool
+        """
+        if not activity_ids:
+            return True
+        activities = self._check_actions(cr, uid, activity_ids, 'schedule',
+                                         fields=['date_scheduled'],
+                                         context=context)
+        vals = {'state': 'scheduled'}
+        if date_scheduled:
+            vals.update({'date_scheduled': date_scheduled})
+        elif not all(activity['date_scheduled'] for activity in activities):
+            raise osv.except_osv(
+                'Error!',
+                "Schedule date is neither set on activity nor passed to the "
+                "method")
+        self.pool['nh.activity'].write(cr, uid, activity_ids, vals,
+                                       context=context)
+        _logger.debug("%s activities '%s' scheduled",
+                      len(activity_ids), self._name)
+        return True
+
     def submit(self, cr, uid, activity_id, vals, context=None):
         """
         Updates submitted data. It creates a new instance of the data
@@ -696,6 +1261,20 @@ class nh_activity_data(orm.AbstractModel):
         """
         return True
 
+    def update_activities(self, cr, uid, activity_ids, context=None):
+        """
+        Batch version of :meth:`update_activity`, calls it for each
+        activity by default.
+
+        :param activity_ids: :mod:`activity<activity.nh_activity>` ids
+        :type activity_ids: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        for activity_id in activity_ids:
+            self.update_activity(cr, uid, activity_id, context=context)
+        return True
+
     def submit_ui(self, cr, uid, ids, context=None):
         if context and context.get('active_id'):
             activity_pool = self.pool['nh.activity']
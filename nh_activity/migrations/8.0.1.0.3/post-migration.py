@@ -0,0 +1,39 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10000
+
+
+def set_data_ids(cr):
+    """
+    Fill in data_id from data_ref, a range of activity ids at a time so
+    that no single update rewrites the whole table.
+    """
+    cr.execute(
+        """
+        SELECT min(id), max(id) FROM nh_activity
+        WHERE data_id IS NULL AND data_ref IS NOT NULL
+        """
+    )
+    first_id, last_id = cr.fetchone()
+    if first_id is None:
+        return
+    for start_id in xrange(first_id, last_id + 1, BATCH_SIZE):
+        cr.execute(
+            """
+            UPDATE nh_activity
+            SET data_id = split_part(data_ref, ',', 2)::int
+            WHERE id >= %s AND id < %s
+            AND data_id IS NULL AND data_ref IS NOT NULL
+            """, (start_id, start_id + BATCH_SIZE)
+        )
+        _logger.info('Set data_id of activities %s to %s', start_id,
+                     min(start_id + BATCH_SIZE - 1, last_id))
+    cr.execute('ANALYZE nh_activity')
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    set_data_ids(cr)
@@ -117,6 +117,134 @@ class TestActivity(common.SingleTransactionCase):
         with self.assertRaises(except_orm):
             self.test_model_pool.create_activity(cr, uid, {}, 'test')
 
+    def test_create_activities_creates_activities(self):
+        cr, uid = self.cr, self.uid
+
+        activity_ids = self.test_model_pool.create_activities(
+            cr, uid, [{}, {'summary': 'Second'}],
+            [{'field1': 'first'}, {'field1': 'second'}])
+        self.assertEqual(len(activity_ids), 2,
+                         msg="Create Activities created wrong number")
+        activities = self.activity_pool.browse(cr, uid, activity_ids)
+        self.assertEqual(
+            [activity.data_ref.field1 for activity in activities],
+            ['first', 'second'],
+            msg="Create Activities returned activities in the wrong order")
+        self.assertEqual(activities[1].summary, 'Second',
+                         msg="Create Activities set wrong summary")
+
+    def test_create_activities_creates_activities_without_data(self):
+        cr, uid = self.cr, self.uid
+
+        activity_ids = self.test_model_pool.create_activities(
+            cr, uid, [{}, {}])
+        activities = self.activity_pool.browse(cr, uid, activity_ids)
+        self.assertFalse(
+            any(activity.data_ref for activity in activities),
+            msg="Create Activities added data model object without Data")
+
+    def test_create_activities_raises_exception_with_mismatched_lists(self):
+        cr, uid = self.cr, self.uid
+
+        with self.assertRaises(except_orm):
+            self.test_model_pool.create_activities(cr, uid, [{}, {}], [{}])
+
+    def test_create_activities_sets_defaults(self):
+        cr, uid = self.cr, self.uid
+
+        activity_ids = self.test_model_pool.create_activities(
+            cr, uid, [{}, {'summary': 'Second'}])
+        activities = self.activity_pool.browse(cr, uid, activity_ids)
+        self.assertEqual([activity.state for activity in activities],
+                         ['new', 'new'],
+                         msg="Activity default state not added")
+        self.assertEqual(
+            [activity.summary for activity in activities],
+            ['Test Activity Model', 'Second'],
+            msg="Activity default summary not added")
+        self.assertEqual(
+            [activity.create_uid.id for activity in activities], [uid, uid],
+            msg="Create Activities set wrong creator User")
+
+    def test_create_activity_sets_data_id(self):
+        cr, uid = self.cr, self.uid
+
+        activity_id = self.test_model_pool.create_activity(cr, uid, {},
+                                                           {'field1': 'test'})
+        activity = self.activity_pool.browse(cr, uid, activity_id)
+        self.assertEqual(activity.data_id, activity.data_ref.id,
+                         msg="Create Activity set wrong data id")
+
+    def test_create_activities_sets_data_id(self):
+        cr, uid = self.cr, self.uid
+
+        activity_ids = self.test_model_pool.create_activities(
+            cr, uid, [{}, {}], [{'field1': 'first'}, None])
+        activities = self.activity_pool.browse(cr, uid, activity_ids)
+        self.assertEqual(activities[0].data_id, activities[0].data_ref.id,
+                         msg="Create Activities set wrong data id")
+        self.assertFalse(activities[1].data_id,
+                         msg="Create Activities set data id without Data")
+
+    def test_create_activities_inserts_data(self):
+        cr, uid = self.cr, self.uid
+
+        self.test_model_pool._patch_method(
+            'create', MagicMock(side_effect=AssertionError))
+        try:
+            activity_ids = self.test_model_pool.create_activities(
+                cr, uid, [{}, {}], [{'field1': 'first'}, {'field1': 'second'}])
+        finally:
+            self.test_model_pool._revert_method('create')
+        activities = self.activity_pool.browse(cr, uid, activity_ids)
+        self.assertEqual(
+            [activity.data_ref.field1 for activity in activities],
+            ['first', 'second'],
+            msg="Create Activities inserted data in the wrong order")
+        self.assertEqual(
+            [activity.data_ref.activity_id.id for activity in activities],
+            activity_ids,
+            msg="Create Activities inserted data with wrong activity")
+        self.assertEqual(
+            [activity.data_ref.create_uid.id for activity in activities],
+            [uid, uid],
+            msg="Create Activities inserted data with wrong creator User")
+
+    def test_create_activities_calls_create_when_overridden(self):
+        cr, uid = self.cr, self.uid
+        overriding_pool = self.registry('test.activity.data.model4')
+
+        activity_ids = overriding_pool.create_activities(
+            cr, uid, [{}, {}], [{'field1': 'first'}, {'field1': 'second'}])
+        activities = self.activity_pool.browse(cr, uid, activity_ids)
+        self.assertEqual(
+            [activity.data_ref.field1 for activity in activities],
+            ['Created individually', 'Created individually'],
+            msg="Overridden Create not called")
+
+    def test_data_id_lookup_uses_index(self):
+        cr = self.cr
+
+        cr.execute("set local enable_seqscan = off")
+        cr.execute("""
+            explain select activity.id
+            from test_activity_data_model data
+            inner join nh_activity activity
+                on activity.data_model = 'test.activity.data.model'
+                and activity.data_id = data.id
+            where data.id = 1
+        """)
+        plan = '\n'.join(row[0] for row in cr.fetchall())
+        cr.execute("set local enable_seqscan = on")
+        self.assertIn('nh_activity_data_model_data_id_index', plan,
+                      msg="data_id lookup doesn't use its index:\n" + plan)
+
+    def test_create_many_raises_exception_if_no_data_model_is_passed(self):
+        cr, uid = self.cr, self.uid
+        with self.assertRaises(except_orm):
+            self.activity_pool.create_many(
+                cr, uid, [{'data_model': 'test.activity.data.model'}, {}])
+
     def test_write_does_not_increment_sequence_if_state_not_changed(self):
         cr, uid = self.cr, self.uid
 
@@ -151,6 +279,22 @@ class TestActivity(common.SingleTransactionCase):
         self.assertEqual(activity.sequence, sequence+1,
                          msg="Activity sequence not updated")
 
+    def test_write_gives_each_activity_a_sequence_if_state_changed(self):
+        cr, uid = self.cr, self.uid
+
+        activity_ids = self.test_model_pool.create_activities(
+            cr, uid, [{}, {}, {}])
+        cr.execute("select coalesce(max(sequence), 0) from nh_activity")
+        sequence = cr.fetchone()[0]
+
+        self.activity_pool.write(cr, uid, activity_ids,
+                                 {'state': 'scheduled'})
+        activities = self.activity_pool.browse(cr, uid, activity_ids)
+        self.assertEqual(
+            [activity.sequence for activity in activities],
+            [sequence + 1, sequence + 2, sequence + 3],
+            msg="Activity sequences not incremented in id order")
+
     def test_get_recursive_created_ids_returns_non_creator_activity_id(self):
         cr, uid = self.cr, self.uid
 
@@ -607,6 +751,138 @@ class TestActivity(common.SingleTransactionCase):
         with self.assertRaises(except_orm):
             self.activity_pool.cancel(cr, uid, activity_id)
 
+    def test_cancel_many_cancels_activities(self):
+        cr, uid = self.cr, self.uid
+
+        activity_ids = [
+            self.activity_pool.create(
+                cr, uid, {'data_model': 'test.activity.data.model'}),
+            self.activity_pool.create(
+                cr, uid, {'data_model': 'test.activity.data.model2'})
+        ]
+        self.assertTrue(self.activity_pool.cancel_many(cr, uid, activity_ids),
+                        msg="Activity Cancel Many failed")
+        for activity in self.activity_pool.browse(cr, uid, activity_ids):
+            self.assertEqual(activity.state, 'cancelled',
+                             msg="Activity state not updated after Cancel")
+            self.assertEqual(
+                activity.terminate_uid.id, uid,
+                msg="Activity completion user not updated after Cancel")
+            self.assertTrue(
+                activity.date_terminated,
+                msg="Activity date terminated not updated after Cancel")
+
+    def test_cancel_many_raises_exception_when_one_is_cancelled(self):
+        cr, uid = self.cr, self.uid
+
+        new_id = self.activity_pool.create(
+            cr, uid, {'data_model': 'test.activity.data.model'})
+        cancelled_id = self.activity_pool.create(
+            cr, uid, {'data_model': 'test.activity.data.model'})
+        self.activity_pool.write(cr, uid, cancelled_id,
+                                 {'state': 'cancelled'})
+        with self.assertRaises(except_orm):
+            self.activity_pool.cancel_many(cr, uid, [new_id, cancelled_id])
+        activity = self.activity_pool.browse(cr, uid, new_id)
+        self.assertEqual(activity.state, 'new',
+                         msg="Activity cancelled when another could not be")
+
+    def test_schedule_many_schedules_activities(self):
+        cr, uid = self.cr, self.uid
+
+        activity_ids = self.test_model_pool.create_activities(
+            cr, uid, [{}, {}])
+        self.assertTrue(
+            self.activity_pool.schedule_many(
+                cr, uid, activity_ids, '2015-10-10 12:00:00'),
+            msg="Activity Schedule Many failed")
+        for activity in self.activity_pool.browse(cr, uid, activity_ids):
+            self.assertEqual(activity.state, 'scheduled',
+                             msg="Activity state not updated after Schedule")
+            self.assertEqual(
+                activity.date_scheduled, '2015-10-10 12:00:00',
+                msg="Activity date scheduled not updated after Schedule")
+
+    def test_schedule_many_raises_exception_when_scheduled_without_date(self):
+        cr, uid = self.cr, self.uid
+
+        activity_ids = self.test_model_pool.create_activities(
+            cr, uid, [{'date_scheduled': '2015-10-10 12:00:00'}, {}])
+        with self.assertRaises(except_orm):
+            self.activity_pool.schedule_many(cr, uid, activity_ids)
+
+    def test_start_many_starts_activities(self):
+        cr, uid = self.cr, self.uid
+
+        activity_ids = self.test_model_pool.create_activities(
+            cr, uid, [{}, {}])
+        self.assertTrue(self.activity_pool.start_many(cr, uid, activity_ids),
+                        msg="Activity Start Many failed")
+        for activity in self.activity_pool.browse(cr, uid, activity_ids):
+            self.assertEqual(activity.state, 'started',
+                             msg="Activity state not updated after Start")
+            self.assertTrue(
+                activity.date_started,
+                msg="Activity date started not updated after Start")
+
+    def test_complete_many_completes_activities(self):
+        cr, uid = self.cr, self.uid
+
+        activity_ids = self.test_model_pool.create_activities(
+            cr, uid, [{}, {}])
+        self.assertTrue(
+            self.activity_pool.complete_many(cr, uid, activity_ids),
+            msg="Activity Complete Many failed")
+        for activity in self.activity_pool.browse(cr, uid, activity_ids):
+            self.assertEqual(activity.state, 'completed',
+                             msg="Activity state not updated after Complete")
+            self.assertEqual(
+                activity.terminate_uid.id, uid,
+                msg="Activity completion user not updated after Complete")
+            self.assertTrue(
+                activity.date_terminated,
+                msg="Activity date terminated not updated after Complete")
+
+    def test_complete_many_raises_exception_without_completing_any(self):
+        cr, uid = self.cr, self.uid
+
+        activity_ids = self.test_model_pool.create_activities(
+            cr, uid, [{}, {}])
+        self.activity_pool.write(cr, uid, activity_ids[1],
+                                 {'state': 'cancelled'})
+        with self.assertRaises(except_orm):
+            self.activity_pool.complete_many(cr, uid, activity_ids)
+        activity = self.activity_pool.browse(cr, uid, activity_ids[0])
+        self.assertEqual(activity.state, 'new',
+                         msg="Activity completed when another could not be")
+
+    def test_complete_many_calls_complete_when_overridden(self):
+        cr, uid = self.cr, self.uid
+
+        activity_ids = [
+            self.activity_pool.create(
+                cr, uid, {'data_model': 'test.activity.data.model3'}),
+            self.activity_pool.create(
+                cr, uid, {'data_model': 'test.activity.data.model3'})
+        ]
+        self.activity_pool.complete_many(cr, uid, activity_ids)
+        for activity in self.activity_pool.browse(cr, uid, activity_ids):
+            self.assertEqual(activity.state, 'completed',
+                             msg="Activity state not updated after Complete")
+            self.assertEqual(
+                activity.notes, 'Completed individually',
+                msg="Overridden Complete not called")
+
+    def test_has_batch_action(self):
+        overriding_pool = self.registry('test.activity.data.model3')
+        self.assertTrue(self.test_model_pool.has_batch_action('complete'))
+        self.assertFalse(overriding_pool.has_batch_action('complete'))
+        self.assertTrue(overriding_pool.has_batch_action('cancel'))
+        batch_overriding_pool = self.registry('test.activity.data.model4')
+        self.assertTrue(batch_overriding_pool.has_batch_action('complete'))
+        self.assertFalse(
+            batch_overriding_pool.has_batch_action('create', '_create_many'))
+
     def test_is_action_allowed_when_action_is_schedule(self):
         self.assertTrue(self.test_model_pool.is_action_allowed('new',
                                                                'schedule'))
@@ -20,3 +20,41 @@ class test_activity_data_model2(orm.Model):
     _columns = {
         'field1': fields.text('Field1')
     }
+
+
+class test_activity_data_model3(orm.Model):
+    _name = 'test.activity.data.model3'
+    _inherit = ['nh.activity.data']
+
+    _columns = {
+        'field1': fields.text('Field1')
+    }
+
+    def complete(self, cr, uid, activity_id, context=None):
+        self.pool['nh.activity'].write(
+            cr, uid, activity_id, {'notes': 'Completed individually'},
+            context=context)
+        return super(test_activity_data_model3, self).complete(
+            cr, uid, activity_id, context=context)
+
+
+class test_activity_data_model4(orm.Model):
+    _name = 'test.activity.data.model4'
+    _inherit = ['nh.activity.data']
+
+    _columns = {
+        'field1': fields.text('Field1')
+    }
+
+    def create(self, cr, uid, vals, context=None):
+        vals = dict(vals, field1='Created individually')
+        return super(test_activity_data_model4, self).create(
+            cr, uid, vals, context=context)
+
+    def complete(self, cr, uid, activity_id, context=None):
+        return super(test_activity_data_model4, self).complete(
+            cr, uid, activity_id, context=context)
+
+    def complete_many(self, cr, uid, activity_ids, context=None):
+        return super(test_activity_data_model4, self).complete_many(
+            cr, uid, activity_ids, context=context)
@@ -46,11 +46,10 @@ class NHClinicalPatientObservationBloodGlucose(models.Model):
             validate.in_min_max_range(field_min, field_max, self.blood_glucose)
 
     @api.model
-    def get_form_description(self, patient_id):
+    def build_form_description(self):
         """
         Override of `nh.clinical.patient.observation_scored` method.
 
-        :param patient_id:
         :return:
         """
         form_description = deepcopy(self._form_description)
@@ -61,7 +61,7 @@ class nh_activity(orm.Model):
             string='Location Name'),
         'pos_id': fields.many2one('nh.clinical.pos', 'POS', readonly=True),
         'spell_activity_id': fields.many2one(
-            'nh.activity', 'Spell Activity', readonly=True),
+            'nh.activity', 'Spell Activity', readonly=True, select=True),
         'cancel_reason_id': fields.many2one(
             'nh.cancel.reason', 'Cancellation Reason'),
         'ward_manager_id': fields.many2one(
@@ -85,11 +85,47 @@ class nh_activity(orm.Model):
             user_ids = self.pool['nh.activity.data'].get_activity_user_ids(
                 cr, uid, res, context=context)
             if vals.get('data_model') == 'nh.clinical.spell':
-                self.update_users(cr, uid, user_ids)
+                self.update_users(cr, uid, user_ids,
+                                  location_ids=[vals['location_id']])
             else:
                 self.write(cr, uid, res, {'user_ids': [[6, False, user_ids]]})
         return res
 
+    def create_many(self, cr, uid, vals_list, context=None):
+        """
+        Extends :meth:`create_many()<activity.nh_activity.create_many>`
+        in the same way as :meth:`create`, looking up the responsible
+        users of all the activities at once.
+
+        :param vals_list: values to create each activity with
+        :type vals_list: list
+        :returns: :class:`nh_activity<activity.nh_activity>` ids
+        :rtype: list
+        """
+        res = super(nh_activity, self).create_many(cr, uid, vals_list,
+                                                   context=context)
+        located_ids = [activity_id for activity_id, vals
+                       in zip(res, vals_list) if vals.get('location_id')]
+        if not located_ids:
+            return res
+        user_ids = self.pool['nh.activity.data'].get_activities_user_ids(
+            cr, uid, located_ids, context=context)
+        activity_ids_by_users = {}
+        for activity_id, vals in zip(res, vals_list):
+            if not vals.get('location_id'):
+                continue
+            if vals.get('data_model') == 'nh.clinical.spell':
+                self.update_users(cr, uid, user_ids[activity_id],
+                                  location_ids=[vals['location_id']])
+            else:
+                activity_ids_by_users.setdefault(
+                    tuple(sorted(user_ids[activity_id])), []).append(
+                    activity_id)
+        for users, activity_ids in activity_ids_by_users.items():
+            self.write(cr, uid, activity_ids,
+                       {'user_ids': [[6, False, list(users)]]})
+        return res
+
     def write(self, cr, uid, ids, values, context=None):
         """
         Extends Odoo's `write()` method.
@@ -112,6 +148,12 @@ class nh_activity(orm.Model):
             values = {}
         res = super(nh_activity, self).write(cr, uid, ids, values,
                                              context=context)
+        # started spells may have changed, see
+        # nh.clinical.spell.get_current_spell()
+        current_spell_cache = (context or {}).get('current_spell_cache')
+        if current_spell_cache and \
+                ('state' in values or 'patient_id' in values):
+            current_spell_cache.clear()
         if 'location_id' in values:
             location_pool = self.pool['nh.clinical.location']
             location = location_pool.read(cr, uid, values['location_id'],
@@ -136,6 +178,25 @@ class nh_activity(orm.Model):
             'cancel_reason_id': cancel_reason_id
         })
 
+    def cancel_many_with_reason(self, cr, uid, activity_ids,
+                                cancel_reason_id, context=None):
+        """
+        Cancel many activities and add the same cancel reason to them.
+
+        :param activity_ids: activity ids
+        :type activity_ids: list
+        :param cancel_reason_id: :class:`nh.cancel.reason` id
+        :type cancel_reason_id: int
+        :return: ``True``
+        :rtype: bool
+        """
+        if not activity_ids:
+            return True
+        self.cancel_many(cr, uid, activity_ids, context=context)
+        return self.write(cr, uid, activity_ids, {
+            'cancel_reason_id': cancel_reason_id
+        }, context=context)
+
     def cancel_open_activities(self, cr, uid, parent_id, model,
                                cancel_reason_id=None, context=None):
         """
@@ -163,51 +224,140 @@ class nh_activity(orm.Model):
              for a in open_activity_ids]
         )
 
-    def update_users(self, cr, uid, user_ids):
+    _responsible_pairs_skeleton = """
+        select activity.id as activity_id, ulr.user_id
+        from user_location_rel ulr
+        inner join res_groups_users_rel gur on ulr.user_id = gur.uid
+        inner join ir_model_access access on access.group_id = gur.gid
+          and access.perm_responsibility = true
+        inner join ir_model model on model.id = access.model_id
+        inner join nh_activity activity
+          on model.model = activity.data_model
+          and activity.location_id = ulr.location_id
+          and activity.state not in ('completed','cancelled')
+        where ulr.user_id in %(user_ids)s {location_filter}
+        union
+        {spell_pairs}
+    """
+
+    _spell_pairs_skeleton = """
+        select activity.id as activity_id, ulr.user_id
+        from user_location_rel ulr
+        inner join res_groups_users_rel gur on ulr.user_id = gur.uid
+        inner join ir_model_access access
+          on access.group_id = gur.gid
+          and access.perm_responsibility = true
+        inner join ir_model model
+          on model.id = access.model_id
+          and model.model = 'nh.clinical.spell'
+        inner join nh_clinical_location_closure closure
+          on closure.ancestor_id = ulr.location_id
+        inner join nh_activity activity
+          on model.model = activity.data_model
+          and activity.location_id = closure.descendant_id
+        where ulr.user_id in %(user_ids)s {location_filter}
+    """
+
+    def _get_responsible_pairs_sql(self, location_ids=None, spell_only=False):
+        """
+        Builds the query returning the (activity, user) pairs that
+        ``activity_user_rel`` should hold for a set of users, passed as
+        the ``user_ids`` parameter.
+
+        :param location_ids: only return pairs for activities in these
+            locations or below them, passed as the ``location_ids``
+            parameter
+        :type location_ids: list
+        :param spell_only: only return pairs for spell activities
+        :type spell_only: bool
+        :returns: SQL statement
+        :rtype: str
+        """
+        location_filter = ''
+        if location_ids is not None:
+            location_filter = """
+          and activity.location_id in (
+            select descendant_id from nh_clinical_location_closure
+            where ancestor_id in %(location_ids)s)"""
+        spell_pairs = self._spell_pairs_skeleton.format(
+            location_filter=location_filter)
+        if spell_only:
+            return spell_pairs
+        return self._responsible_pairs_skeleton.format(
+            location_filter=location_filter, spell_pairs=spell_pairs)
+
+    def update_users(self, cr, uid, user_ids, location_ids=None):
         """
         Updates activities with the user_ids of users responsible for
         the activities' locations.
 
+        Only the difference between what ``activity_user_rel`` holds
+        for the users and what it should hold is written: pairs that no
+        longer apply are removed and missing pairs are added. Passing
+        ``location_ids`` narrows this to activities in or below those
+        locations, for when only some of the users' locations changed.
+
         :param user_ids: user ids. See class
             :class:`res_users<base.res_users>`
         :type user_ids: list
+        :param location_ids: locations affected by the change
+        :type location_ids: list
         :returns: ``True``
         :rtype: bool
         """
 
-        if not user_ids:
+        user_ids = isinstance(user_ids, (list, tuple)) and user_ids \
+            or [user_ids]
+        user_ids = [user_id for user_id in user_ids if user_id]
+        if not user_ids or location_ids == []:
             return True
 
-        where_clause = "where user_id in (%s)" % list2sqlstr(user_ids)
-
+        location_filter = ''
+        if location_ids is not None:
+            location_filter = """
+                and rel.activity_id in (
+                    select activity.id from nh_activity activity
+                    inner join nh_clinical_location_closure closure
+                        on closure.descendant_id = activity.location_id
+                    where closure.ancestor_id in %(location_ids)s)"""
         sql = """
-            delete from activity_user_rel {where_clause};
-            insert into activity_user_rel
-            select activity_id, user_id from
-                (select distinct on (activity.id, ulr.user_id)
-                        activity.id as activity_id,
-                        ulr.user_id
-                from user_location_rel ulr
-                inner join res_groups_users_rel gur on ulr.user_id = gur.uid
-                inner join ir_model_access access on access.group_id = gur.gid
-                  and access.perm_responsibility = true
-                inner join ir_model model on model.id = access.model_id
-                inner join nh_activity activity
-                  on model.model = activity.data_model
-                  and activity.location_id = ulr.location_id
-                  and activity.state not in ('completed','cancelled')
-                where not exists
-                  (select 1 from activity_user_rel
-                    where activity_id=activity.id
-                    and user_id=ulr.user_id )) pairs
-            {where_clause}
-        """.format(where_clause=where_clause)
-        cr.execute(sql)
-        self.update_spell_users(cr, uid, user_ids)
-
+            with
+            pairs as ({pairs}),
+            removed as (
+                delete from activity_user_rel rel
+                where rel.user_id in %(user_ids)s {location_filter}
+                and not exists (
+                    select 1 from pairs
+                    where pairs.activity_id = rel.activity_id
+                    and pairs.user_id = rel.user_id)
+                returning 1
+            ),
+            added as (
+                insert into activity_user_rel (activity_id, user_id)
+                select pairs.activity_id, pairs.user_id
+                from pairs
+                where not exists (
+                    select 1 from activity_user_rel rel
+                    where rel.activity_id = pairs.activity_id
+                    and rel.user_id = pairs.user_id)
+                returning 1
+            )
+            select
+                (select count(*) from removed),
+                (select count(*) from added)
+        """.format(pairs=self._get_responsible_pairs_sql(location_ids),
+                   location_filter=location_filter)
+        cr.execute(sql, {
+            'user_ids': tuple(user_ids),
+            'location_ids': tuple(location_ids or [0])
+        })
+        removed, added = cr.fetchone()
+        _logger.debug('Updated activity users for %s user(s): '
+                      '%s pair(s) removed, %s added',
+                      len(user_ids), removed, added)
         return True
 
-    def update_spell_users(self, cr, uid, user_ids=None):
+    def update_spell_users(self, cr, uid, user_ids=None, location_ids=None):
         """
         Updates spell activities with the user_ids of users
         responsible for parent locations of spell location.
@@ -215,59 +365,32 @@ class nh_activity(orm.Model):
         :param user_ids: user ids. See class
             :class:`res_users<base.res_users>`
         :type user_ids: list
+        :param location_ids: only update spells in or below these
+            locations
+        :type location_ids: list
         :returns: ``True``
         :rtype: bool
         """
 
-        if not user_ids:
+        if not user_ids or location_ids == []:
             return True
-
-        where_clause = "where user_id in (%s)" % list2sqlstr(user_ids)
+        user_ids = isinstance(user_ids, (list, tuple)) and user_ids \
+            or [user_ids]
 
         sql = """
-            with
-               recursive route(level, path, parent_id, id) as (
-                       select 0, id::text, parent_id, id
-                       from nh_clinical_location
-                       where parent_id is null
-                   union
-                       select level + 1, path||','||location.id,
-                        location.parent_id, location.id
-                       from nh_clinical_location location
-                       join route on location.parent_id = route.id
-               ),
-               parent_location as (
-                   select
-                       id as location_id,
-                       ('{'||path||'}')::int[] as ids
-                   from route
-                   order by path
-               )
-           insert into activity_user_rel
-           select activity_id, user_id from (
-               select distinct on (activity.id, ulr.user_id)
-                   activity.id as activity_id,
-                   ulr.user_id
-               from user_location_rel ulr
-               inner join res_groups_users_rel gur on ulr.user_id = gur.uid
-               inner join ir_model_access access
-                on access.group_id = gur.gid
-                and access.perm_responsibility = true
-               inner join ir_model model
-                on model.id = access.model_id
-                and model.model = 'nh.clinical.spell'
-               inner join parent_location
-                on parent_location.ids  && array[ulr.location_id]
-               inner join nh_activity activity
-                on model.model = activity.data_model
-                and activity.location_id = parent_location.location_id
-               where not exists
-                (select 1 from activity_user_rel
-                where activity_id=activity.id and user_id=ulr.user_id )) pairs
-           %s
-        """ % where_clause
-
-        cr.execute(sql)
+            insert into activity_user_rel (activity_id, user_id)
+            select distinct pairs.activity_id, pairs.user_id
+            from ({pairs}) pairs
+            where not exists (
+                select 1 from activity_user_rel rel
+                where rel.activity_id = pairs.activity_id
+                and rel.user_id = pairs.user_id)
+        """.format(pairs=self._get_responsible_pairs_sql(
+            location_ids, spell_only=True))
+        cr.execute(sql, {
+            'user_ids': tuple(user_ids),
+            'location_ids': tuple(location_ids or [0])
+        })
         return True
 
 
@@ -339,6 +462,23 @@ class nh_activity_data(orm.AbstractModel):
         self._audit_shift_coordinator(cr, uid, activity_id, context=context)
         return res
 
+    def complete_many(self, cr, uid, activity_ids, context=None):
+        """
+        Extends
+        :meth:`complete_many()<activity.nh_activity_data.complete_many>`
+        method to audit the ward managers responsible for the activities'
+        locations.
+
+        :param activity_ids: activity ids
+        :type activity_ids: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        res = super(nh_activity_data, self).complete_many(
+            cr, uid, activity_ids, context=context)
+        self._audit_shift_coordinators(cr, uid, activity_ids, context=context)
+        return res
+
     def cancel(self, cr, uid, activity_id, context=None):
         """
         Extends :meth:`cancel()<activity.nh_activity_data.complete>`
@@ -356,6 +496,60 @@ class nh_activity_data(orm.AbstractModel):
         self._audit_shift_coordinator(cr, uid, activity_id, context=context)
         return res
 
+    def cancel_many(self, cr, uid, activity_ids, context=None):
+        """
+        Extends
+        :meth:`cancel_many()<activity.nh_activity_data.cancel_many>`
+        method to audit the ward managers responsible for the activities'
+        locations.
+
+        :param activity_ids: activity ids
+        :type activity_ids: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        res = super(nh_activity_data, self).cancel_many(
+            cr, uid, activity_ids, context=context)
+        self._audit_shift_coordinators(cr, uid, activity_ids, context=context)
+        return res
+
+    def _audit_shift_coordinators(self, cr, uid, activity_ids, context=None):
+        """
+        Batched :meth:`_audit_shift_coordinator`. Each location's ward is
+        looked up once and activities with the same ward manager are
+        written together.
+
+        :param activity_ids: activity ids
+        :type activity_ids: list
+        """
+        activity_pool = self.pool['nh.activity']
+        location_pool = self.pool['nh.clinical.location']
+        ward_managers = {}
+        activity_ids_by_manager = {}
+        for activity in activity_pool.browse(cr, uid, activity_ids,
+                                             context=context):
+            location = activity.location_id
+            if not location:
+                continue
+            if location.id not in ward_managers:
+                if location.usage != 'ward':
+                    ward_id = location_pool.get_closest_parent_id(
+                        cr, uid, location.id, 'ward', context=context)
+                    ward = location_pool.browse(cr, uid, ward_id,
+                                                context=context)
+                else:
+                    ward = location
+                ward_managers[location.id] = ward.assigned_wm_ids[0].id \
+                    if ward.assigned_wm_ids else False
+            ward_manager_id = ward_managers[location.id]
+            if ward_manager_id:
+                activity_ids_by_manager.setdefault(
+                    ward_manager_id, []).append(activity.id)
+        for ward_manager_id, ids in activity_ids_by_manager.items():
+            activity_pool.write(cr, uid, ids,
+                                {'ward_manager_id': ward_manager_id},
+                                context=context)
+
     def update_activity(self, cr, uid, activity_id, context=None):
         """
         Extends
@@ -399,6 +593,117 @@ class nh_activity_data(orm.AbstractModel):
             activity.data_model, activity.id, activity_vals)
         return True
 
+    def update_activities(self, cr, uid, activity_ids, context=None):
+        """
+        Extends :meth:`update_activities()
+        <activity.nh_activity_data.update_activities>` to do the same as :meth:`update_activity` for many activities,
+        reading their data, spells and responsible users together and
+        writing activities that end up with the same values at once.
+
+        :param activity_ids: activity ids of updated activities
+        :type activity_ids: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        if not self.has_batch_action('update_activity', 'update_activities'):
+            return super(nh_activity_data, self).update_activities(
+                cr, uid, activity_ids, context=context)
+        if not activity_ids:
+            return True
+        activity_pool = self.pool['nh.activity']
+        data_ids = self.search(cr, uid, [('activity_id', 'in', activity_ids)])
+        data_by_activity = {}
+        for data in self.browse(cr, uid, data_ids, context=context):
+            data_by_activity.setdefault(data.activity_id.id, data)
+
+        patient_ids = dict(
+            (activity_id, self._get_data_patient_id(data))
+            for activity_id, data in data_by_activity.items())
+        spell_pos_ids = self._get_spell_pos_ids(
+            cr, uid, set(patient_ids.values()), context=context)
+        activity_ids_by_vals = {}
+        for activity_id, data in data_by_activity.items():
+            patient_id = patient_ids[activity_id]
+            location_id = self._get_data_location_id(data)
+            activity_vals = {
+                'location_id': location_id,
+                'pos_id': self._get_data_pos_id(
+                    cr, uid, data, location_id, patient_id,
+                    spell_pos_ids=spell_pos_ids, context=context)
+            }
+            if 'patient_id' in self._columns.keys():
+                activity_vals.update({'patient_id': patient_id})
+            activity_ids_by_vals.setdefault(
+                tuple(sorted(activity_vals.items())), []).append(activity_id)
+        for activity_vals, ids in activity_ids_by_vals.items():
+            activity_pool.write(cr, uid, ids, dict(activity_vals),
+                                context=context)
+
+        spell_activity_ids = {}
+        spell_ids = activity_pool.search(cr, uid, [
+            ['patient_id', 'in', list(set(patient_ids.values()))],
+            ['data_model', '=', 'nh.clinical.spell'],
+            ['state', '=', 'started']], context=context)
+        for spell in activity_pool.read(cr, uid, spell_ids, ['patient_id'],
+                                        context=context):
+            spell_activity_ids.setdefault(
+                spell['patient_id'] and spell['patient_id'][0], spell['id'])
+        # user_ids depend on location_id, thus separate updates
+        located_ids = data_by_activity.keys()
+        if self.has_batch_action('get_activity_user_ids',
+                                 'get_activities_user_ids'):
+            user_ids = self.get_activities_user_ids(
+                cr, uid, located_ids, context=context)
+        else:
+            user_ids = dict(
+                (activity_id, self.get_activity_user_ids(
+                    cr, uid, activity_id, context=context))
+                for activity_id in located_ids)
+        activity_ids_by_vals = {}
+        for activity_id in located_ids:
+            key = (tuple(sorted(user_ids.get(activity_id, []))),
+                   spell_activity_ids.get(patient_ids[activity_id], False))
+            activity_ids_by_vals.setdefault(key, []).append(activity_id)
+        for (users, spell_activity_id), ids in activity_ids_by_vals.items():
+            activity_pool.write(
+                cr, uid, ids,
+                {'user_ids': [(6, 0, list(users))],
+                 'spell_activity_id': spell_activity_id}, context=context)
+        _logger.debug("activity '%s', %s activities updated",
+                      self._name, len(located_ids))
+        return True
+
+    def _get_activity_data(self, cr, uid, activity_id, context=None):
+        """
+        Gets the data record of an activity.
+
+        :param activity_id: activity id
+        :type activity_id: int
+        :returns: data model record
+        """
+        data_ids = self.search(cr, uid, [('activity_id', '=', activity_id)])
+        return self.browse(cr, uid, data_ids, context=context)[0]
+
+    def _get_spell_pos_ids(self, cr, uid, patient_ids, context=None):
+        """
+        Gets the POS of each patient's started spell, see
+        :meth:`get_by_patient_id()<spell.nh_clinical_spell.get_by_patient_id>`.
+
+        :param patient_ids: patient ids
+        :type patient_ids: iterable
+        :returns: patient ids mapped to POS ids
+        :rtype: dict
+        """
+        spell_pool = self.pool['nh.clinical.spell']
+        spell_ids = spell_pool.search(cr, uid, [
+            ['patient_id', 'in', [patient_id for patient_id in patient_ids
+                                  if patient_id]],
+            ['activity_id.state', '=', 'started']], context=context)
+        spell_pos_ids = {}
+        for spell in spell_pool.browse(cr, uid, spell_ids, context=context):
+            spell_pos_ids.setdefault(spell.patient_id.id, spell.pos_id.id)
+        return spell_pos_ids
+
     def get_activity_pos_id(self, cr, uid, activity_id, context=None):
         """
         Gets activity point of service (POST) id.
@@ -409,18 +714,38 @@ class nh_activity_data(orm.AbstractModel):
         :rtype: int
         """
 
+        data = self._get_activity_data(cr, uid, activity_id, context=context)
+        if 'pos_id' in self._columns.keys() and data.pos_id:
+            return data.pos_id.id
+        location_id = self.get_activity_location_id(cr, uid, activity_id)
+        patient_id = self.get_activity_patient_id(cr, uid, activity_id)
+        return self._get_data_pos_id(cr, uid, data, location_id, patient_id,
+                                     context=context)
+
+    def _get_data_pos_id(self, cr, uid, data, location_id, patient_id,
+                         spell_pos_ids=None, context=None):
+        """
+        Gets the point of service (POS) id for an activity's data, see
+        :meth:`get_activity_pos_id`.
+
+        :param data: data model record
+        :param location_id: the activity's location id
+        :type location_id: int
+        :param patient_id: the activity's patient id
+        :type patient_id: int
+        :param spell_pos_ids: patient ids mapped to the POS of their
+            started spell, looked up if not passed
+        :type spell_pos_ids: dict
+        :returns: POS id
+        :rtype: int
+        """
         pos_id = False
         patient_pool = self.pool['nh.clinical.patient']
 
-        data_ids = self.search(cr, uid, [('activity_id', '=', activity_id)])
-        data = self.browse(cr, uid, data_ids, context=context)[0]
-
         if 'pos_id' in self._columns.keys():
             pos_id = data.pos_id.id if data.pos_id else False
         if pos_id:
             return pos_id
-        location_id = self.get_activity_location_id(cr, uid, activity_id)
-        patient_id = self.get_activity_patient_id(cr, uid, activity_id)
 
         if not location_id:
             patient = patient_pool.browse(cr, uid, patient_id, context=context)
@@ -436,6 +761,8 @@ class nh_activity_data(orm.AbstractModel):
                 pos_id = location.pos_id.id if location.pos_id else False
                 if pos_id:
                     return pos_id
+        if spell_pos_ids is not None:
+            return spell_pos_ids.get(patient_id, False)
         spell_pool = self.pool['nh.clinical.spell']
         spell_id = spell_pool.get_by_patient_id(cr, uid, patient_id,
                                                 context=context)
@@ -458,10 +785,19 @@ class nh_activity_data(orm.AbstractModel):
             :mod:`nh_clinical_location<base.nh_clinical_location>`
         :rtype: int
         """
-        location_id = False
-        data_ids = self.search(cr, uid, [('activity_id', '=', activity_id)])
-        data = self.browse(cr, uid, data_ids, context=context)[0]
+        data = self._get_activity_data(cr, uid, activity_id, context=context)
+        return self._get_data_location_id(data)
 
+    def _get_data_location_id(self, data):
+        """
+        Gets the location id for an activity's data, see
+        :meth:`get_activity_location_id`.
+
+        :param data: data model record
+        :returns: location_id
+        :rtype: int
+        """
+        location_id = False
         if 'location_id' in self._columns.keys():
             location_id = data.location_id.id if data.location_id else False
         if not location_id:
@@ -487,10 +823,19 @@ class nh_activity_data(orm.AbstractModel):
             :mod:`nh_clinical_patient<base.nh_clinical_patient>`
         :rtype: int
         """
-        patient_id = False
-        data_ids = self.search(cr, uid, [('activity_id', '=', activity_id)])
-        data = self.browse(cr, uid, data_ids, context)[0]
+        data = self._get_activity_data(cr, uid, activity_id, context=context)
+        return self._get_data_patient_id(data)
+
+    def _get_data_patient_id(self, data):
+        """
+        Gets the patient id for an activity's data, see
+        :meth:`get_activity_patient_id`.
 
+        :param data: data model record
+        :returns: patient_id
+        :rtype: int
+        """
+        patient_id = False
         if 'patient_id' in self._columns.keys():
             patient_id = data.patient_id and data.patient_id.id or False
         return patient_id
@@ -504,11 +849,27 @@ class nh_activity_data(orm.AbstractModel):
         :returns: patient_id. See class :mod:`res_users<base.res_users>`
         :rtype: list
         """
+        return self.get_activities_user_ids(
+            cr, uid, [activity_id], context=context)[activity_id]
+
+    def get_activities_user_ids(self, cr, uid, activity_ids, context=None):
+        """
+        Gets the user ids of many activities, see
+        :meth:`get_activity_user_ids`.
+
+        :param activity_ids: activity ids
+        :type activity_ids: list
+        :returns: activity ids mapped to lists of user ids
+        :rtype: dict
+        """
         activity_pool = self.pool['nh.activity']
-        cr.execute("select location_id from nh_activity where id = %s"
-                   % activity_id)
-        if not cr.fetchone()[0]:
-            return []
+        result = dict((activity_id, []) for activity_id in activity_ids)
+        cr.execute("select id from nh_activity "
+                   "where id in %s and location_id is not null",
+                   (tuple(activity_ids) or (0,),))
+        located_ids = [row[0] for row in cr.fetchall()]
+        if not located_ids:
+            return result
         sql = """
                 select
                     activity_id,
@@ -527,16 +888,19 @@ class nh_activity_data(orm.AbstractModel):
                     inner join nh_activity activity
                       on model.model = activity.data_model
                       and activity.location_id = ulr.location_id
-                      and activity.id = {activity_id}) data
+                      and activity.id in %s) data
                 group by activity_id
-                """.format(activity_id=activity_id)
-        cr.execute(sql)
-        res = cr.dictfetchone()
-        user_ids = list(res and set(res['user_ids']) or [])
-        activity = activity_pool.browse(cr, uid, activity_id, context=context)
-        follower_ids = [user.id for user in activity.patient_id.follower_ids]
-        user_ids += follower_ids
-        return list(set(user_ids))
+                """
+        cr.execute(sql, (tuple(located_ids),))
+        for row in cr.dictfetchall():
+            result[row['activity_id']] = list(set(row['user_ids']))
+        for activity in activity_pool.browse(cr, uid, located_ids,
+                                             context=context):
+            follower_ids = [
+                user.id for user in activity.patient_id.follower_ids]
+            result[activity.id] = list(
+                set(result[activity.id] + follower_ids))
+        return result
 
     # TODO EOBS-703: Trigger policy method is too large
     def trigger_policy(self, cr, uid, activity_id, location_id=None,
@@ -573,16 +937,22 @@ class nh_activity_data(orm.AbstractModel):
 
         else:
             return True
+        patient_id = activity.data_ref.patient_id.id
+        cancel_reason_id = None
+        if self._name == 'nh.clinical.patient.placement' and any(
+                trigger_activity.get('cancel_others')
+                for trigger_activity in self._POLICY['activities']):
+            cancel_reason_id = self.pool['ir.model.data'].xmlid_to_res_id(
+                cr, uid, 'nh_clinical.cancel_reason_placement',
+                raise_if_not_found=True)
         for trigger_activity in self._POLICY.get('activities', []):
             if case and trigger_activity.get('case') != case:
                 continue
             pool = self.pool[trigger_activity['model']]
             if trigger_activity.get('context') and location_id:
-                location = location_pool.browse(cr, uid, location_id,
-                                                context=context)
-                if not any(
-                        [c.name == trigger_activity.get('context')
-                         for c in location.context_ids]):
+                if not location_pool.has_context(
+                        cr, uid, location_id, trigger_activity['context'],
+                        context=context):
                     continue
             if trigger_activity.get('domains'):
                 break_trigger = False
@@ -597,19 +967,12 @@ class nh_activity_data(orm.AbstractModel):
                 if break_trigger:
                     continue
             if trigger_activity.get('cancel_others'):
-                cancel_reason_id = None
-                if self._name == 'nh.clinical.patient.placement':
-                    model_data = self.pool['ir.model.data']
-                    cancel_reason_id = \
-                        model_data.get_object(
-                            cr, uid, 'nh_clinical', 'cancel_reason_placement'
-                        ).id
                 activity_pool.cancel_open_activities(
                     cr, uid, spell_activity_id, pool._name,
                     cancel_reason_id=cancel_reason_id, context=context
                 )
             data = {
-                'patient_id': activity.data_ref.patient_id.id
+                'patient_id': patient_id
             }
             if trigger_activity.get('create_data'):
                 for key in trigger_activity['create_data'].keys():
@@ -675,6 +1038,20 @@ class nh_clinical_activity_access(orm.Model):
     Adds an additional permission type called ``perm_responsibility``
     to an activity. This defines if a particular user group can or
     cannot perform an activity.
+
+    Access is persisted per user in two tables rather than derived from
+    the whole location tree on every read:
+
+    - ``nh_clinical_user_location_access`` holds each location a user
+      is assigned to (``direct``) plus every parent of those locations.
+    - ``nh_clinical_user_model_access`` holds the models a user is
+      responsible for through their groups.
+
+    Both are kept up to date by :meth:`refresh_user_access` whenever
+    ``user_location_rel``, group membership, responsibility access
+    rules or the location hierarchy change. Activities are joined on
+    their indexed ``location_id`` at read time, so moving an activity
+    needs no maintenance.
     """
 
     _name = 'nh.clinical.activity.access'
@@ -691,103 +1068,172 @@ class nh_clinical_activity_access(orm.Model):
     def init(self, cr):
         cr.execute("""
             drop view if exists nh_clinical_activity_access;
+            create table if not exists nh_clinical_user_location_access (
+                user_id integer not null
+                    references res_users (id) on delete cascade,
+                location_id integer not null
+                    references nh_clinical_location (id) on delete cascade,
+                direct boolean not null default false,
+                primary key (user_id, location_id)
+            );
+            create index if not exists
+                nh_clinical_user_location_access_location_id_index
+                on nh_clinical_user_location_access (location_id, user_id);
+            create table if not exists nh_clinical_user_model_access (
+                user_id integer not null
+                    references res_users (id) on delete cascade,
+                model varchar not null,
+                primary key (user_id, model)
+            );
+            create index if not exists
+                nh_clinical_user_model_access_model_index
+                on nh_clinical_user_model_access (model, user_id);
+            """)
+        self.refresh_user_access(cr, SUPERUSER_ID)
+        cr.execute("""
             create or replace view
             nh_clinical_activity_access as(
                 with
-                    recursive route(level, path, parent_id, id) as (
-                    select 0, id::text, parent_id, id
-                    from nh_clinical_location
-                    where parent_id is null
-                union
-                    select level + 1, path||','||location.id,
-                        location.parent_id, location.id
-                    from nh_clinical_location location
-                    join route on location.parent_id = route.id
-            ),
-            location_parents as (
-                select
-                    id as location_id,
-                    ('{'||path||'}')::int[] as ids
-                from route
-                order by path
-            ),
-            user_access as (
-                select
-                    u.id as user_id,
-                    array_agg(access.model_id) as model_ids
-                from res_users u
-                inner join res_groups_users_rel gur on u.id = gur.uid
-                inner join ir_model_access access
-                    on access.group_id = gur.gid
-                    and access.perm_responsibility = true
-                group by u.id
-            ),
-            user_location as (
-                select
-                    ulr.user_id,
-                    array_agg(ulr.location_id) as location_ids
-                from user_location_rel ulr
-                group by ulr.user_id
-            ),
-            user_location_parents_map as (
-                select distinct
-                   user_location.user_id,
-                   parent_location_id
-                from user_location
-                inner join location_parents
-                    on user_location.location_ids
-                    && array[location_parents.location_id]
-                inner join unnest(location_parents.ids) as parent_location_id
-                    on array[parent_location_id] && location_parents.ids
-            ),
-            user_location_parents as (
-                select
-                    user_id,
-                    array_agg(parent_location_id) as ids
-                from user_location_parents_map
-                group by user_id
-            ),
-            user_activity as (
+                user_location as (
+                    select
+                        ula.user_id,
+                        array_agg(ula.location_id) filter (where ula.direct)
+                            as location_ids,
+                        array_agg(ula.location_id) as parent_location_ids
+                    from nh_clinical_user_location_access ula
+                    group by ula.user_id
+                )
                 select
+                    user_location.user_id as id,
                     user_location.user_id,
-                    array_agg(activity.id) as activity_ids
+                    user_location.location_ids::text as location_ids_text,
+                    user_location.parent_location_ids::text
+                        as parent_location_ids_text,
+                    user_activity.ids::text as location_activity_ids_text,
+                    user_parent_location_activity.ids::text
+                        as parent_location_activity_ids_text,
+                    user_location.location_ids,
+                    user_location.parent_location_ids,
+                    user_activity.ids as location_activity_ids,
+                    user_parent_location_activity.ids
+                        as parent_location_activity_ids
                 from user_location
-                inner join user_access
-                    on user_location.user_id = user_access.user_id
-                inner join nh_activity activity
-                    on array[activity.location_id]
-                    && user_location.location_ids
-                inner join ir_model model on model.model = activity.data_model
-                    and array[model.id] && user_access.model_ids
-                group by user_location.user_id
-            ),
-            user_parent_location_activity as(
-                select
-                    user_location_parents.user_id,
-                    array_agg(activity.id) as ids
-                from user_location_parents
-                inner join nh_activity activity
-                    on array[activity.location_id] && user_location_parents.ids
-                group by user_location_parents.user_id
-            )
-            select
-                user_access.user_id as id,
-                user_access.user_id,
-                user_location.location_ids::text as location_ids_text,
-                user_location_parents.ids::text as parent_location_ids_text,
-                user_activity.activity_ids::text as location_activity_ids_text,
-                user_parent_location_activity.ids::text
-                    as parent_location_activity_ids_text,
-                user_location.location_ids as location_ids,
-                user_location_parents.ids as parent_location_ids,
-                user_activity.activity_ids as location_activity_ids,
-                user_parent_location_activity.ids
-                    as parent_location_activity_ids
-            from user_access
-        inner join user_location on user_location.user_id = user_access.user_id
-        inner join user_activity on user_activity.user_id = user_access.user_id
-        inner join user_location_parents
-            on user_location_parents.user_id = user_access.user_id
-        inner join user_parent_location_activity
-            on user_parent_location_activity.user_id = user_access.user_id
-        ); """)
+                cross join lateral (
+                    select array_agg(activity.id) as ids
+                    from nh_clinical_user_location_access ula
+                    inner join nh_activity activity
+                        on activity.location_id = ula.location_id
+                    inner join nh_clinical_user_model_access uma
+                        on uma.user_id = ula.user_id
+                        and uma.model = activity.data_model
+                    where ula.user_id = user_location.user_id
+                    and ula.direct
+                ) user_activity
+                cross join lateral (
+                    select array_agg(activity.id) as ids
+                    from nh_clinical_user_location_access ula
+                    inner join nh_activity activity
+                        on activity.location_id = ula.location_id
+                    where ula.user_id = user_location.user_id
+                ) user_parent_location_activity
+                where user_activity.ids is not null
+                and user_parent_location_activity.ids is not null
+            ); """)
+
+    def refresh_user_access(self, cr, uid, user_ids=None, context=None):
+        """
+        Rebuilds the persisted location and model access for the
+        supplied users. Only the rows belonging to those users are
+        touched, and parent locations come from the location closure
+        table.
+
+        :param user_ids: user ids. All users when not supplied
+        :type user_ids: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        if user_ids is not None:
+            user_ids = isinstance(user_ids, (list, tuple)) \
+                and list(user_ids) or [user_ids]
+            if not user_ids:
+                return True
+            user_filter = 'where user_id in %s'
+            ulr_filter = 'where ulr.user_id in %s'
+            gur_filter = 'where gur.uid in %s'
+            params = (tuple(user_ids),)
+        else:
+            user_filter = ulr_filter = gur_filter = ''
+            params = ()
+
+        cr.execute("""
+            delete from nh_clinical_user_location_access {user_filter};
+            insert into nh_clinical_user_location_access
+                (user_id, location_id, direct)
+            select ulr.user_id, closure.ancestor_id, bool_or(closure.depth = 0)
+            from user_location_rel ulr
+            inner join nh_clinical_location_closure closure
+                on closure.descendant_id = ulr.location_id
+            {ulr_filter}
+            group by ulr.user_id, closure.ancestor_id;
+        """.format(user_filter=user_filter, ulr_filter=ulr_filter),
+            params * 2)
+        cr.execute("""
+            delete from nh_clinical_user_model_access {user_filter};
+            insert into nh_clinical_user_model_access (user_id, model)
+            select distinct gur.uid, model.model
+            from res_groups_users_rel gur
+            inner join ir_model_access access
+                on access.group_id = gur.gid
+                and access.perm_responsibility = true
+            inner join ir_model model on model.id = access.model_id
+            {gur_filter};
+        """.format(user_filter=user_filter, gur_filter=gur_filter),
+            params * 2)
+        return True
+
+    def refresh_location_access(self, cr, uid, location_ids, context=None):
+        """
+        Rebuilds the persisted access of every user assigned to one of
+        the supplied locations or to a location below them. Called when
+        the location hierarchy changes.
+
+        :param location_ids: location ids
+        :type location_ids: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        if not location_ids:
+            return True
+        cr.execute("""
+            select distinct user_id
+            from nh_clinical_user_location_access
+            where location_id in %s
+        """, (tuple(location_ids),))
+        user_ids = [row[0] for row in cr.fetchall()]
+        return self.refresh_user_access(cr, uid, user_ids, context=context)
+
+    def is_responsible(self, cr, uid, user_id, activity_id, context=None):
+        """
+        Checks whether a user is responsible for an activity, i.e. the
+        activity's location is one of the user's locations and the user
+        belongs to a group with responsibility for the activity's model.
+
+        :param user_id: user id
+        :type user_id: int
+        :param activity_id: activity id
+        :type activity_id: int
+        :rtype: bool
+        """
+        cr.execute("""
+            select 1
+            from nh_activity activity
+            inner join nh_clinical_user_location_access ula
+                on ula.location_id = activity.location_id
+                and ula.user_id = %s
+                and ula.direct
+            inner join nh_clinical_user_model_access uma
+                on uma.user_id = ula.user_id
+                and uma.model = activity.data_model
+            where activity.id = %s
+        """, (user_id, activity_id))
+        return bool(cr.fetchone())
@@ -1012,6 +1012,15 @@ class nh_clinical_adt_patient_merge(orm.Model):
             raise osv.except_osv(
                 'Patient Merge Error!',
                 "Destination patient not found in submitted data!")
+        spell_pool = self.pool['nh.clinical.spell']
+        if spell_pool.get_by_patient_id(
+                cr, SUPERUSER_ID, merge_activity.data_ref.source_patient_id.id,
+                context=context) and spell_pool.get_by_patient_id(
+                cr, SUPERUSER_ID, merge_activity.data_ref.dest_patient_id.id,
+                context=context):
+            raise osv.except_osv(
+                'Patient Merge Error!',
+                "Both patients have a started spell!")
         super(nh_clinical_adt_patient_merge, self).complete(
             cr, uid, activity_id, context=context)
         patient_pool = self.pool['nh.clinical.patient']
@@ -27,6 +27,27 @@ class nh_clinical_context(orm.Model):
         'models': fields.text('Applicable Models')
     }
 
+    def write(self, cr, uid, ids, vals, context=None):
+        """
+        Extends Odoo's :meth:`write()<openerp.models.Model.write>` to
+        clear the cached context names of locations.
+        """
+        res = super(nh_clinical_context, self).write(
+            cr, uid, ids, vals, context=context)
+        if 'name' in vals:
+            self.pool['nh.clinical.location'].clear_caches()
+        return res
+
+    def unlink(self, cr, uid, ids, context=None):
+        """
+        Extends Odoo's :meth:`unlink()<openerp.models.Model.unlink>` to
+        clear the cached context names of locations.
+        """
+        res = super(nh_clinical_context, self).unlink(
+            cr, uid, ids, context=context)
+        self.pool['nh.clinical.location'].clear_caches()
+        return res
+
     def check_model(self, cr, uid, ids, model, context=None):
         """
         Checks if model is applicable for the context.
@@ -28,6 +28,77 @@ class ir_model_access(orm.Model):
             'NH Clinical Activity Responsibility'),
         }
 
+    def _refresh_activity_access(self, cr, uid, ids, context=None):
+        """
+        Rebuilds the persisted activity access of the members of the
+        groups the responsibility rules apply to.
+
+        :param ids: access rule ids
+        :type ids: list
+        """
+        ids = isinstance(ids, (list, tuple)) and ids or [ids]
+        if not ids:
+            return
+        cr.execute("""
+            select distinct gur.uid
+            from ir_model_access access
+            inner join res_groups_users_rel gur on gur.gid = access.group_id
+            where access.id in %s
+        """, (tuple(ids),))
+        user_ids = [row[0] for row in cr.fetchall()]
+        self.pool['nh.clinical.activity.access'].refresh_user_access(
+            cr, uid, user_ids, context=context)
+
+    def create(self, cr, uid, vals, context=None):
+        """
+        Extends Odoo's :meth:`create()<openerp.models.Model.create>`
+        to refresh the activity access of the group's members when the
+        rule grants responsibility.
+        """
+        res = super(ir_model_access, self).create(
+            cr, uid, vals, context=context)
+        if vals.get('perm_responsibility'):
+            self._refresh_activity_access(cr, uid, [res], context=context)
+        return res
+
+    def write(self, cr, uid, ids, vals, context=None):
+        """
+        Extends Odoo's :meth:`write()<openerp.models.Model.write>`
+        to refresh the activity access of the members of the groups
+        affected by the rule, before and after the change.
+        """
+        responsibility_fields = ['perm_responsibility', 'group_id', 'model_id']
+        refresh = any(field in vals for field in responsibility_fields)
+        if refresh:
+            # members of the groups that lose the rule need refreshing too
+            self._refresh_activity_access(cr, uid, ids, context=context)
+        res = super(ir_model_access, self).write(
+            cr, uid, ids, vals, context=context)
+        if refresh:
+            self._refresh_activity_access(cr, uid, ids, context=context)
+        return res
+
+    def unlink(self, cr, uid, ids, context=None):
+        """
+        Extends Odoo's :meth:`unlink()<openerp.models.Model.unlink>`
+        to refresh the activity access of the members of the groups
+        that lose responsibility.
+        """
+        ids = isinstance(ids, (list, tuple)) and ids or [ids]
+        cr.execute("""
+            select distinct gur.uid
+            from ir_model_access access
+            inner join res_groups_users_rel gur on gur.gid = access.group_id
+            where access.id in %s and access.perm_responsibility = true
+        """, (tuple(ids),))
+        user_ids = [row[0] for row in cr.fetchall()]
+        res = super(ir_model_access, self).unlink(
+            cr, uid, ids, context=context)
+        if user_ids:
+            self.pool['nh.clinical.activity.access'].refresh_user_access(
+                cr, uid, user_ids, context=context)
+        return res
+
 
 class res_groups(orm.Model):
     """
@@ -52,15 +123,23 @@ class res_groups(orm.Model):
         :rtype: bool
         """
 
+        ids = isinstance(ids, (list, tuple)) and ids or [ids]
+        previous_user_ids = []
+        if values.get('users'):
+            previous_user_ids = [
+                u.id for group in self.browse(cr, uid, ids, context=context)
+                for u in group.users]
         res = super(res_groups, self).write(cr, uid, ids, values, context)
         if values.get('users'):
             activity_pool = self.pool['nh.activity']
             user_ids = []
             # iterate through groups
-            for group in self.browse(
-                    cr, uid, isinstance(ids, (list, tuple)) and ids or [ids]):
+            for group in self.browse(cr, uid, ids):
                 # get all users ids of users who belong to each group
                 user_ids.extend([u.id for u in group.users])
+            self.pool['nh.clinical.activity.access'].refresh_user_access(
+                cr, uid, list(set(user_ids + previous_user_ids)),
+                context=context)
             # update activities with user ids of responsible users
             activity_pool.update_users(cr, uid, user_ids)
         return res
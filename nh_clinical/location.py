@@ -3,7 +3,7 @@
 import logging
 
 from openerp.osv import orm, fields
-from openerp import SUPERUSER_ID
+from openerp import SUPERUSER_ID, tools
 
 
 _logger = logging.getLogger(__name__)
@@ -26,6 +26,8 @@ class nh_clinical_location(orm.Model):
     _usages = [('bed', 'Bed'), ('bay', 'Bay'), ('ward', 'Ward'),
                ('room', 'Room'), ('department', 'Department'),
                ('hospital', 'Hospital')]
+    # ancestor/descendant pairs, used to resolve ``child_of`` domains
+    _closure_table = 'nh_clinical_location_closure'
 
     def _get_pos_id(self, cr, uid, ids, field, args, context=None):
         res = {}
@@ -207,6 +209,174 @@ class nh_clinical_location(orm.Model):
             res[loc.id] = sum
         return res
 
+    def init(self, cr):
+        """
+        Creates the closure table holding every ancestor/descendant pair
+        of the location tree, with ``depth`` being the number of levels
+        between them. Each location is also paired with itself at depth
+        0. The table is rebuilt from ``parent_id`` on every module
+        update and kept current by :meth:`create` and :meth:`write`.
+        """
+        cr.execute("""
+            create table if not exists nh_clinical_location_closure (
+                ancestor_id integer not null
+                    references nh_clinical_location (id) on delete cascade,
+                descendant_id integer not null
+                    references nh_clinical_location (id) on delete cascade,
+                depth integer not null,
+                primary key (ancestor_id, descendant_id)
+            );
+            create index if not exists
+                nh_clinical_location_closure_descendant_id_index
+                on nh_clinical_location_closure (descendant_id, depth);
+            truncate nh_clinical_location_closure;
+            with recursive closure(ancestor_id, descendant_id, depth) as (
+                    select id, id, 0
+                    from nh_clinical_location
+                union all
+                    select location.parent_id, closure.descendant_id,
+                        closure.depth + 1
+                    from closure
+                    inner join nh_clinical_location location
+                        on location.id = closure.ancestor_id
+                    where location.parent_id is not null
+            )
+            insert into nh_clinical_location_closure
+                (ancestor_id, descendant_id, depth)
+            select ancestor_id, descendant_id, depth
+            from closure;
+        """)
+
+    def _add_to_closure(self, cr, location_id, parent_id):
+        cr.execute("""
+            insert into nh_clinical_location_closure
+                (ancestor_id, descendant_id, depth)
+            select %(location_id)s, %(location_id)s, 0
+            union all
+            select ancestor_id, %(location_id)s, depth + 1
+            from nh_clinical_location_closure
+            where descendant_id = %(parent_id)s
+        """, {'location_id': location_id, 'parent_id': parent_id})
+
+    def _move_in_closure(self, cr, location_id, parent_id):
+        """
+        Detaches the subtree rooted at the location from its current
+        ancestors and attaches it below the new parent.
+        """
+        cr.execute("""
+            delete from nh_clinical_location_closure
+            where descendant_id in (
+                select descendant_id from nh_clinical_location_closure
+                where ancestor_id = %(location_id)s)
+            and ancestor_id not in (
+                select descendant_id from nh_clinical_location_closure
+                where ancestor_id = %(location_id)s);
+            insert into nh_clinical_location_closure
+                (ancestor_id, descendant_id, depth)
+            select parent.ancestor_id, subtree.descendant_id,
+                parent.depth + subtree.depth + 1
+            from nh_clinical_location_closure parent
+            cross join nh_clinical_location_closure subtree
+            where parent.descendant_id = %(parent_id)s
+            and subtree.ancestor_id = %(location_id)s;
+        """, {'location_id': location_id, 'parent_id': parent_id})
+
+    def get_ancestor_ids(self, cr, uid, location_id, include_self=False,
+                         context=None):
+        """
+        Gets the ids of a location's ancestors, closest first.
+
+        :param location_id: location id
+        :type location_id: int
+        :param include_self: whether to include the location itself
+        :type include_self: bool
+        :returns: location ids
+        :rtype: list
+        """
+        cr.execute("""
+            select ancestor_id
+            from nh_clinical_location_closure
+            where descendant_id = %s and depth >= %s
+            order by depth
+        """, (location_id, 0 if include_self else 1))
+        return [row[0] for row in cr.fetchall()]
+
+    def get_descendant_ids(self, cr, uid, location_ids, include_self=True,
+                           context=None):
+        """
+        Gets the ids of every location below the supplied locations.
+
+        :param location_ids: location ids
+        :type location_ids: list or int
+        :param include_self: whether to include the supplied locations
+        :type include_self: bool
+        :returns: location ids
+        :rtype: list
+        """
+        location_ids = isinstance(location_ids, (list, tuple)) \
+            and list(location_ids) or [location_ids]
+        if not location_ids:
+            return []
+        cr.execute("""
+            select distinct descendant_id
+            from nh_clinical_location_closure
+            where ancestor_id in %s and depth > 0
+        """, (tuple(location_ids),))
+        descendant_ids = [row[0] for row in cr.fetchall()]
+        if include_self:
+            # locations being created are not in the closure table yet
+            descendant_ids = location_ids + [
+                location_id for location_id in descendant_ids
+                if location_id not in location_ids]
+        return descendant_ids
+
+    def _search(self, cr, uid, args, offset=0, limit=None, order=None,
+                context=None, count=False, access_rights_uid=None):
+        """
+        Extends Odoo's :meth:`_search()<openerp.models.Model._search>`
+        to resolve ``('id', 'child_of', ids)`` leaves from the closure
+        table instead of searching the tree one level at a time.
+        """
+        domain = []
+        for leaf in args:
+            if isinstance(leaf, (list, tuple)) and len(leaf) == 3 \
+                    and leaf[0] == 'id' and leaf[1] == 'child_of':
+                ids = leaf[2]
+                ids = list(ids) if isinstance(ids, (list, tuple)) else [ids]
+                if all(isinstance(i, (int, long)) for i in ids):
+                    leaf = ['id', 'in', self.get_descendant_ids(
+                        cr, uid, ids, context=context)]
+            domain.append(leaf)
+        return super(nh_clinical_location, self)._search(
+            cr, uid, domain, offset=offset, limit=limit, order=order,
+            context=context, count=count, access_rights_uid=access_rights_uid)
+
+    @tools.ormcache(skiparg=3)
+    def _get_context_names(self, cr, uid, location_id):
+        cr.execute("""
+            select context.name
+            from nh_location_context_rel rel
+            inner join nh_clinical_context context
+                on context.id = rel.context_id
+            where rel.location_id = %s
+        """, (location_id,))
+        return frozenset(row[0] for row in cr.fetchall())
+
+    def has_context(self, cr, uid, location_id, context_name, context=None):
+        """
+        Checks if a location belongs to a clinical context. Context names
+        are cached on the registry until a location's contexts or a
+        context's name change.
+
+        :param location_id: location id
+        :type location_id: int
+        :param context_name: name of the
+            :class:`context<context.nh_clinical_context>`
+        :type context_name: str
+        :rtype: bool
+        """
+        return context_name in self._get_context_names(cr, uid, location_id)
+
     def get_closest_parent_id(self, cr, uid, location_id, usage, context=None):
         """
         Gets a location's closest ancestor (parent) location id of a
@@ -220,18 +390,19 @@ class nh_clinical_location(orm.Model):
         :rtype: int or bool
         """
 
-        location = self.read(cr, uid, location_id, ['parent_id'],
-                             context=context)
-        if not location or not location['parent_id']:
-            return False
-        else:
-            parent = self.read(cr, uid, location['parent_id'][0], ['usage'],
-                               context=context)
-        if parent['usage'] == usage:
-            return parent['id']
-        else:
-            return self.get_closest_parent_id(cr, uid, parent['id'], usage,
-                                              context=context)
+        cr.execute("""
+            select closure.ancestor_id
+            from nh_clinical_location_closure closure
+            inner join nh_clinical_location location
+                on location.id = closure.ancestor_id
+            where closure.descendant_id = %s
+            and closure.depth > 0
+            and location.usage = %s
+            order by closure.depth
+            limit 1
+        """, (location_id, usage))
+        row = cr.fetchone()
+        return row[0] if row else False
 
     def is_child_of(self, cr, uid, location_id, code, context=None):
         """
@@ -249,11 +420,10 @@ class nh_clinical_location(orm.Model):
 
         code_location_id = self.search(cr, uid, [['code', '=', code]],
                                        context=context)
-        child_location_ids = self.search(
-            cr, uid, [['id', 'child_of', code_location_id[0]]],
-            context=context
-        )
-        return location_id in child_location_ids
+        if location_id == code_location_id[0]:
+            return True
+        return code_location_id[0] in self.get_ancestor_ids(
+            cr, uid, location_id, context=context)
 
     def _get_name(self, cr, uid, ids, field, args, context=None):
         result = {}
@@ -568,6 +738,7 @@ class nh_clinical_location(orm.Model):
                                    context=context)
         res = super(nh_clinical_location, self).create(
             cr, uid, vals, context=context)
+        self._add_to_closure(cr, res, vals.get('parent_id') or None)
         if vals.get('type') == 'pos' and vals.get('usage') == 'hospital':
             user_pool = self.pool['res.users']
             user = user_pool.browse(cr, uid, uid, context=context)
@@ -595,5 +766,16 @@ class nh_clinical_location(orm.Model):
         if vals.get('context_ids'):
             self.check_context_ids(cr, uid, vals.get('context_ids'),
                                    context=context)
-        return super(nh_clinical_location, self).write(cr, uid, ids, vals,
-                                                       context=context)
+        res = super(nh_clinical_location, self).write(cr, uid, ids, vals,
+                                                      context=context)
+        if 'context_ids' in vals:
+            self.clear_caches()
+        if 'parent_id' in vals:
+            for location_id in isinstance(ids, (list, tuple)) and ids \
+                    or [ids]:
+                self._move_in_closure(
+                    cr, location_id, vals['parent_id'] or None)
+            self.pool['nh.clinical.activity.access'].refresh_location_access(
+                cr, uid, isinstance(ids, (list, tuple)) and ids or [ids],
+                context=context)
+        return res
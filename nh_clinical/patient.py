@@ -1,6 +1,9 @@
 # Part of NHClinical. See LICENSE file for full copyright and licensing details
 # -*- coding: utf-8 -*-
+import csv
+import itertools
 import logging
+import time
 
 import re
 from dateutil.parser import parse
@@ -34,6 +37,10 @@ class nh_clinical_patient(osv.Model):
         ['S', 'Other ethnic group'], ['Z', 'Not stated']
     ]
 
+    _identifier_fields = ['other_identifier', 'patient_identifier']
+    _non_alphanumeric = re.compile(r'[\W_]+')
+    _import_batch_size = 1000
+
     def _get_fullname(self, vals, fmt='{fn}, {gn} {mn}'):
         """
         Formats a fullname string from family, given and middle names.
@@ -113,12 +120,21 @@ class nh_clinical_patient(osv.Model):
         :raises: :class:`except_orm<openerp.osv.osv.except_orm>` if
             ``exception`` is ``True`` and  if the patient exists or if
             the patient does not
+
+        A dictionary passed in the context as ``hospital_number_cache``
+        is used to remember the hospital numbers that were found, so a
+        batch of messages for the same patient only searches once.
         """
+        cache = (context or {}).get('hospital_number_cache')
         if not hospital_number:
             result = False
+        elif cache is not None and cache.get(hospital_number):
+            result = True
         else:
             domain = [['other_identifier', '=', hospital_number]]
             result = bool(self.search(cr, uid, domain, context=context))
+            if result and cache is not None:
+                cache[hospital_number] = True
         if exception:
             if result and eval(exception):
                 raise osv.except_osv(
@@ -266,26 +282,278 @@ class nh_clinical_patient(osv.Model):
         if not context:
             context = dict()
         for index, field in enumerate(fields):
-            if field == 'other_identifier' or field == 'patient_identifier':
-                non_alphanumeric = re.compile(r'[\W_]+')
+            if field in self._identifier_fields:
                 for i, d in enumerate(data):
                     lst = list(d)
-                    lst[index] = non_alphanumeric.sub('', lst[index])
+                    lst[index] = self._non_alphanumeric.sub('', lst[index])
                     data[i] = tuple(lst)
             if field == 'dob':
-                if context.get('dateformat'):
-                    yfirst = context['dateformat'] == 'YMD'
-                    dfirst = context['dateformat'] == 'DMY'
-                else:
-                    yfirst = False
-                    dfirst = False
                 for i, d in enumerate(data):
                     lst = list(d)
-                    lst[index] = parse(
-                        lst[index], yearfirst=yfirst, dayfirst=dfirst
-                    ).strftime(DTF)
+                    lst[index] = self._parse_dob(
+                        lst[index], context.get('dateformat'))
                     data[i] = tuple(lst)
 
+    @staticmethod
+    def _parse_dob(dob, dateformat=None):
+        """
+        Parses an imported date of birth.
+
+        :param dob: date of birth in any format understood by dateutil
+        :type dob: str
+        :param dateformat: ``'YMD'`` or ``'DMY'`` for ambiguous dates,
+            month first if not set
+        :type dateformat: str
+        :returns: date of birth in the server datetime format
+        :rtype: str
+        """
+        return parse(dob, yearfirst=dateformat == 'YMD',
+                     dayfirst=dateformat == 'DMY').strftime(DTF)
+
+    def _import_patients(self, cr, uid, rows, batch_size=None,
+                         dateformat=None, commit=False, context=None):
+        """
+        Imports patients from an iterable of dictionaries, e.g. the rows
+        of a PAS extract, without holding the whole extract in memory.
+        Private so it can't be called over RPC, as it may commit the
+        transaction.
+
+        Identifiers and dates of birth are normalised as in :meth:`load`
+        while the rows are read. Each batch is checked against the
+        existing identifiers with one query and inserted with one
+        multi-row ``INSERT`` per table. Rows for patients that already
+        exist, or that repeat an identifier within the batch, are
+        skipped. Rows without an identifier, a family and given name or
+        with an unreadable date of birth are counted as invalid.
+
+        Unlike :meth:`create` this doesn't log a chatter message or
+        subscribe followers for each patient.
+
+        :param rows: dictionaries of patient values keyed by field name
+        :type rows: iterable
+        :param batch_size: number of rows per batch, defaults to
+            `_import_batch_size`
+        :type batch_size: int
+        :param dateformat: ``'YMD'`` or ``'DMY'`` for ambiguous dates of
+            birth
+        :type dateformat: str
+        :param commit: commit after each batch. Used for large imports
+            so that a failure doesn't lose the batches already imported.
+        :type commit: bool
+        :returns: number of rows ``read``, ``created``, ``skipped`` and
+            ``invalid``, and the ``seconds`` the import took
+        :rtype: dict
+        """
+        self.check_access_rights(cr, uid, 'create')
+        batch_size = batch_size or self._import_batch_size
+        stats = {'read': 0, 'created': 0, 'skipped': 0, 'invalid': 0}
+        start = time.time()
+        normalised_rows = self._normalise_import_rows(
+            rows, stats, dateformat=dateformat)
+        while True:
+            batch = list(itertools.islice(normalised_rows, batch_size))
+            if not batch:
+                break
+            batch = self._deduplicate_import_batch(cr, batch, stats)
+            stats['created'] += len(
+                self._insert_patients(cr, uid, batch, context=context))
+            if commit:
+                cr.commit()
+            elapsed = time.time() - start
+            _logger.info(
+                'Patient import: %s row(s) read, %s created, %s skipped, '
+                '%s invalid, %.0f row(s)/s', stats['read'], stats['created'],
+                stats['skipped'], stats['invalid'],
+                stats['read'] / elapsed if elapsed else 0.0)
+        stats['seconds'] = time.time() - start
+        self._clear_lookup_caches(context)
+        return stats
+
+    def _import_patients_csv(self, cr, uid, csv_file, batch_size=None,
+                             dateformat=None, commit=False, context=None):
+        """
+        Imports patients from a UTF-8 CSV file with a header row of
+        field names. See :meth:`_import_patients`.
+
+        :param csv_file: CSV file opened in binary mode
+        :type csv_file: file
+        :returns: import statistics
+        :rtype: dict
+        """
+        rows = (
+            dict((key, (value or '').decode('utf-8'))
+                 for key, value in row.items() if key)
+            for row in csv.DictReader(csv_file))
+        return self._import_patients(
+            cr, uid, rows, batch_size=batch_size, dateformat=dateformat,
+            commit=commit, context=context)
+
+    def _normalise_import_rows(self, rows, stats, dateformat=None):
+        """
+        Generator normalising the identifiers, date of birth and name of
+        imported rows. Invalid rows are counted and left out.
+
+        :param rows: dictionaries of patient values
+        :type rows: iterable
+        :param stats: import statistics, updated as rows are read
+        :type stats: dict
+        """
+        for row in rows:
+            stats['read'] += 1
+            vals = dict((field, value) for field, value in row.items()
+                        if value not in [None, False, ''])
+            for field in self._identifier_fields:
+                if vals.get(field):
+                    vals[field] = self._non_alphanumeric.sub('', vals[field])
+            if not any(vals.get(field) for field in self._identifier_fields) \
+                    or not vals.get('family_name') \
+                    or not vals.get('given_name'):
+                stats['invalid'] += 1
+                continue
+            if vals.get('dob'):
+                try:
+                    vals['dob'] = self._parse_dob(vals['dob'], dateformat)
+                except (ValueError, OverflowError):
+                    _logger.warning('Patient import: invalid date of birth '
+                                    '%s on row %s', vals['dob'], stats['read'])
+                    stats['invalid'] += 1
+                    continue
+            vals['name'] = self._get_fullname(vals)
+            yield vals
+
+    def _deduplicate_import_batch(self, cr, batch, stats):
+        """
+        Leaves out the rows of a batch whose identifiers belong to an
+        existing patient or to an earlier row. Earlier batches are
+        already in the table so one query per batch is enough.
+
+        :param batch: normalised patient values
+        :type batch: list
+        :param stats: import statistics, ``skipped`` is updated
+        :type stats: dict
+        :returns: patient values to insert
+        :rtype: list
+        """
+        identifiers = dict(
+            (field, [vals[field] for vals in batch if vals.get(field)])
+            for field in self._identifier_fields)
+        cr.execute("""
+            select patient.other_identifier, patient.patient_identifier
+            from nh_clinical_patient patient
+            inner join res_partner partner on partner.id = patient.partner_id
+            where partner.active
+            and (patient.other_identifier = any(%s::varchar[])
+                or patient.patient_identifier = any(%s::varchar[]))
+        """, (identifiers['other_identifier'],
+              identifiers['patient_identifier']))
+        taken = dict((field, set()) for field in self._identifier_fields)
+        for hospital_number, nhs_number in cr.fetchall():
+            taken['other_identifier'].add(hospital_number)
+            taken['patient_identifier'].add(nhs_number)
+        result = []
+        for vals in batch:
+            row_identifiers = [(field, vals[field])
+                               for field in self._identifier_fields
+                               if vals.get(field)]
+            if any(value in taken[field] for field, value in row_identifiers):
+                stats['skipped'] += 1
+                continue
+            for field, value in row_identifiers:
+                taken[field].add(value)
+            result.append(vals)
+        return result
+
+    def _insert_patients(self, cr, uid, batch, context=None):
+        """
+        Inserts a batch of patients and their partners with one
+        multi-row ``INSERT`` per table. Stored function fields of the
+        partners are computed for the whole batch afterwards.
+
+        :param batch: normalised patient values
+        :type batch: list
+        :returns: ids of the inserted patients
+        :rtype: list
+        """
+        if not batch:
+            return []
+        partner_pool = self.pool['res.partner']
+        title_pool = self.pool['res.partner.title']
+        defaults = self.default_get(
+            cr, uid, self._columns.keys() + self._inherit_fields.keys(),
+            context=context)
+        now = time.strftime(DTF)
+        titles = {}
+        partner_rows = []
+        patient_rows = []
+        for row_vals in batch:
+            vals = defaults.copy()
+            vals.update(row_vals)
+            title = vals.get('title')
+            if title and not isinstance(title, (int, long)):
+                if title not in titles:
+                    titles[title] = title_pool.get_title_by_name(
+                        cr, uid, title, context=context)
+                vals['title'] = titles[title]
+            partner_row = {}
+            patient_row = {}
+            for field, value in vals.items():
+                if field in self._inherit_fields:
+                    column = self._inherit_fields[field][2]
+                    row = partner_row
+                else:
+                    column = self._columns.get(field)
+                    row = patient_row
+                if column and column._classic_write:
+                    row[field] = column._symbol_set[1](value)
+            for row in [partner_row, patient_row]:
+                row.update({
+                    'create_uid': uid,
+                    'create_date': now,
+                    'write_uid': uid,
+                    'write_date': now
+                })
+            partner_rows.append(partner_row)
+            patient_rows.append(patient_row)
+        partner_ids = self._insert_rows(cr, partner_pool, partner_rows)
+        for partner_id, patient_row in zip(partner_ids, patient_rows):
+            patient_row['partner_id'] = partner_id
+        patient_ids = self._insert_rows(cr, self, patient_rows)
+        stored_functions = [
+            field for field, column in partner_pool._columns.items()
+            if isinstance(column, fields.function) and column.store]
+        if stored_functions:
+            partner_pool._store_set_values(
+                cr, uid, partner_ids, stored_functions, context or {})
+        return patient_ids
+
+    @staticmethod
+    def _insert_rows(cr, model, rows):
+        """
+        Inserts rows into the table of a model with a single multi-row
+        ``INSERT``, as
+        :meth:`create_many<activity.nh_activity.create_many>` does.
+
+        :param model: model whose table the rows are inserted into
+        :param rows: column values of each row
+        :type rows: list
+        :returns: ids of the rows, in the same order
+        :rtype: list
+        """
+        cr.execute("select nextval(%s) from generate_series(1, %s)",
+                   (model._sequence, len(rows)))
+        ids = [row[0] for row in cr.fetchall()]
+        columns = sorted(set(['id']).union(*rows))
+        params = []
+        for record_id, row in zip(ids, rows):
+            row['id'] = record_id
+            params.extend(row.get(column) for column in columns)
+        placeholders = '({})'.format(', '.join(['%s'] * len(columns)))
+        cr.execute("insert into {table} ({columns}) values {rows}".format(
+            table=model._table,
+            columns=', '.join('"{}"'.format(column) for column in columns),
+            rows=', '.join([placeholders] * len(rows))), params)
+        return ids
+
     def create(self, cr, uid, vals, context=None):
         """
         Extends Odoo's :meth:`create()<openerp.models.Model.create>`
@@ -309,6 +577,7 @@ class nh_clinical_patient(osv.Model):
         if vals.get('patient_identifier'):
             self.check_nhs_number(cr, uid, vals.get('patient_identifier'),
                                   exception='True', context=context)
+        self._clear_lookup_caches(context)
         return super(nh_clinical_patient, self).create(
             cr, uid, vals,
             context=dict(context or {}, mail_create_nosubscribe=True))
@@ -327,9 +596,23 @@ class nh_clinical_patient(osv.Model):
                 vals['title'] = title_pool.get_title_by_name(cr, uid,
                                                              vals['title'],
                                                              context=context)
+        if 'other_identifier' in keys or 'active' in keys:
+            self._clear_lookup_caches(context)
         return super(nh_clinical_patient, self).write(cr, uid, ids, vals,
                                                       context=context)
 
+    @staticmethod
+    def _clear_lookup_caches(context):
+        """
+        Empties the hospital number lookups remembered in the context by
+        :meth:`check_hospital_number` and
+        :meth:`get_current_spell<spell.nh_clinical_spell.get_current_spell>`.
+        """
+        for cache_key in ['hospital_number_cache', 'current_spell_cache']:
+            cache = (context or {}).get(cache_key)
+            if cache:
+                cache.clear()
+
     def unlink(self, cr, uid, ids, context=None):
         """
         "Deletes" a patient from the system without deleting the record
@@ -341,7 +624,7 @@ class nh_clinical_patient(osv.Model):
         :returns: ``True``
         :rtype: bool
         """
-
+        self._clear_lookup_caches(context)
         return super(nh_clinical_patient, self).write(cr, uid, ids,
                                                       {'active': False},
                                                       context=context)
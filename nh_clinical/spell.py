@@ -31,23 +31,6 @@ class nh_clinical_spell(orm.Model):
         res = {spell_id: False for spell_id in ids}
         sql = """
             with
-                recursive route(level, path, parent_id, id) as (
-                        select 0, id::text, parent_id, id
-                        from nh_clinical_location
-                        where parent_id is null
-                    union
-                        select level + 1, path||','||location.id,
-                            location.parent_id, location.id
-                        from nh_clinical_location location
-                        join route on location.parent_id = route.id
-                ),
-                parent_location as (
-                    select
-                        id as location_id,
-                        ('{'||path||'}')::int[] as ids
-                    from route
-                    order by path
-                ),
                 spell_transferred_locations as(
                     select
                         spell.id as spell_id,
@@ -70,23 +53,18 @@ class nh_clinical_spell(orm.Model):
                     move_activity.date_terminated < interval '1d'
                         and spell_activity.state = 'started'
                     group by spell_id, spell_activity.id
-                ),
-                user_locations as (
-                    select
-                        user_id,
-                        array_agg(location_id) as location_ids
-                    from user_location_rel
-                    group by user_id
                 )
             select
                 stl.activity_id,
                 stl.spell_id,
-                array_agg(ul.user_id) as user_ids
+                array_agg(ulr.user_id) as user_ids
             from spell_transferred_locations stl
-            inner join parent_location
-                on stl.location_ids && parent_location.ids
-            left join user_locations ul
-                on ul.location_ids && parent_location.ids
+            inner join nh_clinical_location_closure from_closure
+                on from_closure.ancestor_id = any(stl.location_ids)
+            inner join nh_clinical_location_closure closure
+                on closure.descendant_id = from_closure.descendant_id
+            left join user_location_rel ulr
+                on ulr.location_id = closure.ancestor_id
             where stl.spell_id in (%s)
             group by activity_id, stl.spell_id
         """ % ",".join(map(str, ids))
@@ -98,15 +76,48 @@ class nh_clinical_spell(orm.Model):
 
     def _transferred_user_ids_search(self, cr, uid, obj, name, args,
                                      domain=None, context=None):
+        """
+        Search the started spells transferred in the last day from a
+        location the users are assigned to, either directly or through a
+        parent or child location. Only moves completed in the last day are
+        read, using `_recent_move_index`, so the cost depends on the number
+        of recent transfers rather than every spell in the database.
+        """
         arg1, op, arg2 = args[0]
         arg2 = arg2 if isinstance(arg2, (list, tuple)) else [arg2]
-        all_ids = self.search(cr, uid, [])
-        spell_user_map = self._get_transferred_user_ids(
-            cr, uid, all_ids, 'transferred_user_ids', None)
-        spell_ids = [k for k, v in spell_user_map.items()
-                     if set(v or []) & set(arg2 or [])]
-
-        return [('id', 'in', spell_ids)]
+        if not arg2:
+            return [('id', 'in', [])]
+        cr.execute("""
+            select distinct spell.id
+            from nh_activity move_activity
+            inner join nh_clinical_patient_move move
+                on move.activity_id = move_activity.id
+                and move.from_location_id is not null
+            inner join nh_activity transfer_activity
+                on move_activity.creator_id = transfer_activity.id
+                and transfer_activity.data_model =
+                'nh.clinical.patient.transfer'
+            inner join nh_activity spell_activity
+                on move_activity.parent_id = spell_activity.id
+                and spell_activity.state = 'started'
+            inner join nh_clinical_spell spell
+                on spell.activity_id = spell_activity.id
+            where move_activity.data_model = 'nh.clinical.patient.move'
+                and move_activity.state = 'completed'
+                and move_activity.date_terminated >
+                now() at time zone 'UTC' - interval '1d'
+                and exists (
+                    select 1
+                    from nh_clinical_location_closure from_closure
+                    inner join nh_clinical_location_closure closure
+                        on closure.descendant_id = from_closure.descendant_id
+                    inner join user_location_rel ulr
+                        on ulr.location_id = closure.ancestor_id
+                    where from_closure.ancestor_id = move.from_location_id
+                        and ulr.user_id in %s
+                )
+        """, (tuple(arg2),))
+        return [('id', 'in', [row[0] for row in cr.fetchall()])]
 
     _columns = {
         'patient_id': fields.many2one('nh.clinical.patient', 'Patient',
@@ -135,6 +146,62 @@ class nh_clinical_spell(orm.Model):
             cr, uid, 'nh.clinical.spell', context=c),
     }
 
+    _current_spell_index = 'nh_activity_current_spell_index'
+    _recent_move_index = 'nh_activity_completed_move_date_terminated_index'
+
+    def init(self, cr):
+        """
+        Indexes the started spell activity of each patient so
+        :meth:`get_current_spell` is a single index probe. The index is
+        unique, making a second started spell for a patient an error,
+        unless the existing data already has patients with more than
+        one. It is made unique on a later update once they are fixed.
+
+        Completed moves are indexed by date terminated for the search of
+        `transferred_user_ids`.
+        """
+        cr.execute("""
+            create index if not exists {move_index}
+                on nh_activity (date_terminated)
+                where data_model = 'nh.clinical.patient.move'
+                and state = 'completed';
+        """.format(move_index=self._recent_move_index))
+        cr.execute("""
+            create index if not exists nh_clinical_spell_activity_id_index
+                on nh_clinical_spell (activity_id);
+            select idx.indisunique
+            from pg_index idx
+            inner join pg_class cls on cls.oid = idx.indexrelid
+            where cls.relname = %s
+        """, (self._current_spell_index,))
+        index = cr.fetchone()
+        if index and index[0]:
+            return
+        cr.execute("""
+            select patient_id
+            from nh_activity
+            where data_model = 'nh.clinical.spell'
+            and state = 'started'
+            and patient_id is not null
+            group by patient_id
+            having count(*) > 1
+        """)
+        duplicate_patient_ids = [row[0] for row in cr.fetchall()]
+        if duplicate_patient_ids:
+            _logger.warning(
+                "Patients %s have more than one started spell, the current "
+                "spell index can't be unique", duplicate_patient_ids)
+            if index:
+                return
+        cr.execute("""
+            drop index if exists {index};
+            create {unique} index {index}
+                on nh_activity (patient_id)
+                where data_model = 'nh.clinical.spell'
+                and state = 'started'
+        """.format(index=self._current_spell_index,
+                   unique='' if duplicate_patient_ids else 'unique'))
+
     def create(self, cr, uid, vals, context=None):
         """
         Checks the patient does not have already an open spell and then
@@ -180,24 +247,6 @@ class nh_clinical_spell(orm.Model):
         if not cr.fetchone()[0]:
             return []
         sql = """
-            with
-                recursive route(level, path, parent_id, id) as (
-                        select 0, id::text, parent_id, id
-                        from nh_clinical_location
-                        where parent_id is null
-                    union
-                        select level + 1, path||','||location.id,
-                            location.parent_id, location.id
-                        from nh_clinical_location location
-                        join route on location.parent_id = route.id
-                ),
-                parent_location as (
-                    select
-                        id as location_id,
-                        ('{'||path||'}')::int[] as ids
-                    from route
-                    order by path
-                )
             select
                 activity.id as activity_id,
                 array_agg(ulr.user_id) as user_ids
@@ -207,11 +256,11 @@ class nh_clinical_spell(orm.Model):
                 and access.perm_responsibility = true
             inner join ir_model model on model.id = access.model_id
                 and model.model = 'nh.clinical.spell'
-            inner join parent_location
-                on parent_location.ids  && array[ulr.location_id]
+            inner join nh_clinical_location_closure closure
+                on closure.ancestor_id = ulr.location_id
             inner join nh_activity activity
                 on model.model = activity.data_model
-                and activity.location_id = parent_location.location_id
+                and activity.location_id = closure.descendant_id
                 and activity.id = %s
             group by activity.id
                 """ % activity_id
@@ -241,9 +290,9 @@ class nh_clinical_spell(orm.Model):
         :returns: :mod:`spell<spell.nh_clinical_spell>` id
         :rtype: int
         """
-        domain = [['patient_id', '=', patient_id],
-                  ['activity_id.state', '=', 'started']]
-        spell_id = self.search(cr, uid, domain, context=context)
+        self.check_access_rights(cr, uid, 'read')
+        spell_id = self.get_current_spell(
+            cr, uid, patient_id=patient_id, context=context)['spell_id']
         if exception:
             if spell_id and eval(exception):
                 raise osv.except_osv(
@@ -255,7 +304,67 @@ class nh_clinical_spell(orm.Model):
                     'Spell Not Found!',
                     'There is no started spell for patient with id %s'
                     % patient_id)
-        return spell_id[0] if spell_id else False
+        return spell_id
+
+    def get_current_spell(self, cr, uid, patient_id=None,
+                          hospital_number=None, context=None):
+        """
+        Resolves a patient, by id or `hospital number`, to their started
+        spell with one query on the current spell index.
+
+        Results are remembered in a dictionary passed in the context as
+        ``current_spell_cache``, which is emptied whenever an activity's
+        state or patient or a patient's hospital number changes. Batch
+        jobs like the ADT inbox pass one so the patients in a batch are
+        only looked up once.
+
+        :param patient_id: :mod:`patient<base.nh_clinical_patient>` id
+        :type patient_id: int
+        :param hospital_number: `hospital number` of an active patient,
+            used when ``patient_id`` isn't passed
+        :type hospital_number: str
+        :returns: dictionary with the keys ``patient_id``, ``spell_id``
+            and ``spell_activity_id``, ``False`` when not found
+        :rtype: dict
+        """
+        if patient_id:
+            key = ('patient_id', patient_id)
+            where = 'patient.id = %s'
+        else:
+            key = ('hospital_number', hospital_number)
+            where = 'patient.other_identifier = %s and patient.active'
+        cache = (context or {}).get('current_spell_cache')
+        if cache is not None and key in cache:
+            return dict(cache[key])
+        result = {
+            'patient_id': False,
+            'spell_id': False,
+            'spell_activity_id': False
+        }
+        if key[1]:
+            cr.execute("""
+                select patient.id, spell.id, activity.id
+                from nh_clinical_patient patient
+                left join nh_activity activity
+                    on activity.patient_id = patient.id
+                    and activity.data_model = 'nh.clinical.spell'
+                    and activity.state = 'started'
+                left join nh_clinical_spell spell
+                    on spell.activity_id = activity.id
+                where {where}
+                order by spell.id desc nulls last
+                limit 1
+            """.format(where=where), (key[1],))
+            row = cr.fetchone()
+            if row:
+                result.update({
+                    'patient_id': row[0],
+                    'spell_id': row[1] or False,
+                    'spell_activity_id': row[2] or False
+                })
+        if cache is not None:
+            cache[key] = dict(result)
+        return result
 
     @api.model
     def get_spell_activity_by_patient_id(self, patient_id):
@@ -1,3 +1,6 @@
 # -*- coding: utf-8 -*-
 from . import test_activity_extension
-from . import test_cancel_with_reason
\ No newline at end of file
+from . import test_cancel_with_reason
+from . import test_activity_access
+from . import test_update_users
+from . import test_update_users_benchmark
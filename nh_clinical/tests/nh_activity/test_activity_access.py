@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+
+
+class TestActivityAccess(TransactionCase):
+    """
+    Test the persisted location and model access behind
+    `nh.clinical.activity.access` is kept up to date.
+    """
+
+    def setUp(self):
+        super(TestActivityAccess, self).setUp()
+        self.test_utils = self.env['nh.clinical.test_utils']
+        self.test_utils.admit_and_place_patient()
+        for name in ['hospital', 'ward', 'other_ward', 'bed', 'other_bed',
+                     'nurse', 'spell_activity_id']:
+            self.test_utils.copy_instance_variable_if_exists(self, name)
+        self.access_model = self.env['nh.clinical.activity.access']
+
+    def get_user_locations(self, user_id, direct=None):
+        sql = """
+            SELECT location_id FROM nh_clinical_user_location_access
+            WHERE user_id = %s
+        """
+        if direct is not None:
+            sql += ' AND direct = {}'.format(direct)
+        self.env.cr.execute(sql, (user_id,))
+        return set(row[0] for row in self.env.cr.fetchall())
+
+    def get_user_models(self, user_id):
+        self.env.cr.execute("""
+            SELECT model FROM nh_clinical_user_model_access
+            WHERE user_id = %s
+        """, (user_id,))
+        return set(row[0] for row in self.env.cr.fetchall())
+
+    def test_assigned_location_and_parents(self):
+        self.assertEqual(
+            self.get_user_locations(self.nurse.id, direct=True),
+            {self.bed.id})
+        self.assertEqual(
+            self.get_user_locations(self.nurse.id),
+            {self.bed.id, self.ward.id, self.hospital.id})
+
+    def test_responsibility_models(self):
+        self.assertIn('nh.clinical.spell', self.get_user_models(self.nurse.id))
+
+    def test_location_change_refreshes_access(self):
+        self.nurse.write({'location_ids': [[6, 0, [self.other_bed.id]]]})
+        self.assertEqual(
+            self.get_user_locations(self.nurse.id),
+            {self.other_bed.id, self.other_ward.id, self.hospital.id})
+
+    def test_parent_change_refreshes_access(self):
+        self.bed.write({'parent_id': self.other_ward.id})
+        self.assertEqual(
+            self.get_user_locations(self.nurse.id),
+            {self.bed.id, self.other_ward.id, self.hospital.id})
+
+    def test_group_removal_refreshes_access(self):
+        for group in self.nurse.groups_id:
+            group.write({'users': [[3, self.nurse.id]]})
+        self.assertFalse(self.get_user_models(self.nurse.id))
+
+    def test_view_matches_persisted_access(self):
+        access = self.access_model.search(
+            [('user_id', '=', self.nurse.id)])
+        self.assertEqual(len(access), 1)
+        self.assertIn(str(self.spell_activity_id),
+                      access.parent_location_activity_ids_text)
+
+    def test_is_responsible(self):
+        self.env.cr.execute("""
+            SELECT id FROM nh_activity
+            WHERE location_id = %s
+            AND data_model IN (
+                SELECT model FROM nh_clinical_user_model_access
+                WHERE user_id = %s)
+            LIMIT 1
+        """, (self.bed.id, self.nurse.id))
+        activity_id = self.env.cr.fetchone()[0]
+        self.assertTrue(self.access_model.is_responsible(
+            self.nurse.id, activity_id))
+        self.nurse.write({'location_ids': [[6, 0, [self.other_bed.id]]]})
+        self.assertFalse(self.access_model.is_responsible(
+            self.nurse.id, activity_id))
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+
+
+class TestUpdateUsers(TransactionCase):
+    """
+    Test `nh.activity.update_users` only adds and removes the
+    (activity, user) pairs affected by a change.
+    """
+
+    def setUp(self):
+        super(TestUpdateUsers, self).setUp()
+        self.test_utils = self.env['nh.clinical.test_utils']
+        self.test_utils.admit_and_place_patient()
+        for name in ['ward', 'other_ward', 'bed', 'other_bed', 'nurse',
+                     'spell_activity']:
+            self.test_utils.copy_instance_variable_if_exists(self, name)
+        self.activity_model = self.env['nh.activity']
+
+    def get_activity_ids(self, user_id):
+        self.env.cr.execute("""
+            SELECT activity_id FROM activity_user_rel WHERE user_id = %s
+        """, (user_id,))
+        return set(row[0] for row in self.env.cr.fetchall())
+
+    def test_user_added_to_spell_activity(self):
+        self.assertIn(self.spell_activity.id,
+                      self.get_activity_ids(self.nurse.id))
+
+    def test_moving_user_removes_pairs(self):
+        self.nurse.write({'location_ids': [[6, 0, [self.other_bed.id]]]})
+        self.assertNotIn(self.spell_activity.id,
+                         self.get_activity_ids(self.nurse.id))
+
+    def test_update_is_idempotent(self):
+        before = self.get_activity_ids(self.nurse.id)
+        self.activity_model.update_users([self.nurse.id])
+        self.assertEqual(self.get_activity_ids(self.nurse.id), before)
+
+    def test_unrelated_locations_untouched(self):
+        self.env.cr.execute("""
+            DELETE FROM activity_user_rel
+            WHERE user_id = %s AND activity_id = %s
+        """, (self.nurse.id, self.spell_activity.id))
+        self.activity_model.update_users(
+            [self.nurse.id], location_ids=[self.other_ward.id])
+        self.assertNotIn(self.spell_activity.id,
+                         self.get_activity_ids(self.nurse.id))
+        self.activity_model.update_users(
+            [self.nurse.id], location_ids=[self.ward.id])
+        self.assertIn(self.spell_activity.id,
+                      self.get_activity_ids(self.nurse.id))
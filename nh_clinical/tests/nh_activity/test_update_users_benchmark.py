@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Compares the old delete-and-reinsert maintenance of ``activity_user_rel``
+with the diff based :meth:`update_users` on a synthetic ward. Too slow for
+the regular run so only enabled when ``NH_BENCHMARK`` is set, e.g.::
+
+    NH_BENCHMARK=1 NH_BENCHMARK_ACTIVITIES=500000 openerp-server ...
+"""
+import logging
+import os
+import time
+import unittest
+
+from openerp.tests.common import TransactionCase
+
+_logger = logging.getLogger(__name__)
+
+ACTIVITY_COUNT = int(os.environ.get('NH_BENCHMARK_ACTIVITIES', 500000))
+BED_COUNT = 200
+STAFF_COUNT = 40
+
+LEGACY_UPDATE_USERS = """
+    delete from activity_user_rel where user_id in %(user_ids)s;
+    insert into activity_user_rel
+    select activity_id, user_id from
+        (select distinct on (activity.id, ulr.user_id)
+                activity.id as activity_id,
+                ulr.user_id
+        from user_location_rel ulr
+        inner join res_groups_users_rel gur on ulr.user_id = gur.uid
+        inner join ir_model_access access on access.group_id = gur.gid
+          and access.perm_responsibility = true
+        inner join ir_model model on model.id = access.model_id
+        inner join nh_activity activity
+          on model.model = activity.data_model
+          and activity.location_id = ulr.location_id
+          and activity.state not in ('completed','cancelled')
+        where not exists
+          (select 1 from activity_user_rel
+            where activity_id=activity.id
+            and user_id=ulr.user_id )) pairs
+    where user_id in %(user_ids)s;
+    with
+       recursive route(level, path, parent_id, id) as (
+               select 0, id::text, parent_id, id
+               from nh_clinical_location
+               where parent_id is null
+           union
+               select level + 1, path||','||location.id,
+                location.parent_id, location.id
+               from nh_clinical_location location
+               join route on location.parent_id = route.id
+       ),
+       parent_location as (
+           select
+               id as location_id,
+               ('{'||path||'}')::int[] as ids
+           from route
+           order by path
+       )
+    insert into activity_user_rel
+    select activity_id, user_id from (
+       select distinct on (activity.id, ulr.user_id)
+           activity.id as activity_id,
+           ulr.user_id
+       from user_location_rel ulr
+       inner join res_groups_users_rel gur on ulr.user_id = gur.uid
+       inner join ir_model_access access
+        on access.group_id = gur.gid
+        and access.perm_responsibility = true
+       inner join ir_model model
+        on model.id = access.model_id
+        and model.model = 'nh.clinical.spell'
+       inner join parent_location
+        on parent_location.ids  && array[ulr.location_id]
+       inner join nh_activity activity
+        on model.model = activity.data_model
+        and activity.location_id = parent_location.location_id
+       where not exists
+        (select 1 from activity_user_rel
+        where activity_id=activity.id and user_id=ulr.user_id )) pairs
+    where user_id in %(user_ids)s;
+"""
+
+
+@unittest.skipUnless(os.environ.get('NH_BENCHMARK'),
+                     'set NH_BENCHMARK to run benchmarks')
+class TestUpdateUsersBenchmark(TransactionCase):
+
+    def setUp(self):
+        super(TestUpdateUsersBenchmark, self).setUp()
+        self.test_utils = self.env['nh.clinical.test_utils']
+        self.activity_model = self.env['nh.activity']
+        self.test_utils.create_locations()
+        ward = self.test_utils.ward
+        self.bed_ids = [
+            self.test_utils.create_location('bed', ward.id).id
+            for _ in range(BED_COUNT)]
+        self.user_ids = [
+            self.test_utils.create_nurse(location_id=bed_id).id
+            for bed_id in self.bed_ids[:STAFF_COUNT]]
+        self.env.cr.execute("""
+            insert into nh_activity
+                (data_model, state, location_id, create_uid, write_uid,
+                 create_date, write_date)
+            select
+                (array['nh.clinical.patient.observation.ews',
+                       'nh.clinical.patient.observation.ews',
+                       'nh.clinical.spell'])[1 + i %% 3],
+                (array['scheduled', 'completed', 'started'])[1 + i %% 3],
+                (%s::int[])[1 + i %% %s],
+                1, 1, now() at time zone 'UTC', now() at time zone 'UTC'
+            from generate_series(1, %s) i
+        """, (self.bed_ids, len(self.bed_ids), ACTIVITY_COUNT))
+        self.activity_model.update_users(self.user_ids)
+        self.env.cr.execute('analyze nh_activity; analyze activity_user_rel')
+
+    def reallocate(self):
+        # shift start: every nurse moves to the next bed along
+        self.env.cr.execute("""
+            update user_location_rel ulr
+            set location_id = (%(bed_ids)s::int[])[
+                (array_position(%(bed_ids)s::int[], ulr.location_id)
+                    %% %(bed_count)s) + 1]
+            where ulr.user_id in %(user_ids)s
+        """, {
+            'bed_ids': self.bed_ids,
+            'bed_count': len(self.bed_ids),
+            'user_ids': tuple(self.user_ids)
+        })
+
+    def get_pairs(self):
+        self.env.cr.execute("""
+            select activity_id, user_id from activity_user_rel
+            where user_id in %s
+        """, (tuple(self.user_ids),))
+        return set(self.env.cr.fetchall())
+
+    def timed(self, label, method):
+        start = time.time()
+        method()
+        duration = time.time() - start
+        _logger.info('%s: %.3fs for %s staff over %s activities',
+                     label, duration, STAFF_COUNT, ACTIVITY_COUNT)
+        return duration
+
+    def test_update_users(self):
+        self.reallocate()
+        cr = self.env.cr
+
+        cr.execute('savepoint legacy')
+        self.timed('delete and reinsert', lambda: cr.execute(
+            LEGACY_UPDATE_USERS, {'user_ids': tuple(self.user_ids)}))
+        legacy_pairs = self.get_pairs()
+        cr.execute('rollback to savepoint legacy')
+
+        self.timed('diff', lambda: self.activity_model.update_users(
+            self.user_ids))
+        self.assertEqual(self.get_pairs(), legacy_pairs)
+
+    def test_update_users_changed_locations(self):
+        previous_bed_ids = self.bed_ids[:STAFF_COUNT]
+        self.reallocate()
+        changed_bed_ids = previous_bed_ids + self.bed_ids[1:STAFF_COUNT + 1]
+        cr = self.env.cr
+
+        cr.execute('savepoint full')
+        self.activity_model.update_users(self.user_ids)
+        full_pairs = self.get_pairs()
+        cr.execute('rollback to savepoint full')
+
+        self.timed('diff for changed locations',
+                  lambda: self.activity_model.update_users(
+                      self.user_ids, location_ids=list(set(changed_bed_ids))))
+        self.assertEqual(self.get_pairs(), full_pairs)
@@ -1,3 +1,4 @@
 # -*- coding: utf-8 -*-
 from . import test_patient
-from . import test_name_get
\ No newline at end of file
+from . import test_name_get
+from . import test_import_patients
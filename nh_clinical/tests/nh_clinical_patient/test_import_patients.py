@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+
+from openerp.tests.common import TransactionCase
+
+
+class TestImportPatients(TransactionCase):
+
+    def setUp(self):
+        super(TestImportPatients, self).setUp()
+        self.patient_model = self.env['nh.clinical.patient']
+        self.existing_patient = self.patient_model.create({
+            'family_name': 'Wren',
+            'given_name': 'Colin',
+            'other_identifier': 'IMPORT001',
+            'patient_identifier': '9990000001'
+        })
+        self.rows = [
+            {'other_identifier': 'IMPORT-002', 'family_name': 'Smith',
+             'given_name': 'John', 'dob': '1980-02-01'},
+            {'other_identifier': 'IMPORT003', 'family_name': 'Jones',
+             'given_name': 'Mary', 'middle_names': 'Ann',
+             'patient_identifier': '999 000 0003'},
+            # already imported by the first row
+            {'other_identifier': 'IMPORT002', 'family_name': 'Smith',
+             'given_name': 'John'},
+            # existing patient
+            {'other_identifier': 'IMPORT004', 'family_name': 'Wren',
+             'given_name': 'Colin', 'patient_identifier': '9990000001'},
+            {'other_identifier': 'IMPORT005', 'family_name': 'Brown'},
+            {'family_name': 'Green', 'given_name': 'Alice'},
+            {'other_identifier': 'IMPORT006', 'family_name': 'White',
+             'given_name': 'Bob', 'dob': 'not a date'}
+        ]
+
+    def import_patients(self, rows, **kwargs):
+        return self.patient_model._import_patients(iter(rows), **kwargs)
+
+    def get_patient(self, hospital_number):
+        return self.patient_model.search([
+            ('other_identifier', '=', hospital_number)
+        ])
+
+    def test_returns_stats(self):
+        stats = self.import_patients(self.rows, batch_size=2)
+        self.assertEqual(stats['read'], 7)
+        self.assertEqual(stats['created'], 2)
+        self.assertEqual(stats['skipped'], 2)
+        self.assertEqual(stats['invalid'], 3)
+        self.assertIn('seconds', stats)
+
+    def test_normalises_identifiers_and_dob(self):
+        self.import_patients(self.rows)
+        patient = self.get_patient('IMPORT002')
+        self.assertEqual(len(patient), 1)
+        self.assertEqual(patient.dob, '1980-02-01 00:00:00')
+        patient = self.get_patient('IMPORT003')
+        self.assertEqual(patient.patient_identifier, '9990000003')
+
+    def test_sets_partner_names(self):
+        self.import_patients(self.rows)
+        patient = self.get_patient('IMPORT003')
+        self.assertEqual(patient.name, 'Jones, Mary Ann')
+        self.assertEqual(patient.partner_id.display_name, 'Jones, Mary Ann')
+        self.assertTrue(patient.active)
+
+    def test_skips_existing_patients_and_repeated_rows(self):
+        self.import_patients(self.rows, batch_size=1)
+        self.assertEqual(len(self.get_patient('IMPORT002')), 1)
+        self.assertFalse(self.get_patient('IMPORT004'))
+
+    def test_import_is_visible_to_identifier_checks(self):
+        self.import_patients(self.rows)
+        self.assertTrue(self.patient_model.check_hospital_number('IMPORT003'))
+        self.assertTrue(self.patient_model.check_nhs_number('9990000003'))
+
+    def test_imports_csv_file(self):
+        csv_file = tempfile.NamedTemporaryFile(suffix='.csv', delete=False)
+        csv_file.write('other_identifier,family_name,given_name,dob\n'
+                       'IMPORT007,Black,Jack,01/02/1970\n'
+                       'IMPORT008,Gray,Jill,\n')
+        csv_file.close()
+        self.addCleanup(os.remove, csv_file.name)
+        with open(csv_file.name, 'rb') as import_file:
+            stats = self.patient_model._import_patients_csv(
+                import_file, dateformat='DMY')
+        self.assertEqual(stats['created'], 2)
+        self.assertEqual(self.get_patient('IMPORT007').dob,
+                         '1970-02-01 00:00:00')
+        self.assertFalse(self.get_patient('IMPORT008').dob)
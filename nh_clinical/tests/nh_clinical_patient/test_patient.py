@@ -121,6 +121,29 @@ class TestClinicalPatient(common.SingleTransactionCase):
             self.patient_pool.check_hospital_number(cr, uid, 'TESTHN009',
                                                     exception='False')
 
+    def test_03_check_hospital_number_cache(self):
+        cr, uid = self.cr, self.uid
+        cache = {}
+        context = {'hospital_number_cache': cache}
+
+        # Scenario 1: found hospital numbers are remembered.
+        result = self.patient_pool.check_hospital_number(
+            cr, uid, 'TESTHN001', context=context)
+        self.assertTrue(result)
+        self.assertEqual(cache, {'TESTHN001': True})
+
+        # Scenario 2: missing hospital numbers are not remembered.
+        result = self.patient_pool.check_hospital_number(
+            cr, uid, 'TESTHN009', context=context)
+        self.assertFalse(result)
+        self.assertEqual(cache, {'TESTHN001': True})
+
+        # Scenario 3: remembered hospital numbers are not searched for.
+        cache['TESTHN009'] = True
+        result = self.patient_pool.check_hospital_number(
+            cr, uid, 'TESTHN009', context=context)
+        self.assertTrue(result)
+
     def test_04_check_nhs_number(self):
         cr, uid = self.cr, self.uid
         self.patient_pool.create(cr, uid, {
@@ -1,2 +1,3 @@
 # from . import test_spell
 from . import test_get_spell_activity_by_patient_id
+from . import test_get_current_spell
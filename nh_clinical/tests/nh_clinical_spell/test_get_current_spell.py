@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+
+
+class TestGetCurrentSpell(TransactionCase):
+    """
+    Test that get_current_spell resolves a patient id or hospital number
+    to the patient's started spell.
+    """
+
+    def setUp(self):
+        super(TestGetCurrentSpell, self).setUp()
+        self.test_utils = self.env['nh.clinical.test_utils']
+        self.spell_model = self.env['nh.clinical.spell']
+        self.test_utils.admit_and_place_patient()
+        self.test_utils.copy_instance_variables(self)
+
+    def test_returns_started_spell_by_patient_id(self):
+        current_spell = self.spell_model.get_current_spell(
+            patient_id=self.patient.id)
+        self.assertEqual(current_spell, {
+            'patient_id': self.patient.id,
+            'spell_id': self.spell.id,
+            'spell_activity_id': self.spell_activity.id
+        })
+
+    def test_returns_started_spell_by_hospital_number(self):
+        current_spell = self.spell_model.get_current_spell(
+            hospital_number=self.patient.other_identifier)
+        self.assertEqual(current_spell['patient_id'], self.patient.id)
+        self.assertEqual(current_spell['spell_activity_id'],
+                         self.spell_activity.id)
+
+    def test_returns_patient_without_spell_after_discharge(self):
+        self.test_utils.discharge_patient()
+        current_spell = self.spell_model.get_current_spell(
+            hospital_number=self.patient.other_identifier)
+        self.assertEqual(current_spell['patient_id'], self.patient.id)
+        self.assertFalse(current_spell['spell_id'])
+        self.assertFalse(current_spell['spell_activity_id'])
+
+    def test_returns_false_for_unknown_hospital_number(self):
+        current_spell = self.spell_model.get_current_spell(
+            hospital_number='NOT A HOSPITAL NUMBER')
+        self.assertFalse(current_spell['patient_id'])
+        self.assertFalse(current_spell['spell_id'])
+
+    def test_cache_is_cleared_when_spell_state_changes(self):
+        cache = {}
+        spell_model = self.spell_model.with_context(current_spell_cache=cache)
+        spell_model.get_current_spell(patient_id=self.patient.id)
+        self.assertIn(('patient_id', self.patient.id), cache)
+        self.test_utils.with_context(
+            current_spell_cache=cache).discharge_patient(
+            self.patient.other_identifier)
+        self.assertEqual(cache, {})
+        current_spell = spell_model.get_current_spell(
+            patient_id=self.patient.id)
+        self.assertFalse(current_spell['spell_id'])
+
+    def test_current_spell_index_is_unique(self):
+        self.cr.execute("""
+            select idx.indisunique
+            from pg_index idx
+            inner join pg_class cls on cls.oid = idx.indexrelid
+            where cls.relname = 'nh_activity_current_spell_index'
+        """)
+        self.assertEqual(self.cr.fetchone(), (True,))
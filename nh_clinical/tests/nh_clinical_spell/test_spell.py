@@ -97,14 +97,30 @@ class TestClinicalSpell(common.SingleTransactionCase):
     def test_03_transferred_user_ids_search_with_multiple_user_ids(self):
         cr, uid = self.cr, self.uid
         args = [('user_id', 'in', [3, 4, 5])]
-        return_value = {1: [3, 4, 5], 2: [2, 5], 3: [6, 7]}
-        self.spell_pool._get_transferred_user_ids = MagicMock(
-            return_value=return_value)
+        cr.fetchall = MagicMock(return_value=[(1,), (2,)])
+        self.spell_pool._get_transferred_user_ids = MagicMock()
 
         result = self.spell_pool._transferred_user_ids_search(cr, uid, None,
                                                               None, args)
         self.assertEquals([('id', 'in', [1, 2])], result)
+        self.assertFalse(self.spell_pool._get_transferred_user_ids.called)
         del self.spell_pool._get_transferred_user_ids
+        del cr.fetchall
+
+    def test_03_transferred_user_ids_search_without_user_ids(self):
+        cr, uid = self.cr, self.uid
+        args = [('user_id', 'in', [])]
+
+        result = self.spell_pool._transferred_user_ids_search(cr, uid, None,
+                                                              None, args)
+        self.assertEquals([('id', 'in', [])], result)
+
+    def test_03_transferred_user_ids_search_uses_recent_move_index(self):
+        cr = self.cr
+        cr.execute("""
+            select 1 from pg_class where relname = %s
+        """, (self.spell_pool._recent_move_index,))
+        self.assertTrue(cr.fetchone())
 
     def test_04_test_create_when_patients_is_started_spell(self):
         cr, uid = self.cr, self.uid
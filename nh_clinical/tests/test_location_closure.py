@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+
+
+class TestLocationClosure(TransactionCase):
+    """
+    Test the location closure table is kept in step with `parent_id` and
+    the helpers built on it.
+    """
+
+    def setUp(self):
+        super(TestLocationClosure, self).setUp()
+        self.test_utils = self.env['nh.clinical.test_utils']
+        self.test_utils.create_locations()
+        for name in ['hospital', 'ward', 'other_ward', 'bed', 'other_bed']:
+            self.test_utils.copy_instance_variable_if_exists(self, name)
+        self.location_model = self.env['nh.clinical.location']
+        self.bay = self.test_utils.create_location('bay', self.ward.id)
+        self.bay_bed = self.test_utils.create_location('bed', self.bay.id)
+
+    def test_ancestors_closest_first(self):
+        self.assertEqual(
+            self.location_model.get_ancestor_ids(self.bay_bed.id)[:3],
+            [self.bay.id, self.ward.id, self.hospital.id])
+
+    def test_ancestors_include_self(self):
+        ancestor_ids = self.location_model.get_ancestor_ids(
+            self.bay_bed.id, include_self=True)
+        self.assertEqual(ancestor_ids[0], self.bay_bed.id)
+
+    def test_descendants(self):
+        self.assertEqual(
+            set(self.location_model.get_descendant_ids(self.ward.id)),
+            {self.ward.id, self.bed.id, self.bay.id, self.bay_bed.id})
+
+    def test_closest_parent_of_usage(self):
+        self.assertEqual(self.location_model.get_closest_parent_id(
+            self.bay_bed.id, 'ward'), self.ward.id)
+        self.assertFalse(self.location_model.get_closest_parent_id(
+            self.ward.id, 'bay'))
+
+    def test_moving_subtree_updates_closure(self):
+        self.bay.write({'parent_id': self.other_ward.id})
+        self.assertEqual(self.location_model.get_closest_parent_id(
+            self.bay_bed.id, 'ward'), self.other_ward.id)
+        self.assertNotIn(
+            self.bay_bed.id,
+            self.location_model.get_descendant_ids(self.ward.id))
+        self.assertIn(
+            self.bay_bed.id,
+            self.location_model.get_descendant_ids(self.other_ward.id))
+
+    def test_child_of_uses_closure(self):
+        child_ids = self.location_model.search(
+            [('id', 'child_of', self.ward.id)]).ids
+        self.assertEqual(
+            set(child_ids),
+            {self.ward.id, self.bed.id, self.bay.id, self.bay_bed.id})
+
+    def test_is_child_of(self):
+        self.assertTrue(self.location_model.is_child_of(
+            self.bay_bed.id, self.ward.code))
+        self.assertFalse(self.location_model.is_child_of(
+            self.bay_bed.id, self.other_ward.code))
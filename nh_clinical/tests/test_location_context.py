@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+
+
+class TestLocationContext(TransactionCase):
+    """
+    Test `nh.clinical.location.has_context` follows changes to a
+    location's contexts.
+    """
+
+    def setUp(self):
+        super(TestLocationContext, self).setUp()
+        self.test_utils = self.env['nh.clinical.test_utils']
+        self.test_utils.create_locations()
+        self.test_utils.copy_instance_variable_if_exists(self, 'ward')
+        self.location_model = self.env['nh.clinical.location']
+        self.context_model = self.env['nh.clinical.context']
+        self.test_context = self.context_model.create({
+            'name': 'test_context',
+            'models': "['nh.clinical.location']"
+        })
+
+    def test_has_context(self):
+        self.assertFalse(
+            self.location_model.has_context(self.ward.id, 'test_context'))
+        self.ward.write({'context_ids': [[4, self.test_context.id]]})
+        self.assertTrue(
+            self.location_model.has_context(self.ward.id, 'test_context'))
+
+    def test_renamed_context(self):
+        self.ward.write({'context_ids': [[4, self.test_context.id]]})
+        self.location_model.has_context(self.ward.id, 'test_context')
+        self.test_context.write({'name': 'renamed_context'})
+        self.assertFalse(
+            self.location_model.has_context(self.ward.id, 'test_context'))
+        self.assertTrue(
+            self.location_model.has_context(self.ward.id, 'renamed_context'))
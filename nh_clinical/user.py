@@ -226,8 +226,18 @@ class res_users(orm.Model):
                 cr, user, vals['doctor_id'], {'user_id': res}, context=context)
         if 'groups_id' in vals:
             self.update_doctor_status(cr, user, res, context=context)
+        if vals.get('location_ids') or vals.get('groups_id'):
+            self.pool['nh.clinical.activity.access'].refresh_user_access(
+                cr, user, [res], context=context)
         return res
 
+    def _get_user_locations(self, cr, uid, ids):
+        cr.execute("""
+            select user_id, location_id from user_location_rel
+            where user_id in %s
+        """, (tuple(isinstance(ids, (list, tuple)) and ids or [ids]),))
+        return set(cr.fetchall())
+
     def write(self, cr, uid, ids, values, context=None):
         """
         Extends Odoo's :meth:`write()<openerp.models.Model.write>`
@@ -245,10 +255,23 @@ class res_users(orm.Model):
             self.update_group_vals(cr, uid, ids[0], values, context=context)
         elif isinstance(ids, int):
             self.update_group_vals(cr, uid, ids, values, context=context)
+        user_locations = None
+        if values.get('location_ids') and not values.get('groups_id'):
+            user_locations = self._get_user_locations(cr, uid, ids)
         res = super(res_users, self).write(cr, uid, ids, values, context)
         if values.get('location_ids') or values.get('groups_id'):
+            self.pool['nh.clinical.activity.access'].refresh_user_access(
+                cr, uid, ids, context=context)
+            location_ids = None
+            if user_locations is not None:
+                # only the locations added to or removed from a user need
+                # updating
+                changed = user_locations ^ self._get_user_locations(
+                    cr, uid, ids)
+                location_ids = list(set(
+                    location_id for _, location_id in changed))
             activity_pool = self.pool['nh.activity']
-            activity_pool.update_users(cr, uid, ids)
+            activity_pool.update_users(cr, uid, ids, location_ids=location_ids)
         if 'groups_id' in values:
             self.update_doctor_status(cr, uid, ids, context=context)
         return res
@@ -18,6 +18,9 @@
     'data': ['data/master_data.xml',
              'data/nh_clinical_patient_monitoring_exception_reasons.xml',
              'data/nh_cancel_reasons.xml',
+             'data/materialized_queue_cron.xml',
+             'data/activity_claim_cron.xml',
+             'data/adt_inbox_cron.xml',
              'observation_report_declaration.xml',
              'wizard/cancel_notifications_view.xml',
              'wizard/print_observation_report_view.xml',
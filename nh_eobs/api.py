@@ -50,6 +50,35 @@ class nh_eobs_api(orm.AbstractModel):
                 _('Error!'), 'Activity ID not found: %s' % activity_id)
         return True
 
+    def _get_search_sql(self, cr, uid, model, domain, context=None):
+        """
+        Converts a search domain into an SQL subquery that selects the ids
+        of the matching records, applying access rights and record rules
+        the same way :meth:`search()<openerp.models.Model.search>` does.
+
+        Using the subquery instead of the result of a search keeps the
+        SQL the same whatever the number of records, rather than
+        formatting every id into an ``IN`` list.
+
+        :param model: name of the model to search
+        :type model: str
+        :param domain: search domain
+        :type domain: list
+        :returns: SQL subquery and its query parameters
+        :rtype: tuple
+        """
+        model_pool = self.pool[model]
+        model_pool.check_access_rights(cr, uid, 'read')
+        query = model_pool._where_calc(cr, uid, domain, context=context)
+        model_pool._apply_ir_rules(cr, uid, query, 'read', context=context)
+        from_clause, where_clause, params = query.get_sql()
+        sql = 'select "{table}".id from {from_clause}{where_clause}'.format(
+            table=model_pool._table,
+            from_clause=from_clause,
+            where_clause=' where ' + where_clause if where_clause else ''
+        )
+        return sql, params
+
     def _create_activity(self, cr, uid, data_model, vals_activity=None,
                          vals_data=None, context=None):
         model_pool = self.pool[data_model]
@@ -210,16 +239,12 @@ class nh_eobs_api(orm.AbstractModel):
             for specific attributes returned for each activity
         :rtype: list
         """
-        activity_pool = self.pool['nh.activity']
         sql_pool = self.pool['nh.clinical.sql']
-        activity_ids = activity_pool.search(cr, uid, domain, context=context)
-        activity_ids_sql = ','.join(map(str, activity_ids))
+        activity_ids_sql, params = self._get_search_sql(
+            cr, uid, 'nh.activity', domain, context=context)
         sql = sql_pool.get_collect_activities_sql(activity_ids_sql)
-        activity_values = []
-        if activity_ids:
-            cr.execute(sql)
-            activity_values = cr.dictfetchall()
-        return activity_values
+        cr.execute(sql, params)
+        return cr.dictfetchall()
 
     def get_assigned_activities(self, cr, uid, activity_type=None,
                                 context=None):
@@ -265,6 +290,59 @@ class nh_eobs_api(orm.AbstractModel):
             res.append(data)
         return res
 
+    def get_follow_invitations(self, cr, uid, context=None):
+        """
+        Gets the open follow invitations assigned to the
+        :class:`user<base.res_users>` in a single query, formatted as
+        the notifications returned by :meth:`get_assigned_activities`.
+
+        :returns: list of dictionaries containing activities
+        :rtype: list
+        """
+        cr.execute("""
+            select
+                activity.id,
+                partner.name as user,
+                array_remove(array_agg(rel.patient_id), null) as patient_ids
+            from nh_activity activity
+            inner join res_users creator on creator.id = activity.create_uid
+            inner join res_partner partner on partner.id = creator.partner_id
+            left join nh_clinical_patient_follow follow
+                on follow.activity_id = activity.id
+            left join follow_patient_rel rel on rel.follow_id = follow.id
+            where activity.user_id = %s
+            and activity.data_model = 'nh.clinical.patient.follow'
+            and activity.state not in ('completed', 'cancelled')
+            group by activity.id, partner.name
+            order by activity.id
+        """, (uid,))
+        res = cr.dictfetchall()
+        for data in res:
+            data['count'] = len(data['patient_ids'])
+            data['message'] = 'You have been invited to follow ' + \
+                              str(data['count']) + ' patients from ' + \
+                              data['user']
+        return res
+
+    def get_patient_list(self, cr, uid, context=None):
+        """
+        Gets everything the mobile patient list shows without writing
+        anything: the patients the :class:`user<base.res_users>` is
+        responsible for, the patients they follow and their open follow
+        invitations.
+
+        :returns: dictionary with ``patients``, ``followed_patients`` and
+            ``notifications`` lists
+        :rtype: dict
+        """
+        return {
+            'patients': self.get_patients(cr, uid, [], context=context),
+            'followed_patients': self.get_followed_patients(
+                cr, uid, context=context),
+            'notifications': self.get_follow_invitations(
+                cr, uid, context=context)
+        }
+
     def cancel(self, cr, uid, activity_id, data, context=None):
         """
         Cancel an :class:`activity<activity.nh_activity>`, updating it
@@ -616,8 +694,23 @@ class nh_eobs_api(orm.AbstractModel):
         patient[0]['activities'] = activities
         return patient
 
-    def get_all_patients(self, cr, uid, ids, context=None):
+    def get_all_patients(self, cr, uid, ids, context=None, limit=None,
+                         offset=0):
+        """
+        Return every :class:`patient<base.nh_clinical_patient>` with a
+        started spell on the wards the :class:`user<base.res_users>` is
+        allocated to, that is the wards containing the user's beds.
 
+        :param ids: ids of the patients. If empty, then all patients on
+            the user's wards are returned
+        :type ids: list
+        :param limit: maximum number of patients to return
+        :type limit: int
+        :param offset: number of patients to skip, for paging
+        :type offset: int
+        :returns: list of patient dictionaries
+        :rtype: list
+        """
         if ids:
             domain = [
                 ('patient_id', 'in', ids),
@@ -631,15 +724,13 @@ class nh_eobs_api(orm.AbstractModel):
                 ('state', '=', 'started'),
                 ('data_model', '=', 'nh.clinical.spell'),
             ]
-
-        patient_list = self.collect_patients(cr, uid, domain, context=context)
-
-        # The list of all patients needs to be filtered by locations (Wards) that the current user is assigned to
-        obj_res_users = self.pool['res.users']
-        user_record = obj_res_users.browse(cr, uid, uid, context=context)
-        user_locations = [x.parent_id.name for x in user_record.location_ids if x.usage == 'bed']
-        filtered_patient_list = [x for x in patient_list if x['parent_location'] in user_locations]
-        return filtered_patient_list
+        sql_model = self.pool['nh.clinical.sql']
+        search_sql, params = self._get_search_sql(
+            cr, uid, 'nh.activity', domain, context=context)
+        spell_ids_sql = sql_model.get_user_ward_spells_sql(search_sql)
+        return self.collect_patients(
+            cr, uid, domain, context=context, limit=limit, offset=offset,
+            spell_ids_sql=(spell_ids_sql, params + [uid]))
 
     def get_patients(self, cr, uid, ids, context=None):
         """
@@ -669,7 +760,8 @@ class nh_eobs_api(orm.AbstractModel):
             ]
         return self.collect_patients(cr, uid, domain, context=context)
 
-    def collect_patients(self, cr, uid, domain, context=None):
+    def collect_patients(self, cr, uid, domain, context=None, limit=None,
+                         offset=0, spell_ids_sql=None):
         """
         Collect patients for a given domain and return SQL output.
 
@@ -677,18 +769,28 @@ class nh_eobs_api(orm.AbstractModel):
         :param uid: user ID for user doing operation
         :param domain: search domain to use
         :param context: Odoo context
+        :param limit: maximum number of patients to return
+        :param offset: number of patients to skip
+        :param spell_ids_sql: subquery and parameters selecting the spell
+            activities to collect, used instead of ``domain`` if passed
         :return: list of dicts
         """
-        activity_pool = self.pool['nh.activity']
         sql_model = self.pool['nh.clinical.sql']
-        spell_ids = activity_pool.search(cr, uid, domain, context=context)
-        spell_ids_sql = ','.join(map(str, spell_ids))
+        if spell_ids_sql:
+            spell_ids_sql, params = spell_ids_sql
+        else:
+            spell_ids_sql, params = self._get_search_sql(
+                cr, uid, 'nh.activity', domain, context=context)
         sql = sql_model.get_collect_patients_sql(spell_ids_sql)
-        patient_values = []
-        if spell_ids:
-            cr.execute(sql)
-            patient_values = cr.dictfetchall()
-        return patient_values
+        params = list(params)
+        if limit:
+            sql += ' limit %s'
+            params.append(limit)
+        if offset:
+            sql += ' offset %s'
+            params.append(offset)
+        cr.execute(sql, params)
+        return cr.dictfetchall()
 
     def get_followed_patients(self, cr, uid, context=None):
         """
@@ -993,34 +1095,56 @@ class nh_eobs_api(orm.AbstractModel):
             cr, uid, hospital_number, data, context=context)
         return res
 
+    def queue_adt_messages(self, cr, uid, messages, context=None):
+        """
+        Queues ADT messages to be processed in the background instead
+        of calling :meth:`register`, :meth:`admit`, :meth:`transfer`
+        etc. directly. Messages for the same patient are processed in
+        the order they are queued.
+
+        :param messages: dictionaries with the keys ``message_type``
+            (the name of the ADT method), ``hospital_number`` and
+            ``data``
+        :type messages: list
+        :returns: ids of the queued messages
+        :rtype: list
+        """
+
+        return self.pool['nh.clinical.adt.inbox'].queue_messages(
+            cr, uid, messages, context=context)
+
+    def get_adt_message_status(self, cr, uid, message_ids, context=None):
+        """
+        Gets the state, latency and error of messages queued with
+        :meth:`queue_adt_messages`.
+
+        :param message_ids: ids of the queued messages
+        :type message_ids: list
+        :returns: list of dictionaries
+        :rtype: list
+        """
+
+        return self.pool['nh.clinical.adt.inbox'].get_status(
+            cr, uid, message_ids, context=context)
+
     def get_spell_activity_id(self, hospital_number):
         """
         Return the spell activity ID for the patient with the given hospital
-        number. Raises an exception if more than one spell is found.
+        number, see
+        :meth:`get_current_spell()<spell.nh_clinical_spell.get_current_spell>`.
+        Raises an exception if the patient is not found.
         :param hospital_number:
         :type hospital_number: str
         :return:
         """
-        patient_model = self.env['nh.clinical.patient']
-        domain = [('other_identifier', '=', hospital_number)]
-        patient = patient_model.search(domain)
-        patient.ensure_one()
-
-        spell_model = self.env['nh.clinical.spell']
-        spell = spell_model.search(
-            [
-                ('patient_id', '=', patient.id),
-                ('activity_id.state', '!=', 'completed')
-            ]
-        )
-        # There may be no open spells, so the ensure_one is disabled for now
-        # spell.ensure_one()
-        if spell:
-            return spell.activity_id.id
-        else:
-            return None
-
-        # return spell.activity_id.id
+        current_spell = self.env['nh.clinical.spell'].get_current_spell(
+            hospital_number=hospital_number)
+        if not current_spell['patient_id']:
+            raise osv.except_osv(
+                'Patient Not Found!',
+                'There is no patient with Hospital Number %s'
+                % hospital_number)
+        return current_spell['spell_activity_id'] or None
 
     def cancel_transfer(self, cr, uid, hospital_number, context=None):
         """
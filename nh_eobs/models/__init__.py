@@ -1,2 +1,4 @@
 from . import nh_clinical_patient_monitoring_exception
 from . import nh_clinical_materialized_queue
+from . import nh_activity
+from . import nh_clinical_adt_inbox
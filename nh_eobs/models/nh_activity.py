@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Records when activities are claimed so that claims users walk away from can
+be released by a cron rather than on every page view.
+"""
+import logging
+from datetime import datetime, timedelta
+
+from openerp import models, fields, api, SUPERUSER_ID
+from openerp.tools import DEFAULT_SERVER_DATETIME_FORMAT as DTF
+
+_logger = logging.getLogger(__name__)
+
+
+class NhActivity(models.Model):
+    _inherit = 'nh.activity'
+
+    # Activities that always belong to a specific user, see
+    # `nh.eobs.api.unassign_my_activities`.
+    _unclaimable_models = ['nh.clinical.notification.hca',
+                           'nh.clinical.patient.follow']
+
+    date_assigned = fields.Datetime(string='Assigned Time', readonly=True)
+
+    @api.multi
+    def write(self, vals):
+        if 'user_id' in vals:
+            vals = dict(vals, date_assigned=fields.Datetime.now()
+                        if vals['user_id'] else False)
+        return super(NhActivity, self).write(vals)
+
+    @api.model
+    def release_stale_claims(self, minutes=15):
+        """
+        Unassign open activities that were claimed more than `minutes` ago
+        and have not been locked to their user. Activities claimed before
+        `date_assigned` was recorded are judged on when they were last
+        written.
+
+        Called by the `ir_cron_release_stale_claims` cron.
+
+        :param minutes: how long a claim lasts
+        :type minutes: int
+        :return: ids of the released activities
+        :rtype: list
+        """
+        expiry = (datetime.now() - timedelta(minutes=minutes)).strftime(DTF)
+        self._cr.execute("""
+            SELECT id
+            FROM nh_activity
+            WHERE user_id IS NOT NULL
+            AND NOT coalesce(assign_locked, FALSE)
+            AND state NOT IN ('completed', 'cancelled')
+            AND data_model NOT IN %s
+            AND coalesce(date_assigned, write_date) < %s
+            FOR UPDATE SKIP LOCKED
+        """, (tuple(self._unclaimable_models), expiry))
+        activity_ids = [row[0] for row in self._cr.fetchall()]
+        if activity_ids:
+            self.sudo(SUPERUSER_ID).browse(activity_ids).write(
+                {'user_id': False})
+            _logger.info('Released %s stale activity claim(s)',
+                         len(activity_ids))
+        return activity_ids
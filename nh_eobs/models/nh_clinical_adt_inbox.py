@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+Contains the inbox of queued ADT messages and the worker that processes
+it.
+"""
+import json
+import logging
+
+from openerp import models, fields, api
+from openerp.osv import osv
+from openerp.tools import ustr
+
+_logger = logging.getLogger(__name__)
+
+
+class NhClinicalAdtInbox(models.Model):
+    """
+    ADT messages are appended by :meth:`queue_messages` and processed by
+    the :meth:`process_inbox` cron with the same
+    :class:`nh.eobs.api` methods that would have been called
+    synchronously.
+
+    Messages for a patient are always processed in the order they were
+    received. A message that fails stops every later message for the
+    same hospital number until it is requeued with :meth:`requeue`.
+    Different patients are processed independently, so running more than
+    one worker (e.g. a copy of the cron) spreads the patients between
+    them.
+    """
+    _name = 'nh.clinical.adt.inbox'
+    _description = "NH Clinical ADT Inbox"
+    _order = 'id'
+
+    # Messages that only take a hospital number, the rest also take a data
+    # dictionary.
+    _no_data_message_types = ['cancel_admit', 'cancel_discharge',
+                              'cancel_transfer']
+    # Arbitrary constant namespacing the per patient locks taken by
+    # workers.
+    _advisory_lock_key = 7420114
+    _batch_size = 500
+
+    message_type = fields.Selection([
+        ('register', 'Register'),
+        ('update', 'Update'),
+        ('admit', 'Admit'),
+        ('admit_update', 'Admit Update'),
+        ('cancel_admit', 'Cancel Admit'),
+        ('discharge', 'Discharge'),
+        ('cancel_discharge', 'Cancel Discharge'),
+        ('transfer', 'Transfer'),
+        ('cancel_transfer', 'Cancel Transfer'),
+        ('merge', 'Merge')
+    ], string='Message Type', required=True, readonly=True)
+    hospital_number = fields.Char(string='Hospital Number', required=True,
+                                  index=True, readonly=True)
+    data = fields.Text(string='Data', readonly=True)
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('done', 'Done'),
+        ('failed', 'Failed')
+    ], string='State', default='queued', required=True, index=True,
+        readonly=True)
+    date_received = fields.Datetime(string='Received',
+                                    default=fields.Datetime.now,
+                                    readonly=True)
+    date_processed = fields.Datetime(string='Processed', readonly=True)
+    latency = fields.Float(string='Latency (s)', digits=(16, 3),
+                           readonly=True)
+    error = fields.Text(string='Error', readonly=True)
+
+    @api.model
+    def queue_messages(self, messages):
+        """
+        Append ADT messages to the inbox.
+
+        :param messages: dictionaries with the keys ``message_type``,
+            ``hospital_number`` and, for messages that take it, ``data``.
+            Messages for the same patient are processed in list order.
+        :type messages: list
+        :return: ids of the queued messages, in the same order
+        :rtype: list
+        """
+        message_types = dict(self._fields['message_type'].selection)
+        ids = []
+        for message in messages:
+            message_type = message.get('message_type')
+            if message_type not in message_types:
+                raise osv.except_osv(
+                    'Value Error!',
+                    'Unknown ADT message type: %s' % message_type)
+            if not message.get('hospital_number'):
+                raise osv.except_osv(
+                    'Value Error!', 'ADT message has no hospital number')
+            ids.append(self.create({
+                'message_type': message_type,
+                'hospital_number': message['hospital_number'],
+                'data': json.dumps(message.get('data') or {})
+            }).id)
+        return ids
+
+    @api.model
+    def get_status(self, message_ids):
+        """
+        State, latency and error of queued messages.
+
+        :param message_ids: ids returned by :meth:`queue_messages`
+        :type message_ids: list
+        :return: dictionaries with the keys ``id``, ``message_type``,
+            ``hospital_number``, ``state``, ``date_received``,
+            ``date_processed``, ``latency`` and ``error``
+        :rtype: list
+        """
+        return self.browse(message_ids).read([
+            'message_type', 'hospital_number', 'state', 'date_received',
+            'date_processed', 'latency', 'error'
+        ])
+
+    @api.model
+    def get_inbox_stats(self):
+        """
+        Number of messages in each state and the latency of the processed
+        messages.
+
+        :return: dictionary with the keys ``queued``, ``done``,
+            ``failed``, ``oldest_queued``, ``average_latency`` and
+            ``max_latency``
+        :rtype: dict
+        """
+        cr = self._cr
+        cr.execute("""
+            SELECT state, count(*)
+            FROM nh_clinical_adt_inbox
+            GROUP BY state
+        """)
+        stats = {'queued': 0, 'done': 0, 'failed': 0}
+        stats.update(dict(cr.fetchall()))
+        cr.execute("""
+            SELECT min(CASE WHEN state = 'queued' THEN date_received END),
+                avg(CASE WHEN state = 'done' THEN latency END),
+                max(CASE WHEN state = 'done' THEN latency END)
+            FROM nh_clinical_adt_inbox
+        """)
+        oldest, average_latency, max_latency = cr.fetchone()
+        stats.update({
+            'oldest_queued': oldest and fields.Datetime.to_string(oldest),
+            'average_latency': average_latency or 0.0,
+            'max_latency': max_latency or 0.0
+        })
+        return stats
+
+    @api.multi
+    def requeue(self):
+        """
+        Queue failed messages again, unblocking the later messages for
+        their patients.
+        """
+        self.filtered(lambda message: message.state == 'failed').write({
+            'state': 'queued',
+            'error': False
+        })
+        return True
+
+    @api.model
+    def _get_queued_hospital_numbers(self, limit):
+        """
+        Hospital numbers with queued messages, the one waiting longest
+        first. Patients with a failed message are skipped as their later
+        messages can't be processed until it is requeued.
+
+        :param limit: maximum number of hospital numbers
+        :type limit: int
+        :rtype: list
+        """
+        self._cr.execute("""
+            SELECT queued.hospital_number
+            FROM nh_clinical_adt_inbox AS queued
+            WHERE queued.state = 'queued'
+            AND NOT EXISTS (
+                SELECT 1
+                FROM nh_clinical_adt_inbox AS failed
+                WHERE failed.hospital_number = queued.hospital_number
+                AND failed.state = 'failed'
+            )
+            GROUP BY queued.hospital_number
+            ORDER BY min(queued.id)
+            LIMIT %s
+        """, (limit,))
+        return [row[0] for row in self._cr.fetchall()]
+
+    @api.model
+    def _lock_hospital_number(self, hospital_number):
+        """
+        Take the transaction level lock on a patient's messages so that
+        concurrent workers don't process them twice or out of order.
+
+        :rtype: bool
+        """
+        self._cr.execute(
+            'SELECT pg_try_advisory_xact_lock(%s, hashtext(%s))',
+            (self._advisory_lock_key, hospital_number))
+        return self._cr.fetchone()[0]
+
+    @api.model
+    def _get_hospital_number_cache(self, hospital_numbers):
+        """
+        Look up the hospital numbers of a batch in one query. The result
+        is passed in the context as ``hospital_number_cache`` to
+        :meth:`check_hospital_number` of :class:`nh.clinical.patient`,
+        which otherwise searches for the patient several times per
+        message. Started spells are remembered the same way in
+        ``current_spell_cache``, see :meth:`get_current_spell` of
+        :class:`nh.clinical.spell`.
+
+        :param hospital_numbers: hospital numbers in the batch
+        :type hospital_numbers: list
+        :return: existing hospital numbers mapped to ``True``
+        :rtype: dict
+        """
+        if not hospital_numbers:
+            return {}
+        patients = self.env['nh.clinical.patient'].search([
+            ('other_identifier', 'in', hospital_numbers)
+        ])
+        return dict((hospital_number, True) for hospital_number
+                    in patients.mapped('other_identifier'))
+
+    @api.multi
+    def _process_message(self):
+        """
+        Call the :class:`nh.eobs.api` method for the message as the user
+        that queued it.
+        """
+        self.ensure_one()
+        api_model = self.env['nh.eobs.api'].sudo(self.create_uid.id)
+        method = getattr(api_model, self.message_type)
+        if self.message_type in self._no_data_message_types:
+            method(self.hospital_number)
+        else:
+            method(self.hospital_number, json.loads(self.data or '{}'))
+
+    @api.model
+    def _set_message_state(self, message_id, state, error=None):
+        """
+        Record the outcome of a message and how long it waited in the
+        inbox.
+        """
+        self._cr.execute("""
+            UPDATE nh_clinical_adt_inbox
+            SET state = %s,
+                error = %s,
+                date_processed = clock_timestamp() AT TIME ZONE 'UTC',
+                latency = extract(epoch FROM (
+                    clock_timestamp() AT TIME ZONE 'UTC' - date_received))
+            WHERE id = %s
+        """, (state, error, message_id))
+
+    @api.model
+    def _process_patient_messages(self, hospital_number):
+        """
+        Process the queued messages of a patient in the order they were
+        received, stopping at the first one that fails.
+
+        :return: number of messages processed and failed
+        :rtype: tuple
+        """
+        messages = self.search([
+            ('hospital_number', '=', hospital_number),
+            ('state', '=', 'queued')
+        ], order='id')
+        processed = failed = 0
+        for message in messages:
+            try:
+                with self._cr.savepoint():
+                    message._process_message()
+            except Exception as e:
+                _logger.exception('Failed to process ADT message %s',
+                                  message.id)
+                self.invalidate_cache()
+                # lookups made by the message were rolled back with it
+                self.env['nh.clinical.patient']._clear_lookup_caches(
+                    self.env.context)
+                self._set_message_state(message.id, 'failed', ustr(e))
+                failed += 1
+                break
+            self._set_message_state(message.id, 'done')
+            processed += 1
+        return processed, failed
+
+    @api.model
+    def process_inbox(self, commit=False, limit=None):
+        """
+        Process queued messages grouped by patient. Patients are taken
+        waiting longest first and locked for the rest of the transaction,
+        patients already locked by another worker are skipped.
+
+        Called by the `ir_cron_process_adt_inbox` cron.
+
+        :param commit: commit after each patient, releasing its lock.
+            Used by the cron so that a long run doesn't hold every patient
+            in one transaction.
+        :type commit: bool
+        :param limit: maximum number of patients to process, defaults to
+            `_batch_size`
+        :type limit: int
+        :return: number of messages processed and failed
+        :rtype: tuple
+        """
+        cr = self._cr
+        hospital_numbers = self._get_queued_hospital_numbers(
+            limit or self._batch_size)
+        inbox = self.with_context(
+            hospital_number_cache=self._get_hospital_number_cache(
+                hospital_numbers),
+            current_spell_cache={})
+        processed = failed = 0
+        for hospital_number in hospital_numbers:
+            if not inbox._lock_hospital_number(hospital_number):
+                continue
+            patient_processed, patient_failed = \
+                inbox._process_patient_messages(hospital_number)
+            processed += patient_processed
+            failed += patient_failed
+            if commit:
+                cr.commit()
+            inbox.invalidate_cache()
+        if processed or failed:
+            _logger.info('Processed %s ADT message(s), %s failed',
+                         processed, failed)
+        return processed, failed
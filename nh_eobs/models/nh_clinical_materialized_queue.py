@@ -1,11 +1,240 @@
 # -*- coding: utf-8 -*-
+"""
+Contains the queue of pending materialized view refreshes and the worker
+that drains it.
+"""
+import logging
+import time
+from collections import Counter
 
 from openerp import models, fields, api
 
+_logger = logging.getLogger(__name__)
+
 
 class NhClinicalMaterializedQueue(models.Model):
+    """
+    Rows are appended by the `materialized_queue` decorators in
+    :mod:`nh_eobs.helpers` and drained by the
+    :meth:`refresh_queued_views` cron. Each cycle refreshes every queued
+    view once no matter how many times it was requested.
+    """
     _name = 'nh.clinical.materialized.queue'
     _description = "NH Clinical Materialized Queue"
 
+    # Views later in the list are built on views earlier in the list so
+    # must be refreshed after them.
+    _refresh_order = ['param', 'pbp']
+    # Arbitrary constant used to make sure only one worker drains the queue
+    # at a time.
+    _advisory_lock_key = 7420113
+
     name = fields.Char()
-    view_name = fields.Char()
+    view_name = fields.Char(index=True)
+
+    @api.model
+    def sort_views(self, view_names):
+        """
+        Sort view names into dependency order. Views not in
+        `_refresh_order` are refreshed last, in alphabetical order.
+
+        :param view_names: names of materialized views
+        :type view_names: iterable
+        :return: view names in the order they should be refreshed
+        :rtype: list
+        """
+        order = self._refresh_order
+
+        def sort_key(view_name):
+            if view_name in order:
+                return order.index(view_name), view_name
+            return len(order), view_name
+        return sorted(set(view_names), key=sort_key)
+
+    @api.model
+    def get_queue_depth(self):
+        """
+        Number of pending refresh requests per view.
+
+        :return: view name mapped to the number of queued requests
+        :rtype: dict
+        """
+        self._cr.execute("""
+            SELECT view_name, count(*)
+            FROM nh_clinical_materialized_queue
+            GROUP BY view_name
+        """)
+        return dict(self._cr.fetchall())
+
+    @api.model
+    def _get_materialized_views(self, view_names):
+        """
+        Filter out anything that is not an existing materialized view so
+        the name can safely be interpolated into a `REFRESH` statement.
+
+        :return: set of materialized view names
+        :rtype: set
+        """
+        if not view_names:
+            return set()
+        self._cr.execute("""
+            SELECT matviewname
+            FROM pg_matviews
+            WHERE matviewname IN %s
+        """, (tuple(view_names),))
+        return set(row[0] for row in self._cr.fetchall())
+
+    @api.model
+    def _can_refresh_concurrently(self, view_name):
+        """
+        `REFRESH MATERIALIZED VIEW CONCURRENTLY` requires a unique index
+        covering all rows and a view that has already been populated.
+
+        :param view_name: name of materialized view
+        :type view_name: str
+        :rtype: bool
+        """
+        self._cr.execute("""
+            SELECT 1
+            FROM pg_index idx
+            INNER JOIN pg_class cls ON cls.oid = idx.indrelid
+            INNER JOIN pg_matviews mv ON mv.matviewname = cls.relname
+            WHERE cls.relname = %s
+            AND idx.indisunique
+            AND idx.indpred IS NULL
+            AND mv.ispopulated
+            LIMIT 1
+        """, (view_name,))
+        return bool(self._cr.fetchone())
+
+    @api.model
+    def refresh_view(self, view_name):
+        """
+        Refresh a single materialized view and record how long it took.
+
+        :param view_name: name of materialized view
+        :type view_name: str
+        :return: time taken in seconds and whether the view was refreshed
+            concurrently
+        :rtype: tuple
+        """
+        concurrently = self._can_refresh_concurrently(view_name)
+        sql = 'REFRESH MATERIALIZED VIEW {concurrently}{view}'.format(
+            concurrently='CONCURRENTLY ' if concurrently else '',
+            view=view_name
+        )
+        start = time.time()
+        self._cr.execute(sql)
+        duration = time.time() - start
+        _logger.debug('Refreshed %s in %.3fs', view_name, duration)
+        return duration, concurrently
+
+    @api.model
+    def refresh_queued_views(self):
+        """
+        Drain the queue. Pending rows are removed, the view names are
+        deduplicated and each view is refreshed once in dependency order.
+        A view that fails to refresh is queued again for the next cycle.
+
+        Called by the `ir_cron_refresh_materialized_views` cron.
+
+        :return: names of the views that were refreshed
+        :rtype: list
+        """
+        cr = self._cr
+        cr.execute('SELECT pg_try_advisory_xact_lock(%s)',
+                   (self._advisory_lock_key,))
+        if not cr.fetchone()[0]:
+            _logger.debug('Materialized view queue already being drained')
+            return []
+        cr.execute("""
+            DELETE FROM nh_clinical_materialized_queue
+            RETURNING view_name
+        """)
+        requests = Counter(row[0] for row in cr.fetchall() if row[0])
+        if not requests:
+            return []
+        existing_views = self._get_materialized_views(requests.keys())
+        for view_name in set(requests) - existing_views:
+            _logger.warning(
+                'Ignoring refresh request for unknown materialized view %s',
+                view_name)
+
+        stats_model = self.env['nh.clinical.materialized.view']
+        refreshed = []
+        for view_name in self.sort_views(existing_views):
+            try:
+                with cr.savepoint():
+                    duration, concurrently = self.refresh_view(view_name)
+            except Exception:
+                _logger.exception('Failed to refresh %s', view_name)
+                self.create({
+                    'name': 'Refresh {}'.format(view_name),
+                    'view_name': view_name
+                })
+                continue
+            stats_model.record_refresh(
+                view_name, duration, requests[view_name], concurrently)
+            refreshed.append(view_name)
+        _logger.info(
+            'Refreshed %s materialized view(s) for %s queued request(s)',
+            len(refreshed), sum(requests[view] for view in refreshed))
+        return refreshed
+
+
+class NhClinicalMaterializedView(models.Model):
+    """
+    Refresh statistics for each materialized view drained from
+    :class:`nh.clinical.materialized.queue`.
+    """
+    _name = 'nh.clinical.materialized.view'
+    _description = "NH Clinical Materialized View Refresh Statistics"
+    _order = 'name'
+
+    name = fields.Char(string='View', required=True, index=True)
+    last_refresh = fields.Datetime(string='Last Refreshed')
+    last_duration = fields.Float(string='Last Refresh Duration (s)',
+                                 digits=(16, 3))
+    max_duration = fields.Float(string='Longest Refresh Duration (s)',
+                                digits=(16, 3))
+    refresh_count = fields.Integer(string='Refreshes')
+    request_count = fields.Integer(string='Requests Coalesced')
+    concurrent = fields.Boolean(string='Refreshed Concurrently')
+    queue_depth = fields.Integer(string='Queued Requests',
+                                 compute='_compute_queue_depth')
+
+    _sql_constraints = [
+        ('name_uniq', 'unique(name)', 'View statistics must be unique')
+    ]
+
+    @api.multi
+    def _compute_queue_depth(self):
+        depth = self.env['nh.clinical.materialized.queue'].get_queue_depth()
+        for record in self:
+            record.queue_depth = depth.get(record.name, 0)
+
+    @api.model
+    def record_refresh(self, view_name, duration, requests, concurrent):
+        """
+        Update the statistics for a view after it has been refreshed.
+
+        :param view_name: name of materialized view
+        :type view_name: str
+        :param duration: time taken to refresh in seconds
+        :type duration: float
+        :param requests: number of queued requests the refresh satisfied
+        :type requests: int
+        :param concurrent: whether the view was refreshed concurrently
+        :type concurrent: bool
+        """
+        record = self.search([('name', '=', view_name)], limit=1)
+        if not record:
+            record = self.create({'name': view_name})
+        record.write({
+            'last_refresh': fields.Datetime.now(),
+            'last_duration': duration,
+            'max_duration': max(record.max_duration, duration),
+            'refresh_count': record.refresh_count + 1,
+            'request_count': record.request_count + requests,
+            'concurrent': concurrent
+        })
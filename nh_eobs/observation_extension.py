@@ -4,14 +4,64 @@ from openerp.osv import orm
 from openerp.addons.nh_eobs.helpers import v7_materialized_queue
 
 
-class nh_clinical_patient_observation_ews(orm.Model):
-    _inherit = 'nh.clinical.patient.observation.ews'
-
-    @v7_materialized_queue('ews0', 'ews1', 'ews2', 'bg0')
-    def complete(self, cr, uid, activity_id, context=None):
-        return super(
-            nh_clinical_patient_observation_ews, self).complete(
-            cr, uid, activity_id, context)
+class nh_activity(orm.Model):
+    """
+    Keeps the `wb_obs_state` table behind the `ews0`, `ews1`, `ews2` and
+    `bg0` views up to date for the spells whose EWS or blood glucose
+    activities are scheduled, completed or cancelled.
+    """
+    _inherit = 'nh.activity'
+
+    _obs_state_models = ['nh.clinical.patient.observation.ews',
+                         'nh.clinical.patient.observation.blood_glucose']
+    _obs_state_fields = ['state', 'sequence', 'spell_activity_id']
+
+    def _get_obs_state_spell_activity_ids(self, cr, ids):
+        cr.execute("""
+            select distinct spell_activity_id
+            from nh_activity
+            where id = any(%s) and data_model in %s
+            and spell_activity_id is not null
+        """, (list(ids), tuple(self._obs_state_models)))
+        return [row[0] for row in cr.fetchall()]
+
+    def create(self, cr, uid, vals, context=None):
+        activity_id = super(nh_activity, self).create(
+            cr, uid, vals, context=context)
+        if vals.get('data_model') in self._obs_state_models and \
+                vals.get('state', 'new') != 'new':
+            self.pool['nh.clinical.wardboard'].refresh_obs_state(
+                cr, uid, self._get_obs_state_spell_activity_ids(
+                    cr, [activity_id]), context=context)
+        return activity_id
+
+    def create_many(self, cr, uid, vals_list, context=None):
+        activity_ids = super(nh_activity, self).create_many(
+            cr, uid, vals_list, context=context)
+        obs_state_ids = [
+            activity_id for activity_id, vals in zip(activity_ids, vals_list)
+            if vals.get('data_model') in self._obs_state_models and
+            vals.get('state', 'new') != 'new'
+        ]
+        if obs_state_ids:
+            self.pool['nh.clinical.wardboard'].refresh_obs_state(
+                cr, uid, self._get_obs_state_spell_activity_ids(
+                    cr, obs_state_ids), context=context)
+        return activity_ids
+
+    def write(self, cr, uid, ids, vals, context=None):
+        if not any(field in vals for field in self._obs_state_fields):
+            return super(nh_activity, self).write(
+                cr, uid, ids, vals, context=context)
+        if isinstance(ids, (int, long)):
+            ids = [ids]
+        spell_activity_ids = self._get_obs_state_spell_activity_ids(cr, ids)
+        res = super(nh_activity, self).write(
+            cr, uid, ids, vals, context=context)
+        spell_activity_ids += self._get_obs_state_spell_activity_ids(cr, ids)
+        self.pool['nh.clinical.wardboard'].refresh_obs_state(
+            cr, uid, spell_activity_ids, context=context)
+        return res
 
 
 class nh_clinical_patient_o2target(orm.Model):
@@ -24,16 +74,6 @@ class nh_clinical_patient_o2target(orm.Model):
             cr, uid, activity_id, context)
 
 
-class nh_clinical_notification_frequency(orm.Model):
-    _inherit = 'nh.clinical.notification.frequency'
-
-    @v7_materialized_queue('ews0', 'ews1', 'ews2', 'bg0')
-    def complete(self, cr, uid, activity_id, context=None):
-        return super(
-            nh_clinical_notification_frequency, self).complete(
-            cr, uid, activity_id, context)
-
-
 class nh_clinical_patient_observation_height(orm.Model):
     _inherit = 'nh.clinical.patient.observation.height'
 
@@ -53,8 +53,9 @@ def create_search_filter(spell_activity_id, model,
     if not model:
         raise ValueError('No model supplied.')
 
+    model_operator = 'in' if isinstance(model, list) else '='
     domain = [('parent_id', '=', spell_activity_id),
-              ('data_model', '=', model)]
+              ('data_model', model_operator, model)]
     if states:
         operator = 'in' if isinstance(states, list) else '='
         domain.append(['state', operator, states])
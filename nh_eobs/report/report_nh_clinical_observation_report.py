@@ -14,6 +14,7 @@ generate the report.
 """
 import copy
 import json
+from collections import defaultdict
 from datetime import datetime
 
 from openerp import api, models
@@ -40,6 +41,21 @@ class ObservationReport(models.AbstractModel):
 
     _graph_data_keys_mapping = {}
 
+    # Models whose activities are loaded for the whole spell in one pass by
+    # `prefetch_activity_data`, activities of other models are searched for
+    # when they are asked for.
+    _prefetch_models = [
+        'nh.clinical.patient.observation.ews',
+        'nh.clinical.patient.observation.height',
+        'nh.clinical.patient.observation.gcs',
+        'nh.clinical.patient.observation.pain',
+        'nh.clinical.patient.observation.blood_product',
+        'nh.clinical.patient.observation.pbp',
+        'nh.clinical.patient.observation.stools',
+        'nh.clinical.patient.move'
+    ] + monitoring_dict.values()
+    _activity_prefetch = None
+
     @api.multi
     def render_html(self, data=None):
         """"
@@ -106,6 +122,8 @@ class ObservationReport(models.AbstractModel):
         dates = self.process_report_dates(data, spell, base_report)
         spell_activity_id = spell['activity_id'][0]
         self.spell_activity_id = spell_activity_id
+        self.prefetch_activity_data(
+            spell_activity_id, data.start_time, data.end_time)
         spell_docs = spell['con_doctor_ids']
         spell['consultants'] = False
         if len(spell_docs) > 0:
@@ -236,6 +254,59 @@ class ObservationReport(models.AbstractModel):
         formatted_patient_dob = patient_dob
         patient['dob'] = formatted_patient_dob
 
+    def prefetch_activity_data(self, spell_activity_id, start_time, end_time,
+                               models=None):
+        """
+        Loads the activities of every model in `models` for the spell with
+        a single search and read and keeps them, grouped by `data_model`,
+        for :meth:`get_activity_data` to use for the rest of the report.
+
+        :param spell_activity_id:
+        :type spell_activity_id: int
+        :param start_time:
+        :param end_time:
+        :param models: models to load, `_prefetch_models` by default
+        :type models: list
+        :return: activity dictionaries grouped by model
+        :rtype: dict
+        """
+        cr, uid = self._cr, self._uid
+        activity_model = self.pool['nh.activity']
+        models = models or self._prefetch_models
+        model_states = {}
+        for model in models:
+            states = self._get_allowed_activity_states_for_model(model)
+            model_states[model] = \
+                states if isinstance(states, list) else [states]
+        domain = helpers.create_search_filter(
+            spell_activity_id, list(models), start_time, end_time,
+            states=['started', 'completed', 'cancelled']
+        )
+        self.add_exclude_placement_cancel_reason_parameter_to_domain(domain)
+        activity_ids = activity_model.search(
+            cr, uid, domain, order='effective_date_terminated asc')
+        activity_data = activity_model.read(cr, uid, activity_ids)
+        self.add_user_key(activity_data)
+
+        activities = dict((model, []) for model in models)
+        for activity in activity_data:
+            if activity['state'] in model_states[activity['data_model']]:
+                activities[activity['data_model']].append(activity)
+        self._activity_prefetch = {
+            'key': (spell_activity_id, start_time, end_time),
+            'activities': activities
+        }
+        return activities
+
+    def _get_prefetched_activity_data(
+            self, spell_activity_id, model, start_time, end_time):
+        prefetch = self._activity_prefetch
+        if not prefetch or model not in prefetch['activities'] or \
+                prefetch['key'] != (spell_activity_id, start_time, end_time):
+            return None
+        # Callers add keys to the dictionaries so each gets its own copy
+        return copy.deepcopy(prefetch['activities'][model])
+
     @api.multi
     def get_activity_data(
             self, spell_activity_id, model, start_time, end_time):
@@ -252,6 +323,10 @@ class ObservationReport(models.AbstractModel):
         :return:
         :rtype: dict
         """
+        prefetched = self._get_prefetched_activity_data(
+            spell_activity_id, model, start_time, end_time)
+        if prefetched is not None:
+            return prefetched
         cr, uid = self._cr, self._uid
         activity_model = self.pool['nh.activity']
 
@@ -269,16 +344,25 @@ class ObservationReport(models.AbstractModel):
         return activity_data
 
     def add_user_key(self, activity_data_list):
+        unnamed_user_ids = set()
         for activity_data in activity_data_list:
             terminate_user_tuple = activity_data.get('terminate_uid')
             is_tuple = isinstance(terminate_user_tuple, tuple)
             user_name = terminate_user_tuple[1] \
                 if is_tuple and len(terminate_user_tuple) > 1 else False
             if not user_name and is_tuple:
-                user_id = terminate_user_tuple[0]
-                user_model = self.env['res.users']
-                user_name = user_model.get_name(user_id)
+                unnamed_user_ids.add(terminate_user_tuple[0])
             activity_data['user'] = user_name
+        if not unnamed_user_ids:
+            return
+        users = self.env['res.users'].browse(list(unnamed_user_ids))
+        user_names = dict((user.id, user.name) for user in users)
+        for activity_data in activity_data_list:
+            terminate_user_tuple = activity_data.get('terminate_uid')
+            if not activity_data['user'] and \
+                    isinstance(terminate_user_tuple, tuple):
+                activity_data['user'] = \
+                    user_names.get(terminate_user_tuple[0], False)
 
     def add_exclude_placement_cancel_reason_parameter_to_domain(self, domain):
         model_data = self.env['ir.model.data']
@@ -348,23 +432,23 @@ class ObservationReport(models.AbstractModel):
         """
         cr, uid = self._cr, self._uid
         model_pool = self.pool[model]
-        for activity in activity_data:
-            obs_id = self._get_data_ref_id(activity)
-            # TODO EOBS-1011: Report shouldn't have to check whether to call
-            # read or read_labels
-            if 'nh.clinical.patient.observation' in model_pool._name:
-                model_data = model_pool.read_labels(cr, uid, obs_id, [])
-            else:
-                model_data = model_pool.read(cr, uid, obs_id, [])
-            if isinstance(model_data, list):
-                # V8 read always returns a list, V7 doesn't when single int is
-                # passed as id instead of a list.
-                if len(model_data) > 1:
-                    message = "Should have read data for only one record " \
-                              "but more than one was found."
-                    raise ValueError(message)
-                model_data = model_data[0]
-
+        obs_ids = [self._get_data_ref_id(activity)
+                   for activity in activity_data]
+        if not obs_ids:
+            return activity_data
+        # Read every record of the model at once rather than per activity
+        # TODO EOBS-1011: Report shouldn't have to check whether to call
+        # read or read_labels
+        if 'nh.clinical.patient.observation' in model_pool._name:
+            records = model_pool.read_labels(
+                cr, uid, list(set(obs_ids)), [])
+        else:
+            records = model_pool.read(cr, uid, list(set(obs_ids)), [])
+        if isinstance(records, dict):
+            records = [records]
+        records = dict((record['id'], record) for record in records)
+        for activity, obs_id in zip(activity_data, obs_ids):
+            model_data = copy.deepcopy(records.get(obs_id, False))
             if model_data:
                 if 'status' in model_data and model_data['status']:
                     status = 'Yes'
@@ -430,9 +514,81 @@ class ObservationReport(models.AbstractModel):
 
     @api.model
     def add_triggered_action_keys_to_obs_dicts(self, obs_dict_list):
+        triggered_actions = self.get_triggered_actions_for_activities(
+            [observation['id'] for observation in obs_dict_list])
         for observation in obs_dict_list:
-            triggered_actions = self.get_triggered_actions(observation['id'])
-            observation['triggered_actions'] = triggered_actions
+            observation['triggered_actions'] = \
+                triggered_actions.get(observation['id'], [])
+
+    @api.model
+    def get_triggered_actions_for_activities(self, activity_ids):
+        """
+        Batched :meth:`get_triggered_actions`. Finds the actions triggered
+        by all the activities and their descendants with one query and
+        reads them with another.
+
+        :param activity_ids: ids of the triggering activities
+        :type activity_ids: list
+        :return: activity id mapped to its list of triggered actions, in
+            the same order as :meth:`get_triggered_actions` returns them
+        :rtype: dict
+        """
+        cr, uid = self.env.cr, self.env.uid
+        if not activity_ids:
+            return {}
+        cr.execute("""
+            WITH RECURSIVE triggered(id, creator_id) AS (
+                SELECT id, creator_id
+                FROM nh_activity
+                WHERE creator_id = ANY(%(activity_ids)s)
+                AND data_model != %(ews)s
+                UNION
+                SELECT activity.id, activity.creator_id
+                FROM nh_activity activity
+                INNER JOIN triggered ON activity.creator_id = triggered.id
+                WHERE activity.data_model != %(ews)s
+            )
+            SELECT id, creator_id FROM triggered
+        """, {
+            'activity_ids': list(activity_ids),
+            'ews': 'nh.clinical.patient.observation.ews'
+        })
+        edges = cr.fetchall()
+        activity_pool = self.pool['nh.activity']
+        # Searching again applies the access rules the recursive search did
+        visible_ids = set(activity_pool.search(
+            cr, uid, [['id', 'in', [edge[0] for edge in edges]]]))
+        created_ids = defaultdict(list)
+        for activity_id, creator_id in edges:
+            if activity_id in visible_ids:
+                created_ids[creator_id].append(activity_id)
+        for ids in created_ids.values():
+            # nh.activity has no _order so searches return ascending ids
+            ids.sort()
+
+        def collect(activity_id, activity_list):
+            created = created_ids.get(activity_id, [])
+            activity_list += created
+            for created_id in created:
+                collect(created_id, activity_list)
+            return activity_list
+
+        triggered_ids = dict(
+            (activity_id, collect(activity_id, []))
+            for activity_id in activity_ids
+        )
+        read_ids = set()
+        for ids in triggered_ids.values():
+            read_ids.update(ids)
+        actions = dict(
+            (action['id'], action) for action in
+            activity_pool.read(cr, uid, list(read_ids))
+        ) if read_ids else {}
+        return dict(
+            (activity_id, [copy.deepcopy(actions[action_id])
+                           for action_id in ids if action_id in actions])
+            for activity_id, ids in triggered_ids.items()
+        )
 
     @api.model
     def get_triggered_actions(self, observation_activity_id,
@@ -1,3 +1,6 @@
+from copy import deepcopy
+
+from openerp import tools
 from openerp.osv import osv, orm, fields
 import re
 
@@ -16,6 +19,24 @@ class NHEobsWorkloadBucket(orm.Model):
 
     _order = 'sequence asc'
 
+    def create(self, cr, uid, vals, context=None):
+        res = super(NHEobsWorkloadBucket, self).create(
+            cr, uid, vals, context=context)
+        self.pool['nh.clinical.settings'].clear_caches()
+        return res
+
+    def write(self, cr, uid, ids, vals, context=None):
+        res = super(NHEobsWorkloadBucket, self).write(
+            cr, uid, ids, vals, context=context)
+        self.pool['nh.clinical.settings'].clear_caches()
+        return res
+
+    def unlink(self, cr, uid, ids, context=None):
+        res = super(NHEobsWorkloadBucket, self).unlink(
+            cr, uid, ids, context=context)
+        self.pool['nh.clinical.settings'].clear_caches()
+        return res
+
 
 class NHEobsSettings(orm.Model):
     _name = 'nh.clinical.settings'
@@ -39,13 +60,39 @@ class NHEobsSettings(orm.Model):
     }
 
     def get_settings(self, cr, uid, settings, context=None):
+        """
+        Reads settings from the settings record. Values are cached on the
+        registry until the settings or workload buckets are written, so
+        repeated lookups within and across requests don't hit the
+        database.
+
+        :param settings: names of the settings
+        :type settings: list or str
+        :returns: setting names mapped to their values
+        :rtype: dict
+        """
         if not isinstance(settings, list):
             settings = [settings]
-        vals = self.browse(cr, uid, [])
-        if not vals.ids:
+        # callers are free to modify the result, the cached copy isn't
+        return deepcopy(self._read_settings(cr, uid, tuple(settings)))
+
+    @tools.ormcache(skiparg=2)
+    def _read_settings(self, cr, uid, settings):
+        if not self.exists(cr, uid, 1):
             self.create(cr, uid, {})
-        get_vals = self.read(cr, uid, 1, settings)
-        return get_vals
+        return self.read(cr, uid, 1, list(settings))
+
+    def create(self, cr, uid, vals, context=None):
+        res = super(NHEobsSettings, self).create(
+            cr, uid, vals, context=context)
+        self.clear_caches()
+        return res
+
+    def write(self, cr, uid, ids, vals, context=None):
+        res = super(NHEobsSettings, self).write(
+            cr, uid, ids, vals, context=context)
+        self.clear_caches()
+        return res
 
     def get_setting(self, cr, uid, setting, context=None):
         if isinstance(setting, list):
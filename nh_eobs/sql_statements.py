@@ -385,6 +385,13 @@ class NHEobsSQL(orm.AbstractModel):
     """
 
     def get_collect_activities_sql(self, activity_ids_sql):
+        """
+        :param activity_ids_sql: subquery selecting the activity ids to
+            collect, may contain query parameters
+        :type activity_ids_sql: str
+        :returns: SQL statement
+        :rtype: str
+        """
         return self.collect_activities_skeleton.format(
             activity_ids=activity_ids_sql)
 
@@ -474,19 +481,53 @@ class NHEobsSQL(orm.AbstractModel):
         left join bg0 on bg0.spell_activity_id = activity.id
         where activity.state = 'started' and activity.data_model =
           'nh.clinical.spell' and activity.id in ({spell_ids})
-        order by location
+        order by location, activity.id
     """
 
     def get_collect_patients_sql(self, spell_ids):
+        """
+        :param spell_ids: subquery selecting the spell activity ids to
+            collect, may contain query parameters
+        :type spell_ids: str
+        :returns: SQL statement
+        :rtype: str
+        """
         return self.collect_patients_skeleton.format(spell_ids=spell_ids)
 
+    user_ward_spells_skeleton = """
+    select spell_activity.id
+    from nh_activity spell_activity
+    inner join nh_clinical_location location
+        on location.id = spell_activity.location_id
+    where spell_activity.id in ({spell_ids})
+    and location.parent_id in (
+        select bed.parent_id
+        from user_location_rel ulrel
+        inner join nh_clinical_location bed
+            on bed.id = ulrel.location_id
+        where ulrel.user_id = %s and bed.usage = 'bed'
+    )
+    """
+
+    def get_user_ward_spells_sql(self, spell_ids):
+        """
+        Restricts spell activities to those located on the wards
+        containing a user's allocated beds.
+
+        :param spell_ids: subquery selecting the spell activity ids to
+            restrict, may contain query parameters
+        :type spell_ids: str
+        :returns: SQL statement, with the user id as the last parameter
+        :rtype: str
+        """
+        return self.user_ward_spells_skeleton.format(spell_ids=spell_ids)
+
     wb_transfer_ranked_skeleton = """
     select *
     from (
         select
             spell.id as spell_id,
             activity.*,
-            split_part(activity.data_ref, ',', 2)::int as data_id,
             rank() over (partition by spell.id, activity.data_model,
                 activity.state order by activity.sequence desc)
     from nh_clinical_spell spell
@@ -498,3 +539,88 @@ class NHEobsSQL(orm.AbstractModel):
 
     def get_wb_transfer_ranked_sql(self):
         return self.wb_transfer_ranked_skeleton
+
+    wb_obs_state_skeleton = """
+    select
+        spell_activity_id,
+        case
+            when data_model = 'nh.clinical.patient.observation.blood_glucose'
+                then 'bg0'
+            when state = 'scheduled' then 'ews0'
+            when rank = 1 then 'ews1'
+            else 'ews2'
+        end as view_name,
+        id as activity_id,
+        data_id
+    from (
+        select
+            activity.spell_activity_id,
+            activity.id,
+            activity.data_model,
+            activity.state,
+            activity.data_id,
+            row_number() over (partition by activity.spell_activity_id,
+                activity.data_model, activity.state
+                order by activity.sequence desc, activity.id desc) as rank
+        from nh_activity activity
+        left join nh_clinical_patient_observation_ews ews
+            on ews.activity_id = activity.id
+        where activity.spell_activity_id is not null
+        and (
+            (activity.data_model = 'nh.clinical.patient.observation.ews'
+                and (activity.state = 'scheduled'
+                or (activity.state = 'completed'
+                    and ews.clinical_risk != 'Unknown')))
+            or (activity.data_model =
+                'nh.clinical.patient.observation.blood_glucose'
+                and activity.state = 'scheduled')
+        ){spell_filter}
+    ) ranked
+    where (state = 'scheduled' and rank = 1)
+    or (state = 'completed' and rank <= 2)
+    """
+
+    def get_wb_obs_state_sql(self, spell_filter=''):
+        """
+        Rows for the `wb_obs_state` table that backs the `ews0`, `ews1`,
+        `ews2` and `bg0` views.
+
+        :param spell_filter: extra `and` clause to restrict which spells
+            are returned, may contain query parameters
+        :type spell_filter: str
+        :returns: SQL statement
+        :rtype: str
+        """
+        return self.wb_obs_state_skeleton.format(spell_filter=spell_filter)
+
+    ward_locations_skeleton = """
+    select
+        location.id,
+        location.parent_id,
+        array(
+            select path.ancestor_id
+            from nh_clinical_location_closure path
+            inner join nh_clinical_location_closure ward_path
+                on ward_path.descendant_id = path.ancestor_id
+                and ward_path.ancestor_id = ward.id
+            where path.descendant_id = location.id
+            order by path.depth desc
+        ) as path,
+        ward.id as ward_id
+    from nh_clinical_location ward
+    inner join nh_clinical_location_closure closure
+        on closure.ancestor_id = ward.id
+    inner join nh_clinical_location location
+        on location.id = closure.descendant_id
+    where ward.usage = 'ward'
+    """
+
+    def get_ward_locations_sql(self):
+        """
+        Every location paired with each ward it sits in (including the
+        ward itself), read from the location closure table.
+
+        :returns: SQL statement
+        :rtype: str
+        """
+        return self.ward_locations_skeleton
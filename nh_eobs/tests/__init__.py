@@ -6,6 +6,8 @@ from . import test_eobs_settings
 from . import test_helpers
 from . import test_sql_statements
 from . import test_workload
+from .nh_clinical_adt_inbox import *
+from .nh_clinical_materialized_queue import *
 from .nh_clinical_observation_report_wizard import *
 from .nh_clinical_patient_monitoring_exception import *
 from .nh_clinical_wardboard import *
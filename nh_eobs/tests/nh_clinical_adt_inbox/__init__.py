@@ -0,0 +1 @@
+from . import test_process_inbox
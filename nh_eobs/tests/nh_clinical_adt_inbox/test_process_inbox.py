@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+from openerp.osv.orm import except_orm
+from openerp.tests.common import TransactionCase
+
+
+class TestProcessInbox(TransactionCase):
+
+    def setUp(self):
+        super(TestProcessInbox, self).setUp()
+        self.inbox_model = self.env['nh.clinical.adt.inbox']
+        self.api_model = self.env['nh.eobs.api']
+        self.processed = []
+        test = self
+
+        def mock_admit(*args, **kwargs):
+            data = args[4]
+            if data.get('fail'):
+                raise except_orm('Test Error!', 'Admission failed')
+            test.processed.append(('admit', args[3], data.get('seq')))
+            return True
+
+        def mock_transfer(*args, **kwargs):
+            test.processed.append(('transfer', args[3], args[4].get('seq')))
+            return True
+
+        def mock_cancel_admit(*args, **kwargs):
+            test.processed.append(('cancel_admit', args[3], None))
+            return True
+
+        self.api_model._patch_method('admit', mock_admit)
+        self.api_model._patch_method('transfer', mock_transfer)
+        self.api_model._patch_method('cancel_admit', mock_cancel_admit)
+
+    def tearDown(self):
+        self.api_model._revert_method('admit')
+        self.api_model._revert_method('transfer')
+        self.api_model._revert_method('cancel_admit')
+        super(TestProcessInbox, self).tearDown()
+
+    def queue(self, message_type, hospital_number, **data):
+        return self.inbox_model.queue_messages([{
+            'message_type': message_type,
+            'hospital_number': hospital_number,
+            'data': data
+        }])[0]
+
+    def test_processes_patient_messages_in_order(self):
+        self.queue('admit', 'HN001', seq=1)
+        self.queue('admit', 'HN002', seq=2)
+        self.queue('transfer', 'HN001', seq=3)
+        self.queue('cancel_admit', 'HN002')
+        self.queue('transfer', 'HN001', seq=4)
+        self.assertEqual(self.inbox_model.process_inbox(), (5, 0))
+        self.assertEqual(self.processed, [
+            ('admit', 'HN001', 1),
+            ('transfer', 'HN001', 3),
+            ('transfer', 'HN001', 4),
+            ('admit', 'HN002', 2),
+            ('cancel_admit', 'HN002', None)
+        ])
+
+    def test_failure_blocks_later_messages_for_patient(self):
+        failed_id = self.queue('admit', 'HN001', fail=True)
+        blocked_id = self.queue('transfer', 'HN001', seq=1)
+        self.queue('admit', 'HN002', seq=2)
+        self.assertEqual(self.inbox_model.process_inbox(), (1, 1))
+        self.assertEqual(self.processed, [('admit', 'HN002', 2)])
+        status = dict(
+            (message['id'], message) for message in
+            self.inbox_model.get_status([failed_id, blocked_id]))
+        self.assertEqual(status[failed_id]['state'], 'failed')
+        self.assertIn('Admission failed', status[failed_id]['error'])
+        self.assertEqual(status[blocked_id]['state'], 'queued')
+
+        self.inbox_model.process_inbox()
+        self.assertEqual(self.processed, [('admit', 'HN002', 2)])
+
+    def test_requeue_unblocks_patient(self):
+        failed_id = self.queue('transfer', 'HN001', seq=1)
+        self.inbox_model.browse(failed_id).write({'state': 'failed'})
+        self.queue('transfer', 'HN001', seq=2)
+        self.inbox_model.process_inbox()
+        self.assertEqual(self.processed, [])
+
+        self.inbox_model.browse(failed_id).requeue()
+        self.inbox_model.process_inbox()
+        self.assertEqual(self.processed, [('transfer', 'HN001', 1),
+                                          ('transfer', 'HN001', 2)])
+
+    def test_records_state_and_latency(self):
+        message_id = self.queue('admit', 'HN001', seq=1)
+        self.inbox_model.process_inbox()
+        status = self.inbox_model.get_status([message_id])[0]
+        self.assertEqual(status['state'], 'done')
+        self.assertTrue(status['date_processed'])
+        self.assertGreaterEqual(status['latency'], 0.0)
+        stats = self.inbox_model.get_inbox_stats()
+        self.assertEqual(stats['queued'], 0)
+        self.assertGreaterEqual(stats['done'], 1)
+
+    def test_limit_processes_patients_waiting_longest(self):
+        self.queue('admit', 'HN002', seq=1)
+        self.queue('admit', 'HN001', seq=2)
+        self.queue('transfer', 'HN002', seq=3)
+        self.inbox_model.process_inbox(limit=1)
+        self.assertEqual(self.processed, [('admit', 'HN002', 1),
+                                          ('transfer', 'HN002', 3)])
+
+    def test_hospital_number_lookups_shared_in_batch(self):
+        patient = self.env['nh.clinical.patient'].create({
+            'other_identifier': 'HN001',
+            'given_name': 'John',
+            'family_name': 'Smith'
+        })
+        cache = self.inbox_model._get_hospital_number_cache(
+            ['HN001', 'HN002'])
+        self.assertEqual(cache, {patient.other_identifier: True})
+
+    def test_unknown_message_type_raises(self):
+        with self.assertRaises(except_orm):
+            self.inbox_model.queue_messages([{
+                'message_type': 'delete_everything',
+                'hospital_number': 'HN001'
+            }])
@@ -0,0 +1 @@
+from . import test_refresh_queued_views
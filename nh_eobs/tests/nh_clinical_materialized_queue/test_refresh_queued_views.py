@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+
+
+class TestRefreshQueuedViews(TransactionCase):
+
+    def setUp(self):
+        super(TestRefreshQueuedViews, self).setUp()
+        self.queue_model = self.env['nh.clinical.materialized.queue']
+        self.stats_model = self.env['nh.clinical.materialized.view']
+        self.refreshed = []
+
+        def mock_refresh_view(*args, **kwargs):
+            self.refreshed.append(args[-1])
+            return 0.01, False
+
+        self.queue_model._patch_method('refresh_view', mock_refresh_view)
+
+    def tearDown(self):
+        self.queue_model._revert_method('refresh_view')
+        super(TestRefreshQueuedViews, self).tearDown()
+
+    def queue(self, *views):
+        for view in views:
+            self.queue_model.create({
+                'name': 'Refresh {}'.format(view),
+                'view_name': view
+            })
+
+    def test_refreshes_each_view_once(self):
+        self.queue('param', 'param', 'pbp', 'param', 'pbp')
+        self.queue_model.refresh_queued_views()
+        self.assertEqual(self.refreshed, ['param', 'pbp'])
+
+    def test_refreshes_in_dependency_order(self):
+        self.queue('pbp', 'param')
+        self.queue_model.refresh_queued_views()
+        self.assertEqual(self.refreshed, ['param', 'pbp'])
+
+    def test_empties_queue(self):
+        self.queue('param', 'pbp')
+        self.assertEqual(self.queue_model.get_queue_depth(),
+                         {'param': 1, 'pbp': 1})
+        self.queue_model.refresh_queued_views()
+        self.assertEqual(self.queue_model.get_queue_depth(), {})
+
+    def test_ignores_unknown_views(self):
+        self.queue('not_a_view; drop table nh_activity', 'pbp')
+        self.queue_model.refresh_queued_views()
+        self.assertEqual(self.refreshed, ['pbp'])
+
+    def test_records_refresh_statistics(self):
+        self.queue('pbp', 'pbp', 'pbp')
+        self.queue_model.refresh_queued_views()
+        stats = self.stats_model.search([('name', '=', 'pbp')])
+        self.assertEqual(stats.refresh_count, 1)
+        self.assertEqual(stats.request_count, 3)
+        self.assertAlmostEqual(stats.last_duration, 0.01)
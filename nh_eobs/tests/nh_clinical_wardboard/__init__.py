@@ -0,0 +1 @@
+from . import test_wardboard_obs_state
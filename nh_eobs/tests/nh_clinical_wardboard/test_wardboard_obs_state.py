@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+
+
+class TestWardboardObsState(TransactionCase):
+    """
+    Test that the `ews0`, `ews1` and `ews2` views are kept up to date per
+    spell as EWS activities change state.
+    """
+
+    def setUp(self):
+        super(TestWardboardObsState, self).setUp()
+        self.test_utils = self.env['nh.clinical.test_utils']
+        self.test_utils.admit_and_place_patient()
+        self.test_utils.copy_instance_variables(self)
+        self.ews_model = self.env['nh.clinical.patient.observation.ews']
+        self.wardboard_pool = self.registry('nh.clinical.wardboard')
+
+    def get_view_activity_id(self, view_name):
+        self.env.cr.execute("""
+            select activity_id
+            from wb_obs_state
+            where spell_activity_id = %s and view_name = %s
+        """, (self.spell_activity.id, view_name))
+        row = self.env.cr.fetchone()
+        return row[0] if row else None
+
+    def get_view_ews_ids(self, view_name):
+        self.env.cr.execute(
+            'select id from {} where spell_activity_id = %s'.format(view_name),
+            (self.spell_activity.id,))
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    def test_ews0_is_scheduled_obs_after_placement(self):
+        open_obs = self.ews_model.get_open_obs_activity(self.spell_activity.id)
+        self.assertEqual(self.get_view_activity_id('ews0'), open_obs.id)
+        self.assertEqual(self.get_view_ews_ids('ews0'),
+                         [open_obs.data_ref.id])
+
+    def test_ews1_and_ews2_are_last_two_completed_obs(self):
+        first = self.test_utils.create_and_complete_ews_obs_activity(
+            self.patient.id, self.spell_activity.id)
+        second = self.test_utils.create_and_complete_ews_obs_activity(
+            self.patient.id, self.spell_activity.id)
+        self.assertEqual(self.get_view_activity_id('ews1'), second.id)
+        self.assertEqual(self.get_view_activity_id('ews2'), first.id)
+        self.assertEqual(self.get_view_ews_ids('ews1'),
+                         [second.data_ref.id])
+
+    def test_ews0_follows_next_scheduled_obs(self):
+        self.test_utils.create_and_complete_ews_obs_activity(
+            self.patient.id, self.spell_activity.id)
+        open_obs = self.ews_model.get_open_obs_activity(self.spell_activity.id)
+        self.assertEqual(self.get_view_activity_id('ews0'), open_obs.id)
+
+    def test_refresh_matches_full_rebuild(self):
+        self.test_utils.create_and_complete_ews_obs_activity(
+            self.patient.id, self.spell_activity.id)
+        self.env.cr.execute("""
+            select view_name, activity_id from wb_obs_state
+            where spell_activity_id = %s order by view_name
+        """, (self.spell_activity.id,))
+        incremental = self.env.cr.fetchall()
+        self.env.cr.execute(
+            'delete from wb_obs_state where spell_activity_id = %s',
+            (self.spell_activity.id,))
+        self.wardboard_pool.refresh_obs_state(
+            self.env.cr, self.env.uid, [self.spell_activity.id])
+        self.env.cr.execute("""
+            select view_name, activity_id from wb_obs_state
+            where spell_activity_id = %s order by view_name
+        """, (self.spell_activity.id,))
+        self.assertEqual(self.env.cr.fetchall(), incremental)
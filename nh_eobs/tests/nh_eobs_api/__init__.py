@@ -3,3 +3,6 @@ from . import test_transfer
 from . import test_placement
 from . import test_get_data_visualisation_resources
 from . import test_get_activities_for_spell
+from . import test_collect_patients
+from . import test_get_all_patients
+from . import test_get_patient_list
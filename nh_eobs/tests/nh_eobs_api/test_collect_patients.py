@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+
+
+class TestCollectPatients(TransactionCase):
+
+    def setUp(self):
+        super(TestCollectPatients, self).setUp()
+        self.test_utils = self.env['nh.clinical.test_utils']
+        self.test_utils.admit_and_place_patient()
+        self.test_utils.copy_instance_variables(self)
+        self.api_pool = self.registry('nh.eobs.api')
+
+    def test_collects_patients_matching_domain(self):
+        domain = [
+            ('state', '=', 'started'),
+            ('data_model', '=', 'nh.clinical.spell'),
+            ('patient_id', '=', self.patient.id)
+        ]
+        patients = self.api_pool.collect_patients(
+            self.cr, self.uid, domain)
+        self.assertEqual(len(patients), 1)
+        self.assertEqual(patients[0]['id'], self.patient.id)
+
+    def test_returns_empty_list_when_nothing_matches(self):
+        domain = [('id', '=', -1)]
+        self.assertEqual(
+            self.api_pool.collect_patients(self.cr, self.uid, domain), [])
+        self.assertEqual(
+            self.api_pool.collect_activities(self.cr, self.uid, domain), [])
+
+    def test_search_sql_does_not_depend_on_user(self):
+        def get_search_sql(user_id):
+            return self.api_pool._get_search_sql(
+                self.cr, self.uid, 'nh.activity', [
+                    ('state', '=', 'started'),
+                    ('data_model', '=', 'nh.clinical.spell'),
+                    ('user_ids', 'in', [user_id])
+                ])
+        nurse_sql, nurse_params = get_search_sql(self.test_utils.nurse.id)
+        hca_sql, hca_params = get_search_sql(self.test_utils.hca.id)
+        self.assertEqual(nurse_sql, hca_sql)
+        self.assertNotEqual(nurse_params, hca_params)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+
+
+class TestGetAllPatients(TransactionCase):
+    """
+    Test that `get_all_patients` only returns patients on the wards of the
+    beds the user is allocated to.
+    """
+
+    def setUp(self):
+        super(TestGetAllPatients, self).setUp()
+        self.test_utils = self.env['nh.clinical.test_utils']
+        self.test_utils.admit_and_place_patient()
+        self.test_utils.copy_instance_variables(self)
+        self.api_pool = self.registry('nh.eobs.api')
+
+    def get_all_patient_ids(self, user_id, **kwargs):
+        patients = self.api_pool.get_all_patients(
+            self.cr, user_id, [], **kwargs)
+        return [patient['id'] for patient in patients]
+
+    def test_returns_patients_on_users_ward(self):
+        self.assertIn(self.patient.id,
+                      self.get_all_patient_ids(self.test_utils.nurse.id))
+
+    def test_does_not_return_patients_on_other_wards(self):
+        other_nurse = self.test_utils.create_nurse(
+            self.test_utils.other_bed.id)
+        self.assertNotIn(self.patient.id,
+                         self.get_all_patient_ids(other_nurse.id))
+
+    def test_returns_patients_in_other_beds_on_users_ward(self):
+        other_bed = self.test_utils.create_location(
+            'bed', self.test_utils.ward.id)
+        other_nurse = self.test_utils.create_nurse(other_bed.id)
+        self.assertIn(self.patient.id,
+                      self.get_all_patient_ids(other_nurse.id))
+
+    def test_pages_results(self):
+        nurse_id = self.test_utils.nurse.id
+        all_ids = self.get_all_patient_ids(nurse_id)
+        self.assertEqual(
+            self.get_all_patient_ids(nurse_id, limit=1), all_ids[:1])
+        self.assertEqual(
+            self.get_all_patient_ids(nurse_id, limit=1, offset=1),
+            all_ids[1:2])
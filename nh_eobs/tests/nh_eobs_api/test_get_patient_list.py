@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+
+from openerp.tests.common import TransactionCase
+from openerp.tools import DEFAULT_SERVER_DATETIME_FORMAT as DTF
+
+
+class TestGetPatientList(TransactionCase):
+    """
+    Test that `get_patient_list` returns what the mobile patient list needs
+    without releasing the user's claims, and that `release_stale_claims`
+    releases them instead.
+    """
+
+    def setUp(self):
+        super(TestGetPatientList, self).setUp()
+        self.test_utils = self.env['nh.clinical.test_utils']
+        self.test_utils.admit_and_place_patient()
+        self.test_utils.copy_instance_variables(self)
+        self.api_pool = self.registry('nh.eobs.api')
+        self.activity_model = self.env['nh.activity']
+        self.nurse = self.test_utils.nurse
+        self.other_nurse = self.test_utils.create_nurse()
+        self.follow_activity_id = self.registry(
+            'nh.clinical.patient.follow').create_activity(
+            self.cr, self.uid, {'user_id': self.other_nurse.id},
+            {'patient_ids': [[6, 0, [self.patient.id]]]})
+
+    def get_patient_list(self, user_id):
+        return self.api_pool.get_patient_list(self.cr, user_id)
+
+    def claim_task(self):
+        task = self.activity_model.search([
+            ('patient_id', '=', self.patient.id),
+            ('data_model', '=', 'nh.clinical.patient.observation.ews'),
+            ('state', 'not in', ['completed', 'cancelled'])
+        ])[0]
+        self.api_pool.assign(self.cr, self.nurse.id, task.id, {})
+        return task
+
+    def test_returns_patients(self):
+        patient_list = self.get_patient_list(self.nurse.id)
+        self.assertEqual([patient['id'] for patient in
+                          patient_list['patients']], [self.patient.id])
+
+    def test_returns_follow_invitations_as_notifications(self):
+        notifications = self.get_patient_list(self.other_nurse.id)[
+            'notifications']
+        self.assertEqual(notifications, self.api_pool.get_assigned_activities(
+            self.cr, self.other_nurse.id,
+            activity_type='nh.clinical.patient.follow'))
+        self.assertEqual(notifications[0]['patient_ids'], [self.patient.id])
+
+    def test_does_not_release_claims(self):
+        task = self.claim_task()
+        self.get_patient_list(self.nurse.id)
+        self.assertEqual(task.user_id, self.nurse)
+
+    def test_release_stale_claims_releases_expired_claims(self):
+        task = self.claim_task()
+        claimed = (datetime.now() - timedelta(minutes=20)).strftime(DTF)
+        self.cr.execute(
+            'UPDATE nh_activity SET date_assigned = %s WHERE id = %s',
+            (claimed, task.id))
+        task.invalidate_cache()
+        self.assertIn(task.id, self.activity_model.release_stale_claims(15))
+        self.assertFalse(task.user_id)
+
+    def test_release_stale_claims_keeps_recent_claims(self):
+        task = self.claim_task()
+        self.assertTrue(task.date_assigned)
+        self.assertNotIn(task.id,
+                         self.activity_model.release_stale_claims(15))
+        self.assertEqual(task.user_id, self.nurse)
+
+    def test_release_stale_claims_keeps_follow_invitations(self):
+        claimed = (datetime.now() - timedelta(minutes=20)).strftime(DTF)
+        self.cr.execute(
+            'UPDATE nh_activity SET date_assigned = %s WHERE id = %s',
+            (claimed, self.follow_activity_id))
+        self.assertNotIn(self.follow_activity_id,
+                         self.activity_model.release_stale_claims(15))
@@ -2,12 +2,14 @@ from . import test_create_search_filter
 from . import test_data_dict_to_obj
 from . import test_get_ews_observations
 from . import test_get_report_entry_dictionary
+from . import test_get_triggered_actions_for_activities
 from . import test_report_get_triggered_actions
 from . import test_report_start_and_end_date
 from . import test_report_structure
 from . import test_report_without_dob
 from . import test_localise_and_format_datetimes
 from . import test_process_report_dates
+from . import test_prefetch_activity_data
 
 # Disabled
 # from . import test_table_structure
@@ -416,6 +416,24 @@ class ObservationReportHelpers(TransactionCase):
                 'patient_identifier': 'HOS1234123'
             }]
 
+        activity_models = [
+            'nh.clinical.patient.observation.ews',
+            'nh.clinical.patient.observation.height',
+            'nh.clinical.patient.observation.pain',
+            'nh.clinical.patient.observation.blood_product',
+            'nh.clinical.patient.observation.stools',
+            'nh.clinical.patient.observation.pbp',
+            'nh.clinical.patient.observation.gcs',
+            'nh.clinical.patient.observation.o2target',
+            'nh.clinical.patient.mrsa',
+            'nh.clinical.patient.diabetes',
+            'nh.clinical.patient.palliative_care',
+            'nh.clinical.patient.post_surgery',
+            'nh.clinical.patient.critical_care',
+            'nh.clinical.patient.move',
+            'nh.clinical.patient.o2target'
+        ]
+
         def activity_pool_mock_search(*args, **kwargs):
             domain = args[3] if len(args) > 3 else False
             model = domain[1][2] if len(domain) > 1 else False
@@ -430,31 +448,25 @@ class ObservationReportHelpers(TransactionCase):
                 else:
                     raise ValueError('Odd search filter passed')
 
-            models = [
-                'nh.clinical.patient.observation.ews',
-                'nh.clinical.patient.observation.height',
-                'nh.clinical.patient.observation.pain',
-                'nh.clinical.patient.observation.blood_product',
-                'nh.clinical.patient.observation.stools',
-                'nh.clinical.patient.observation.pbp',
-                'nh.clinical.patient.observation.gcs',
-                'nh.clinical.patient.observation.o2target',
-                'nh.clinical.patient.mrsa',
-                'nh.clinical.patient.diabetes',
-                'nh.clinical.patient.palliative_care',
-                'nh.clinical.patient.post_surgery',
-                'nh.clinical.patient.critical_care',
-                'nh.clinical.patient.move',
-                'nh.clinical.patient.o2target'
-            ]
-            if model in models:
-                return [models.index(model)]
+            if isinstance(model, list):
+                return [activity_models.index(name) for name in model
+                        if name in activity_models]
+            if model in activity_models:
+                return [activity_models.index(model)]
             return []
 
         def activity_pool_mock_read(*args, **kwargs):
             aid = args[3] if len(args) > 3 else False
+            if hasattr(aid, '__iter__') and len(aid) > 1:
+                # Prefetched read of several models' activities
+                activities = []
+                for activity_id in aid:
+                    activity = activity_pool_mock_read(
+                        args[0], args[1], args[2], [activity_id])
+                    activities += activity
+                return activities
             if hasattr(aid, '__iter__'):
-                aid = aid[0]
+                aid = aid[0] if aid else None
             if aid is None or False:
                 raise ValueError('No IDs passed')
 
@@ -476,10 +488,16 @@ class ObservationReportHelpers(TransactionCase):
                 self.o2target_data,
                 self.triggered_ews_data
             ]
-            return [copy.deepcopy(responses[aid])] if responses[aid] else []
+            if not responses[aid]:
+                return []
+            activity = copy.deepcopy(responses[aid])
+            if aid < len(activity_models):
+                activity.setdefault('data_model', activity_models[aid])
+                activity.setdefault('state', 'completed')
+            return [activity]
 
         def ews_pool_mock_read(*args, **kwargs):
-            return copy.deepcopy(self.ews_values)
+            return dict(copy.deepcopy(self.ews_values), id=1)
 
         def o2target_pool_mock_get_last(*args, **kwargs):
             return self.o2target_id
@@ -547,6 +565,12 @@ class ObservationReportHelpers(TransactionCase):
         def mock_triggered_actions(*args, **kwargs):
             return []
 
+        def mock_triggered_actions_for_activities(*args, **kwargs):
+            return {}
+
+        self.report_pool._patch_method(
+            'get_triggered_actions_for_activities',
+            mock_triggered_actions_for_activities)
         self.report_pool._patch_method('get_triggered_actions',
                                        mock_triggered_actions)
         self.spell_pool._patch_method('read', spell_pool_mock_spell)
@@ -610,4 +634,6 @@ class ObservationReportHelpers(TransactionCase):
         self.company_pool._revert_method('read')
         self.o2level_pool._revert_method('browse')
         self.report_pool._revert_method('get_triggered_actions')
+        self.report_pool._revert_method(
+            'get_triggered_actions_for_activities')
         super(ObservationReportHelpers, self).tearDown()
@@ -133,3 +133,9 @@ class TestObservationReport(TransactionCase):
     def test_14_without_spell_activity_id(self):
         with self.assertRaises(ValueError):
             create_search_filter(None, None, None, None)
+
+    def test_15_with_list_of_models(self):
+        models = [self.normal_model, 'nh.clinical.patient.move']
+        domain = create_search_filter(self.spell_activity_id, models,
+                                      None, None)
+        self.assertEqual(domain[1], ('data_model', 'in', models))
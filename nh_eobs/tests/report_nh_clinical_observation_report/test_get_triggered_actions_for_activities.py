@@ -0,0 +1,75 @@
+from openerp.tests.common import TransactionCase
+
+
+class TestGetTriggeredActionsForActivities(TransactionCase):
+    """
+    Test that the batched triggered actions match the ones found by
+    searching each level of the chain.
+    """
+
+    def setUp(self):
+        super(TestGetTriggeredActionsForActivities, self).setUp()
+        self.activity_model = self.registry('nh.activity')
+        self.report_pool = \
+            self.registry('report.nh.clinical.observation_report')
+        self.ews = 'nh.clinical.patient.observation.ews'
+        self.task = 'nh.clinical.notification.frequency'
+
+        # root (EWS)
+        #   -> a
+        #      -> a1
+        #         -> a1x
+        #      -> a2
+        #   -> ews (EWS, not followed)
+        #      -> ews1
+        #   -> b
+        #      -> b1
+        self.root_id = self.create(self.ews)
+        a_id = self.create(self.task, self.root_id)
+        ews_id = self.create(self.ews, self.root_id)
+        b_id = self.create(self.task, self.root_id)
+        a1_id = self.create(self.task, a_id)
+        self.create(self.task, ews_id)
+        self.create(self.task, b_id)
+        self.create(self.task, a1_id)
+        self.create(self.task, a_id)
+        # another observation with a single triggered action
+        self.root2_id = self.create(self.ews)
+        self.create(self.task, self.root2_id)
+        self.root3_id = self.create(self.ews)
+
+    def create(self, data_model, creator_id=False):
+        return self.activity_model.create(self.cr, self.uid, {
+            'data_model': data_model,
+            'creator_id': creator_id
+        })
+
+    def get_batched_ids(self, activity_ids):
+        actions = self.report_pool.get_triggered_actions_for_activities(
+            self.cr, self.uid, activity_ids)
+        return dict((activity_id, [action['id'] for action in action_list])
+                    for activity_id, action_list in actions.items())
+
+    def get_action_ids(self, activity_id):
+        return self.report_pool.get_triggered_action_ids(
+            self.cr, self.uid, activity_id)
+
+    def test_matches_get_triggered_action_ids(self):
+        activity_ids = [self.root_id, self.root2_id, self.root3_id]
+        batched = self.get_batched_ids(activity_ids)
+        for activity_id in activity_ids:
+            self.assertEqual(batched[activity_id],
+                             self.get_action_ids(activity_id))
+
+    def test_multi_level_chain_order(self):
+        action_ids = self.get_batched_ids([self.root_id])[self.root_id]
+        self.assertEqual(len(action_ids), 6)
+        a_id, b_id = action_ids[:2]
+        self.assertLess(a_id, b_id)
+        self.assertEqual(
+            self.activity_model.read(
+                self.cr, self.uid, action_ids[2], ['creator_id']
+            )['creator_id'][0], a_id)
+
+    def test_no_activities(self):
+        self.assertEqual(self.get_batched_ids([]), {})
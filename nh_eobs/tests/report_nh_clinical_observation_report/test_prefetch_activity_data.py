@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+
+
+class TestPrefetchActivityData(TransactionCase):
+
+    def setUp(self):
+        super(TestPrefetchActivityData, self).setUp()
+        self.report_model = self.env['report.nh.clinical.observation_report']
+        self.patient_model = self.env['nh.clinical.patient']
+        self.activity_model = self.env['nh.activity']
+        self.activity_pool = self.registry('nh.activity')
+        self.spell_model = self.env['nh.clinical.spell']
+        self.ews_model = self.env['nh.clinical.patient.observation.ews']
+        self.height_model = \
+            self.env['nh.clinical.patient.observation.height']
+
+        self.patient = self.patient_model.create({
+            'given_name': 'Jon',
+            'family_name': 'Snow',
+            'patient_identifier': 'a_patient_identifier'
+        })
+        self.spell_activity_id = self.spell_model.create_activity(
+            {},
+            {'patient_id': self.patient.id, 'pos_id': 1}
+        )
+        self.activity_pool.start(self.env.cr, self.env.uid,
+                                 self.spell_activity_id)
+
+        self.ews_activity_id = self.ews_model.create_activity(
+            {'parent_id': self.spell_activity_id},
+            {'patient_id': self.patient.id}
+        )
+        self.activity_pool.cancel(self.env.cr, self.env.uid,
+                                  self.ews_activity_id)
+        self.height_activity_id = self.height_model.create_activity(
+            {'parent_id': self.spell_activity_id},
+            {'patient_id': self.patient.id}
+        )
+        self.activity_pool.cancel(self.env.cr, self.env.uid,
+                                  self.height_activity_id)
+
+        self.models = [
+            'nh.clinical.patient.observation.ews',
+            'nh.clinical.patient.observation.height'
+        ]
+
+    def test_activities_grouped_by_model(self):
+        activities = self.report_model.prefetch_activity_data(
+            self.spell_activity_id, False, False, models=self.models)
+        self.assertEqual(
+            [activity['id'] for activity in
+             activities['nh.clinical.patient.observation.ews']],
+            [self.ews_activity_id]
+        )
+
+    def test_activities_filtered_by_allowed_states(self):
+        activities = self.report_model.prefetch_activity_data(
+            self.spell_activity_id, False, False, models=self.models)
+        self.assertEqual(
+            activities['nh.clinical.patient.observation.height'], [])
+
+    def test_get_activity_data_matches_search(self):
+        model = 'nh.clinical.patient.observation.ews'
+        expected = self.report_model.get_activity_data(
+            self.spell_activity_id, model, False, False)
+        report = self.report_model.browse()
+        report.prefetch_activity_data(
+            self.spell_activity_id, False, False, models=self.models)
+        self.assertEqual(
+            report.get_activity_data(
+                self.spell_activity_id, model, False, False),
+            expected
+        )
+
+    def test_get_activity_data_uses_prefetch(self):
+        report = self.report_model.browse()
+        report.prefetch_activity_data(
+            self.spell_activity_id, False, False, models=self.models)
+
+        def mock_search(*args, **kwargs):
+            raise AssertionError('Activities searched for again')
+
+        self.activity_pool._patch_method('search', mock_search)
+        try:
+            activities = report.get_activity_data(
+                self.spell_activity_id,
+                'nh.clinical.patient.observation.ews', False, False)
+        finally:
+            self.activity_pool._revert_method('search')
+        self.assertEqual(len(activities), 1)
+
+    def test_get_activity_data_returns_copies(self):
+        model = 'nh.clinical.patient.observation.ews'
+        report = self.report_model.browse()
+        report.prefetch_activity_data(
+            self.spell_activity_id, False, False, models=self.models)
+        activities = report.get_activity_data(
+            self.spell_activity_id, model, False, False)
+        activities[0]['values'] = {}
+        activities = report.get_activity_data(
+            self.spell_activity_id, model, False, False)
+        self.assertNotIn('values', activities[0])
+
+    def test_other_periods_not_prefetched(self):
+        report = self.report_model.browse()
+        report.prefetch_activity_data(
+            self.spell_activity_id, False, False, models=self.models)
+        self.assertIsNone(report._get_prefetched_activity_data(
+            self.spell_activity_id, 'nh.clinical.patient.observation.ews',
+            '1988-01-12 06:00:00', False))
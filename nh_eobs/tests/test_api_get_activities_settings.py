@@ -15,20 +15,21 @@ class TestApiGetActivitiesSettings(SingleTransactionCase):
         def mock_settings_get(*args, **kwargs):
             return 120
 
-        def mock_activity_search(*args, **kwargs):
+        def mock_activity_where_calc(*args, **kwargs):
             context = kwargs.get('context')
             if context and context.get('test') == 'domain_test':
                 global search_domain
                 search_domain = args[3]
-            return []
+            return mock_activity_where_calc.origin(*args, **kwargs)
 
         cls.settings_pool._patch_method('get_setting', mock_settings_get)
-        cls.activity_pool._patch_method('search', mock_activity_search)
+        cls.activity_pool._patch_method(
+            '_where_calc', mock_activity_where_calc)
 
     @classmethod
     def tearDownClass(cls):
         cls.settings_pool._revert_method('get_setting')
-        cls.activity_pool._revert_method('search')
+        cls.activity_pool._revert_method('_where_calc')
         super(TestApiGetActivitiesSettings, cls).tearDownClass()
 
     def test_passes_settings_value_to_domain(self):
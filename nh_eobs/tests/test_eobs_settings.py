@@ -43,3 +43,46 @@ class TestEobsSettings(SingleTransactionCase):
         test_setting = self.settings_pool.get_setting(cr, uid,
                                                       'activity_period')
         self.assertEqual(test_setting, 120)
+
+    def test_get_setting_is_cached(self):
+        """
+        Test that repeated lookups don't read the settings record again
+        """
+        cr, uid = self.cr, self.uid
+        self.settings_pool.get_setting(cr, uid, 'activity_period')
+        reads = []
+
+        def mock_read(*args, **kwargs):
+            reads.append(args)
+            return mock_read.origin(*args, **kwargs)
+
+        self.settings_pool._patch_method('read', mock_read)
+        try:
+            self.settings_pool.get_setting(cr, uid, 'activity_period')
+            self.settings_pool.get_setting(cr, uid, 'activity_period')
+        finally:
+            self.settings_pool._revert_method('read')
+        self.assertFalse(reads)
+
+    def test_write_invalidates_cached_setting(self):
+        """
+        Test that writing to the settings clears the cached values
+        """
+        cr, uid = self.cr, self.uid
+        self.settings_pool.write(cr, uid, 1, {'activity_period': 90})
+        self.assertEqual(
+            self.settings_pool.get_setting(cr, uid, 'activity_period'), 90)
+        self.settings_pool.write(cr, uid, 1, {'activity_period': 45})
+        self.assertEqual(
+            self.settings_pool.get_setting(cr, uid, 'activity_period'), 45)
+
+    def test_cached_setting_not_shared(self):
+        """
+        Test that modifying a returned value doesn't change the cache
+        """
+        cr, uid = self.cr, self.uid
+        buckets = self.settings_pool.get_setting(
+            cr, uid, 'workload_bucket_period')
+        buckets.append(0)
+        self.assertNotIn(0, self.settings_pool.get_setting(
+            cr, uid, 'workload_bucket_period'))
@@ -164,20 +164,7 @@ class nh_eobs_ward_dashboard(orm.Model):
         drop view if exists ward_beds cascade;
 
         create or replace view
-        wdb_ward_locations as(
-            with recursive ward_loc(id, parent_id, path, ward_id) as (
-                select lc.id, lc.parent_id, ARRAY[lc.id] as path,
-                lc.id as ward_id
-                from nh_clinical_location as lc
-                where lc.usage = 'ward'
-                union all
-                select l.id, l.parent_id,
-                w.path || ARRAY[l.id] as path, w.path[1]
-                    as ward_id
-                from ward_loc as w, nh_clinical_location as l
-                where l.parent_id = w.id)
-            select * from ward_loc
-        );
+        wdb_ward_locations as(%s);
 
         create or replace view
         -- ews per spell, data_model, state
@@ -187,7 +174,6 @@ class nh_eobs_ward_dashboard(orm.Model):
                 select
                     spell.id as spell_id,
                     activity.*,
-                    split_part(activity.data_ref, ',', 2)::int as data_id,
                     rank() over (partition by spell.id, activity.data_model,
                         activity.state order by activity.sequence desc)
             from nh_clinical_spell spell
@@ -374,7 +360,9 @@ class nh_eobs_ward_dashboard(orm.Model):
                 on rpc.location_id = location.id
             where location.usage = 'ward'
         )
-        """ % (self._table, self._table))
+        """ % (self._table,
+               self.pool['nh.clinical.sql'].get_ward_locations_sql(),
+               self._table))
 
 
 class nh_eobs_bed_dashboard(orm.Model):
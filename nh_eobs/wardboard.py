@@ -861,30 +861,9 @@ class nh_clinical_wardboard(orm.Model):
             raise osv.except_osv(
                 "Patient Board Error!",
                 "Patient must be placed to bed before moving!")
-        sql = """
-        with
-            recursive route(level, path, parent_id, id) as (
-                    select 0, id::text, parent_id, id
-                    from nh_clinical_location
-                    where parent_id is null
-                union
-                    select level + 1, path||','||location.id,
-                        location.parent_id, location.id
-                    from nh_clinical_location location
-                    join route on location.parent_id = route.id
-            )
-            select
-                route.id as location_id,
-                ('{'||path||'}')::int[] as parent_ids
-            from route
-            where id = %s
-            order by path
-        """ % wardboard.location_id.id
-        cr.execute(sql)
-        parent_ids = (cr.dictfetchone() or {}).get('parent_ids')
-        ward_location_ids = self.pool['nh.clinical.location'].search(
-            cr, uid, [['id', 'in', parent_ids], ['usage', '=', 'ward']])
-        ward_location_id = ward_location_ids and ward_location_ids[0] or False
+        ward_location_id = self.pool['nh.clinical.location']\
+            .get_closest_parent_id(cr, uid, wardboard.location_id.id, 'ward',
+                                   context=context)
         res_id = self.pool['wardboard.patient.placement'].create(
             cr, uid,
             {'patient_id': wardboard.patient_id.id,
@@ -1096,6 +1075,38 @@ class nh_clinical_wardboard(orm.Model):
         wardboard.ensure_one()
         return wardboard
 
+    def refresh_obs_state(self, cr, uid, spell_activity_ids, context=None):
+        """
+        Recalculates the rows of the `wb_obs_state` table, which backs the
+        `ews0`, `ews1`, `ews2` and `bg0` views, for the passed spells only.
+
+        :param spell_activity_ids: ids of the spell activities that have
+            had an EWS or blood glucose activity change state
+        :type spell_activity_ids: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        spell_activity_ids = [sid for sid in set(spell_activity_ids) if sid]
+        if not spell_activity_ids:
+            return True
+        nh_eobs_sql = self.pool['nh.clinical.sql']
+        cr.execute("""
+            delete from wb_obs_state
+            where spell_activity_id = any(%(spell_activity_ids)s);
+            insert into wb_obs_state (spell_activity_id, view_name,
+                activity_id, data_id)
+            {wb_obs_state}
+            on conflict (spell_activity_id, view_name) do update
+            set activity_id = excluded.activity_id,
+                data_id = excluded.data_id;
+        """.format(wb_obs_state=nh_eobs_sql.get_wb_obs_state_sql(
+            spell_filter='\n        and activity.spell_activity_id = '
+                         'any(%(spell_activity_ids)s)'
+        )), {'spell_activity_ids': spell_activity_ids})
+        _logger.debug('Wardboard observation state refreshed for spells %s',
+                      spell_activity_ids)
+        return True
+
     def init(self, cr):
         settings_pool = self.pool['nh.clinical.settings']
         nh_eobs_sql = self.pool['nh.clinical.sql']
@@ -1107,14 +1118,36 @@ class nh_clinical_wardboard(orm.Model):
             nh_eobs_sql.get_last_transfer_users('{0}d'.format(dt_period))
         wardboard = nh_eobs_sql.get_wardboard('{0}d'.format(dt_period))
         wb_transfer_ranked = nh_eobs_sql.get_wb_transfer_ranked_sql()
+        wb_obs_state = nh_eobs_sql.get_wb_obs_state_sql()
         cr.execute("""
 
+-- ews0, ews1, ews2 and bg0 used to be materialized views
+do $$
+declare
+    old_view text;
+begin
+    for old_view in select matviewname from pg_matviews
+        where matviewname in ('ews0', 'bg0', 'ews1', 'ews2')
+    loop
+        execute 'drop materialized view ' || old_view || ' cascade';
+    end loop;
+end $$;
+drop view if exists ews0 cascade;
+drop view if exists bg0 cascade;
+drop view if exists ews1 cascade;
+drop view if exists ews2 cascade;
+
+-- ward_locations used to be a materialized view
+do $$
+begin
+    if exists (select 1 from pg_matviews
+               where matviewname = 'ward_locations') then
+        drop materialized view ward_locations cascade;
+    end if;
+end $$;
+drop view if exists ward_locations cascade;
+
 -- materialized views
-drop materialized view if exists ews0 cascade;
-drop materialized view if exists bg0 cascade;
-drop materialized view if exists ews1 cascade;
-drop materialized view if exists ews2 cascade;
-drop materialized view if exists ward_locations cascade;
 drop materialized view if exists param cascade;
 drop materialized view if exists pbp cascade;
 
@@ -1139,7 +1172,6 @@ wb_activity_ranked as(
         select
             spell.id as spell_id,
             activity.*,
-            split_part(activity.data_ref, ',', 2)::int as data_id,
             rank() over (partition by spell.id, activity.data_model,
                 activity.state order by activity.sequence desc)
         from nh_clinical_spell spell
@@ -1156,7 +1188,6 @@ wb_ews_ranked as(
         select
             spell.id as spell_id,
             activity.*,
-            split_part(activity.data_ref, ',', 2)::int as data_id,
             rank() over (partition by spell.id, activity.data_model,
                 activity.state order by activity.sequence desc)
     from nh_clinical_spell spell
@@ -1179,7 +1210,6 @@ wb_bg_ranked as(
         select
             spell.id as spell_id,
             activity.*,
-            split_part(activity.data_ref, ',', 2)::int as data_id,
             rank() over (partition by spell.id, activity.data_model,
                 activity.state order by activity.sequence desc)
     from nh_clinical_spell spell
@@ -1200,7 +1230,6 @@ wb_spell_ranked as(
         select
             spell.id as spell_id,
             activity.*,
-            split_part(activity.data_ref, ',', 2)::int as data_id,
             rank() over (partition by spell.id, activity.data_model,
                 activity.state order by activity.sequence desc)
     from nh_clinical_spell spell
@@ -1221,7 +1250,6 @@ wb_discharge_ranked as(
         select
             spell.id as spell_id,
             activity.*,
-            split_part(activity.data_ref, ',', 2)::int as data_id,
             rank() over (partition by spell.id, activity.data_model,
                 activity.state order by activity.sequence desc)
     from nh_clinical_spell spell
@@ -1231,18 +1259,9 @@ wb_discharge_ranked as(
     where rank = 1
 );
 
-create materialized view
+create or replace view
 ward_locations as(
-    with recursive ward_loc(id, parent_id, path, ward_id) as (
-        select lc.id, lc.parent_id, ARRAY[lc.id] as path, lc.id as ward_id
-        from nh_clinical_location as lc
-        where lc.usage = 'ward'
-        union all
-        select l.id, l.parent_id, w.path || ARRAY[l.id] as path, w.path[1]
-            as ward_id
-        from ward_loc as w, nh_clinical_location as l
-        where l.parent_id = w.id)
-    select * from ward_loc
+    {ward_locations}
 );
 
 create or replace view
@@ -1278,8 +1297,7 @@ wb_activity_data as(
             spell.patient_id,
             activity.data_model,
             activity.state,
-            array_agg(split_part(activity.data_ref, ',', 2)::int
-                order by split_part(activity.data_ref, ',', 2)::int desc)
+            array_agg(activity.data_id order by activity.data_id desc)
                 as ids
         from nh_clinical_spell spell
         inner join nh_activity spell_activity
@@ -1290,12 +1308,25 @@ wb_activity_data as(
             activity.state
 );
 
-create materialized view
+-- latest scheduled and completed ews and blood glucose activities per spell,
+-- maintained per spell by nh.clinical.wardboard.refresh_obs_state
+create table if not exists wb_obs_state (
+    spell_activity_id integer not null,
+    view_name varchar not null,
+    activity_id integer not null,
+    data_id integer not null,
+    primary key (spell_activity_id, view_name)
+);
+truncate wb_obs_state;
+insert into wb_obs_state (spell_activity_id, view_name, activity_id, data_id)
+{wb_obs_state};
+
+create or replace view
 ews0 as(
             select
                 activity.parent_id as spell_activity_id,
                 activity.patient_id,
-                activity.spell_id,
+                spell.id as spell_id,
                 activity.state,
                 activity.date_scheduled,
                 ews.id,
@@ -1308,19 +1339,23 @@ ews0 as(
                     'UTC', activity.date_scheduled))
                     else interval '0s'
                 end as next_diff_interval,
-                activity.rank
-            from wb_ews_ranked activity
+                1::bigint as rank
+            from wb_obs_state obs_state
+            inner join nh_clinical_spell spell
+                on spell.activity_id = obs_state.spell_activity_id
+            inner join nh_activity activity
+                on activity.id = obs_state.activity_id
             left join nh_clinical_patient_observation_ews ews
-                on activity.data_id = ews.id
-            where activity.rank = 1 and activity.state = 'scheduled'
+                on ews.id = obs_state.data_id
+            where obs_state.view_name = 'ews0'
 );
 
-create materialized view
+create or replace view
 bg0 as(
             select
                 activity.parent_id as spell_activity_id,
                 activity.patient_id,
-                activity.spell_id,
+                spell.id as spell_id,
                 activity.state,
                 activity.date_scheduled,
                 bg.id,
@@ -1331,19 +1366,23 @@ bg0 as(
                     'UTC', activity.date_scheduled))
                     else interval '0s'
                 end as next_diff_interval,
-                activity.rank
-            from wb_bg_ranked activity
+                1::bigint as rank
+            from wb_obs_state obs_state
+            inner join nh_clinical_spell spell
+                on spell.activity_id = obs_state.spell_activity_id
+            inner join nh_activity activity
+                on activity.id = obs_state.activity_id
             left join nh_clinical_patient_observation_blood_glucose bg
-                on activity.data_id = bg.id
-            where activity.rank = 1 and activity.state = 'scheduled'
+                on bg.id = obs_state.data_id
+            where obs_state.view_name = 'bg0'
 );
 
-create materialized view
+create or replace view
 ews1 as(
             select
                 activity.parent_id as spell_activity_id,
                 activity.patient_id,
-                activity.spell_id,
+                spell.id as spell_id,
                 activity.state,
                 activity.date_scheduled,
                 activity.date_terminated,
@@ -1359,19 +1398,23 @@ ews1 as(
                     'UTC', activity.date_scheduled))
                     else interval '0s'
                 end as next_diff_interval,
-                activity.rank
-            from wb_ews_ranked activity
+                1::bigint as rank
+            from wb_obs_state obs_state
+            inner join nh_clinical_spell spell
+                on spell.activity_id = obs_state.spell_activity_id
+            inner join nh_activity activity
+                on activity.id = obs_state.activity_id
             inner join nh_clinical_patient_observation_ews ews
-                on activity.data_id = ews.id
-            where activity.rank = 1 and activity.state = 'completed'
+                on ews.id = obs_state.data_id
+            where obs_state.view_name = 'ews1'
 );
 
-create materialized view
+create or replace view
 ews2 as(
             select
                 activity.parent_id as spell_activity_id,
                 activity.patient_id,
-                activity.spell_id,
+                spell.id as spell_id,
                 activity.state,
                 activity.date_scheduled,
                 ews.id,
@@ -1386,13 +1429,18 @@ ews2 as(
                     'UTC', activity.date_scheduled))
                     else interval '0s'
                 end as next_diff_interval,
-                activity.rank
-            from wb_ews_ranked activity
+                2::bigint as rank
+            from wb_obs_state obs_state
+            inner join nh_clinical_spell spell
+                on spell.activity_id = obs_state.spell_activity_id
+            inner join nh_activity activity
+                on activity.id = obs_state.activity_id
             inner join nh_clinical_patient_observation_ews ews
-            on activity.data_id = ews.id
-            where activity.rank = 2 and activity.state = 'completed'
+                on ews.id = obs_state.data_id
+            where obs_state.view_name = 'ews2'
 );
 
+
 create or replace view
 consulting_doctors as(
             select
@@ -1473,4 +1521,6 @@ nh_clinical_wardboard as({wardboard});
 """.format(last_discharge_users=last_discharge_users,
            last_transfer_users=last_transfer_users,
            wardboard=wardboard,
-           wb_transfer_ranked=wb_transfer_ranked))
+           wb_transfer_ranked=wb_transfer_ranked,
+           wb_obs_state=wb_obs_state,
+           ward_locations=nh_eobs_sql.get_ward_locations_sql()))
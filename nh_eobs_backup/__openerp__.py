@@ -10,7 +10,8 @@
     'author': 'Neova Health',
     'website': 'http://www.neovahealth.co.uk/',
     'depends': ['nh_eobs'],
-    'data': ['data/cron.xml',
+    'data': ['security/ir.model.access.csv',
+             'data/cron.xml',
              'views/config_view.xml'],
     'qweb': [],
     'application': True,
@@ -4,26 +4,59 @@ from openerp.exceptions import except_orm
 from openerp.osv import orm
 from openerp.osv import fields
 from openerp.osv import osv
+from openerp import api, registry, SUPERUSER_ID
+from openerp.tools import DEFAULT_SERVER_DATETIME_FORMAT as DTF
+from datetime import datetime
 import logging
 import base64
 import os
 import errno
+import Queue
+import threading
+import time
 
 _logger = logging.getLogger(__name__)
 
+BACKUP_LOCATION = '/bcp/out'
+# Stages of printing a report, timed by `print_spell_report`
+REPORT_STAGES = ['render', 'pdf', 'write']
+
 
 class NHClinicalBackupSpellFlag(orm.Model):
     _name = 'nh.clinical.spell'
     _inherit = 'nh.clinical.spell'
 
     _columns = {
-        'report_printed': fields.boolean('Has the report been printed?')
+        'report_printed': fields.boolean('Has the report been printed?'),
+        'report_printed_obs_count': fields.integer(
+            'Completed observations when the report was last printed')
     }
 
     _defaults = {
         'report_printed': False
     }
 
+    def get_completed_obs_count(self, cr, uid, spell_id, context=None):
+        """
+        Number of completed observations in a spell. Observations can't
+        be uncompleted so a spell with the same count as when it was last
+        printed has nothing new to print.
+
+        :param spell_id: spell id
+        :type spell_id: int
+        :rtype: int
+        """
+        cr.execute("""
+            SELECT count(*)
+            FROM nh_activity
+            WHERE spell_activity_id = (
+                SELECT activity_id FROM nh_clinical_spell WHERE id = %s
+            )
+            AND state = 'completed'
+            AND data_model LIKE 'nh.clinical.patient.observation.%%'
+        """, (spell_id,))
+        return cr.fetchone()[0]
+
 
 class NHClinicalObservationCompleteOverride(orm.AbstractModel):
     _inherit = 'nh.clinical.patient.observation.ews'
@@ -40,6 +73,22 @@ class NHClinicalObservationCompleteOverride(orm.AbstractModel):
         spell_pool.write(cr, uid, spell_id, {'report_printed': False})
         return res
 
+    def complete_many(self, cr, uid, activity_ids, context=None):
+        res = super(NHClinicalObservationCompleteOverride, self)\
+            .complete_many(cr, uid, activity_ids, context=context)
+        activity_pool = self.pool['nh.activity']
+        spell_pool = self.pool['nh.clinical.spell']
+        patient_ids = set(
+            activity.data_ref.patient_id.id for activity in
+            activity_pool.browse(cr, uid, activity_ids, context=context))
+        spell_ids = [
+            spell_pool.get_by_patient_id(cr, uid, patient_id,
+                                         context=context)
+            for patient_id in patient_ids]
+        spell_pool.write(cr, uid, [spell_id for spell_id in spell_ids
+                                   if spell_id], {'report_printed': False})
+        return res
+
 
 class NHClinicalObservationBackupSettings(osv.TransientModel):
     _inherit = 'base.config.settings'
@@ -49,7 +98,13 @@ class NHClinicalObservationBackupSettings(osv.TransientModel):
             'nh.clinical.location',
             domain=[['usage', '=', 'ward']],
             string='Locations to print backup observation reports for'
-        )
+        ),
+        'backup_workers': fields.integer(
+            'Workers to print backup observation reports with'),
+        'backup_max_attempts': fields.integer(
+            'Attempts to print a backup observation report before giving up'),
+        'backup_job_retention_days': fields.integer(
+            'Days to keep printed backup observation report jobs for')
     }
 
     def set_locations(self, cr, uid, ids, context=None):
@@ -79,6 +134,40 @@ class NHClinicalObservationBackupSettings(osv.TransientModel):
         )
         return dict(locations_to_print=locs)
 
+    def set_backup_workers(self, cr, uid, ids, context=None):
+        record = self.browse(cr, uid, ids[0], context=context)
+        return self.pool['ir.config_parameter'].set_param(
+            cr, uid, 'nh_eobs_backup.workers',
+            str(max(record.backup_workers, 1)))
+
+    def get_default_backup_workers(self, cr, uid, ids, context=None):
+        workers = self.pool['nh.eobs.backup.job'].get_workers(
+            cr, uid, context=context)
+        return dict(backup_workers=workers)
+
+    def set_backup_max_attempts(self, cr, uid, ids, context=None):
+        record = self.browse(cr, uid, ids[0], context=context)
+        return self.pool['ir.config_parameter'].set_param(
+            cr, uid, 'nh_eobs_backup.max_attempts',
+            str(max(record.backup_max_attempts, 1)))
+
+    def get_default_backup_max_attempts(self, cr, uid, ids, context=None):
+        max_attempts = self.pool['nh.eobs.backup.job'].get_max_attempts(
+            cr, uid, context=context)
+        return dict(backup_max_attempts=max_attempts)
+
+    def set_backup_job_retention_days(self, cr, uid, ids, context=None):
+        record = self.browse(cr, uid, ids[0], context=context)
+        return self.pool['ir.config_parameter'].set_param(
+            cr, uid, 'nh_eobs_backup.job_retention_days',
+            str(max(record.backup_job_retention_days, 1)))
+
+    def get_default_backup_job_retention_days(self, cr, uid, ids,
+                                              context=None):
+        retention_days = self.pool['nh.eobs.backup.job'].get_retention_days(
+            cr, uid, context=context)
+        return dict(backup_job_retention_days=retention_days)
+
 
 class NHClinicalObservationBackupLocation(orm.Model):
     _inherit = 'nh.clinical.location'
@@ -151,144 +240,528 @@ class NHClinicalObservationReportPrinting(orm.Model):
         return True
 
     def print_report(self, cr, uid, spell_id=None, context=None):
-        # Get spell ids for reports to be printed
-        spell_pool = self.pool['nh.clinical.spell']
-        loc_pool = self.pool['nh.clinical.location']
-        spell_ids = []
+        """
+        Prints the observation report of a spell to the backup location.
+        Without a spell it runs a backup of every spell on a backup ward
+        that needs printing, see :meth:`run_backup`.
+
+        :param spell_id: id of the spell to print
+        :type spell_id: int
+        :returns: ``True``
+        :rtype: bool
+        """
+        if not spell_id:
+            self.run_backup(cr, uid, context=context)
+            return True
+        try:
+            with cr.savepoint():
+                self.print_spell_report(cr, uid, spell_id, context=context)
+        except except_orm:
+            pass
+        except Exception:
+            _logger.exception(
+                'Error creating PDF for Spell: {0}'.format(spell_id))
+        return True
+
+    def run_backup(self, cr, uid, workers=None, context=None):
+        """
+        Queues a job for each spell that needs printing and processes
+        the queue.
+
+        The queued jobs are committed and every job is committed once it
+        has finished, so a run that crashes resumes from the remaining
+        jobs. With more than one worker the jobs are shared between a
+        pool of threads, each printing with its own cursor. With a single
+        worker jobs are printed in the caller's cursor.
 
-        if spell_id:
-            spell_ids.append(spell_id)
+        :param workers: number of workers, defaults to the
+            ``nh_eobs_backup.workers`` system parameter
+        :type workers: int
+        :returns: ids of the jobs processed
+        :rtype: list
+        """
+        job_pool = self.pool['nh.eobs.backup.job']
+        if workers is None:
+            workers = job_pool.get_workers(cr, uid, context=context)
+        if not job_pool.lock_queue(cr, uid, context=context):
+            _logger.info('Observation report backup already running')
+            return []
+        job_ids = job_pool.queue_jobs(cr, uid, context=context)
+        if not job_ids:
+            return []
+        start = time.time()
+        cr.commit()
+        # The commit released the lock, hold it again until the jobs are
+        # processed
+        job_pool.lock_queue(cr, uid, context=context)
+        if workers > 1:
+            def process(job_cr, job_id):
+                job_pool.process_job(
+                    job_cr, uid, job_id, commit=True, context=context)
+            self._run_workers(cr.dbname, job_ids, workers, process)
         else:
-            loc_ids = loc_pool.search(
-                cr, uid,
-                [
-                    ['usage', '=', 'ward'],
-                    ['backup_observations', '=', True]
-                ]
-            )
-            spell_ids = spell_pool.search(
-                cr, uid,
-                [
-                    ['report_printed', '=', False],
-                    ['state', 'not in', ['completed', 'cancelled']],
-                    ['location_id', 'child_of', loc_ids]
-                ]
-            )
+            for job_id in job_ids:
+                job_pool.process_job(cr, uid, job_id, commit=True,
+                                     relock=True, context=context)
+        _logger.info('Processed %s observation report job(s) with %s '
+                     'worker(s) in %.3fs',
+                     len(job_ids), workers, time.time() - start)
+        return job_ids
 
-        # For each report; print it, save it to DB, save it to FS,
-        # set flag to True
-        report_pool = self.pool['report']
-        obs_report_pool = self.pool['report.nh.clinical.observation_report']
-        for spell in spell_ids:
-		    # TAT - 20/02/2019: Moved try to resolve script failing, added additional logging to identify failure
+    def print_spell_reports(self, cr, uid, spell_ids, workers=None,
+                            context=None):
+        """
+        Prints the observation reports of many spells to the backup
+        location, for example when a ward is discharged, writing each
+        report as soon as it is ready.
+
+        With more than one worker the spells are shared between a pool of
+        threads, each printing with its own cursor and committing after
+        every spell. The PDF conversion runs in a separate wkhtmltopdf
+        process per report so up to `workers` reports are converted at
+        once. Workers only see data committed before the call.
+
+        :param spell_ids: ids of the spells to print
+        :type spell_ids: list
+        :param workers: number of workers, defaults to the
+            ``nh_eobs_backup.workers`` system parameter
+        :type workers: int
+        :returns: spell id mapped to the state the report finished in,
+            how long it took and how long each stage took
+        :rtype: dict
+        """
+        if workers is None:
+            workers = self.pool['nh.eobs.backup.job'].get_workers(
+                cr, uid, context=context)
+        results = {}
+
+        def process(spell_cr, spell_id):
+            metrics = {}
+            start = time.time()
             try:
-                _logger.info('Spell Id: {0}'.format(spell))
-                obs_report_wizard_pool = \
-                    self.pool['nh.clinical.observation_report_wizard']
-                obs_report_wizard_id = obs_report_wizard_pool.create(
-                    cr, uid, {
-                        'start_time': None,
-                        'end_time': None
-                    }
-                )
-                data = obs_report_wizard_pool.read(cr, uid, obs_report_wizard_id)
-                data['spell_id'] = spell
-                data['ews_only'] = True
-
-                # Render the HTML for the report
-                report_html = obs_report_pool.render_html(cr, uid,
-                                                      obs_report_wizard_id,
-                                                      data=data,
-                                                      context=context)
-
-                # Create PDF from HTML
-                report_pdf = report_pool.get_pdf(
-                    cr, uid, [obs_report_wizard_id],
-                    'nh.clinical.observation_report',
-                    html=report_html,
-                    data=data, context=context
-                )
+                with spell_cr.savepoint():
+                    printed = self.print_spell_report(
+                        spell_cr, uid, spell_id, metrics=metrics,
+                        context=context)
+                metrics['state'] = 'done' if printed else 'failed'
+            except Exception:
+                _logger.exception(
+                    'Error creating PDF for Spell: {0}'.format(spell_id))
+                metrics['state'] = 'failed'
+            metrics['duration'] = time.time() - start
+            results[spell_id] = metrics
 
-                # file name - fetch values trustid,ward,surname,nhsnumber
-		        # TAT - 20/02/2019: added 'other_identifier' to patient_id array, data handler and file name
-                spell_obj = spell_pool.read(cr, uid, spell)
-                patient_id = spell_obj['patient_id'][0]
-                patient = self.pool['nh.clinical.patient'].read(
-                    cr, uid,
-                    patient_id,
-                    [
-                        'patient_identifier',
-                        'other_identifier',
-                        'current_location_id',
-                        'family_name'
-                    ]
-                )
-                nhs_number = None
-                if 'patient_identifier' in patient \
-                        and patient['patient_identifier']:
-                    nhs_number = patient['patient_identifier']
-                ward = None
-                ward_id = None
-                if 'current_location_id' in patient \
-                        and patient['current_location_id']:
-                    ward_id = patient['current_location_id'][0]
-                if ward_id:
-                    loc_pool = self.pool['nh.clinical.location']
-                    ward_usage = loc_pool.read(
-                        cr, uid,
-                        ward_id,
-                        ['usage', 'display_name']
-                    )
-                    if ward_usage['usage'] != 'ward':
-                        ward_ward = loc_pool.get_closest_parent_id(
-                            cr, uid, ward_id, 'ward')
-                        if ward_ward:
-                            ward = loc_pool.read(
-                                cr, uid, ward_ward,
-                                ['display_name']
-                            )['display_name'].replace(' ', '')
-                    else:
-                        ward = ward_usage['display_name'].replace(' ', '')
-                surname = None
-                if 'family_name' in patient and patient['family_name']:
-                    surname = patient['family_name']
-                trust_id = None
-                if 'other_identifier' in patient and patient['other_identifier']:
-                    trust_id = patient['other_identifier']
-                #file_name = '{w}_{s}_{n}'.format(
-                #    w=ward,
-                #    s=surname,
-                #    n=nhs_number
-                #)
-                # TAT - 20/02/2019: added code here to handle if trustid == None and log error, do not create PDF or updated report_printed flag
-                if trust_id:
-                    file_name = '{t}'.format(
-                        t=trust_id
-                    )
-                    # Write to database disabled on 07/08/2018 at request of client
-
-                    # Save to database
-                    # db = self.add_report_to_database(
-                    #     cr, uid,
-                    #     'nh.clinical.observation_report',
-                    #     report_pdf,
-                    #     file_name,
-                    #     'nh.clinical.observation_report_wizard',
-                    #     obs_report_wizard_id)
-
-
-                    # Save to file system
-                    fs = self.add_report_to_backup_location('/bcp/out', report_pdf,
-                                                        file_name)
-                    # if db and fs:
-                    if fs:
-                        self.pool['nh.clinical.spell'].write(
-                            cr, uid, spell, {'report_printed': True})
-                else:
-                    _logger.warning('Cannot save PDF report for Spell: {0}, other_identifier missing'.format(spell))
-            except except_orm:
-                pass
-            except:
-                _logger.error('Error creating PDF for Spell: {0}'.format(spell))
-                pass
+        start = time.time()
+        if workers > 1 and len(spell_ids) > 1:
+            self._run_workers(cr.dbname, spell_ids, workers, process)
+        else:
+            for spell_id in spell_ids:
+                process(cr, spell_id)
+        _logger.info(
+            'Printed %s of %s observation report(s) with %s worker(s) in '
+            '%.3fs (%s)',
+            len([metrics for metrics in results.values()
+                 if metrics['state'] == 'done']),
+            len(spell_ids), workers, time.time() - start,
+            ', '.join(
+                '{0} {1:.3f}s'.format(stage, sum(
+                    metrics.get(stage, 0) for metrics in results.values()))
+                for stage in REPORT_STAGES
+            ))
+        return results
+
+    def _run_workers(self, dbname, items, workers, process):
+        """
+        Calls `process` with a new cursor and each of `items` from a pool
+        of `workers` threads. The cursor is committed once `process`
+        returns.
+
+        :param dbname: database name
+        :type dbname: str
+        :param items: items to process
+        :type items: list
+        :param workers: number of threads
+        :type workers: int
+        :param process: callable taking a cursor and an item
+        """
+        queue = Queue.Queue()
+        for item in items:
+            queue.put(item)
+
+        def work():
+            threading.current_thread().dbname = dbname
+            with api.Environment.manage():
+                while True:
+                    try:
+                        item = queue.get_nowait()
+                    except Queue.Empty:
+                        return
+                    with registry(dbname).cursor() as cr:
+                        process(cr, item)
+
+        threads = [
+            threading.Thread(target=work,
+                             name='nh_eobs_backup.worker.{0}'.format(index))
+            for index in range(min(workers, len(items)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def get_report_file_name(self, cr, uid, spell_id, context=None):
+        """
+        Name of the backup file for a spell, which is the patient's
+        hospital number.
+
+        :param spell_id: spell id
+        :type spell_id: int
+        :returns: file name without extension, or ``None`` if the
+            patient has no hospital number
+        :rtype: str
+        """
+        spell = self.pool['nh.clinical.spell'].read(
+            cr, uid, spell_id, ['patient_id'], context=context)
+        patient = self.pool['nh.clinical.patient'].read(
+            cr, uid, spell['patient_id'][0], ['other_identifier'],
+            context=context)
+        trust_id = patient.get('other_identifier')
+        return '{t}'.format(t=trust_id) if trust_id else None
+
+    def print_spell_report(self, cr, uid, spell_id, metrics=None,
+                           context=None):
+        """
+        Renders the observation report of a spell, writes the PDF to the
+        backup location and flags the spell as printed.
+
+        :param spell_id: spell id
+        :type spell_id: int
+        :param metrics: dictionary to record the seconds taken by each of
+            `REPORT_STAGES` in
+        :type metrics: dict
+        :returns: ``True`` if the report was written, ``False`` if the
+            patient has no hospital number to name it by
+        :rtype: bool
+        """
+        if metrics is None:
+            metrics = {}
+        _logger.info('Spell Id: {0}'.format(spell_id))
+        # TAT - 20/02/2019: do not create PDF or update report_printed flag
+        # when the patient has no hospital number
+        file_name = self.get_report_file_name(
+            cr, uid, spell_id, context=context)
+        if not file_name:
+            _logger.warning(
+                'Cannot save PDF report for Spell: {0}, other_identifier '
+                'missing'.format(spell_id))
+            return False
+
+        report_pool = self.pool['report']
+        env = api.Environment(cr, uid, context or {})
+        obs_report_model = env['report.nh.clinical.observation_report']
+        obs_report_wizard_pool = \
+            self.pool['nh.clinical.observation_report_wizard']
+        obs_report_wizard_id = obs_report_wizard_pool.create(
+            cr, uid, {
+                'start_time': None,
+                'end_time': None
+            }
+        )
+        data = obs_report_wizard_pool.read(cr, uid, obs_report_wizard_id)
+        data['spell_id'] = spell_id
+        data['ews_only'] = True
+
+        # Render the HTML for the report
+        start = time.time()
+        report_html = obs_report_model.render_html(data)
+        metrics['render'] = time.time() - start
+
+        # Create PDF from HTML
+        start = time.time()
+        report_pdf = report_pool.get_pdf(
+            cr, uid, [obs_report_wizard_id],
+            'nh.clinical.observation_report',
+            html=report_html,
+            data=data, context=context
+        )
+        metrics['pdf'] = time.time() - start
+
+        # Write to database disabled on 07/08/2018 at request of client,
+        # see add_report_to_database
+
+        # Save to file system
+        start = time.time()
+        written = self.add_report_to_backup_location(
+            BACKUP_LOCATION, report_pdf, file_name)
+        metrics['write'] = time.time() - start
+        _logger.debug(
+            'Spell %s report timings: %s', spell_id,
+            ', '.join('{0} {1:.3f}s'.format(stage, metrics[stage])
+                      for stage in REPORT_STAGES))
+        if not written:
+            return False
+        spell_pool = self.pool['nh.clinical.spell']
+        spell_pool.write(cr, uid, spell_id, {
+            'report_printed': True,
+            'report_printed_obs_count': spell_pool.get_completed_obs_count(
+                cr, uid, spell_id, context=context)
+        })
         return True
+
+
+class NHEobsBackupJob(orm.Model):
+    """
+    A spell queued for printing by
+    :meth:`NHClinicalObservationReportPrinting.run_backup`, with the
+    outcome and timing of the attempt.
+    """
+    _name = 'nh.eobs.backup.job'
+    _description = 'Observation Report Backup Job'
+    _order = 'id desc'
+
+    # Arbitrary constant used to make sure only one backup runs at a time
+    _advisory_lock_key = 7420114
+    # Defaults of the ``nh_eobs_backup.max_attempts`` and
+    # ``nh_eobs_backup.job_retention_days`` system parameters
+    _max_attempts = 3
+    _retention_days = 30
+    _states = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Printed'),
+        ('skipped', 'Skipped'),
+        ('failed', 'Failed')
+    ]
+
+    _columns = {
+        'spell_id': fields.many2one('nh.clinical.spell', 'Spell',
+                                    required=True, select=True,
+                                    ondelete='cascade'),
+        'state': fields.selection(_states, 'State', required=True,
+                                  select=True),
+        'attempts': fields.integer('Attempts'),
+        'date_started': fields.datetime('Started'),
+        'date_finished': fields.datetime('Finished'),
+        'duration': fields.float('Duration (s)', digits=(16, 3)),
+        'render_duration': fields.float('HTML Rendering (s)',
+                                        digits=(16, 3)),
+        'pdf_duration': fields.float('PDF Conversion (s)', digits=(16, 3)),
+        'write_duration': fields.float('File Write (s)', digits=(16, 3)),
+        'error': fields.text('Error')
+    }
+
+    _defaults = {
+        'state': 'pending',
+        'attempts': 0
+    }
+
+    def get_workers(self, cr, uid, context=None):
+        """
+        Number of workers to print reports with, from the
+        ``nh_eobs_backup.workers`` system parameter.
+
+        :rtype: int
+        """
+        return self._get_int_param(cr, 'nh_eobs_backup.workers', 1)
+
+    def _get_int_param(self, cr, key, default):
+        """
+        Positive integer system parameter, `default` if it isn't set or
+        isn't a number.
+
+        :rtype: int
+        """
+        value = self.pool['ir.config_parameter'].get_param(
+            cr, SUPERUSER_ID, key, default=str(default))
+        try:
+            return max(int(value), 1)
+        except ValueError:
+            return default
+
+    def get_max_attempts(self, cr, uid, context=None):
+        """
+        Number of times a job is attempted before it is left failed, from
+        the ``nh_eobs_backup.max_attempts`` system parameter.
+
+        :rtype: int
+        """
+        return self._get_int_param(
+            cr, 'nh_eobs_backup.max_attempts', self._max_attempts)
+
+    def get_retention_days(self, cr, uid, context=None):
+        """
+        Number of days finished jobs are kept for, from the
+        ``nh_eobs_backup.job_retention_days`` system parameter.
+
+        :rtype: int
+        """
+        return self._get_int_param(
+            cr, 'nh_eobs_backup.job_retention_days', self._retention_days)
+
+    def lock_queue(self, cr, uid, context=None):
+        """
+        Takes a transaction level lock so only one backup runs at a time.
+
+        :returns: ``True`` if the lock was taken
+        :rtype: bool
+        """
+        cr.execute('SELECT pg_try_advisory_xact_lock(%s)',
+                   (self._advisory_lock_key,))
+        return cr.fetchone()[0]
+
+    def queue_jobs(self, cr, uid, context=None):
+        """
+        Queues a job for every open spell on a backup ward that hasn't
+        been printed since its last observation. Jobs left pending,
+        running or failed by an earlier run are picked up again rather
+        than duplicated, so completed spells are never reprinted.
+
+        Jobs that have been attempted `get_max_attempts` times are left
+        failed and their spells aren't queued again until the job is
+        set back to pending. Finished jobs older than
+        `get_retention_days` are deleted.
+
+        :returns: ids of the jobs to process
+        :rtype: list
+        """
+        loc_pool = self.pool['nh.clinical.location']
+        spell_pool = self.pool['nh.clinical.spell']
+        self.delete_old_jobs(cr, uid, context=context)
+        max_attempts = self.get_max_attempts(cr, uid, context=context)
+        open_jobs = self.read(cr, uid, self.search(cr, uid, [
+            ['state', 'in', ['pending', 'running', 'failed']]
+        ], context=context), ['spell_id', 'attempts'], context=context)
+        open_job_ids = [job['id'] for job in open_jobs
+                        if job['attempts'] < max_attempts]
+        given_up_ids = [job['id'] for job in open_jobs
+                        if job['attempts'] >= max_attempts]
+        if open_job_ids:
+            self.write(cr, uid, open_job_ids, {'state': 'pending'},
+                       context=context)
+        if given_up_ids:
+            self.write(cr, uid, given_up_ids, {'state': 'failed'},
+                       context=context)
+            _logger.warning(
+                '%s observation report job(s) failed %s times and will not '
+                'be retried', len(given_up_ids), max_attempts)
+        loc_ids = loc_pool.search(
+            cr, uid,
+            [
+                ['usage', '=', 'ward'],
+                ['backup_observations', '=', True]
+            ]
+        )
+        spell_ids = spell_pool.search(
+            cr, uid,
+            [
+                ['report_printed', '=', False],
+                ['state', 'not in', ['completed', 'cancelled']],
+                ['location_id', 'child_of', loc_ids]
+            ]
+        )
+        queued_spell_ids = set(job['spell_id'][0] for job in open_jobs)
+        for spell_id in spell_ids:
+            if spell_id not in queued_spell_ids:
+                open_job_ids.append(
+                    self.create(cr, uid, {'spell_id': spell_id},
+                                context=context))
+        return sorted(open_job_ids)
+
+    def delete_old_jobs(self, cr, uid, context=None):
+        """
+        Deletes the printed and skipped jobs that finished more than
+        `get_retention_days` days ago.
+
+        :returns: number of jobs deleted
+        :rtype: int
+        """
+        retention_days = self.get_retention_days(cr, uid, context=context)
+        cr.execute("""
+            DELETE FROM nh_eobs_backup_job
+            WHERE state IN ('done', 'skipped')
+            AND date_finished < (now() AT TIME ZONE 'UTC') -
+                %s * INTERVAL '1 day'
+        """, (retention_days,))
+        if cr.rowcount:
+            _logger.info('Deleted %s observation report job(s) finished '
+                         'more than %s day(s) ago', cr.rowcount,
+                         retention_days)
+        return cr.rowcount
+
+    def process_job(self, cr, uid, job_id, commit=False, relock=False,
+                    context=None):
+        """
+        Prints the spell of a job unless it has no new observations since
+        it was last printed, recording the outcome and how long it took.
+
+        :param job_id: job id
+        :type job_id: int
+        :param commit: commit once the job is marked running and again
+            when it has finished
+        :type commit: bool
+        :param relock: take the queue lock again after each commit, for a
+            job processed with the cursor that holds it
+        :type relock: bool
+        :returns: state the job finished in
+        :rtype: str
+        """
+        api_pool = self.pool['nh.eobs.api']
+        spell_pool = self.pool['nh.clinical.spell']
+        job = self.browse(cr, uid, job_id, context=context)
+        if job.state != 'pending':
+            return job.state
+        self.write(cr, uid, job_id, {
+            'state': 'running',
+            'attempts': job.attempts + 1,
+            'date_started': datetime.now().strftime(DTF)
+        }, context=context)
+        if commit:
+            self._commit(cr, uid, relock, context=context)
+
+        spell = job.spell_id
+        start = time.time()
+        values = {'error': False}
+        metrics = {}
+        try:
+            with cr.savepoint():
+                if spell.report_printed_obs_count and \
+                        spell.report_printed_obs_count == \
+                        spell_pool.get_completed_obs_count(
+                            cr, uid, spell.id, context=context):
+                    spell_pool.write(cr, uid, spell.id,
+                                     {'report_printed': True})
+                    values['state'] = 'skipped'
+                elif api_pool.print_spell_report(
+                        cr, uid, spell.id, metrics=metrics,
+                        context=context):
+                    values['state'] = 'done'
+                else:
+                    values.update({
+                        'state': 'failed',
+                        'error': 'Report not written, hospital number '
+                                 'missing or backup location unavailable'
+                    })
+        except Exception as error:
+            _logger.exception(
+                'Error creating PDF for Spell: {0}'.format(spell.id))
+            values.update({'state': 'failed', 'error': repr(error)})
+        for stage in REPORT_STAGES:
+            values['{0}_duration'.format(stage)] = metrics.get(stage, 0)
+        values.update({
+            'duration': time.time() - start,
+            'date_finished': datetime.now().strftime(DTF)
+        })
+        self.write(cr, uid, job_id, values, context=context)
+        if commit:
+            self._commit(cr, uid, relock, context=context)
+        _logger.debug('Backup job %s for spell %s %s in %.3fs',
+                      job_id, spell.id, values['state'], values['duration'])
+        return values['state']
+
+    def _commit(self, cr, uid, relock, context=None):
+        """
+        Commits the cursor, taking the queue lock again if `relock`.
+        """
+        cr.commit()
+        if relock:
+            self.lock_queue(cr, uid, context=context)
@@ -1,9 +1,12 @@
 # Part of Open eObs. See LICENSE file for full copyright and licensing details.
 from openerp.osv import osv
 from openerp.tests.common import TransactionCase
-from datetime import datetime as dt
+from datetime import datetime as dt, timedelta
+from mock import MagicMock
 from openerp.tools import DEFAULT_SERVER_DATETIME_FORMAT as dtf
 import base64
+import threading
+import time
 import os.path
 
 
@@ -110,6 +113,12 @@ class TestNHClinicalBackupProcedure(TransactionCase):
             'pulse_rate': 250,
             'avpu_text': 'U'
         }
+        # The backup commits each job, keep the test data uncommitted
+        self.cr.commit = MagicMock()
+
+    def tearDown(self):
+        del self.cr.commit
+        super(TestNHClinicalBackupProcedure, self).tearDown()
 
     def test_01_test_flag_set_on_spell(self):
         # get the spell registry and check that it has report_
@@ -467,3 +476,301 @@ class TestNHClinicalBackupProcedure(TransactionCase):
         self.assertEqual(
             get_vals['locations_to_print'],
             [], 'Ward U not removed from backed up wards')
+
+    def complete_ews(self, spell_activity_id, patient_id):
+        cr, uid = self.cr, self.uid
+        ews_activity_id = self.ews_pool.create_activity(
+            cr, uid,
+            {'parent_id': spell_activity_id},
+            {'patient_id': patient_id}
+        )
+        self.ews_pool.submit(cr, uid, ews_activity_id, self.ews_data)
+        self.ews_pool.complete(cr, uid, ews_activity_id)
+
+    def get_job(self, spell_id):
+        job_pool = self.registry('nh.eobs.backup.job')
+        job_ids = job_pool.search(
+            self.cr, self.uid, [['spell_id', '=', spell_id]])
+        self.assertEqual(len(job_ids), 1, 'Spell not queued exactly once')
+        return job_pool.read(self.cr, self.uid, job_ids[0],
+                             ['state', 'attempts', 'duration', 'error'])
+
+    def test_15_backup_job_records_printed_spell(self):
+        cr, uid = self.cr, self.uid
+        spell_id = self.spell_pool.get_by_patient_id(cr, uid, self.patient_id)
+        self.complete_ews(self.spell_id, self.patient_id)
+        self.api_pool.print_report(cr, uid)
+        job = self.get_job(spell_id)
+        self.assertEqual(job['state'], 'done')
+        self.assertEqual(job['attempts'], 1)
+        self.assertGreater(job['duration'], 0)
+        spell = self.spell_pool.read(
+            cr, uid, spell_id, ['report_printed', 'report_printed_obs_count'])
+        self.assertTrue(spell['report_printed'])
+        self.assertEqual(spell['report_printed_obs_count'], 1)
+
+    def test_16_backup_job_skips_spell_without_new_observations(self):
+        cr, uid = self.cr, self.uid
+        spell_id = self.spell_pool.get_by_patient_id(cr, uid, self.patient_id)
+        self.complete_ews(self.spell_id, self.patient_id)
+        self.api_pool.print_report(cr, uid, spell_id)
+        dirty_spell_ids = self.spell_pool.search(
+            cr, uid, [['report_printed', '=', False]])
+        self.spell_pool.write(
+            cr, uid, dirty_spell_ids, {'report_printed': True})
+        self.spell_pool.write(cr, uid, spell_id, {'report_printed': False})
+
+        def mock_print(*args, **kwargs):
+            raise AssertionError('Report printed without new observations')
+
+        self.api_pool._patch_method('print_spell_report', mock_print)
+        try:
+            self.api_pool.print_report(cr, uid)
+        finally:
+            self.api_pool._revert_method('print_spell_report')
+        self.assertEqual(self.get_job(spell_id)['state'], 'skipped')
+        self.assertTrue(self.spell_pool.read(
+            cr, uid, spell_id, ['report_printed'])['report_printed'])
+
+    def test_17_backup_job_records_failure_and_is_retried(self):
+        cr, uid = self.cr, self.uid
+        spell_id = self.spell_pool.get_by_patient_id(cr, uid, self.patient_id)
+        self.complete_ews(self.spell_id, self.patient_id)
+
+        def mock_print(*args, **kwargs):
+            raise osv.except_osv(
+                'Report (PDF)',
+                'Wkhtmltopdf failed (error code: -11). Message:'
+            )
+
+        self.registry('report')._patch_method('_run_wkhtmltopdf', mock_print)
+        try:
+            self.api_pool.print_report(cr, uid)
+        finally:
+            self.registry('report')._revert_method('_run_wkhtmltopdf')
+        job = self.get_job(spell_id)
+        self.assertEqual(job['state'], 'failed')
+        self.assertIn('Wkhtmltopdf failed', job['error'])
+        self.assertFalse(self.spell_pool.read(
+            cr, uid, spell_id, ['report_printed'])['report_printed'])
+
+        self.api_pool.print_report(cr, uid)
+        job = self.get_job(spell_id)
+        self.assertEqual(job['state'], 'done')
+        self.assertEqual(job['attempts'], 2)
+        self.assertFalse(job['error'])
+
+    def test_18_backup_resumes_without_reprinting_completed_spells(self):
+        cr, uid = self.cr, self.uid
+        job_pool = self.registry('nh.eobs.backup.job')
+        spell_id = self.spell_pool.get_by_patient_id(cr, uid, self.patient_id)
+        spell_id2 = self.spell_pool.get_by_patient_id(
+            cr, uid, self.patient_id2)
+        self.complete_ews(self.spell_id, self.patient_id)
+        self.complete_ews(self.spell_id2, self.patient_id2)
+        # Simulate a run that crashed after printing the first spell
+        job_ids = job_pool.queue_jobs(cr, uid)
+        first_job_id = job_pool.search(
+            cr, uid, [['id', 'in', job_ids], ['spell_id', '=', spell_id]])[0]
+        job_pool.process_job(cr, uid, first_job_id)
+        job_pool.write(cr, uid, job_ids, {'state': 'running'})
+        job_pool.write(cr, uid, first_job_id, {'state': 'done'})
+
+        printed = []
+
+        def mock_print(*args, **kwargs):
+            printed.append(args[3])
+            return mock_print.origin(*args, **kwargs)
+
+        self.api_pool._patch_method('print_spell_report', mock_print)
+        try:
+            self.api_pool.print_report(cr, uid)
+        finally:
+            self.api_pool._revert_method('print_spell_report')
+        self.assertNotIn(spell_id, printed)
+        self.assertIn(spell_id2, printed)
+        self.assertEqual(self.get_job(spell_id)['state'], 'done')
+        self.assertEqual(self.get_job(spell_id2)['state'], 'done')
+
+    def test_19_backup_workers_read_from_settings(self):
+        cr, uid = self.cr, self.uid
+        settings_pool = self.registry('base.config.settings')
+        job_pool = self.registry('nh.eobs.backup.job')
+        record = settings_pool.create(cr, uid, {'backup_workers': 4})
+        settings_pool.set_backup_workers(cr, uid, [record])
+        self.assertEqual(job_pool.get_workers(cr, uid), 4)
+        self.assertEqual(
+            settings_pool.get_default_backup_workers(cr, uid, []),
+            {'backup_workers': 4})
+
+    def test_20_backup_job_records_stage_timings(self):
+        cr, uid = self.cr, self.uid
+        spell_id = self.spell_pool.get_by_patient_id(cr, uid, self.patient_id)
+        self.complete_ews(self.spell_id, self.patient_id)
+        self.api_pool.print_report(cr, uid)
+        job_pool = self.registry('nh.eobs.backup.job')
+        job_ids = job_pool.search(cr, uid, [['spell_id', '=', spell_id]])
+        job = job_pool.read(cr, uid, job_ids[0], [
+            'render_duration', 'pdf_duration'])
+        self.assertGreater(job['render_duration'], 0)
+        self.assertGreater(job['pdf_duration'], 0)
+
+    def test_21_print_spell_reports_prints_each_spell(self):
+        cr, uid = self.cr, self.uid
+        spell_id = self.spell_pool.get_by_patient_id(cr, uid, self.patient_id)
+        spell_id2 = self.spell_pool.get_by_patient_id(
+            cr, uid, self.patient_id2)
+        results = self.api_pool.print_spell_reports(
+            cr, uid, [spell_id, spell_id2], workers=1)
+        self.assertEqual(sorted(results), sorted([spell_id, spell_id2]))
+        for metrics in results.values():
+            self.assertEqual(metrics['state'], 'done')
+            for stage in ['render', 'pdf', 'write']:
+                self.assertIn(stage, metrics)
+        self.assertTrue(self.spell_pool.read(
+            cr, uid, spell_id2, ['report_printed'])['report_printed'])
+
+    def test_22_print_spell_reports_continues_after_failure(self):
+        cr, uid = self.cr, self.uid
+        spell_id = self.spell_pool.get_by_patient_id(cr, uid, self.patient_id)
+        spell_id2 = self.spell_pool.get_by_patient_id(
+            cr, uid, self.patient_id2)
+
+        def mock_print(*args, **kwargs):
+            if args[3] == spell_id:
+                raise osv.except_osv(
+                    'Report (PDF)',
+                    'Wkhtmltopdf failed (error code: -11). Message:'
+                )
+            return mock_print.origin(*args, **kwargs)
+
+        self.api_pool._patch_method('print_spell_report', mock_print)
+        try:
+            results = self.api_pool.print_spell_reports(
+                cr, uid, [spell_id, spell_id2], workers=1)
+        finally:
+            self.api_pool._revert_method('print_spell_report')
+        self.assertEqual(results[spell_id]['state'], 'failed')
+        self.assertEqual(results[spell_id2]['state'], 'done')
+
+    def test_23_single_worker_backup_commits_and_keeps_lock(self):
+        cr, uid = self.cr, self.uid
+        job_pool = self.registry('nh.eobs.backup.job')
+        spell_id = self.spell_pool.get_by_patient_id(cr, uid, self.patient_id)
+        self.complete_ews(self.spell_id, self.patient_id)
+        locks = []
+
+        def mock_lock_queue(*args, **kwargs):
+            locks.append(cr.commit.call_count)
+            return mock_lock_queue.origin(*args, **kwargs)
+
+        job_pool._patch_method('lock_queue', mock_lock_queue)
+        try:
+            job_ids = self.api_pool.run_backup(cr, uid, workers=1)
+        finally:
+            job_pool._revert_method('lock_queue')
+        self.assertEqual(self.get_job(spell_id)['state'], 'done')
+        # Queue committed, then each job committed when started and
+        # finished, the lock is taken again after every commit
+        self.assertEqual(cr.commit.call_count, 1 + 2 * len(job_ids))
+        self.assertEqual(locks, range(cr.commit.call_count + 1))
+
+    def test_24_backup_job_not_retried_after_max_attempts(self):
+        cr, uid = self.cr, self.uid
+        job_pool = self.registry('nh.eobs.backup.job')
+        self.registry('ir.config_parameter').set_param(
+            cr, uid, 'nh_eobs_backup.max_attempts', '2')
+        spell_id = self.spell_pool.get_by_patient_id(cr, uid, self.patient_id)
+        self.complete_ews(self.spell_id, self.patient_id)
+
+        def mock_print(*args, **kwargs):
+            raise osv.except_osv(
+                'Report (PDF)',
+                'Wkhtmltopdf failed (error code: -11). Message:'
+            )
+
+        self.registry('report')._patch_method('_run_wkhtmltopdf', mock_print)
+        try:
+            for run in range(3):
+                self.api_pool.print_report(cr, uid)
+        finally:
+            self.registry('report')._revert_method('_run_wkhtmltopdf')
+        job = self.get_job(spell_id)
+        self.assertEqual(job['state'], 'failed')
+        self.assertEqual(job['attempts'], 2)
+        job_ids = job_pool.search(cr, uid, [['spell_id', '=', spell_id]])
+        self.assertNotIn(job_ids[0], job_pool.queue_jobs(cr, uid))
+
+    def test_25_old_finished_backup_jobs_deleted(self):
+        cr, uid = self.cr, self.uid
+        job_pool = self.registry('nh.eobs.backup.job')
+        self.registry('ir.config_parameter').set_param(
+            cr, uid, 'nh_eobs_backup.job_retention_days', '30')
+        spell_id = self.spell_pool.get_by_patient_id(cr, uid, self.patient_id)
+        old_date = (dt.now() - timedelta(days=31)).strftime(dtf)
+        recent_date = (dt.now() - timedelta(days=1)).strftime(dtf)
+        old_ids = [
+            job_pool.create(cr, uid, {'spell_id': spell_id, 'state': state,
+                                      'date_finished': old_date})
+            for state in ['done', 'skipped']
+        ]
+        kept_ids = [
+            job_pool.create(cr, uid, {'spell_id': spell_id, 'state': 'done',
+                                      'date_finished': recent_date}),
+            job_pool.create(cr, uid, {'spell_id': spell_id, 'state': 'failed',
+                                      'attempts': 3,
+                                      'date_finished': old_date})
+        ]
+        self.assertEqual(job_pool.delete_old_jobs(cr, uid), 2)
+        existing_ids = job_pool.search(
+            cr, uid, [['id', 'in', old_ids + kept_ids]])
+        self.assertEqual(sorted(existing_ids), sorted(kept_ids))
+
+    def test_26_print_spell_report_uses_report_render_html(self):
+        cr, uid = self.cr, self.uid
+        spell_id = self.spell_pool.get_by_patient_id(cr, uid, self.patient_id)
+        report_pool = self.registry('report.nh.clinical.observation_report')
+        rendered = []
+
+        def mock_render_html(*args, **kwargs):
+            rendered.append(args[-1]['spell_id'])
+            return mock_render_html.origin(*args, **kwargs)
+
+        report_pool._patch_method('render_html', mock_render_html)
+        try:
+            metrics = {}
+            self.assertTrue(self.api_pool.print_spell_report(
+                cr, uid, spell_id, metrics=metrics))
+        finally:
+            report_pool._revert_method('render_html')
+        self.assertEqual(rendered, [spell_id])
+        self.assertGreater(metrics['render'], 0)
+
+    def test_27_print_spell_reports_shares_spells_between_workers(self):
+        cr, uid = self.cr, self.uid
+        spell_ids = [1, 2, 3, 4]
+        printed = []
+
+        def mock_print(*args, **kwargs):
+            # Uncommitted test data isn't visible to the worker cursors
+            self.assertIsNot(args[1], cr)
+            time.sleep(0.05)
+            kwargs['metrics']['render'] = 0.05
+            printed.append((args[3], threading.current_thread().name))
+            return True
+
+        self.api_pool._patch_method('print_spell_report', mock_print)
+        try:
+            results = self.api_pool.print_spell_reports(
+                cr, uid, spell_ids, workers=2)
+        finally:
+            self.api_pool._revert_method('print_spell_report')
+        self.assertEqual(sorted(spell_id for spell_id, _ in printed),
+                         spell_ids)
+        self.assertEqual(
+            set(thread_name for _, thread_name in printed),
+            {'nh_eobs_backup.worker.0', 'nh_eobs_backup.worker.1'})
+        self.assertEqual(sorted(results), spell_ids)
+        for metrics in results.values():
+            self.assertEqual(metrics['state'], 'done')
+            self.assertEqual(metrics['render'], 0.05)
@@ -510,8 +510,9 @@ class lister_patient_observation_gcs(orm.Model):
         'pupil_left_reaction': fields.selection([['yes', 'Yes'], ['no', 'No'], ['sluggish', 'Sluggish']], 'Left Pupil Reaction')
     }
 
-    def get_form_description(self, cr, uid, patient_id, context=None):
-        fd = list(self._form_description)
+    def build_form_description(self, cr, uid, context=None):
+        fd = super(lister_patient_observation_gcs,
+                   self).build_form_description(cr, uid, context=context)
         fd.append({
             'name': 'pupil_right_size',
             'type': 'selection',
@@ -6,6 +6,7 @@ from .models import nh_clinical_overdue
 from .models import nh_clinical_patient_observation_ews
 from .models import nh_clinical_pme_obs_stop
 from .models import nh_clinical_pme_rapid_tranq
+from .models import nh_clinical_refusal_episode
 from .models import nh_clinical_settings
 from .models import nh_clinical_spell
 from .models import nh_clinical_wardboard
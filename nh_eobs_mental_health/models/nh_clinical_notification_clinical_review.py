@@ -1,4 +1,4 @@
-from openerp import models, api
+from openerp import SUPERUSER_ID, models, api
 
 
 class ClinicalReviewNotification(models.Model):
@@ -18,6 +18,22 @@ class ClinicalReviewNotification(models.Model):
         }
     ]
 
+    def create_activity(self, cr, uid, vals_activity=None, vals_data=None,
+                        context=None):
+        """
+        Extends
+        :meth:`create_activity()<activity.nh_activity_data.create_activity>`
+        to link the clinical review to the refusal episode that triggered
+        it.
+        """
+        activity_id = super(ClinicalReviewNotification, self).create_activity(
+            cr, uid, vals_activity=vals_activity, vals_data=vals_data,
+            context=context)
+        if (vals_activity or {}).get('creator_id'):
+            self.pool['nh.clinical.refusal.episode'].add_review(
+                cr, SUPERUSER_ID, activity_id, context=context)
+        return activity_id
+
     @api.model
     def complete(self, activity_id):
         super(ClinicalReviewNotification, self).complete(activity_id)
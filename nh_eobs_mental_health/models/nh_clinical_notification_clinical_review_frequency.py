@@ -1,4 +1,4 @@
-from openerp import api
+from openerp import SUPERUSER_ID, api
 from openerp.addons.nh_observations import frequencies
 from openerp.models import Model
 
@@ -24,6 +24,23 @@ class ClinicalReviewFrequencyNotification(Model):
         frequencies.EVERY_DAY
     ]
 
+    def create_activity(self, cr, uid, vals_activity=None, vals_data=None,
+                        context=None):
+        """
+        Extends
+        :meth:`create_activity()<activity.nh_activity_data.create_activity>`
+        to link the clinical review frequency to the refusal episode of
+        the clinical review that triggered it.
+        """
+        activity_id = super(
+            ClinicalReviewFrequencyNotification, self).create_activity(
+            cr, uid, vals_activity=vals_activity, vals_data=vals_data,
+            context=context)
+        if (vals_activity or {}).get('creator_id'):
+            self.pool['nh.clinical.refusal.episode'].add_frequency(
+                cr, SUPERUSER_ID, activity_id, context=context)
+        return activity_id
+
     @api.model
     def get_form_description(self, patient_id):
         """
@@ -24,7 +24,10 @@ class NHClinicalPatientObservationEWS(orm.Model):
 
     _columns = {
         'partial_reason': fields.selection(_partial_reasons,
-                                           'Reason if partial observation')
+                                           'Reason if partial observation'),
+        'refusal_episode_id': fields.many2one(
+            'nh.clinical.refusal.episode', 'Refusal Episode',
+            ondelete='set null')
     }
 
     def complete(self, cr, uid, activity_id, context=None):
@@ -64,6 +67,8 @@ class NHClinicalPatientObservationEWS(orm.Model):
         activity = activity_model.browse(cr, uid, activity_id, context=context)
         ews = activity.data_ref
         patient_spell = activity.spell_activity_id.data_ref
+        self.pool['nh.clinical.refusal.episode'].add_observation(
+            cr, SUPERUSER_ID, activity_id, context=context)
         patient_refusing = patient_spell.refusing_obs
 
         if not ews.is_partial:
@@ -140,13 +145,15 @@ class NHClinicalPatientObservationEWS(orm.Model):
     def is_refusal_in_effect(self, cr, uid, activity_id,
                              mode='parent', context=None):
         """
-        Use the last_refused_ews SQL view to see if activity_id is part of a
-        patient refusal
+        Use the ``nh.clinical.refusal.episode`` of the observation to see
+        if activity_id is part of a patient refusal
 
         :param cr: Odoo cursor
         :param uid: User doing operation
         :param activity_id: <nh.activity> Activity ID
-        :param mode: Mode to operate on, parent goes up chain, child goes down
+        :param mode: Mode to operate on, parent checks the observation is
+            part of a refusal episode, child checks the refusal
+            observation's episode hasn't been closed by a full observation
         :param context: Odoo Context
         :return: If the patient is currently in refusal
         """
@@ -155,41 +162,31 @@ class NHClinicalPatientObservationEWS(orm.Model):
         if activity.spell_activity_id.state in ['completed', 'cancelled']:
             return False
 
-        column = 'last_activity_id'
-        first_act_order = 'DESC'
+        ews = activity.data_ref
+        episode = ews.refusal_episode_id
+        if not episode:
+            return False
         if mode == 'child':
-            column = 'first_activity_id'
-            first_act_order = 'ASC'
-
-        cr.execute(
-            'SELECT refused.refused, '
-            'acts.date_terminated '
-            'FROM refused_ews_activities AS refused '
-            'RIGHT OUTER JOIN wb_activity_ranked AS acts '
-            'ON acts.id = refused.id '
-            'RIGHT OUTER JOIN nh_clinical_spell AS spell '
-            'ON spell.activity_id = refused.spell_activity_id '
-            'LEFT JOIN wb_transfer_ranked as transfer '
-            'ON transfer.spell_id = spell.id '
-            'AND transfer.rank = 1 '
-            'LEFT JOIN last_finished_obs_stop AS obs_stop '
-            'ON obs_stop.spell_id = spell.id '
-            'WHERE {column} = {id} '
-            'AND coalesce(acts.date_terminated '
-            '>= transfer.date_terminated, TRUE) '
-            'AND coalesce(acts.date_terminated >= '
-            'obs_stop.activity_date_terminated, TRUE) '
-            'AND (spell.obs_stop <> TRUE OR spell.obs_stop IS NULL) '
-            'ORDER BY refused.spell_activity_id ASC, '
-            'refused.first_activity_id {first_act_order}, '
-            'refused.last_activity_id DESC '
-            'LIMIT 1;'.format(
-                column=column,
-                id=activity_id,
-                first_act_order=first_act_order
-            )
-        )
-        result = cr.dictfetchall()
-        if result:
-            return result[0].get('refused', False)
-        return False
+            if ews.partial_reason != 'refused' or episode.state != 'open':
+                return False
+            activity_id = episode.last_activity_id.id
+
+        cr.execute("""
+            SELECT TRUE
+            FROM nh_activity AS activity
+            INNER JOIN nh_clinical_spell AS spell
+            ON spell.activity_id = activity.spell_activity_id
+            LEFT JOIN wb_transfer_ranked as transfer
+            ON transfer.spell_id = spell.id
+            AND transfer.rank = 1
+            LEFT JOIN last_finished_obs_stop AS obs_stop
+            ON obs_stop.spell_id = spell.id
+            WHERE activity.id = %s
+            AND coalesce(activity.date_terminated
+            >= transfer.date_terminated, TRUE)
+            AND coalesce(activity.date_terminated >=
+            obs_stop.activity_date_terminated, TRUE)
+            AND (spell.obs_stop <> TRUE OR spell.obs_stop IS NULL)
+            LIMIT 1;
+        """, (activity_id,))
+        return bool(cr.fetchone())
@@ -15,6 +15,8 @@ class NhClinicalObsStop(models.Model):
         'nh.clinical.patient_monitoring_exception.reason',
         required=True
     )
+    # Indexed for the latest obs stop reason of the wardboard.
+    spell = fields.Many2one('nh.clinical.spell', index=True)
 
     start_message = 'Stop Observations'
     stop_message = 'Restart Observations'
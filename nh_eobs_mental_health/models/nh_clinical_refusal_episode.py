@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+Contains the refusal episodes of mental health patients.
+"""
+from openerp import SUPERUSER_ID, models, fields, api
+
+
+class NhClinicalRefusalEpisode(models.Model):
+    """
+    A refusal episode starts when a patient refuses a NEWS observation and
+    is extended by every partial observation that follows it in the
+    observation chain (each observation's ``creator_id`` is the one
+    before it). A full observation closes the episode.
+
+    Episodes are kept up to date as observations are completed so that
+    :meth:`is_refusal_in_effect` and the refusal events of the
+    observation report don't have to walk every EWS activity in the
+    database to rebuild them.
+    """
+    _name = 'nh.clinical.refusal.episode'
+    _description = "Refusal Episode"
+    _order = 'id'
+
+    _ews_model = 'nh.clinical.patient.observation.ews'
+    _review_model = 'nh.clinical.notification.clinical_review'
+    _frequency_model = 'nh.clinical.notification.clinical_review_frequency'
+
+    spell_activity_id = fields.Many2one(
+        'nh.activity', string='Spell Activity', required=True, index=True,
+        ondelete='cascade')
+    first_activity_id = fields.Many2one(
+        'nh.activity', string='First Refusal', required=True, index=True,
+        ondelete='cascade')
+    last_activity_id = fields.Many2one(
+        'nh.activity', string='Last Observation', required=True,
+        index=True, ondelete='cascade')
+    count = fields.Integer(string='Refusals', default=1)
+    review_activity_id = fields.Many2one(
+        'nh.activity', string='Clinical Review', index=True,
+        ondelete='set null')
+    frequency_activity_id = fields.Many2one(
+        'nh.activity', string='Clinical Review Frequency',
+        ondelete='set null')
+    state = fields.Selection([
+        ('open', 'Open'),
+        ('closed', 'Closed')
+    ], string='State', default='open', required=True, index=True)
+
+    def init(self, cr):
+        """
+        Builds the episodes of the observations completed before the
+        table existed.
+        """
+        cr.execute("""
+            select not exists (
+                select 1 from nh_clinical_refusal_episode
+            ) and exists (
+                select 1 from nh_clinical_patient_observation_ews
+                where partial_reason = 'refused'
+            )
+        """)
+        if cr.fetchone()[0]:
+            self.rebuild_episodes(cr, SUPERUSER_ID)
+
+    @api.model
+    def add_observation(self, activity_id):
+        """
+        Extends or closes the episode the completed observation follows
+        on from, or starts one if it is a refusal.
+
+        :param activity_id: completed NEWS observation activity id
+        :type activity_id: int
+        :returns: the observation's episode, empty if it isn't part of
+            one
+        """
+        activity = self.env['nh.activity'].browse(activity_id)
+        ews = activity.data_ref
+        episode = self.browse()
+        if activity.creator_id:
+            episode = self.search([
+                ('last_activity_id', '=', activity.creator_id.id),
+                ('state', '=', 'open')
+            ], limit=1)
+        refused = ews.partial_reason == 'refused'
+        if episode and not ews.partial_reason:
+            episode.write({'state': 'closed'})
+            return self.browse()
+        if episode:
+            episode.write({
+                'last_activity_id': activity.id,
+                'count': episode.count + int(refused)
+            })
+        elif refused:
+            episode = self.create({
+                'spell_activity_id': activity.spell_activity_id.id,
+                'first_activity_id': activity.id,
+                'last_activity_id': activity.id
+            })
+        if episode:
+            ews.write({'refusal_episode_id': episode.id})
+        return episode
+
+    @api.model
+    def add_review(self, review_activity_id):
+        """
+        Links a clinical review task to the episode whose first refusal
+        triggered it.
+
+        :param review_activity_id: clinical review activity id
+        :type review_activity_id: int
+        """
+        review_activity = self.env['nh.activity'].browse(review_activity_id)
+        self.search([
+            ('first_activity_id', '=', review_activity.creator_id.id),
+            ('review_activity_id', '=', False)
+        ]).write({'review_activity_id': review_activity.id})
+
+    @api.model
+    def add_frequency(self, frequency_activity_id):
+        """
+        Links a clinical review frequency task to the episode of the
+        clinical review that triggered it.
+
+        :param frequency_activity_id: clinical review frequency activity
+            id
+        :type frequency_activity_id: int
+        """
+        frequency_activity = \
+            self.env['nh.activity'].browse(frequency_activity_id)
+        self.search([
+            ('review_activity_id', '=', frequency_activity.creator_id.id),
+            ('frequency_activity_id', '=', False)
+        ]).write({'frequency_activity_id': frequency_activity.id})
+
+    @api.model
+    def rebuild_episodes(self):
+        """
+        Rebuilds every episode from the EWS activities with the
+        `refused_ews_activities` recursive query. Used when the table is
+        created and by data loaded without completing the observations,
+        e.g. demo data.
+        """
+        cr = self._cr
+        sql_model = self.env['nh.clinical.sql']
+        cr.execute("""
+            update nh_clinical_patient_observation_ews
+            set refusal_episode_id = null
+            where refusal_episode_id is not null;
+            delete from nh_clinical_refusal_episode;
+
+            with ews_activities as ({ews_activities}),
+            refused_ews_activities as ({refused_ews}),
+            chain as (
+                select *,
+                    row_number() over (
+                        partition by last_activity_id
+                        order by first_activity_id asc
+                    ) as last_activity_rank,
+                    row_number() over (
+                        partition by first_activity_id
+                        order by last_activity_id desc
+                    ) as first_activity_rank
+                from refused_ews_activities
+                where refused
+            ),
+            episode as (
+                select spell_activity_id,
+                    first_activity_id,
+                    last_activity_id,
+                    activity_ids,
+                    (
+                        select count(*)
+                        from unnest(partial_tree) as reason
+                        where reason = 'refused'
+                    ) as count,
+                    (
+                        select min(review.id)
+                        from nh_activity as review
+                        where review.creator_id = chain.first_activity_id
+                        and review.data_model = %(review_model)s
+                    ) as review_activity_id,
+                    case when exists (
+                        select 1
+                        from ews_activities as child
+                        where child.creator_id = chain.last_activity_id
+                        and child.state = 'completed'
+                        and child.partial_reason is null
+                    ) then 'closed' else 'open' end as state
+                from chain
+                where last_activity_rank = 1
+                and first_activity_rank = 1
+            ),
+            inserted as (
+                insert into nh_clinical_refusal_episode (
+                    create_uid, create_date, write_uid, write_date,
+                    spell_activity_id, first_activity_id, last_activity_id,
+                    count, review_activity_id, frequency_activity_id, state
+                )
+                select %(uid)s, now() at time zone 'UTC',
+                    %(uid)s, now() at time zone 'UTC',
+                    spell_activity_id, first_activity_id, last_activity_id,
+                    count, review_activity_id,
+                    (
+                        select min(frequency.id)
+                        from nh_activity as frequency
+                        where frequency.creator_id = review_activity_id
+                        and frequency.data_model = %(frequency_model)s
+                    ),
+                    state
+                from episode
+                returning id, first_activity_id
+            ),
+            episode_member as (
+                select first_activity_id,
+                    unnest(activity_ids) as activity_id
+                from episode
+            )
+            update nh_clinical_patient_observation_ews as ews
+            set refusal_episode_id = inserted.id
+            from inserted
+            inner join episode_member
+                on episode_member.first_activity_id =
+                    inserted.first_activity_id
+            inner join ews_activities as member_activity
+                on member_activity.id = episode_member.activity_id
+            where ews.id = member_activity.ews_id
+        """.format(
+            ews_activities=sql_model.get_ews_activities(),
+            refused_ews=sql_model.get_refused_ews_activities()
+        ), {
+            'uid': self._uid,
+            'review_model': self._review_model,
+            'frequency_model': self._frequency_model
+        })
+        self.invalidate_cache()
+        self.env[self._ews_model].invalidate_cache(['refusal_episode_id'])
+        return True
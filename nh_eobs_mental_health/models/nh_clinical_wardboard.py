@@ -1,7 +1,7 @@
 import copy
 
 from openerp import api
-from openerp.addons.nh_eobs import helpers, exceptions
+from openerp.addons.nh_eobs import exceptions
 from openerp.addons.nh_eobs_api.routing import ResponseJSON
 from openerp.osv import orm, fields
 
@@ -11,22 +11,6 @@ class NHClinicalWardboard(orm.Model):
     _name = 'nh.clinical.wardboard'
     _inherit = 'nh.clinical.wardboard'
 
-    def _get_obs_stop_from_spell(self, cr, uid, ids, field_name, arg,
-                                 context=None):
-        """
-        Function field to return obs_stop flag from spell
-        :param cr: Odoo cursor
-        :param uid: User ID of user doing operation
-        :param ids: Ids to read
-        :param field_name: name of field
-        :param arg: arguments
-        :param context: Odoo context
-        :return: obs_stop flag from spell
-        """
-        spell_model = self.pool['nh.clinical.spell']
-        flags = spell_model.read(cr, uid, ids, ['obs_stop'], context=context)
-        return dict([(rec.get('id'), rec.get('obs_stop')) for rec in flags])
-
     def _get_rapid_tranq_from_spell(
             self, cr, uid, ids, field_name, arg, context=None):
         """
@@ -56,12 +40,20 @@ class NHClinicalWardboard(orm.Model):
     ]
 
     _columns = {
-        'obs_stop': fields.function(_get_obs_stop_from_spell, type='boolean'),
+        'obs_stop': fields.boolean('Stop Observations for patient?'),
         'acuity_index': fields.text('Index on Acuity Board'),
         'rapid_tranq': fields.function(
-            _get_rapid_tranq_from_spell, type='boolean', store=True)
+            _get_rapid_tranq_from_spell, type='boolean', store=True),
+        'refusing_obs': fields.boolean('Patient Refusing Observations?'),
+        'refusing_obs_blood_glucose': fields.boolean(
+            'Patient Refusing Blood Glucose Observations?'),
+        'obs_stop_reason': fields.text('Observations Stopped Reason')
     }
 
+    # Columns of the view needed to decorate the observation fields in read.
+    _spell_flag_fields = ['spell_state', 'obs_stop', 'refusing_obs',
+                          'refusing_obs_blood_glucose', 'obs_stop_reason']
+
     @api.multi
     def toggle_obs_stop(self):
         """
@@ -121,7 +113,6 @@ class NHClinicalWardboard(orm.Model):
             'view_id': view_id
         }
 
-    @helpers.v8_materialized_queue('ews0', 'ews1', 'ews2', 'bg0')
     @api.multi
     def start_obs_stop(self, reasons, spell_id, spell_activity_id):
         """
@@ -165,7 +156,6 @@ class NHClinicalWardboard(orm.Model):
         obs_stop = activity.data_ref
         obs_stop.start(activity_id)
 
-    @helpers.v8_materialized_queue('ews0', 'ews1', 'ews2', 'bg0')
     @api.multi
     def end_obs_stop(self, cancellation=False):
         """
@@ -259,61 +249,65 @@ class NHClinicalWardboard(orm.Model):
             toolbar=toolbar, submenu=submenu)
         return res
 
-    def read(self, cr, user, ids, fields=None, context=None, load='_classic_read'):
-        res = super(NHClinicalWardboard, self).read(cr, user, ids, fields=fields, context=context, load=load)
-
-        patient_ids = [self._get_patient_id(record) for record in res]
-        obj_nh_clinical_spell = self.pool['nh.clinical.spell']
-        spell_ids = obj_nh_clinical_spell.search(cr, user, [
-                ('patient_id', 'in', patient_ids),
-                ('state', 'not in', ['completed', 'cancelled']),
-            ],
-            context=context
-        )
-        spells = obj_nh_clinical_spell.browse(cr, user, spell_ids, context=context)
-        for record in res:
-            spell = spells.filtered(
-                lambda _spell: _spell.patient_id.id == self._get_patient_id(record)
-            )
-            if spell:
-                if record.get('next_blood_glucose_diff', '00:00') == '00:00':
-                    record['next_blood_glucose_diff'] = ''
-                record['rapid_tranq'] = spell.rapid_tranq
-
-                if spell.obs_stop:
-                    record['frequency'] = self._get_stopped_obs_reason(
-                        cr, user, spell.id, context=context
-                    )
-                    record['next_diff'] = 'Observations Stopped'
-                    record['next_blood_glucose_diff'] = 'Observations Stopped'
-                elif spell.refusing_obs:
-                    record['frequency'] = 'Refused - {0}'.format(record['frequency'])
-                    record['next_diff'] = 'Refused - {0}'.format(record['next_diff'])
-
-                if not spell.obs_stop and spell.refusing_obs_blood_glucose:
-                    if record.get('blood_glucose_frequency'):
-                        record['blood_glucose_frequency'] = 'Refused - {0}'.format(
-                            record['blood_glucose_frequency']
-                        )
-                        record['next_blood_glucose_diff'] = 'Refused - {0}'.format(
-                            record['next_blood_glucose_diff']
-                        )
+    def read(self, cr, user, ids, fields=None, context=None,
+             load='_classic_read'):
+        """
+        Override of read to show the obs stop and refusal state of the spell
+        in the observation fields. The spell flags and obs stop reason are
+        columns of the wardboard view so they are read with the rest of the
+        row, the columns added only for this are left out of the result.
 
+        :param cr: Odoo cursor
+        :param user: User doing operation
+        :param ids: Record IDs to read
+        :param fields: Fields to read from records
+        :param context: Odoo context
+        :param load: Type of loading to do
+        :return: list of dicts or dict
+        """
+        extra_fields = []
+        if fields:
+            extra_fields = [field for field in self._spell_flag_fields
+                            if field not in fields]
+            fields = fields + extra_fields
+        res = super(NHClinicalWardboard, self).read(
+            cr, user, ids, fields=fields, context=context, load=load)
+        records = res if isinstance(res, list) else [res]
+        for record in records:
+            self._set_spell_flag_display(record)
+            for field in extra_fields:
+                record.pop(field, None)
         return res
 
     @staticmethod
-    def _get_patient_id(patient):
-        if isinstance(patient.get('patient_id'), tuple):
-            return patient['patient_id'][0]
-        return patient.get('patient_id')
-
-    def _get_stopped_obs_reason(self, cr, user, spell_id, context=None):
-        obj_nh_clinical_pme_obs_stop = self.pool['nh.clinical.pme.obs_stop']
-        record_ids = obj_nh_clinical_pme_obs_stop.search(cr, user, [
-            ('spell', '=', spell_id)
-        ], context=context, limit=1)
-        record = obj_nh_clinical_pme_obs_stop.browse(cr, user, record_ids, context=context)
-        return record.reason.id
+    def _set_spell_flag_display(record):
+        """
+        Show obs stop and refusals in the observation fields of a read
+        wardboard record.
+
+        :param record: wardboard record read with the spell flag fields
+        :type record: dict
+        """
+        if record.get('spell_state') in ['completed', 'cancelled']:
+            return
+        if record.get('next_blood_glucose_diff', '00:00') == '00:00':
+            record['next_blood_glucose_diff'] = ''
+        if record.get('obs_stop'):
+            if record.get('obs_stop_reason'):
+                record['frequency'] = record['obs_stop_reason']
+            record['next_diff'] = 'Observations Stopped'
+            record['next_blood_glucose_diff'] = 'Observations Stopped'
+            return
+        refused_fields = []
+        if record.get('refusing_obs'):
+            refused_fields += ['frequency', 'next_diff']
+        if record.get('refusing_obs_blood_glucose') \
+                and record.get('blood_glucose_frequency'):
+            refused_fields += ['blood_glucose_frequency',
+                               'next_blood_glucose_diff']
+        for field in refused_fields:
+            if field in record:
+                record[field] = 'Refused - {0}'.format(record[field])
 
     # def read(self, cr, user, ids, fields=None, context=None,
     #          load='_classic_read'):
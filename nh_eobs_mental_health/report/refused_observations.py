@@ -43,24 +43,24 @@ class MentalHealthObservationReport(models.AbstractModel):
         :rtype: list
         """
         self._cr.execute("""
-        SELECT * FROM refused_review_chain WHERE spell_activity_id = {0}
+        SELECT * FROM refused_review_chain WHERE spell_activity_id = %s
         ORDER BY refused_review_chain.first_refusal_date_terminated ASC;
-        """.format(spell_activity_id))
+        """, (spell_activity_id,))
         return self._cr.dictfetchall()
 
     def init(self, cr):
         """
-        Create or replace the refused_chain_count table for use in
-        get_refusal_episodes
+        Create or replace the refused_review_chain view over the refusal
+        episodes for use in get_refusal_episodes
 
         :param cr: Odoo cursor
         """
         sql_model = self.pool['nh.clinical.sql']
         cr.execute("""
-        CREATE OR REPLACE VIEW refused_chain_count AS ({refused_chain_sql});
-        CREATE OR REPLACE VIEW refused_review_chain AS ({refused_review});
+        DROP VIEW IF EXISTS refused_review_chain;
+        DROP VIEW IF EXISTS refused_chain_count;
+        CREATE VIEW refused_review_chain AS ({refused_review});
         """.format(
-            refused_chain_sql=sql_model.get_refused_chain_count_sql(),
             refused_review=sql_model.get_refused_review_chain_sql()
         ))
 
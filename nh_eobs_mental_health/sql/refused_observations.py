@@ -20,7 +20,7 @@ class RefusedObservationsSQL(orm.AbstractModel):
             activity.sequence
     FROM nh_activity as activity
     INNER JOIN nh_clinical_patient_observation_ews as ews
-    ON split_part(activity.data_ref, ',', 2)::int = ews.id
+    ON activity.data_id = ews.id
     WHERE activity.data_model = 'nh.clinical.patient.observation.ews'
     """
 
@@ -173,61 +173,24 @@ class RefusedObservationsSQL(orm.AbstractModel):
         )
         return sql.format(spell_ids=spell_ids)
 
-    refused_chain_count_skeleton = """
-    SELECT  (
-                with reasons (reason) as (
-                    select unnest(partial_tree)
-                )
-                select count(*)
-                from reasons
-                where reason = 'refused'
-            ) as count,
-            first_activity_id as activity_id,
-            spell_activity_id,
-            first_activity_date_terminated
-    FROM (
-        SELECT *,
-        row_number() over(
-            partition by last_activity_id
-            ORDER BY
-            last_activity_id DESC,
-            first_activity_id ASC
-        ) AS last_activity_rank,
-        row_number() over(
-            partition by first_activity_id
-            ORDER BY
-            last_activity_id DESC,
-            first_activity_id ASC
-        ) AS first_activity_rank
-        FROM refused_ews_activities
-        WHERE NOT array_to_string(partial_tree, ',', 'null') LIKE '%null%'
-    ) AS refused_ews
-    WHERE last_activity_rank = 1
-    AND first_activity_rank = 1
-    """
-
-    def get_refused_chain_count_sql(self):
-        return self.refused_chain_count_skeleton
-
     refused_review_chain_skeleton = """
-    SELECT  rchain.count,
-            rchain.spell_activity_id,
+    SELECT  episode.count,
+            episode.spell_activity_id,
             review_activity.state as review_state,
             review_activity.date_terminated as review_date_terminated,
             review_activity.terminate_uid as review_terminate_uid,
             freq_activity.state as freq_state,
             freq_activity.date_terminated as freq_date_terminated,
             freq_activity.terminate_uid as freq_terminate_uid,
-            rchain.first_activity_date_terminated
+            first_activity.date_terminated
             as first_refusal_date_terminated
-    FROM refused_chain_count AS rchain
+    FROM nh_clinical_refusal_episode AS episode
+    INNER JOIN nh_activity AS first_activity
+    ON first_activity.id = episode.first_activity_id
     LEFT JOIN nh_activity AS review_activity
-    ON review_activity.creator_id = rchain.activity_id
-    AND review_activity.data_model = 'nh.clinical.notification.clinical_review'
+    ON review_activity.id = episode.review_activity_id
     LEFT JOIN nh_activity AS freq_activity
-    ON freq_activity.creator_id = review_activity.id
-    AND freq_activity.data_model =
-    'nh.clinical.notification.clinical_review_frequency'
+    ON freq_activity.id = episode.frequency_activity_id
     """
 
     def get_refused_review_chain_sql(self):
@@ -191,7 +191,8 @@ class WardDashboardSQL(orm.AbstractModel):
 
     def get_wardboard(self, interval):
         """
-        Override wardboard SQL view to include acuity index
+        Override wardboard SQL view to include acuity index, the spell flags
+        and the reason of the latest obs stop
         :param interval: Time interval used for recently transferred /
         discharged
         :return: SQL statement used in nh_eobs.init()
@@ -200,6 +201,20 @@ class WardDashboardSQL(orm.AbstractModel):
             'spell.move_date,',
             'spell.move_date, '
             'spell.rapid_tranq AS rapid_tranq, '
+            'spell.obs_stop AS obs_stop, '
+            'spell.refusing_obs AS refusing_obs, '
+            'spell.refusing_obs_blood_glucose '
+            'AS refusing_obs_blood_glucose, '
+            '( '
+            'SELECT reason.display_text '
+            'FROM nh_clinical_pme_obs_stop AS obs_stop '
+            'INNER JOIN nh_clinical_patient_monitoring_exception_reason '
+            'AS reason '
+            'ON reason.id = obs_stop.reason '
+            'WHERE obs_stop.spell = spell.id '
+            'ORDER BY obs_stop.id DESC '
+            'LIMIT 1'
+            ') AS obs_stop_reason, '
             'CASE '
             'WHEN spell.obs_stop = \'t\' THEN \'ObsStop\' '
             'WHEN '
@@ -7,6 +7,7 @@ from .nh_clinical_patient_monitoring_exception import *
 from .nh_clinical_patient_observation_ews import *
 from .nh_clinical_pme_obs_stop import *
 from .nh_clinical_pme_rapid_tranq import *
+from .nh_clinical_refusal_episode import *
 from .nh_clinical_spell import *
 from .nh_clinical_wardboard import *
 from .nh_eobs_api import *
@@ -0,0 +1,2 @@
+from . import test_add_observation
+from . import test_rebuild_episodes
@@ -0,0 +1,94 @@
+from openerp.addons.nh_ews.tests.common import clinical_risk_sample_data
+from openerp.tests.common import TransactionCase
+
+
+class TestAddObservation(TransactionCase):
+    """
+    Test that completing NEWS observations keeps the patient's refusal
+    episodes up to date
+    """
+
+    def setUp(self):
+        super(TestAddObservation, self).setUp()
+        self.episode_model = self.env['nh.clinical.refusal.episode']
+        self.test_utils_model = self.env['nh.clinical.test_utils']
+        self.test_utils_model.admit_and_place_patient()
+        self.spell_activity_id = self.test_utils_model.spell_activity_id
+        self.completed_ews = []
+
+    def complete_obs(self, list_of_obs):
+        for ob in list_of_obs:
+            self.test_utils_model.get_open_obs()
+            self.completed_ews.append(self.test_utils_model.ews_activity)
+            self.test_utils_model.complete_obs(ob)
+
+    def get_episodes(self):
+        return self.episode_model.search([
+            ('spell_activity_id', '=', self.spell_activity_id)
+        ])
+
+    def test_full_obs_has_no_episode(self):
+        self.complete_obs([clinical_risk_sample_data.NO_RISK_DATA])
+        self.assertFalse(self.get_episodes())
+        self.assertFalse(self.completed_ews[0].data_ref.refusal_episode_id)
+
+    def test_refusal_starts_episode(self):
+        self.complete_obs([clinical_risk_sample_data.REFUSED_DATA])
+        episode = self.get_episodes()
+        self.assertEqual(len(episode), 1)
+        self.assertEqual(episode.first_activity_id, self.completed_ews[0])
+        self.assertEqual(episode.last_activity_id, self.completed_ews[0])
+        self.assertEqual(episode.count, 1)
+        self.assertEqual(episode.state, 'open')
+        self.assertEqual(
+            self.completed_ews[0].data_ref.refusal_episode_id, episode)
+
+    def test_partial_and_refusal_extend_episode(self):
+        self.complete_obs([
+            clinical_risk_sample_data.REFUSED_DATA,
+            clinical_risk_sample_data.PARTIAL_DATA_ASLEEP,
+            clinical_risk_sample_data.REFUSED_DATA
+        ])
+        episode = self.get_episodes()
+        self.assertEqual(len(episode), 1)
+        self.assertEqual(episode.first_activity_id, self.completed_ews[0])
+        self.assertEqual(episode.last_activity_id, self.completed_ews[2])
+        self.assertEqual(episode.count, 2)
+        for activity in self.completed_ews:
+            self.assertEqual(activity.data_ref.refusal_episode_id, episode)
+
+    def test_full_obs_closes_episode(self):
+        self.complete_obs([
+            clinical_risk_sample_data.REFUSED_DATA,
+            clinical_risk_sample_data.NO_RISK_DATA,
+            clinical_risk_sample_data.REFUSED_DATA
+        ])
+        episodes = self.get_episodes()
+        self.assertEqual(len(episodes), 2)
+        self.assertEqual(episodes[0].state, 'closed')
+        self.assertEqual(episodes[0].last_activity_id, self.completed_ews[0])
+        self.assertFalse(self.completed_ews[1].data_ref.refusal_episode_id)
+        self.assertEqual(episodes[1].first_activity_id, self.completed_ews[2])
+        self.assertEqual(episodes[1].state, 'open')
+
+    def test_clinical_review_tasks_are_linked(self):
+        self.complete_obs([clinical_risk_sample_data.REFUSED_DATA])
+        self.env['nh.clinical.patient.observation.ews']\
+            .create_clinical_review_task(self.completed_ews[0])
+        review = self.env['nh.activity'].search([
+            ('creator_id', '=', self.completed_ews[0].id),
+            ('data_model', '=', 'nh.clinical.notification.clinical_review')
+        ])
+        episode = self.get_episodes()
+        self.assertEqual(episode.review_activity_id, review)
+        self.assertFalse(episode.frequency_activity_id)
+
+        self.test_utils_model.find_and_complete_clinical_review(
+            self.completed_ews[0].id)
+        frequency = self.env['nh.activity'].search([
+            ('creator_id', '=', review.id),
+            ('data_model', '=',
+             'nh.clinical.notification.clinical_review_frequency')
+        ])
+        self.assertTrue(frequency)
+        self.assertEqual(episode.frequency_activity_id, frequency)
@@ -0,0 +1,49 @@
+from openerp.addons.nh_ews.tests.common import clinical_risk_sample_data
+from openerp.tests.common import TransactionCase
+
+
+class TestRebuildEpisodes(TransactionCase):
+    """
+    Test that rebuilding the refusal episodes from the EWS activities gives
+    the same episodes as completing the observations did
+    """
+
+    def setUp(self):
+        super(TestRebuildEpisodes, self).setUp()
+        self.episode_model = self.env['nh.clinical.refusal.episode']
+        self.test_utils_model = self.env['nh.clinical.test_utils']
+        self.test_utils_model.admit_and_place_patient()
+        self.spell_activity_id = self.test_utils_model.spell_activity_id
+        self.completed_ews = []
+        for ob in [clinical_risk_sample_data.REFUSED_DATA,
+                   clinical_risk_sample_data.PARTIAL_DATA_ASLEEP,
+                   clinical_risk_sample_data.REFUSED_DATA,
+                   clinical_risk_sample_data.NO_RISK_DATA,
+                   clinical_risk_sample_data.REFUSED_DATA]:
+            self.test_utils_model.get_open_obs()
+            self.completed_ews.append(self.test_utils_model.ews_activity)
+            self.test_utils_model.complete_obs(ob)
+
+    def read_episodes(self):
+        episodes = self.episode_model.search([
+            ('spell_activity_id', '=', self.spell_activity_id)
+        ])
+        return sorted(
+            (episode.first_activity_id.id, episode.last_activity_id.id,
+             episode.count, episode.state) for episode in episodes)
+
+    def read_members(self):
+        return [activity.data_ref.refusal_episode_id.first_activity_id.id
+                for activity in self.completed_ews]
+
+    def test_rebuild_matches_completed_observations(self):
+        episodes = self.read_episodes()
+        members = self.read_members()
+        self.assertEqual(episodes, [
+            (self.completed_ews[0].id, self.completed_ews[2].id, 2,
+             'closed'),
+            (self.completed_ews[4].id, self.completed_ews[4].id, 1, 'open')
+        ])
+        self.episode_model.rebuild_episodes()
+        self.assertEqual(self.read_episodes(), episodes)
+        self.assertEqual(self.read_members(), members)
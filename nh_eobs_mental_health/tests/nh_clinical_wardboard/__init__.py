@@ -3,6 +3,7 @@ from . import test_escalation_tasks
 from . import test_get_acuity_groups
 from . import test_prompt_user_for_obs_stop_reason
 from . import test_read_obs_stop
+from . import test_read_obs_stop_reason
 from . import test_read_rapid_tranq
 from . import test_read_refused
 from . import test_restarts_ews_tasks
@@ -6,11 +6,23 @@ from openerp.tests.common import SingleTransactionCase
 class PatchedReadSuper(object):
 
     def read(*args, **kwargs):
-        return {
+        context = kwargs.get('context', {})
+        test = context.get('test', '')
+        res = {
             'patient_id': 1,
             'next_diff': 'soon',
-            'frequency': '15 Minutes'
+            'frequency': '15 Minutes',
+            'spell_state': 'started',
+            'obs_stop': False,
+            'obs_stop_reason': None
         }
+        if test in ['obs_stopped', 'no_reason', 'discharged']:
+            res['obs_stop'] = True
+        if test in ['obs_stopped', 'discharged']:
+            res['obs_stop_reason'] = 'Acute hospital ED'
+        if test == 'discharged':
+            res['spell_state'] = 'completed'
+        return res
 
 
 class TestReadObsStop(SingleTransactionCase):
@@ -23,56 +35,11 @@ class TestReadObsStop(SingleTransactionCase):
     def setUpClass(cls):
         super(TestReadObsStop, cls).setUpClass()
         cls.wardboard_model = cls.registry('nh.clinical.wardboard')
-        cls.spell_model = cls.registry('nh.clinical.spell')
-        cls.obs_stop_model = \
-            cls.registry('nh.clinical.pme.obs_stop')
 
         def patch_wardboard_read_super(*args, **kwargs):
             return PatchedReadSuper()
 
         cls.patch_wardboard_read_super = patch_wardboard_read_super
-
-        def patch_spell_search(*args, **kwargs):
-            return [1]
-
-        def patch_spell_read(*args, **kwargs):
-            context = kwargs.get('context', {})
-            test = context.get('test', '')
-            res = {
-                'id': 1,
-                'obs_stop': False
-            }
-            if test in ['obs_stopped', 'no_reason', 'multiple']:
-                res['obs_stop'] = True
-            return res
-
-        def patch_pme_search(*args, **kwargs):
-            context = kwargs.get('context', {})
-            test = context.get('test', '')
-            vals = {
-                'no_reason': [],
-                'multiple': [2, 1]
-            }
-            return vals.get(test, [1])
-
-        def patch_pme_read(*args, **kwargs):
-            context = kwargs.get('context', {})
-            test = context.get('test', '')
-            if test == 'multiple':
-                global reason_id_sent
-                reason_id_sent = args[3]
-                return {
-                    'reason': (2, 'AWOL')
-                }
-            return {
-                'reason': (1, 'Acute hospital ED')
-            }
-
-        cls.spell_model._patch_method('search', patch_spell_search)
-        cls.spell_model._patch_method('read', patch_spell_read)
-        cls.obs_stop_model._patch_method('search', patch_pme_search)
-        cls.obs_stop_model._patch_method('read', patch_pme_read)
-
         cls.original_super = super
 
     def setUp(self):
@@ -86,10 +53,6 @@ class TestReadObsStop(SingleTransactionCase):
     @classmethod
     def tearDownClass(cls):
         __builtin__.super = cls.original_super
-        cls.spell_model._revert_method('search')
-        cls.spell_model._revert_method('read')
-        cls.obs_stop_model._revert_method('search')
-        cls.obs_stop_model._revert_method('read')
         super(TestReadObsStop, cls).tearDownClass()
 
     def test_next_diff_with_obs_stop(self):
@@ -128,15 +91,27 @@ class TestReadObsStop(SingleTransactionCase):
         self.assertEqual(read.get('next_diff'), 'Observations Stopped')
         self.assertEqual(read.get('frequency'), '15 Minutes')
 
-    def test_multiple_pme_reasons(self):
+    def test_next_diff_with_obs_stop_on_closed_spell(self):
         """
-        EOBS-448 check that when the patient has had multiple PME that
-        the latest reason is returned as frequency
+        Test that next_diff is untouched when the spell of the row is no
+        longer open
         """
         cr, uid = self.cr, self.uid
         read = self.wardboard_model.read(cr, uid, 1,
                                          fields=['next_diff', 'patient_id'],
-                                         context={'test': 'multiple'})
-        self.assertEqual(read.get('next_diff'), 'Observations Stopped')
-        self.assertEqual(read.get('frequency'), 'AWOL')
-        self.assertEqual(reason_id_sent, 2)
+                                         context={'test': 'discharged'})
+        self.assertEqual(read.get('next_diff'), 'soon')
+        self.assertEqual(read.get('frequency'), '15 Minutes')
+
+    def test_spell_flag_fields_not_requested_are_removed(self):
+        """
+        Test that the spell flag columns read to decorate the row are only
+        returned when they were requested
+        """
+        cr, uid = self.cr, self.uid
+        read = self.wardboard_model.read(
+            cr, uid, 1, fields=['next_diff', 'patient_id', 'obs_stop'],
+            context={'test': 'obs_stopped'})
+        self.assertTrue(read.get('obs_stop'))
+        self.assertNotIn('obs_stop_reason', read)
+        self.assertNotIn('spell_state', read)
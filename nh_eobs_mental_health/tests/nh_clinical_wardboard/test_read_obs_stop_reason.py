@@ -0,0 +1,57 @@
+from openerp.addons.nh_eobs_mental_health \
+    .tests.common.transaction_observation import TransactionObservationCase
+
+
+class TestReadObsStopReason(TransactionObservationCase):
+    """
+    Test that the wardboard shows the reason of the latest obs stop when a
+    spell has had more than one (EOBS-448)
+    """
+
+    def setUp(self):
+        super(TestReadObsStopReason, self).setUp()
+        self.wardboard_model = self.registry('nh.clinical.wardboard')
+        self.spell = self.env['nh.clinical.spell'].browse(self.spell_id)
+        self.acute_ed = self.env.ref('nh_eobs.acute_hospital_ed')
+        self.awol = self.env.ref('nh_eobs.awol')
+
+    def start_obs_stop(self, reason):
+        self.spell.write({'obs_stop': True})
+        obs_stop_model = self.env['nh.clinical.pme.obs_stop']
+        activity_id = obs_stop_model.create_activity(
+            {
+                'parent_id': self.spell_activity_id,
+                'data_model': 'nh.clinical.pme.obs_stop'
+            },
+            {'reason': reason.id, 'spell': self.spell_id}
+        )
+        activity_model = self.env['nh.activity']
+        obs_stop_activity = activity_model.browse(activity_id)
+        obs_stop_activity.spell_activity_id = self.spell.activity_id
+        obs_stop_activity.data_ref.start(activity_id)
+        return activity_id
+
+    def read_wardboard(self):
+        cr, uid = self.cr, self.uid
+        return self.wardboard_model.read(
+            cr, uid, [self.spell_id], fields=['frequency', 'next_diff'])[0]
+
+    def test_multiple_pme_reasons(self):
+        """
+        Test that the reason of the latest obs stop is shown in frequency
+        """
+        cr, uid = self.cr, self.uid
+        first_obs_stop_id = self.start_obs_stop(self.acute_ed)
+        self.activity_pool.complete(cr, uid, first_obs_stop_id)
+        self.start_obs_stop(self.awol)
+        read = self.read_wardboard()
+        self.assertEqual(read.get('frequency'), 'AWOL')
+        self.assertEqual(read.get('next_diff'), 'Observations Stopped')
+
+    def test_single_pme_reason(self):
+        """
+        Test that the reason of the only obs stop is shown in frequency
+        """
+        self.start_obs_stop(self.acute_ed)
+        read = self.read_wardboard()
+        self.assertEqual(read.get('frequency'), 'Acute hospital ED')
@@ -1,76 +1,29 @@
-from openerp.tests.common import SingleTransactionCase
-import __builtin__
+from openerp.addons.nh_eobs_mental_health \
+    .tests.common.transaction_observation import TransactionObservationCase
 
 
-class PatchedReadSuper(object):
-
-    def read(*args, **kwargs):
-        return {
-            'patient_id': 1,
-            'next_diff': 'soon',
-            'frequency': '15 Minutes'
-        }
-
-
-class TestReadObsStop(SingleTransactionCase):
+class TestReadRapidTranq(TransactionObservationCase):
     """
-    Test that next_diff on wardboard is set to 'Observations Stopped' when
-    obs_stop flag is set to True
+    Test that rapid_tranq on the wardboard row reflects the spell's
+    rapid_tranq flag
     """
 
-    @classmethod
-    def setUpClass(cls):
-        super(TestReadObsStop, cls).setUpClass()
-        cls.wardboard_model = cls.registry('nh.clinical.wardboard')
-        cls.spell_model = cls.registry('nh.clinical.spell')
-
-        def patch_wardboard_read_super(*args, **kwargs):
-            return PatchedReadSuper()
-
-        cls.patch_wardboard_read_super = patch_wardboard_read_super
-
-        def patch_spell_search(*args, **kwargs):
-            return [1]
-
-        def patch_spell_read(*args, **kwargs):
-            context = kwargs.get('context', {})
-            test = context.get('test', '')
-            res = {
-                'id': 1,
-                'rapid_tranq': False
-            }
-            if test in ['rapid_tranq']:
-                res['rapid_tranq'] = True
-            return res
-
-        cls.spell_model._patch_method('search', patch_spell_search)
-        cls.spell_model._patch_method('read', patch_spell_read)
-
-        cls.original_super = super
-
     def setUp(self):
-        super(TestReadObsStop, self).setUp()
-        __builtin__.super = self.patch_wardboard_read_super
-
-    def tearDown(self):
-        __builtin__.super = self.original_super
-        super(TestReadObsStop, self).tearDown()
+        super(TestReadRapidTranq, self).setUp()
+        self.wardboard_model = self.registry('nh.clinical.wardboard')
 
-    @classmethod
-    def tearDownClass(cls):
-        __builtin__.super = cls.original_super
-        cls.spell_model._revert_method('search')
-        cls.spell_model._revert_method('read')
-        super(TestReadObsStop, cls).tearDownClass()
+    def read_rapid_tranq(self):
+        cr, uid = self.cr, self.uid
+        return self.wardboard_model.read(
+            cr, uid, [self.spell_id], fields=['rapid_tranq'])[0]
 
     def test_with_rapid_tranq(self):
         """
         Test that wardboard rapid_tranq is True when spell has rapid_tranq
         """
         cr, uid = self.cr, self.uid
-        read = self.wardboard_model.read(
-            cr, uid, 1, fields=['rapid_tranq'],
-            context={'test': 'rapid_tranq'})
+        self.spell_pool.write(cr, uid, self.spell_id, {'rapid_tranq': True})
+        read = self.read_rapid_tranq()
         self.assertTrue(read.get('rapid_tranq'))
 
     def test_without_rapid_tranq(self):
@@ -79,7 +32,6 @@ class TestReadObsStop(SingleTransactionCase):
         rapid tranq
         """
         cr, uid = self.cr, self.uid
-        read = self.wardboard_model.read(
-            cr, uid, 1, fields=['rapid_tranq'],
-            context={'test': 'not_rapid_tranq'})
+        self.spell_pool.write(cr, uid, self.spell_id, {'rapid_tranq': False})
+        read = self.read_rapid_tranq()
         self.assertFalse(read.get('rapid_tranq'))
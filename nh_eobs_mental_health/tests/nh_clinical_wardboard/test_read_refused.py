@@ -15,6 +15,7 @@ class PatchedReadSuper(object):
         }
         if test == 'refused':
             res['acuity_index'] = 'Refused'
+            res['refusing_obs'] = True
         return res
 
 
@@ -28,28 +29,12 @@ class TestReadRefusedAcuityIndex(SingleTransactionCase):
     def setUpClass(cls):
         super(TestReadRefusedAcuityIndex, cls).setUpClass()
         cls.wardboard_model = cls.registry('nh.clinical.wardboard')
-        cls.spell_model = cls.registry('nh.clinical.spell')
 
         def patch_wardboard_read_super(*args, **kwargs):
             return PatchedReadSuper()
 
         cls.patch_wardboard_read_super = patch_wardboard_read_super
 
-        def patch_spell_search(*args, **kwargs):
-            return [1]
-
-        def patch_spell_read(*args, **kwargs):
-            context = kwargs.get('context', {})
-            test = context.get('test', '')
-            res = {
-                'id': 1,
-            }
-            if test == 'refused':
-                res['refusing_obs'] = True
-            return res
-
-        cls.spell_model._patch_method('search', patch_spell_search)
-        cls.spell_model._patch_method('read', patch_spell_read)
         cls.original_super = super
 
     def setUp(self):
@@ -63,8 +48,6 @@ class TestReadRefusedAcuityIndex(SingleTransactionCase):
     @classmethod
     def tearDownClass(cls):
         __builtin__.super = cls.original_super
-        cls.spell_model._revert_method('search')
-        cls.spell_model._revert_method('read')
         super(TestReadRefusedAcuityIndex, cls).tearDownClass()
 
     def test_next_diff_frequency_with_refused(self):
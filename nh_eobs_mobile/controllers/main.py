@@ -560,20 +560,16 @@ class MobileFrontend(openerp.addons.web.controllers.main.Home):
 
         cr, uid, context = request.cr, request.session.uid, request.context
         patient_api = request.registry['nh.eobs.api']
-        patient_api.unassign_my_activities(cr, uid)
-        follow_activities = patient_api.get_assigned_activities(
-            cr, uid,
-            activity_type='nh.clinical.patient.follow',
-            context=context
-        )
+        # Read only, claims left by the user are released by the
+        # nh.activity release_stale_claims cron
+        patient_list = patient_api.get_patient_list(cr, uid, context=context)
+        follow_activities = patient_list['notifications']
         patients = self.process_patient_list(
-            cr, uid, patient_api.get_patients(
-                cr, uid, [], context=context), context=context)
+            cr, uid, patient_list['patients'], context=context)
         # JC says this concept is now deprecated
         # patient_api.get_patient_followers(cr, uid, patients, context=context)
         following_patients = self.process_patient_list(
-            cr, uid, patient_api.get_followed_patients(
-                cr, uid, []), context=context)
+            cr, uid, patient_list['followed_patients'], context=context)
 
         for patient in patients:
             if patient.get('frequency'):
@@ -769,15 +765,6 @@ class MobileFrontend(openerp.addons.web.controllers.main.Home):
         if tasks:
             self._check_custom_frequency(tasks[0])
 
-        request.registry["nh.clinical.materialized.queue"].create(cr, uid, {
-            "name": "Refresh ews0",
-            "view_name": "ews0"
-        }, context=context)
-        request.registry["nh.clinical.materialized.queue"].create(cr, uid, {
-            "name": "Refresh ews0",
-            "view_name": "bg0"
-        }, context=context)
-
         return utils.redirect(URLS['task_list'], 303)
 
     def _check_custom_frequency(self, task_data):
@@ -816,10 +803,6 @@ class MobileFrontend(openerp.addons.web.controllers.main.Home):
             ('patient_id', '=', activity.patient_id.id)
         ], context=context)
         obj_nh_activity.cancel(cr, uid, next_blood_glucose_activity_id, context=context)
-        request.registry["nh.clinical.materialized.queue"].create(cr, uid, {
-            "name": "Refresh ews0",
-            "view_name": "bg0"
-        }, context=context)
 
     @http.route(URLS['share_patient_list'], type='http', auth='user')
     def get_share_patients(self, *args, **kw):
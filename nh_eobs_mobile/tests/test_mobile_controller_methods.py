@@ -366,12 +366,9 @@ class TestMobileControllerMethods(tests.common.HttpCase):
             get_patients_route[0]['endpoint'], None, mobile=True)
 
         # Odoo-patch models' methods to make them returning test data
-        def mock_unassign_my_activities(*args, **kwargs):
-            return True
-
-        def mock_get_assigned_activities(*args, **kwargs):
+        def mock_get_follow_invitations(*args, **kwargs):
             """Return a list of dictionaries
-            (one for each assigned activity)."""
+            (one for each follow invitation)."""
             assigned_activities_list = [
                 {
                     'id': 1,
@@ -425,8 +422,7 @@ class TestMobileControllerMethods(tests.common.HttpCase):
         # Start Odoo's patchers
         eobs_api = self.registry['nh.eobs.api']
         methods_patching_list = [
-            ('unassign_my_activities', mock_unassign_my_activities),
-            ('get_assigned_activities', mock_get_assigned_activities),
+            ('get_follow_invitations', mock_get_follow_invitations),
             ('get_patients', mock_get_patients),
             ('get_patient_followers', mock_get_patient_followers),
             ('get_followed_patients', mock_get_followed_patients),
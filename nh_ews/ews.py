@@ -7,6 +7,7 @@ and policy triggers based on the UK NEWS standard.
 import bisect
 import copy
 import logging
+import time
 from datetime import datetime as dt
 from datetime import timedelta
 
@@ -17,6 +18,11 @@ from openerp.tools import DEFAULT_SERVER_DATETIME_FORMAT as dtf
 
 _logger = logging.getLogger(__name__)
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class nh_clinical_patient_observation_ews(orm.Model):
     """
@@ -101,7 +107,8 @@ class nh_clinical_patient_observation_ews(orm.Model):
                                             'niv_backup',
                                             'niv_ipap',
                                             'concentration'], context):
-            partial = bool(set(self._required) & set(eval(obs['none_values'])))
+            partial = bool(set(self._required) &
+                           set(self._load_field_list(obs['none_values'])))
             suppl_oxygen = obs.get('oxygen_administration_flag')
             if not partial and suppl_oxygen:
                 device_id = obs.get('device_id', None)
@@ -227,11 +234,214 @@ class nh_clinical_patient_observation_ews(orm.Model):
         return {'score': score, 'three_in_one': three_in_one,
                 'clinical_risk': clinical_risk}
 
+    # Parameters scored against a range table, in the order they are
+    # passed to `calculate_scores`.
+    _SCORED_PARAMETERS = [
+        ('respiration_rate', '_RR_RANGES'),
+        ('indirect_oxymetry_spo2', '_O2_RANGES'),
+        ('body_temperature', '_BT_RANGES'),
+        ('blood_pressure_systolic', '_BP_RANGES'),
+        ('pulse_rate', '_PR_RANGES')
+    ]
+
+    @api.model
+    def calculate_scores(self, ews_columns):
+        """
+        Batch version of :meth:`calculate_score`. Computes the score,
+        three in one flag and clinical risk for many observations at once
+        from columns of NEWS parameters, for example the result of a single
+        SQL fetch.
+
+        The range lookups are vectorised with NumPy when it is installed.
+        Without NumPy the same lookups are done column by column with
+        :mod:`bisect`.
+
+        :param ews_columns: NEWS parameter name mapped to a list (or array)
+            of values, one per observation. All columns must be the same
+            length. Missing columns are treated as not recorded.
+        :type ews_columns: dict
+        :returns: ``score``, ``three_in_one`` and ``clinical_risk`` mapped
+            to lists with one value per observation. Empty observations
+            have ``None`` for all three values.
+        :rtype: dict
+        """
+        length = max([len(column) for column in ews_columns.values()] or [0])
+        empty_column = [None] * length
+
+        def get_column(name):
+            return list(ews_columns.get(name, empty_column))
+
+        if numpy is not None:
+            return self._calculate_scores_numpy(get_column, length)
+
+        scores = [0] * length
+        three_in_one = [False] * length
+        recorded = [False] * length
+        for field_name, ranges_name in self._SCORED_PARAMETERS:
+            ranges = getattr(self, ranges_name)
+            parameter_scores = [int(score) for score in ranges['scores']]
+            for index, value in enumerate(get_column(field_name)):
+                if not value:
+                    continue
+                aux = parameter_scores[
+                    bisect.bisect_left(ranges['ranges'], value)]
+                scores[index] += aux
+                three_in_one[index] = three_in_one[index] or aux == 3
+                recorded[index] = True
+        for index, value in enumerate(
+                get_column('oxygen_administration_flag')):
+            if value:
+                scores[index] += 2
+                recorded[index] = True
+        for index, value in enumerate(get_column('avpu_text')):
+            if value:
+                recorded[index] = True
+            if value in ['V', 'P', 'U']:
+                scores[index] += 3
+                three_in_one[index] = True
+
+        cases = [int(self._POLICY['case'][bisect.bisect_left(
+            self._POLICY['ranges'], score)]) for score in scores]
+        return self._build_scores_result(
+            scores, three_in_one, cases, recorded)
+
+    def _calculate_scores_numpy(self, get_column, length):
+        scores = numpy.zeros(length, dtype=int)
+        three_in_one = numpy.zeros(length, dtype=bool)
+        recorded = numpy.zeros(length, dtype=bool)
+        for field_name, ranges_name in self._SCORED_PARAMETERS:
+            ranges = getattr(self, ranges_name)
+            column = get_column(field_name)
+            present = numpy.array([bool(value) for value in column],
+                                  dtype=bool)
+            values = numpy.array([value if value else 0 for value in column],
+                                 dtype=float)
+            parameter_scores = numpy.array(
+                [int(score) for score in ranges['scores']], dtype=int)
+            aux = numpy.where(present, parameter_scores[numpy.searchsorted(
+                ranges['ranges'], values, side='left')], 0)
+            scores += aux
+            three_in_one |= aux == 3
+            recorded |= present
+        suppl_oxy = numpy.array(
+            [bool(value) for value in get_column('oxygen_administration_flag')],
+            dtype=bool)
+        scores += suppl_oxy * 2
+        recorded |= suppl_oxy
+        avpu = get_column('avpu_text')
+        recorded |= numpy.array([bool(value) for value in avpu], dtype=bool)
+        avpu_red = numpy.array(
+            [value in ['V', 'P', 'U'] for value in avpu], dtype=bool)
+        scores += avpu_red * 3
+        three_in_one |= avpu_red
+
+        policy_cases = numpy.array(
+            [int(case) for case in self._POLICY['case']], dtype=int)
+        cases = policy_cases[numpy.searchsorted(
+            self._POLICY['ranges'], scores, side='left')]
+        return self._build_scores_result(
+            scores.tolist(), three_in_one.tolist(), cases.tolist(),
+            recorded.tolist())
+
+    def _build_scores_result(self, scores, three_in_one, cases, recorded):
+        res = {'score': [], 'three_in_one': [], 'clinical_risk': []}
+        for score, red_score, case, has_values in zip(
+                scores, three_in_one, cases, recorded):
+            if not has_values:
+                res['score'].append(None)
+                res['three_in_one'].append(None)
+                res['clinical_risk'].append(None)
+                continue
+            case = 2 if red_score and case < 3 else case
+            res['score'].append(score)
+            res['three_in_one'].append(red_score)
+            res['clinical_risk'].append(self._POLICY['risk'][case])
+        return res
+
+    def recompute_scores(self, cr, uid, date_from, date_to, chunk_size=1000,
+                         commit=False, context=None):
+        """
+        Recomputes the stored ``score``, ``three_in_one`` and
+        ``clinical_risk`` of every observation whose activity was
+        terminated within the passed date range, for example after the
+        policy ranges have changed or observations have been imported.
+
+        Observations are processed in chunks of ``chunk_size``. Each chunk
+        is read with one query, scored with :meth:`calculate_scores` and
+        written back with one update.
+
+        :param date_from: start of the range (inclusive)
+        :type date_from: str
+        :param date_to: end of the range (exclusive)
+        :type date_to: str
+        :param chunk_size: number of observations per chunk
+        :type chunk_size: int
+        :param commit: commit the cursor after each chunk so a long run
+            does not hold a single transaction open
+        :type commit: bool
+        :returns: number of observations recomputed
+        :rtype: int
+        """
+        parameter_names = [name for name, ranges in self._SCORED_PARAMETERS]
+        parameter_names += ['oxygen_administration_flag', 'avpu_text']
+        start = time.time()
+        total = 0
+        last_id = 0
+        while True:
+            cr.execute("""
+                SELECT ews.id, {columns}
+                FROM nh_clinical_patient_observation_ews AS ews
+                INNER JOIN nh_activity AS activity
+                    ON activity.id = ews.activity_id
+                WHERE activity.date_terminated >= %s
+                AND activity.date_terminated < %s
+                AND ews.id > %s
+                ORDER BY ews.id
+                LIMIT %s
+            """.format(columns=', '.join(
+                'ews.{}'.format(name) for name in parameter_names)),
+                (date_from, date_to, last_id, chunk_size))
+            rows = cr.fetchall()
+            if not rows:
+                break
+            ids = [row[0] for row in rows]
+            columns = {name: [row[index + 1] for row in rows]
+                       for index, name in enumerate(parameter_names)}
+            res = self.calculate_scores(cr, uid, columns, context=context)
+            partial = self._is_partial(cr, uid, ids, None, None,
+                                       context=context)
+            for index, ews_id in enumerate(ids):
+                if partial.get(ews_id):
+                    res['score'][index] = None
+                    res['three_in_one'][index] = False
+                    res['clinical_risk'][index] = 'Unknown'
+            cr.execute("""
+                UPDATE nh_clinical_patient_observation_ews AS ews
+                SET score = new.score,
+                    three_in_one = new.three_in_one,
+                    clinical_risk = new.clinical_risk
+                FROM unnest(%s::int[], %s::int[], %s::bool[], %s::varchar[])
+                    AS new(id, score, three_in_one, clinical_risk)
+                WHERE ews.id = new.id
+            """, (ids, res['score'], res['three_in_one'],
+                  res['clinical_risk']))
+            self.invalidate_cache(
+                cr, uid, ['score', 'three_in_one', 'clinical_risk'], ids,
+                context=context)
+            total += len(ids)
+            last_id = ids[-1]
+            if commit:
+                cr.commit()
+            _logger.info(
+                'Recomputed %s EWS scores (%.1f per second)', total,
+                total / max(time.time() - start, 0.001))
+        return total
+
     def _get_score(self, cr, uid, ids, field_names, arg, context=None):
         res = {}
+        partial_map = self._is_partial(cr, uid, ids, None, None)
         for ews in self.browse(cr, uid, ids, context):
-            partial = \
-                self._is_partial(cr, uid, ews.id, None, None).get(ews.id)
+            partial = partial_map.get(ews.id)
             if partial:
                 res[ews.id] = {'score': False, 'three_in_one': False,
                                'clinical_risk': 'Unknown'}
@@ -698,17 +908,10 @@ class nh_clinical_patient_observation_ews(orm.Model):
         :rtype: bool
         """
         activity_pool = self.pool['nh.activity']
-        groups_pool = self.pool['res.groups']
         api_pool = self.pool['nh.clinical.api']
         activity = activity_pool.browse(cr, uid, activity_id, context=context)
 
-        hcagroup_ids = groups_pool.search(
-            cr, uid, [('users', 'in', [uid]),
-                      ('name', '=', 'NH Clinical HCA Group')])
-        nursegroup_ids = groups_pool.search(
-            cr, uid, [('users', 'in', [uid]),
-                      ('name', '=', 'NH Clinical Nurse Group')])
-        group = nursegroup_ids and 'nurse' or hcagroup_ids and 'hca' or False
+        group = self._get_user_group(cr, uid)
         spell_activity_id = activity.parent_id.id
         self.handle_o2_devices(cr, uid, activity.id, context=context)
 
@@ -724,17 +927,81 @@ class nh_clinical_patient_observation_ews(orm.Model):
         self.create_next_obs(cr, uid, activity, context)
         return res
 
+    def complete_many(self, cr, uid, activity_ids, context=None):
+        """
+        Batch version of :meth:`complete`. The user's group is looked up
+        once and the notifications triggered by the whole batch are
+        created with one ``trigger_notifications_many`` call on
+        ``nh.clinical.api``. The activities are then completed with a
+        single write before the next observation is created for each.
+
+        :param activity_ids: :class:`activity<activity.nh_activity>` ids
+        :type activity_ids: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        if not activity_ids:
+            return True
+        self._check_actions(cr, uid, activity_ids, 'complete',
+                            context=context)
+        activity_pool = self.pool['nh.activity']
+        api_pool = self.pool['nh.clinical.api']
+        group = self._get_user_group(cr, uid)
+        notifications_values = []
+        for activity in activity_pool.browse(cr, uid, activity_ids,
+                                             context=context):
+            self.handle_o2_devices(cr, uid, activity.id, context=context)
+            if activity.data_ref.is_partial:
+                continue
+            notifications = self.get_notifications(cr, uid, activity)
+            if len(notifications) > 0:
+                notifications_values.append(self._get_notifications_values(
+                    activity, group, notifications, activity.parent_id.id))
+        api_pool.trigger_notifications_many(
+            cr, uid, notifications_values, context=context)
+
+        res = super(nh_clinical_patient_observation_ews, self).complete_many(
+            cr, uid, activity_ids, context=context)
+        for activity in activity_pool.browse(cr, uid, activity_ids,
+                                             context=context):
+            self.create_next_obs(cr, uid, activity, context)
+        return res
+
+    def _get_user_group(self, cr, uid):
+        """
+        Gets the group of the user completing the observation, which
+        decides the notifications triggered.
+
+        :returns: ``'nurse'``, ``'hca'`` or ``False``
+        :rtype: str or bool
+        """
+        groups_pool = self.pool['res.groups']
+        hcagroup_ids = groups_pool.search(
+            cr, uid, [('users', 'in', [uid]),
+                      ('name', '=', 'NH Clinical HCA Group')])
+        nursegroup_ids = groups_pool.search(
+            cr, uid, [('users', 'in', [uid]),
+                      ('name', '=', 'NH Clinical Nurse Group')])
+        return nursegroup_ids and 'nurse' or hcagroup_ids and 'hca' or False
+
     def trigger_notifications(self, cr, uid, activity, api_pool, group, notifications,
                               spell_activity_id, context):
         if len(notifications) > 0:
-            api_pool.trigger_notifications(cr, uid, {
-                'notifications': notifications,
-                'parent_id': spell_activity_id,
-                'creator_id': activity.id,
-                'patient_id': activity.data_ref.patient_id.id,
-                'model': self._name,
-                'group': group
-            }, context=context)
+            api_pool.trigger_notifications(
+                cr, uid, self._get_notifications_values(
+                    activity, group, notifications, spell_activity_id),
+                context=context)
+
+    def _get_notifications_values(self, activity, group, notifications,
+                                  spell_activity_id):
+        return {
+            'notifications': notifications,
+            'parent_id': spell_activity_id,
+            'creator_id': activity.id,
+            'patient_id': activity.data_ref.patient_id.id,
+            'model': self._name,
+            'group': group
+        }
 
     @api.model
     def create_next_obs(self, previous_obs_activity):
@@ -1030,46 +1297,57 @@ class nh_clinical_patient_observation_ews(orm.Model):
             nh_clinical_patient_observation_ews, self).create_activity(
             cr, uid, vals_activity, vals_data, context=context)
 
-    # TODO EOBS-704: Make 'get_form_description' generic and move from ews.py
-    # to observations.py
-    def get_form_description(self, cr, uid, patient_id, context=None):
+    def build_form_description(self, cr, uid, context=None):
         """
-        Returns a description in dictionary format of the input fields
-        that would be required in the user gui to submit the
-        observation.
+        Adds the supplemental O2
+        :class:`device types<devices.nh_clinical_device_type>` to the
+        ``device_id`` field. Cached until a device type or category is
+        changed.
 
-        :param patient_id: :class:`patient<base.nh_clinical_patient>` id
-        :type patient_id: int
         :returns: a list of dictionaries
         :rtype: list
         """
         device_pool = self.pool['nh.clinical.device.type']
-        o2target_pool = self.pool['nh.clinical.patient.o2target']
-        o2level_pool = self.pool['nh.clinical.o2level']
         fd = copy.deepcopy(self._form_description)
-        # Find the O2 target
-        o2level_id = o2target_pool.get_last(
-            cr, uid, patient_id, context=context)
-        if not o2level_id:
-            o2target = False
-        else:
-            o2level = o2level_pool.browse(cr, uid, o2level_id, context=context)
-            o2target = o2level.name
         # Find O2 devices
         device_ids = device_pool.search(
             cr, uid, [('category_id.name', '=', 'Supplemental O2')],
             context=context)
-        device_selection = [[d, device_pool.read(
-            cr, uid, d, ['name'],
-            context=context)['name']] for d in device_ids]
+        device_selection = [
+            [device['id'], device['name']] for device in device_pool.read(
+                cr, uid, device_ids, ['name'], context=context)]
 
         for field in fd:
-            if field['name'] == 'indirect_oxymetry_spo2' and o2target:
-                field['secondary_label'] = 'Target: {0}'.format(o2target)
             if field['name'] == 'device_id':
                 field['selection'] = device_selection
         return fd
 
+    def update_form_description(self, cr, uid, patient_id, form_description,
+                                context=None):
+        """
+        Adds the patient's O2 target to the ``indirect_oxymetry_spo2``
+        field.
+
+        :param patient_id: :class:`patient<base.nh_clinical_patient>` id
+        :type patient_id: int
+        :param form_description: copy of the cached form description
+        :type form_description: list
+        :returns: a list of dictionaries
+        :rtype: list
+        """
+        o2target_pool = self.pool['nh.clinical.patient.o2target']
+        o2level_pool = self.pool['nh.clinical.o2level']
+        # Find the O2 target
+        o2level_id = o2target_pool.get_last(
+            cr, uid, patient_id, context=context)
+        if not o2level_id:
+            return form_description
+        o2level = o2level_pool.browse(cr, uid, o2level_id, context=context)
+        for field in form_description:
+            if field['name'] == 'indirect_oxymetry_spo2':
+                field['secondary_label'] = 'Target: {0}'.format(o2level.name)
+        return form_description
+
     def get_last_case(self, cr, uid, patient_id, context=None):
         """
         Checks for the last completed NEWS for the provided
@@ -1143,3 +1421,56 @@ class nh_clinical_patient_observation_ews(orm.Model):
                 'Here are related tasks based on the observation' \
                 if len(triggered_tasks) > 0 else ''
         return submission_message
+
+
+class nh_clinical_device_category(orm.Model):
+    """
+    Clears the cached EWS form description when a device category
+    changes.
+    """
+    _name = 'nh.clinical.device.category'
+    _inherit = 'nh.clinical.device.category'
+
+    def create(self, cr, uid, vals, context=None):
+        res = super(nh_clinical_device_category, self).create(
+            cr, uid, vals, context=context)
+        self.pool['nh.clinical.patient.observation.ews'].clear_caches()
+        return res
+
+    def write(self, cr, uid, ids, vals, context=None):
+        res = super(nh_clinical_device_category, self).write(
+            cr, uid, ids, vals, context=context)
+        self.pool['nh.clinical.patient.observation.ews'].clear_caches()
+        return res
+
+    def unlink(self, cr, uid, ids, context=None):
+        res = super(nh_clinical_device_category, self).unlink(
+            cr, uid, ids, context=context)
+        self.pool['nh.clinical.patient.observation.ews'].clear_caches()
+        return res
+
+
+class nh_clinical_device_type(orm.Model):
+    """
+    Clears the cached EWS form description when a device type changes.
+    """
+    _name = 'nh.clinical.device.type'
+    _inherit = 'nh.clinical.device.type'
+
+    def create(self, cr, uid, vals, context=None):
+        res = super(nh_clinical_device_type, self).create(
+            cr, uid, vals, context=context)
+        self.pool['nh.clinical.patient.observation.ews'].clear_caches()
+        return res
+
+    def write(self, cr, uid, ids, vals, context=None):
+        res = super(nh_clinical_device_type, self).write(
+            cr, uid, ids, vals, context=context)
+        self.pool['nh.clinical.patient.observation.ews'].clear_caches()
+        return res
+
+    def unlink(self, cr, uid, ids, context=None):
+        res = super(nh_clinical_device_type, self).unlink(
+            cr, uid, ids, context=context)
+        self.pool['nh.clinical.patient.observation.ews'].clear_caches()
+        return res
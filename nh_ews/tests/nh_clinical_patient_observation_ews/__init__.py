@@ -1,6 +1,9 @@
+from . import test_complete_many
+from . import test_get_form_description
 from . import test_get_open_obs_activity
 from . import test_get_submission_message
 from . import test_partial_obs
 from . import test_patient_refusal
 from . import test_update_next_obs_after_partial
 
+from . import test_calculate_scores
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+from openerp.addons.nh_ews import ews
+from openerp.addons.nh_ews.tests.common import clinical_risk_sample_data
+from openerp.tests.common import TransactionCase
+
+
+class TestCalculateScores(TransactionCase):
+    """
+    Test that the batch scoring API gives the same results as scoring each
+    observation individually, with and without NumPy.
+    """
+
+    def setUp(self):
+        super(TestCalculateScores, self).setUp()
+        self.ews_model = self.env['nh.clinical.patient.observation.ews']
+        self.observations = [
+            clinical_risk_sample_data.NO_RISK_DATA,
+            clinical_risk_sample_data.LOW_RISK_DATA,
+            clinical_risk_sample_data.MEDIUM_RISK_DATA,
+            clinical_risk_sample_data.HIGH_RISK_DATA,
+            {'respiration_rate': 18, 'avpu_text': 'V'},
+            {'oxygen_administration_flag': True},
+            {'pulse_rate': 131, 'body_temperature': 34.9},
+            {}
+        ]
+        self.numpy = ews.numpy
+
+    def tearDown(self):
+        ews.numpy = self.numpy
+        super(TestCalculateScores, self).tearDown()
+
+    def get_columns(self):
+        names = set()
+        for obs in self.observations:
+            names.update(obs.keys())
+        return {name: [obs.get(name) for obs in self.observations]
+                for name in names}
+
+    def get_expected(self):
+        expected = {'score': [], 'three_in_one': [], 'clinical_risk': []}
+        for obs in self.observations:
+            res = self.ews_model.calculate_score(obs)
+            for key in expected:
+                expected[key].append(res[key])
+        return expected
+
+    def test_matches_calculate_score(self):
+        self.assertEqual(
+            self.ews_model.calculate_scores(self.get_columns()),
+            self.get_expected())
+
+    def test_matches_calculate_score_without_numpy(self):
+        ews.numpy = None
+        self.assertEqual(
+            self.ews_model.calculate_scores(self.get_columns()),
+            self.get_expected())
+
+    def test_empty_columns(self):
+        self.assertEqual(
+            self.ews_model.calculate_scores({}),
+            {'score': [], 'three_in_one': [], 'clinical_risk': []})
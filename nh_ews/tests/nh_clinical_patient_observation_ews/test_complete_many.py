@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from openerp.addons.nh_ews.tests.common import clinical_risk_sample_data
+from openerp.tests.common import TransactionCase
+
+
+class TestCompleteMany(TransactionCase):
+    """
+    Test that completing EWS activities with :method:`complete_many`
+    triggers the same activities as completing them one at a time.
+    """
+    def setUp(self):
+        super(TestCompleteMany, self).setUp()
+        self.test_utils_model = self.env['nh.clinical.test_utils']
+        self.test_utils_model.create_patient_and_spell()
+        self.test_utils_model.copy_instance_variables(self)
+        self.activity_pool = self.registry('nh.activity')
+        self.ews_pool = self.registry('nh.clinical.patient.observation.ews')
+        self.ews_model = self.env['nh.clinical.patient.observation.ews']
+
+        nurse_group = self.env['res.groups'].search(
+            [('name', '=', 'NH Clinical Nurse Group')])
+        nurse_group.write({'users': [(4, self.uid)]})
+
+    def create_obs_activity(self, obs_data):
+        activity_id = self.ews_model.create_activity(
+            {'parent_id': self.spell_activity.id},
+            {'patient_id': self.patient.id}
+        )
+        self.activity_pool.submit(self.cr, self.uid, activity_id, obs_data)
+        return activity_id
+
+    def get_triggered_data_models(self, activity_id):
+        cr, uid = self.cr, self.uid
+        triggered_ids = self.activity_pool.search(
+            cr, uid, [('creator_id', '=', activity_id)])
+        return sorted(
+            activity.data_model for activity in
+            self.activity_pool.browse(cr, uid, triggered_ids))
+
+    def test_triggers_same_activities_as_complete(self):
+        cr, uid = self.cr, self.uid
+        activity_id = self.create_obs_activity(
+            clinical_risk_sample_data.HIGH_RISK_DATA)
+        self.activity_pool.complete(cr, uid, activity_id)
+        expected = self.get_triggered_data_models(activity_id)
+        self.assertIn('nh.clinical.notification.medical_team', expected)
+
+        batch_activity_id = self.create_obs_activity(
+            clinical_risk_sample_data.HIGH_RISK_DATA)
+        self.ews_pool.complete_many(cr, uid, [batch_activity_id])
+        self.assertEqual(self.get_triggered_data_models(batch_activity_id),
+                         expected)
+
+    def test_completes_activities(self):
+        cr, uid = self.cr, self.uid
+        activity_id = self.create_obs_activity(
+            clinical_risk_sample_data.NO_RISK_DATA)
+        self.ews_pool.complete_many(cr, uid, [activity_id])
+        activity = self.activity_pool.browse(cr, uid, activity_id)
+        self.assertEqual(activity.state, 'completed')
+        self.assertEqual(self.get_triggered_data_models(activity_id),
+                         ['nh.clinical.patient.observation.ews'])
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+
+
+class TestGetFormDescription(TransactionCase):
+
+    def setUp(self):
+        super(TestGetFormDescription, self).setUp()
+        self.ews_model = self.env['nh.clinical.patient.observation.ews']
+        self.o2target_model = self.env['nh.clinical.patient.o2target']
+        self.device_type_model = self.env['nh.clinical.device.type']
+        self.o2_category = self.env.ref('nh_clinical.nhc_device_category_o2')
+        self.o2level = self.env['nh.clinical.o2level'].create({
+            'min': 88,
+            'max': 92
+        })
+        self.o2level_ids = {}
+
+        def mock_get_last(*args, **kwargs):
+            return self.o2level_ids.get(args[3], False)
+
+        self.o2target_model._patch_method('get_last', mock_get_last)
+
+    def tearDown(self):
+        self.o2target_model._revert_method('get_last')
+        super(TestGetFormDescription, self).tearDown()
+
+    def get_field(self, patient_id, name):
+        form_description = self.ews_model.get_form_description(patient_id)
+        return [field for field in form_description
+                if field['name'] == name][0]
+
+    def test_o2_target_is_per_patient(self):
+        self.o2level_ids[1] = self.o2level.id
+        field = self.get_field(1, 'indirect_oxymetry_spo2')
+        self.assertEqual(field['secondary_label'],
+                         'Target: {0}'.format(self.o2level.name))
+        field = self.get_field(2, 'indirect_oxymetry_spo2')
+        self.assertNotIn('secondary_label', field)
+
+    def test_new_device_type_clears_cache(self):
+        self.get_field(1, 'device_id')
+        device_type = self.device_type_model.create({
+            'name': 'Test Mask',
+            'category_id': self.o2_category.id
+        })
+        field = self.get_field(1, 'device_id')
+        self.assertIn([device_type.id, 'Test Mask'], field['selection'])
+
+    def test_renamed_device_type_clears_cache(self):
+        device_type = self.device_type_model.create({
+            'name': 'Test Mask',
+            'category_id': self.o2_category.id
+        })
+        self.get_field(1, 'device_id')
+        device_type.write({'name': 'Test Cannula'})
+        field = self.get_field(1, 'device_id')
+        self.assertIn([device_type.id, 'Test Cannula'], field['selection'])
+
+    def test_result_is_a_copy_of_the_cache(self):
+        field = self.get_field(1, 'device_id')
+        field['selection'] = []
+        field = self.get_field(1, 'device_id')
+        self.assertTrue(field['selection'])
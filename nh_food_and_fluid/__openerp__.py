@@ -2,7 +2,7 @@
 # Part of Open eObs. See LICENSE file for full copyright and licensing details.
 {
     'name': 'NH Food and Fluid Observation',
-    'version': '0.1',
+    'version': '0.2',
     'category': 'Clinical',
     'license': 'AGPL-3',
     'summary': '',
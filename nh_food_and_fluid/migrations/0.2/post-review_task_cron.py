@@ -0,0 +1,24 @@
+# Part of Open eObs. See LICENSE file for full copyright and licensing details.
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, installed_version):
+    """
+    The review task cron is ``noupdate`` so the argument that makes it
+    commit in chunks has to be set on existing databases here.
+    """
+    cr.execute("""
+        UPDATE ir_cron
+        SET args = '(True,)'
+        WHERE id IN (
+            SELECT res_id
+            FROM ir_model_data
+            WHERE module = 'nh_food_and_fluid'
+            AND name = 'ir_cron_food_fluid_review_task'
+            AND model = 'ir.cron'
+        )
+    """)
+    _logger.info('Updated arguments of %s food and fluid review cron(s)',
+                 cr.rowcount)
@@ -1,6 +1,8 @@
 from . import dietary_need
 from . import food_and_fluid
+from . import food_fluid_period
 from . import food_fluid_review
 from . import recorded_concern
 from . import nh_clinical_wardboard
 from . import nh_eobs_api
+from . import nh_activity
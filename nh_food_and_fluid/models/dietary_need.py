@@ -10,3 +10,22 @@ class FoodAndFluidDietaryNeed(orm.Model):
     _columns = {
         'name': fields.text('Name')
     }
+
+    # The options are cached in the food and fluid form description.
+    def create(self, cr, uid, vals, context=None):
+        res = super(FoodAndFluidDietaryNeed, self).create(
+            cr, uid, vals, context=context)
+        self.pool['nh.clinical.patient.observation.food_fluid'].clear_caches()
+        return res
+
+    def write(self, cr, uid, ids, vals, context=None):
+        res = super(FoodAndFluidDietaryNeed, self).write(
+            cr, uid, ids, vals, context=context)
+        self.pool['nh.clinical.patient.observation.food_fluid'].clear_caches()
+        return res
+
+    def unlink(self, cr, uid, ids, context=None):
+        res = super(FoodAndFluidDietaryNeed, self).unlink(
+            cr, uid, ids, context=context)
+        self.pool['nh.clinical.patient.observation.food_fluid'].clear_caches()
+        return res
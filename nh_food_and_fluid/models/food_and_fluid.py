@@ -15,6 +15,8 @@ class NHClinicalFoodAndFluid(models.Model):
 
     _required = ['passed_urine', 'bowels_open']
     _description = 'Food and Fluid'
+    # Hour of the day that each 24 hour period starts
+    _period_start_hour = 7
 
     _passed_urine_options = [
         ('measured', 'Yes (Measured)'),
@@ -88,18 +90,12 @@ class NHClinicalFoodAndFluid(models.Model):
         return '/nh_food_and_fluid/static/src/js/chart.js'
 
     @api.model
-    def get_form_description(self, patient_id):
+    def build_form_description(self):
         """
-        Returns a description in dictionary format of the input fields
-        that would be required in the user gui to submit this
-        observation.
-
         Adds the lists of recorded concerns and dietary needs to the
         form description as these are stored in separate models to allow
-        for multi select
+        for multi select. Cached until either list is changed.
 
-        :param patient_id: :class:`patient<base.nh_clinical_patient>` id
-        :type patient_id: int
         :returns: a list of dictionaries
         :rtype: list
         """
@@ -248,12 +244,11 @@ class NHClinicalFoodAndFluid(models.Model):
         :return: Total fluid intake.
         :rtype: int
         """
-        f_and_f_obs_activities = self.get_obs_activities_for_period(
+        period = self.env['nh.clinical.food_fluid.period'].get_period(
             spell_activity_id, date_time)
-        fluid_intake_total = \
-            self._calculate_total_fluid_intake_from_obs_activities(
-                f_and_f_obs_activities)
-        return fluid_intake_total
+        # No observations means no fluid intake, see
+        # `_calculate_total_fluid_intake_from_obs_activities`
+        return period.fluid_intake or 0
 
     @staticmethod
     def _calculate_total_fluid_intake_from_obs_activities(obs_activities):
@@ -323,16 +318,13 @@ class NHClinicalFoodAndFluid(models.Model):
         :return: Fluid Balance
         :rtype: int
         """
-        f_and_f_obs_activities = self.get_obs_activities_for_period(
+        period = self.env['nh.clinical.food_fluid.period'].get_period(
             spell_activity_id, date_time)
 
-        fluid_intake_total = \
-            self._calculate_total_fluid_intake_from_obs_activities(
-                f_and_f_obs_activities)
-
-        fluid_output_total = \
-            self._calculate_total_fluid_output_from_obs_activities(
-                f_and_f_obs_activities)
+        fluid_intake_total = period.fluid_intake or 0
+        # Output is only ever recorded as a positive number so a total of
+        # zero means none was measured.
+        fluid_output_total = period.fluid_output or None
 
         # If no intake or output measurements, return 0.
         if fluid_intake_total is 0 and fluid_output_total is None:
@@ -405,7 +397,7 @@ class NHClinicalFoodAndFluid(models.Model):
         :rtype: str
         """
         date_time = self.env['datetime_utils'].validate_and_convert(date_time)
-        period_start_hour = 7
+        period_start_hour = self._period_start_hour
 
         period_start_datetime = datetime(
             date_time.year, date_time.month, day=date_time.day,
@@ -428,7 +420,7 @@ class NHClinicalFoodAndFluid(models.Model):
         :rtype: str
         """
         date_time = self.env['datetime_utils'].validate_and_convert(date_time)
-        period_start_hour = 7
+        period_start_hour = self._period_start_hour
 
         period_end_datetime = datetime(
             date_time.year, date_time.month, day=date_time.day,
@@ -708,6 +700,32 @@ class NHClinicalFoodAndFluid(models.Model):
         """
         dateutils_model = self.env['datetime_utils']
         current_time = dateutils_model.get_current_time(as_string=True)
-        obs_for_period = self.get_obs_activities_for_period(
+        period = self.env['nh.clinical.food_fluid.period'].get_period(
             spell_activity_id, current_time)
-        return any(obs_for_period)
+        return bool(period.obs_count)
+
+    @api.model
+    def get_active_period_spell_activity_ids(self):
+        """
+        Get the open spells that have had food and fluid observations
+        submitted in the current period, see
+        :meth:`active_food_fluid_period`.
+
+        :return: IDs of the spell activities
+        :rtype: list
+        """
+        dateutils_model = self.env['datetime_utils']
+        current_time = dateutils_model.get_current_time(as_string=True)
+        period_start = self.get_period_start_datetime(current_time)
+        self._cr.execute("""
+            SELECT spell.id
+            FROM nh_activity AS spell
+            INNER JOIN nh_clinical_food_fluid_period AS period
+                ON period.spell_activity_id = spell.id
+            WHERE spell.data_model = 'nh.clinical.spell'
+            AND spell.state NOT IN ('completed', 'cancelled')
+            AND period.period_start = %s
+            AND period.obs_count > 0
+            ORDER BY spell.id
+        """, (period_start,))
+        return [row[0] for row in self._cr.fetchall()]
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Keeps running totals of the food and fluid observations taken in each 24
+hour period of a spell.
+"""
+import logging
+from datetime import datetime, timedelta
+
+from openerp import models, fields, api, SUPERUSER_ID
+from openerp.tools import DEFAULT_SERVER_DATETIME_FORMAT as DTF
+
+_logger = logging.getLogger(__name__)
+
+
+class NhClinicalFoodFluidPeriod(models.Model):
+    """
+    One row per spell and period with the totals that
+    :meth:`calculate_total_fluid_intake`,
+    :meth:`calculate_fluid_balance` and
+    :meth:`active_food_fluid_period` of
+    :class:`nh.clinical.patient.observation.food_fluid` need, so they
+    don't have to load every observation in the period.
+
+    Rows are recalculated by :meth:`refresh_periods` whenever a food and
+    fluid activity is completed, cancelled or has its termination date
+    changed.
+    """
+    _name = 'nh.clinical.food_fluid.period'
+    _description = 'Food and Fluid Period Totals'
+    _order = 'period_start desc'
+
+    _obs_model = 'nh.clinical.patient.observation.food_fluid'
+
+    spell_activity_id = fields.Many2one('nh.activity', string='Spell Activity',
+                                        required=True, index=True,
+                                        ondelete='cascade')
+    period_start = fields.Datetime(string='Period Start', required=True,
+                                   index=True)
+    period_end = fields.Datetime(string='Period End', required=True)
+    fluid_intake = fields.Integer(string='Fluid Intake (ml)')
+    fluid_output = fields.Integer(string='Fluid Output (ml)')
+    obs_count = fields.Integer(string='Observations')
+    first_obs_date = fields.Datetime(string='First Observation')
+    last_obs_date = fields.Datetime(string='Last Observation')
+
+    _sql_constraints = [
+        ('spell_period_uniq', 'unique(spell_activity_id, period_start)',
+         'Food and fluid period totals must be unique per spell')
+    ]
+
+    def init(self, cr):
+        """
+        Calculate the totals of existing observations when the table is
+        first created.
+        """
+        cr.execute('SELECT 1 FROM nh_clinical_food_fluid_period LIMIT 1')
+        if cr.fetchone():
+            return
+        cr.execute("""
+            INSERT INTO nh_clinical_food_fluid_period (
+                create_uid, create_date, write_uid, write_date,
+                spell_activity_id, period_start, period_end,
+                fluid_intake, fluid_output, obs_count,
+                first_obs_date, last_obs_date
+            )
+            SELECT %(uid)s, now() AT TIME ZONE 'UTC',
+                %(uid)s, now() AT TIME ZONE 'UTC',
+                periods.spell_activity_id, periods.period_start,
+                periods.period_start + interval '1 day',
+                periods.fluid_intake, periods.fluid_output, periods.obs_count,
+                periods.first_obs_date, periods.last_obs_date
+            FROM (
+                SELECT activity.spell_activity_id,
+                    {period_start} AS period_start,
+                    coalesce(sum(obs.fluid_taken), 0) AS fluid_intake,
+                    coalesce(sum(obs.fluid_output), 0) AS fluid_output,
+                    count(activity.id) AS obs_count,
+                    min(activity.effective_date_terminated) AS first_obs_date,
+                    max(activity.effective_date_terminated) AS last_obs_date
+                FROM nh_activity AS activity
+                LEFT JOIN nh_clinical_patient_observation_food_fluid AS obs
+                    ON obs.activity_id = activity.id
+                WHERE activity.data_model = %(model)s
+                AND activity.spell_activity_id IS NOT NULL
+                AND activity.effective_date_terminated IS NOT NULL
+                GROUP BY activity.spell_activity_id, 2
+            ) AS periods
+        """.format(period_start=self._get_period_start_sql()), {
+            'uid': SUPERUSER_ID,
+            'model': self._obs_model
+        })
+        _logger.info('Calculated %s food and fluid period total(s)',
+                     cr.rowcount)
+
+    def _get_period_start_sql(
+            self, column='activity.effective_date_terminated'):
+        """
+        SQL expression for the start of the period `column` falls in, see
+        :meth:`get_period_start_datetime` of
+        :class:`nh.clinical.patient.observation.food_fluid`.
+
+        :rtype: str
+        """
+        hours = self.pool[self._obs_model]._period_start_hour
+        return "date_trunc('day', {column} - interval '{hours} hours') " \
+               "+ interval '{hours} hours'".format(column=column, hours=hours)
+
+    @api.model
+    def get_period(self, spell_activity_id, date_time):
+        """
+        Get the totals for the period `date_time` falls in.
+
+        :param spell_activity_id: ID of the patient's spell activity
+        :type spell_activity_id: int
+        :param date_time:
+        :type date_time: datetime or str
+        :return: period record, empty if no observations were taken in the
+            period
+        """
+        obs_model = self.env[self._obs_model]
+        period_start = obs_model.get_period_start_datetime(date_time)
+        return self.search([
+            ('spell_activity_id', '=', spell_activity_id),
+            ('period_start', '=', period_start)
+        ], limit=1)
+
+    @api.model
+    def get_activity_periods(self, activity_ids):
+        """
+        The spells and periods that the passed food and fluid activities are
+        counted in. Other activities are ignored.
+
+        :param activity_ids: :class:`nh.activity` ids
+        :type activity_ids: list
+        :return: set of spell activity id and period start tuples
+        :rtype: set
+        """
+        if not activity_ids:
+            return set()
+        self._cr.execute("""
+            SELECT activity.spell_activity_id, {period_start}
+            FROM nh_activity AS activity
+            WHERE activity.id IN %s
+            AND activity.data_model = %s
+            AND activity.spell_activity_id IS NOT NULL
+            AND activity.effective_date_terminated IS NOT NULL
+        """.format(period_start=self._get_period_start_sql()),
+            (tuple(activity_ids), self._obs_model))
+        return set(
+            (spell_activity_id, period_start.strftime(DTF))
+            for spell_activity_id, period_start in self._cr.fetchall()
+        )
+
+    @api.model
+    def refresh_periods(self, periods):
+        """
+        Recalculate the totals of the passed periods from their
+        observations, removing the totals of periods that no longer have
+        any.
+
+        :param periods: spell activity id and period start tuples, as
+            returned by :meth:`get_activity_periods`
+        :type periods: iterable
+        """
+        model = self.sudo(SUPERUSER_ID)
+        for spell_activity_id, period_start in set(periods):
+            period_end = (datetime.strptime(period_start, DTF) +
+                          timedelta(days=1)).strftime(DTF)
+            self._cr.execute("""
+                SELECT coalesce(sum(obs.fluid_taken), 0),
+                    coalesce(sum(obs.fluid_output), 0),
+                    count(activity.id),
+                    min(activity.effective_date_terminated),
+                    max(activity.effective_date_terminated)
+                FROM nh_activity AS activity
+                LEFT JOIN nh_clinical_patient_observation_food_fluid AS obs
+                    ON obs.activity_id = activity.id
+                WHERE activity.data_model = %s
+                AND activity.spell_activity_id = %s
+                AND activity.effective_date_terminated >= %s
+                AND activity.effective_date_terminated < %s
+            """, (self._obs_model, spell_activity_id, period_start,
+                  period_end))
+            intake, output, count, first, last = self._cr.fetchone()
+            period = model.search([
+                ('spell_activity_id', '=', spell_activity_id),
+                ('period_start', '=', period_start)
+            ], limit=1)
+            if not count:
+                period.unlink()
+                continue
+            values = {
+                'fluid_intake': intake,
+                'fluid_output': output,
+                'obs_count': count,
+                'first_obs_date': first.strftime(DTF),
+                'last_obs_date': last.strftime(DTF)
+            }
+            if period:
+                period.write(values)
+            else:
+                values.update({
+                    'spell_activity_id': spell_activity_id,
+                    'period_start': period_start,
+                    'period_end': period_end
+                })
+                model.create(values)
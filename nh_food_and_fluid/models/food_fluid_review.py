@@ -18,6 +18,8 @@ class FoodAndFluidReview(models.Model):
     _description = 'F&F - {} Fluid Intake Review'
 
     trigger_times = [15, 6]
+    # Number of review tasks created between commits when run by the cron.
+    _review_chunk_size = 100
 
     ESCALATION_TASKS = {
         0: [
@@ -64,18 +66,27 @@ class FoodAndFluidReview(models.Model):
             datetime.strftime(localised_time, '%-I%p').lower())
 
     @api.model
-    def manage_review_tasks_for_active_periods(self):
+    def manage_review_tasks_for_active_periods(self, commit=False):
         """
         Ensure all spells have the correct food and fluid review tasks
         associated with them. This involves cancelling existing ones and
         creating new ones at specific times.
+
+        Called by the `ir_cron_food_fluid_review_task` Scheduled Action.
+
+        :param commit: commit after the cancellations and after each chunk
+            of new review tasks so a large ward list doesn't hold one long
+            transaction
+        :type commit: bool
         :return:
         """
         cancel_reason = self._get_cancel_reason()
         if cancel_reason:
             self.cancel_review_tasks(cancel_reason)
+            if commit:
+                self._cr.commit()
 
-        self.trigger_review_tasks_for_active_periods()
+        self.trigger_review_tasks_for_active_periods(commit=commit)
 
     def _get_cancel_reason(self):
         """
@@ -117,8 +128,8 @@ class FoodAndFluidReview(models.Model):
                           "review task open at any one time. Cancelling all "
                           "such tasks for the spell anyway to reduce manual "
                           "cleanup but this needs to be fixed.")
-        for activity in open_activities:
-            activity.cancel_with_reason(activity.id, cancel_reason.id)
+        self.env['nh.activity'].cancel_many_with_reason(
+            open_activities.ids, cancel_reason.id)
 
         tasks = 'tasks' if len(open_activities) > 1 else 'task'
         message = "{} food and fluid review {} cancelled.".format(
@@ -126,33 +137,46 @@ class FoodAndFluidReview(models.Model):
         _logger.info(message)
 
     @api.model
-    def trigger_review_tasks_for_active_periods(self):
+    def trigger_review_tasks_for_active_periods(self, commit=False):
         """
         Method to trigger F&F review tasks for any active periods in the system
         Called by Scheduled Action every hour
+
+        The spells with an active period are found with one query and
+        their review tasks created in chunks of `_review_chunk_size`.
+        Spells that already have an open review task are skipped so the
+        cron can be safely re-run after failing part way through.
+
+        :param commit: commit after each chunk of review tasks
+        :type commit: bool
         """
+        is_time_to_trigger_review = self.should_trigger_review()
+        if not is_time_to_trigger_review:
+            return
         food_fluid_model = \
             self.env['nh.clinical.patient.observation.food_fluid']
-        is_time_to_trigger_review = self.should_trigger_review()
-        if is_time_to_trigger_review:
-            activity_model = self.env['nh.activity']
-            spell_activities = activity_model.search(
-                [
-                    ['data_model', '=', 'nh.clinical.spell'],
-                    ['state', 'not in', ['completed', 'cancelled']]
-                ]
-            )
-            review_tasks_created = 0
-            for spell_activity in spell_activities:
-                if food_fluid_model.active_food_fluid_period(
-                        spell_activity.id):
-                    self.schedule_review(spell_activity)
-                    review_tasks_created += 1
-
-            tasks = 'tasks' if review_tasks_created > 1 else 'task'
-            message = "{} new food and fluid review {} created.".format(
-                review_tasks_created, tasks)
-            _logger.info(message)
+        activity_model = self.env['nh.activity']
+        reviewed_spell_ids = set(
+            self.get_open_activities().mapped('spell_activity_id').ids)
+        spell_activity_ids = [
+            spell_activity_id for spell_activity_id
+            in food_fluid_model.get_active_period_spell_activity_ids()
+            if spell_activity_id not in reviewed_spell_ids
+        ]
+        review_tasks_created = 0
+        chunk_size = self._review_chunk_size
+        for index in range(0, len(spell_activity_ids), chunk_size):
+            spell_activities = activity_model.browse(
+                spell_activity_ids[index:index + chunk_size])
+            review_ids = self.schedule_reviews(spell_activities)
+            review_tasks_created += len(review_ids)
+            if commit:
+                self._cr.commit()
+
+        tasks = 'tasks' if review_tasks_created > 1 else 'task'
+        message = "{} new food and fluid review {} created.".format(
+            review_tasks_created, tasks)
+        _logger.info(message)
 
     def schedule_review(self, spell_activity):
         """
@@ -176,6 +200,36 @@ class FoodAndFluidReview(models.Model):
             }
         )
 
+    def schedule_reviews(self, spell_activities):
+        """
+        Create the activities for the Food and Fluid Review Tasks of many
+        spells at once, see :meth:`schedule_review`.
+
+        :param spell_activities: Activities for patients' spells
+        :return: activity IDs
+        :rtype: list
+        """
+        if not spell_activities:
+            return []
+        dateutils_model = self.env['datetime_utils']
+        summary = self.get_review_task_summary()
+        date_scheduled = dateutils_model.get_current_time(as_string=True)
+        vals_activity_list = []
+        vals_data_list = []
+        for spell_activity in spell_activities:
+            vals_activity_list.append({
+                'parent_id': spell_activity.id,
+                'spell_activity_id': spell_activity.id,
+                'patient_id': spell_activity.patient_id.id,
+                'summary': summary,
+                'location_id': spell_activity.location_id.id,
+                'date_scheduled': date_scheduled
+            })
+            vals_data_list.append({
+                'patient_id': spell_activity.patient_id.id
+            })
+        return self.create_activities(vals_activity_list, vals_data_list)
+
     def get_view_description(self, form_desc):
         """
         Transform the form description into view description that can
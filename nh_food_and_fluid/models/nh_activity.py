@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from openerp import models, api
+
+
+class NhActivity(models.Model):
+    """
+    Keeps :class:`nh.clinical.food_fluid.period` up to date as food and
+    fluid activities are completed, cancelled or moved to another period.
+    """
+    _inherit = 'nh.activity'
+
+    # Fields that change which period, if any, an activity is counted in
+    _food_fluid_period_fields = ['state', 'date_terminated',
+                                 'effective_date_terminated',
+                                 'spell_activity_id']
+
+    @api.multi
+    def write(self, vals):
+        if not any(field in vals for field in self._food_fluid_period_fields):
+            return super(NhActivity, self).write(vals)
+        period_model = self.env['nh.clinical.food_fluid.period']
+        periods = period_model.get_activity_periods(self.ids)
+        result = super(NhActivity, self).write(vals)
+        periods |= period_model.get_activity_periods(self.ids)
+        if periods:
+            period_model.refresh_periods(periods)
+        return result
+
+    @api.multi
+    def unlink(self):
+        period_model = self.env['nh.clinical.food_fluid.period']
+        periods = period_model.get_activity_periods(self.ids)
+        result = super(NhActivity, self).unlink()
+        if periods:
+            period_model.refresh_periods(periods)
+        return result
@@ -1,7 +1,9 @@
 from . import test_calculate_fluid_balance
 from . import test_calculate_total_fluid_intake
+from . import test_food_fluid_period
 from . import test_food_fluid_columns
 from . import test_food_fluid_form_description
+from . import test_get_active_period_spell_activity_ids
 from . import test_get_formatted_obs
 from . import test_get_period_dictionaries
 from . import test_get_submission_message
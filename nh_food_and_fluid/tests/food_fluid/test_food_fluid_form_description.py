@@ -171,3 +171,17 @@ class TestFoodFluidFormDescription(TransactionCase):
                          'Bristol Stools Type Chart')
         self.assertEqual(reference.get('label'),
                          'Bristol Stools Type Chart')
+
+    def test_new_recorded_concern_clears_cache(self):
+        """
+        Test that a recorded concern created after the form description was
+        cached is added to the recorded concerns options
+        """
+        self.env['nh.clinical.recorded_concern'].create({
+            'name': 'Test Concern'
+        })
+        food_fluid_model = \
+            self.env['nh.clinical.patient.observation.food_fluid']
+        entry = food_fluid_model.get_form_description(1)[0]
+        self.assertIn('Test Concern',
+                      [rec[1] for rec in entry.get('selection')])
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+
+
+class TestFoodFluidPeriod(TransactionCase):
+    """
+    Test that the period totals are kept up to date as food and fluid
+    observations are completed and moved between periods.
+    """
+
+    def setUp(self):
+        super(TestFoodFluidPeriod, self).setUp()
+        self.test_utils = self.env['nh.clinical.test_utils']
+        self.test_utils.admit_and_place_patient()
+        self.test_utils.copy_instance_variables(self)
+        self.period_model = self.env['nh.clinical.food_fluid.period']
+        self.activity_model = self.env['nh.activity']
+
+    def get_period(self, date_time):
+        return self.period_model.get_period(
+            self.spell_activity.id, date_time)
+
+    def test_totals_for_observations_in_period(self):
+        self.test_utils.create_and_complete_food_and_fluid_obs_activity(
+            100, 20, '1988-01-12 08:00:00', self.patient.id)
+        self.test_utils.create_and_complete_food_and_fluid_obs_activity(
+            50, None, '1988-01-13 06:00:00', self.patient.id)
+        period = self.get_period('1988-01-12 12:00:00')
+        self.assertEqual(period.period_start, '1988-01-12 07:00:00')
+        self.assertEqual(period.period_end, '1988-01-13 07:00:00')
+        self.assertEqual(period.fluid_intake, 150)
+        self.assertEqual(period.fluid_output, 20)
+        self.assertEqual(period.obs_count, 2)
+        self.assertEqual(period.first_obs_date, '1988-01-12 08:00:00')
+        self.assertEqual(period.last_obs_date, '1988-01-13 06:00:00')
+
+    def test_observations_in_other_periods_not_counted(self):
+        self.test_utils.create_and_complete_food_and_fluid_obs_activity(
+            100, 20, '1988-01-12 06:59:59', self.patient.id)
+        self.test_utils.create_and_complete_food_and_fluid_obs_activity(
+            50, None, '1988-01-13 07:00:00', self.patient.id)
+        self.assertFalse(self.get_period('1988-01-12 12:00:00'))
+
+    def test_moving_observation_updates_both_periods(self):
+        activity_id = \
+            self.test_utils.create_and_complete_food_and_fluid_obs_activity(
+                100, 20, '1988-01-12 08:00:00', self.patient.id)
+        self.test_utils.create_and_complete_food_and_fluid_obs_activity(
+            50, None, '1988-01-12 09:00:00', self.patient.id)
+        self.activity_model.browse(activity_id).date_terminated = \
+            '1988-01-14 08:00:00'
+        period = self.get_period('1988-01-12 12:00:00')
+        self.assertEqual(period.fluid_intake, 50)
+        self.assertEqual(period.obs_count, 1)
+        period = self.get_period('1988-01-14 12:00:00')
+        self.assertEqual(period.fluid_intake, 100)
+        self.assertEqual(period.fluid_output, 20)
+
+    def test_period_removed_when_last_observation_moved_out(self):
+        activity_id = \
+            self.test_utils.create_and_complete_food_and_fluid_obs_activity(
+                100, 20, '1988-01-12 08:00:00', self.patient.id)
+        self.activity_model.browse(activity_id).date_terminated = \
+            '1988-01-14 08:00:00'
+        self.assertFalse(self.get_period('1988-01-12 12:00:00'))
+
+    def test_refresh_matches_observations(self):
+        self.test_utils.create_and_complete_food_and_fluid_obs_activity(
+            100, 20, '1988-01-12 08:00:00', self.patient.id)
+        period = self.get_period('1988-01-12 12:00:00')
+        period.sudo().write({'fluid_intake': 0, 'obs_count': 0})
+        self.period_model.refresh_periods(
+            [(self.spell_activity.id, '1988-01-12 07:00:00')])
+        self.assertEqual(period.fluid_intake, 100)
+        self.assertEqual(period.obs_count, 1)
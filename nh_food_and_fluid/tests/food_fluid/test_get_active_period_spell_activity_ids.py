@@ -0,0 +1,87 @@
+from openerp.tests.common import TransactionCase
+from datetime import datetime
+
+
+class TestGetActivePeriodSpellActivityIds(TransactionCase):
+    """
+    Test that the open spells with an active Food & Fluid Period are found
+    """
+
+    def setUp(self):
+        super(TestGetActivePeriodSpellActivityIds, self).setUp()
+        self.test_utils_model = self.env['nh.clinical.test_utils']
+        self.dateutils_model = self.env['datetime_utils']
+        self.food_fluid_model = \
+            self.env['nh.clinical.patient.observation.food_fluid']
+        self.test_utils_model.admit_and_place_patient()
+        self.test_utils_model.copy_instance_variables(self)
+
+        def patch_get_current_time(*args, **kwargs):
+            return datetime(1988, 1, 12, 12, 0, 0)
+
+        self.dateutils_model._patch_method(
+            'get_current_time', patch_get_current_time)
+
+    def tearDown(self):
+        self.dateutils_model._revert_method('get_current_time')
+        super(TestGetActivePeriodSpellActivityIds, self).tearDown()
+
+    def test_obs_in_period(self):
+        """
+        Test that the spell is returned if an obs was taken in the period
+        """
+        self.test_utils_model.create_and_complete_food_and_fluid_obs_activity(
+            100, 100,
+            '1988-01-12 07:00:00', self.patient.id
+        )
+        self.assertIn(
+            self.spell_activity.id,
+            self.food_fluid_model.get_active_period_spell_activity_ids())
+
+    def test_obs_in_previous_period(self):
+        """
+        Test that the spell is not returned if the last obs was taken in the
+        previous period
+        """
+        self.test_utils_model.create_and_complete_food_and_fluid_obs_activity(
+            100, 100,
+            '1988-01-12 06:59:59', self.patient.id
+        )
+        self.assertNotIn(
+            self.spell_activity.id,
+            self.food_fluid_model.get_active_period_spell_activity_ids())
+
+    def test_matches_active_food_fluid_period(self):
+        """
+        Test that the spells returned are the ones
+        `active_food_fluid_period` is True for
+        """
+        self.test_utils_model.create_and_complete_food_and_fluid_obs_activity(
+            100, 100,
+            '1988-01-12 08:00:00', self.patient.id
+        )
+        spell_activities = self.env['nh.activity'].search([
+            ['data_model', '=', 'nh.clinical.spell'],
+            ['state', 'not in', ['completed', 'cancelled']]
+        ])
+        expected = [
+            spell_activity.id for spell_activity in spell_activities
+            if self.food_fluid_model.active_food_fluid_period(
+                spell_activity.id)
+        ]
+        self.assertEqual(
+            sorted(expected),
+            self.food_fluid_model.get_active_period_spell_activity_ids())
+
+    def test_discharged_spell(self):
+        """
+        Test that the spell is not returned once it has been completed
+        """
+        self.test_utils_model.create_and_complete_food_and_fluid_obs_activity(
+            100, 100,
+            '1988-01-12 07:00:00', self.patient.id
+        )
+        self.spell_activity.write({'state': 'completed'})
+        self.assertNotIn(
+            self.spell_activity.id,
+            self.food_fluid_model.get_active_period_spell_activity_ids())
@@ -26,9 +26,11 @@ class TestTriggerReviewTask(TransactionCase):
         self.review_creator.write({'tz': 'Etc/UTC'})
         self.nurse.write({'tz': 'Etc/UTC'})
 
-        def patch_active_food_fluid_period(*args, **kwargs):
+        def patch_get_active_period_spell_activity_ids(*args, **kwargs):
             obj = args[0]
-            return obj._context.get('active_period', False)
+            if obj._context.get('active_period', False):
+                return [self.spell_activity.id]
+            return []
 
         def patch_get_current_time(*args, **kwargs):
             obj = args[0]
@@ -42,7 +44,8 @@ class TestTriggerReviewTask(TransactionCase):
             return obj._context.get('correct_time', False)
 
         self.food_fluid_model._patch_method(
-            'active_food_fluid_period', patch_active_food_fluid_period)
+            'get_active_period_spell_activity_ids',
+            patch_get_active_period_spell_activity_ids)
         self.review_model._patch_method(
             'should_trigger_review', patch_should_trigger_review
         )
@@ -51,7 +54,8 @@ class TestTriggerReviewTask(TransactionCase):
         )
 
     def tearDown(self):
-        self.food_fluid_model._revert_method('active_food_fluid_period')
+        self.food_fluid_model._revert_method(
+            'get_active_period_spell_activity_ids')
         self.review_model._revert_method('should_trigger_review')
         self.dateutils_model._revert_method('get_current_time')
         super(TestTriggerReviewTask, self).tearDown()
@@ -159,3 +163,17 @@ class TestTriggerReviewTask(TransactionCase):
             .trigger_review_tasks_for_active_periods()
         review = self.get_open_reviews()[:1]
         self.assertEqual(review.summary, 'F&F - 6am Fluid Intake Review')
+
+    def test_open_review_not_duplicated(self):
+        """
+        Test that a second task is not created for a spell that already has
+        an open review task
+        """
+        ctx = self.env.context.copy()
+        ctx.update({'correct_time': True, 'active_period': True})
+        review_model = \
+            self.review_model.sudo(self.review_creator).with_context(ctx)
+        review_model.trigger_review_tasks_for_active_periods()
+        count = self.get_number_of_open_reviews()
+        review_model.trigger_review_tasks_for_active_periods()
+        self.assertEqual(count, self.get_number_of_open_reviews())
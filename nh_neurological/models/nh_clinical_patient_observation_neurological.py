@@ -69,16 +69,15 @@ class NhClinicalPatientObservationNeurological(models.Model):
     )
 
     @api.model
-    def get_form_description(self, patient_id):
+    def build_form_description(self):
         """
         Returns a list of dicts that represent the form description used by
         the mobile
 
-        :param patient_id: ID for the patient
         :return: list of dicts
         """
         form_description = super(NhClinicalPatientObservationNeurological,
-                                 self).get_form_description(patient_id)
+                                 self).build_form_description()
         for item in form_description:
             if item.get('type') == 'meta':
                 item['partial_flow'] = 'score'
@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'NH Clinical Basic Observations',
-    'version': '1.0',
+    'version': '1.1',
     'category': 'Clinical',
     'license': 'AGPL-3',
     'summary': '',
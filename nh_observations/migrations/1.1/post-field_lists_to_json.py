@@ -0,0 +1,28 @@
+# Part of Open eObs. See LICENSE file for full copyright and licensing details.
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, installed_version):
+    """
+    Convert the ``none_values`` and ``null_values`` columns of every
+    observation table from the ``repr`` of a Python list, e.g.
+    ``[u'height']``, to JSON so they can be read without ``eval``.
+    """
+    cr.execute("""
+        SELECT table_name
+        FROM information_schema.columns
+        WHERE table_schema = current_schema()
+        AND column_name = 'null_values'
+    """)
+    for table in [row[0] for row in cr.fetchall()]:
+        for column in ('none_values', 'null_values'):
+            cr.execute("""
+                UPDATE {table}
+                SET {column} = regexp_replace(
+                    {column}, 'u?''([^'']*)''', '"\\1"', 'g')
+                WHERE {column} LIKE '%''%'
+            """.format(table=table, column=column))
+            _logger.info('Converted %s %s.%s values to JSON',
+                         cr.rowcount, table, column)
@@ -184,18 +184,12 @@ class NhClinicalPatientObservationScored(models.AbstractModel):
                 del scored_field['selection']
         return fields_view_dict
 
-    # TODO Set once on model load rather than process every time.
-    # Tried setting on init() but seems to only be called when module is
-    # updated.
     @api.model
-    def get_form_description(self, patient_id):
+    def build_form_description(self):
         """
-        Returns a description in dictionary format of the input fields
-        that would be required in the user gui to submit the
-        observation.
+        Builds the form description from the observation fields, see
+        :meth:`get_form_description`.
 
-        :param patient_id: :class:`patient<base.nh_clinical_patient>` id
-        :type patient_id: int
         :returns: a list of dictionaries
         :rtype: list
         """
@@ -54,6 +54,14 @@ class nh_clinical_api_extension(orm.AbstractModel):
     _name = 'nh.clinical.api'
     _inherit = 'nh.clinical.api'
 
+    # Notifications that replace the open review frequency task of the
+    # triggering observation type.
+    _frequency_notifications = ['frequency',
+                                'frequency_agreed',
+                                'select_frequency',
+                                'weekly_frequency',
+                                'clinical_review_frequency']
+
     def change_activity_frequency(self, cr, uid, patient_id, activity_type,
                                   frequency, context=None):
         """
@@ -163,48 +171,142 @@ class nh_clinical_api_extension(orm.AbstractModel):
             # notifications: [{'summary','model','groups'}]
             if values.get('group') in n['groups']:
                 pool = self.pool['nh.clinical.notification.'+n['model']]
-                deadline = (dt.now()+td(
-                    minutes=n.get('minutes_due'))).strftime(DTF) \
-                    if n.get('minutes_due') \
-                    else (dt.now()+td(minutes=5)).strftime(DTF)
-                a_values = {
-                    'user_id': uid if n.get('assign') else False,
-                    'assign_locked': n.get('assign'),
-                    'parent_id': values.get('parent_id'),
-                    'date_deadline': deadline,
-                    'creator_id': values.get('creator_id'),
-                }
-                if n.get('summary'):
-                    a_values.update({'summary': n['summary']})
-                d_values = {
-                    'patient_id': values.get('patient_id')
-                }
-                # Populate required observation fields for
-                # nh.clinical.notification.frequency and it's children.
+                a_values, d_values = self._get_notification_values(
+                    cr, uid, values, n)
                 # TODO EOBS-731: Refactor creation of activities from
                 # triggered notifications
-                if n['model'] in ['frequency',
-                                  'frequency_agreed',
-                                  'select_frequency',
-                                  'weekly_frequency',
-                                  'clinical_review_frequency']:
-                    activity_pool = self.pool['nh.activity']
-                    domain = [
-                        ('patient_id', '=', values.get('patient_id')),
-                        ('state', 'not in', ['completed', 'cancelled']),
-                        ('data_model', '=',
-                         'nh.clinical.notification.frequency')]
-                    frequency_activity_ids = activity_pool.search(
-                        cr, uid, domain, context=context)
-                    for f in activity_pool.browse(
-                            cr, uid, frequency_activity_ids, context=context):
-                        if f.data_ref.observation == values.get('model'):
-                            activity_pool.cancel(
-                                cr, uid, f.id, context=context)
-                    d_values.update({'observation': values.get('model')})
+                if n['model'] in self._frequency_notifications:
+                    self._cancel_frequency_notifications(
+                        cr, uid, [(values.get('patient_id'),
+                                   values.get('model'))], context=context)
                 pool.create_activity(
                     cr, SUPERUSER_ID, a_values, d_values, context=context)
 
+    def trigger_notifications_many(self, cr, uid, values_list,
+                                   context=None):
+        """
+        Batch version of :meth:`trigger_notifications` for the
+        notifications triggered by many activities at once. The open
+        frequency notifications they replace are cancelled together,
+        then the notifications of each type are created with a single
+        :meth:`create_activities()
+        <activity.nh_activity_data.create_activities>` call.
+
+        Values that would cancel a frequency notification triggered
+        earlier in the same batch, i.e. another one for the same patient
+        or the second of their own, are triggered one at a time after the
+        rest so the same notifications are left open.
+
+        :param values_list: values as passed to
+            :meth:`trigger_notifications`, one per triggering activity
+        :type values_list: list
+        :returns: ``True``
+        :rtype: bool
+        """
+        frequency_patient_ids = set()
+        cancel_keys = set()
+        vals_by_model = {}
+        single_values_list = []
+        for values in values_list:
+            notifications = [n for n in values['notifications']
+                             if values.get('group') in n['groups']]
+            frequency_count = len([
+                n for n in notifications
+                if n['model'] in self._frequency_notifications])
+            patient_id = values.get('patient_id')
+            if frequency_count:
+                if frequency_count > 1 or \
+                        patient_id in frequency_patient_ids:
+                    frequency_patient_ids.add(patient_id)
+                    single_values_list.append(values)
+                    continue
+                frequency_patient_ids.add(patient_id)
+                cancel_keys.add((patient_id, values.get('model')))
+            for n in notifications:
+                a_values, d_values = self._get_notification_values(
+                    cr, uid, values, n)
+                vals_activity_list, vals_data_list = vals_by_model.setdefault(
+                    'nh.clinical.notification.'+n['model'], ([], []))
+                vals_activity_list.append(a_values)
+                vals_data_list.append(d_values)
+        if cancel_keys:
+            self._cancel_frequency_notifications(cr, uid, cancel_keys,
+                                                 context=context)
+        for model, (vals_activity_list, vals_data_list) in \
+                vals_by_model.items():
+            self.pool[model].create_activities(
+                cr, SUPERUSER_ID, vals_activity_list, vals_data_list,
+                context=context)
+        for values in single_values_list:
+            self.trigger_notifications(cr, uid, values, context=context)
+        return True
+
+    def _get_notification_values(self, cr, uid, values, notification):
+        """
+        Gets the activity and data values to create a notification
+        triggered with :meth:`trigger_notifications`.
+
+        :param values: values passed to :meth:`trigger_notifications`
+        :type values: dict
+        :param notification: element of the `notifications` list
+        :type notification: dict
+        :returns: activity values and data values
+        :rtype: tuple
+        """
+        n = notification
+        deadline = (dt.now()+td(
+            minutes=n.get('minutes_due'))).strftime(DTF) \
+            if n.get('minutes_due') \
+            else (dt.now()+td(minutes=5)).strftime(DTF)
+        a_values = {
+            'user_id': uid if n.get('assign') else False,
+            'assign_locked': n.get('assign'),
+            'parent_id': values.get('parent_id'),
+            'date_deadline': deadline,
+            'creator_id': values.get('creator_id'),
+        }
+        if n.get('summary'):
+            a_values.update({'summary': n['summary']})
+        d_values = {
+            'patient_id': values.get('patient_id')
+        }
+        # Populate required observation fields for
+        # nh.clinical.notification.frequency and it's children.
+        if n['model'] in self._frequency_notifications:
+            d_values.update({'observation': values.get('model')})
+        return a_values, d_values
+
+    def _cancel_frequency_notifications(self, cr, uid, patient_observations,
+                                        context=None):
+        """
+        Cancels the open
+        :mod:`rev frequency<notifications.nh_clinical_notification_frequency>`
+        tasks of the given patients for the given observation types.
+
+        :param patient_observations: (patient id, observation ``_name``)
+            pairs
+        :type patient_observations: iterable
+        :returns: ``True``
+        :rtype: bool
+        """
+        patient_observations = set(patient_observations)
+        activity_pool = self.pool['nh.activity']
+        domain = [
+            ('patient_id', 'in', list(set(
+                patient_id for patient_id, _ in patient_observations))),
+            ('state', 'not in', ['completed', 'cancelled']),
+            ('data_model', '=', 'nh.clinical.notification.frequency')]
+        frequency_activity_ids = activity_pool.search(
+            cr, uid, domain, context=context)
+        cancel_ids = [
+            f.id for f in activity_pool.browse(
+                cr, uid, frequency_activity_ids, context=context)
+            if (f.patient_id.id, f.data_ref.observation) in
+            patient_observations]
+        if cancel_ids:
+            activity_pool.cancel_many(cr, uid, cancel_ids, context=context)
+        return True
+
     def cancel_open_activities(self, cr, uid, parent_id, model,
                                cancel_reason_id=None, context=None):
         """
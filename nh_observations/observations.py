@@ -9,10 +9,12 @@ The abstract definition of an observation from which all other
 observations inherit is also included here.
 """
 import copy
+import json
 import logging
+from ast import literal_eval
 from datetime import datetime as dt, timedelta as td
 
-from openerp import SUPERUSER_ID, api
+from openerp import SUPERUSER_ID, api, tools
 from openerp.addons.nh_observations import fields as obs_fields
 from openerp.addons.nh_observations import frequencies
 from openerp.osv import orm, fields, osv
@@ -148,7 +150,8 @@ class NhClinicalPatientObservation(orm.AbstractModel):
                 # If so then return True, because any none values for required
                 # fields mean a partial observation.
                 {obs['id']: bool(set(self._required) &
-                                 set(eval(obs['none_values'])))})
+                                 set(self._load_field_list(
+                                     obs['none_values'])))})
         return res
 
     def _is_partial_search(self, cr, uid, obj, name, args, domain=None,
@@ -219,8 +222,10 @@ class NhClinicalPatientObservation(orm.AbstractModel):
         :returns: ``nh_clinical_patient_observation`` id.
         :rtype: int
         """
-        none_values = list(set(self._required) - set(vals.keys()))
-        null_values = list(set(self._num_fields) - set(vals.keys()))
+        none_values = self._dump_field_list(
+            set(self._required) - set(vals.keys()))
+        null_values = self._dump_field_list(
+            set(self._num_fields) - set(vals.keys()))
         vals.update({'none_values': none_values, 'null_values': null_values})
         return super(NhClinicalPatientObservation, self).create(
             cr, uid, vals, context)
@@ -264,10 +269,12 @@ class NhClinicalPatientObservation(orm.AbstractModel):
                 cr, uid, ids, vals, context)
         for obs in self.read(
                 cr, uid, ids, ['none_values', 'null_values'], context=context):
-            none_values = list(
-                set(eval(obs['none_values'])) - set(vals.keys()))
-            null_values = list(
-                set(eval(obs['null_values'])) - set(vals.keys()))
+            none_values = self._dump_field_list(
+                set(self._load_field_list(obs['none_values'])) -
+                set(vals.keys()))
+            null_values = self._dump_field_list(
+                set(self._load_field_list(obs['null_values'])) -
+                set(vals.keys()))
             vals.update(
                 {'none_values': none_values, 'null_values': null_values})
             super(NhClinicalPatientObservation, self).write(
@@ -288,6 +295,113 @@ class NhClinicalPatientObservation(orm.AbstractModel):
                     context=context)
         return True
 
+    @staticmethod
+    def _dump_field_list(field_names):
+        """
+        Serialise a list of field names for the ``none_values`` and
+        ``null_values`` columns.
+
+        :param field_names: field names
+        :type field_names: iterable
+        :returns: JSON list, sorted so equal sets give equal values
+        :rtype: str
+        """
+        return json.dumps(sorted(field_names))
+
+    @staticmethod
+    def _load_field_list(value):
+        """
+        Parse a ``none_values`` or ``null_values`` column. Values are
+        stored as JSON but rows written before the ``1.1`` migration, or
+        by clients still writing Python lists, hold the ``repr`` of a
+        list which is parsed with ``literal_eval`` rather than ``eval``.
+
+        :param value: column value
+        :type value: str
+        :returns: field names
+        :rtype: list
+        """
+        if not value:
+            return []
+        try:
+            return json.loads(value)
+        except ValueError:
+            return list(literal_eval(value))
+
+    def _register_hook(self, cr):
+        self._get_format_tables(refresh=True)
+        return super(NhClinicalPatientObservation, self)._register_hook(cr)
+
+    def _get_format_tables(self, refresh=False):
+        """
+        Lookup tables used to format read results, built once per model
+        class and so once per registry load:
+
+        - ``floats``: float column name mapped to its number of digits,
+          ``None`` if the column doesn't define digits
+        - ``selections``: observation selection field name mapped to a
+          dictionary of value to label
+        - ``many2many``: observation many2many field name mapped to its
+          comodel
+
+        :param refresh: rebuild the tables even if they already exist
+        :type refresh: bool
+        :rtype: dict
+        """
+        cls = type(self)
+        tables = cls.__dict__.get('_format_tables')
+        if tables is not None and not refresh:
+            return tables
+        floats = {}
+        for name, column in self._columns.items():
+            if column._type == 'float':
+                floats[name] = column.digits[1] if column.digits else None
+        selections = {}
+        many2many = {}
+        field_utils = self.pool['nh.clinical.field_utils']
+        for field in self._fields.values():
+            if not field_utils.is_obs_field(field):
+                continue
+            if isinstance(field, obs_fields.Selection) \
+                    and isinstance(field.selection, (list, tuple)):
+                selections[field.name] = dict(field.selection)
+            elif isinstance(field, obs_fields.Many2Many):
+                many2many[field.name] = field.comodel_name
+        tables = {
+            'floats': floats,
+            'selections': selections,
+            'many2many': many2many
+        }
+        cls._format_tables = tables
+        return tables
+
+    def _format_read_rows(self, rows):
+        """
+        Rounds floats to the digits defined on their column and replaces
+        numeric fields listed in ``null_values`` with ``False`` for a whole
+        :meth:`read` result in one pass.
+
+        :param rows: read result
+        :type rows: list
+        """
+        if not rows:
+            return
+        floats = self._get_format_tables()['floats']
+        read_fields = set(rows[0]).intersection(floats)
+        if any(floats[key] is None for key in read_fields):
+            _logger.warn(
+                "You might be reading a wrong float from the "
+                "DB. Define digits attribute for float columns"
+                " to avoid this problem.")
+        rounded = [(key, floats[key]) for key in read_fields
+                   if floats[key] is not None]
+        for row in rows:
+            for key, digits in rounded:
+                row[key] = round(row[key], digits)
+            for key in self._load_field_list(row.get('null_values')):
+                if key in row:
+                    row[key] = False
+
     def read(self, cr, uid, ids, fields=None, context=None,
              load='_classic_read'):
         """
@@ -313,22 +427,8 @@ class NhClinicalPatientObservation(orm.AbstractModel):
         res = super(NhClinicalPatientObservation, self).read(
             cr, uid, ids, fields=fields, context=context, load=load)
         if res:
-            for d in res:
-                for key in d.keys():
-                    if key in self._columns \
-                            and self._columns[key]._type == 'float':
-                        if not self._columns[key].digits:
-                            _logger.warn(
-                                "You might be reading a wrong float from the "
-                                "DB. Define digits attribute for float columns"
-                                " to avoid this problem.")
-                        else:
-                            d[key] = round(
-                                d[key], self._columns[key].digits[1])
-            for obs in isinstance(res, (tuple, list)) and res or [res]:
-                for nv in eval(obs['null_values'] or '{}'):
-                    if nv in obs.keys():
-                        obs[nv] = False
+            self._format_read_rows(
+                res if isinstance(res, (tuple, list)) else [res])
             res = res[0] if nolist and len(res) > 0 else res
         return res
 
@@ -371,14 +471,29 @@ class NhClinicalPatientObservation(orm.AbstractModel):
         :param obs:
         :type obs: list
         """
-        field_names = self.get_obs_field_names()
+        if not obs:
+            return
+        tables = self._get_format_tables()
+        selections = [
+            (field_name, labels)
+            for field_name, labels in tables['selections'].items()
+            if field_name in obs[0]
+        ]
         for ob in obs:
-            for field_name in field_names:
-                if field_name in ob:
-                    field_value = ob[field_name]
-                    field_value_label = self.get_field_value_label(field_name,
-                                                                   field_value)
-                    ob[field_name] = field_value_label
+            for field_name, labels in selections:
+                ob[field_name] = labels.get(ob[field_name], ob[field_name])
+        for field_name, comodel in tables['many2many'].items():
+            if field_name not in obs[0]:
+                continue
+            related_ids = set()
+            for ob in obs:
+                related_ids.update(ob[field_name] or [])
+            names = dict(
+                (rec.id, rec.name)
+                for rec in self.env[comodel].browse(list(related_ids)))
+            for ob in obs:
+                ob[field_name] = [
+                    names[related_id] for related_id in ob[field_name] or []]
 
     def get_field_value_label(self, field_name, field_value):
         """
@@ -391,17 +506,13 @@ class NhClinicalPatientObservation(orm.AbstractModel):
         :return: Field label.
         :rtype: str
         """
-        field = self._fields[field_name]
-        if isinstance(field, obs_fields.Selection):
-            selection = field.selection
-            valid_value_tuple = \
-                [valid_value_tuple for valid_value_tuple in selection
-                 if valid_value_tuple[0] == field_value][0]
-            return valid_value_tuple[1]
-        if isinstance(field, obs_fields.Many2Many):
-            related_ids = field_value
-            related_model = self.env[field.comodel_name]
-            return [rec.name for rec in related_model.browse(related_ids)]
+        tables = self._get_format_tables()
+        if field_name in tables['selections']:
+            return tables['selections'][field_name].get(
+                field_value, field_value)
+        if field_name in tables['many2many']:
+            related_model = self.env[tables['many2many'][field_name]]
+            return [rec.name for rec in related_model.browse(field_value)]
         return field_value
 
     @api.multi
@@ -497,12 +608,53 @@ class NhClinicalPatientObservation(orm.AbstractModel):
         Returns a description in dictionary format of the input fields
         that would be required in the user gui to submit the
         observation.
+
+        The part of the form that is the same for every patient is
+        built by :meth:`build_form_description` and cached on the
+        registry, only :meth:`update_form_description` is run on every
+        call.
+
+        :param patient_id: :class:`patient<base.nh_clinical_patient>` id
+        :type patient_id: int
+        :returns: a list of dictionaries
+        :rtype: list
+        """
+        # callers are free to modify the result, the cached copy isn't
+        form_description = copy.deepcopy(
+            self._get_static_form_description(cr, uid))
+        return self.update_form_description(
+            cr, uid, patient_id, form_description, context=context)
+
+    @tools.ormcache(skiparg=2)
+    def _get_static_form_description(self, cr, uid):
+        return self.build_form_description(cr, uid)
+
+    def build_form_description(self, cr, uid, context=None):
+        """
+        Builds the part of the form description that doesn't depend on
+        the patient. The result is cached by
+        :meth:`get_form_description`, so anything read here must clear
+        the model's caches when it changes.
+
+        :returns: a list of dictionaries
+        :rtype: list
+        """
+        return copy.deepcopy(self._form_description)
+
+    def update_form_description(self, cr, uid, patient_id, form_description,
+                                context=None):
+        """
+        Adds the patient specific parts to a copy of the cached form
+        description.
+
         :param patient_id: :class:`patient<base.nh_clinical_patient>` id
         :type patient_id: int
+        :param form_description: copy of the cached form description
+        :type form_description: list
         :returns: a list of dictionaries
         :rtype: list
         """
-        return self._form_description
+        return form_description
 
     @api.model
     def get_view_description(self, form_desc):
@@ -852,12 +1004,9 @@ class nh_clinical_patient_observation_urine_output(orm.Model):
         }
     ]
 
-    def get_form_description(self, cr, uid, patient_id, context=None):
+    def update_form_description(self, cr, uid, patient_id, form_description,
+                                context=None):
         """
-         Returns a description in dictionary format of the input fields
-         that would be required in the user gui to submit this
-         observation.
-
          Adds an additional label to the ``urine_output`` field with
          the
          :mod:`target<parameters.nh_clinical_patient_urine_output_target>`
@@ -865,12 +1014,14 @@ class nh_clinical_patient_observation_urine_output(orm.Model):
 
         :param patient_id: :class:`patient<base.nh_clinical_patient>` id
         :type patient_id: int
+        :param form_description: copy of the cached form description
+        :type form_description: list
         :returns: a list of dictionaries
         :rtype: list
         """
         uotarget_pool = self.pool['nh.clinical.patient.uotarget']
         units = {1: 'ml/hour', 2: 'L/day'}
-        fd = copy.deepcopy(self._form_description)
+        fd = form_description
         # Find the Urine Output target
         uotarget = uotarget_pool.current_target(
             cr, uid, patient_id, context=context)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # Part of Open eObs. See LICENSE file for full copyright and licensing details.
 from .frequencies import test_frequencies
+from .nh_clinical_api import *
 from .nh_clinical_field_utils import *
 from .nh_clinical_notification_frequency import *
 from .nh_clinical_patient_observation import *
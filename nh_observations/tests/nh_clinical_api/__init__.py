@@ -0,0 +1 @@
+from . import test_trigger_notifications_many
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+
+
+class TestTriggerNotificationsMany(TransactionCase):
+    """
+    Test that :method:`trigger_notifications_many` leaves the same
+    notifications open as calling :method:`trigger_notifications` for each
+    of its values.
+    """
+    OBSERVATION = 'nh.clinical.patient.observation.height'
+
+    def setUp(self):
+        super(TestTriggerNotificationsMany, self).setUp()
+        self.test_utils = self.env['nh.clinical.test_utils']
+        self.test_utils.create_patient_and_spell()
+        self.test_utils.copy_instance_variables(self)
+        self.api_pool = self.registry('nh.clinical.api')
+        self.activity_pool = self.registry('nh.activity')
+
+    def get_values(self, notifications):
+        return {
+            'notifications': notifications,
+            'parent_id': self.spell_activity.id,
+            'creator_id': False,
+            'patient_id': self.patient.id,
+            'model': self.OBSERVATION,
+            'group': 'nurse'
+        }
+
+    def get_open_data_models(self):
+        cr, uid = self.cr, self.uid
+        activity_ids = self.activity_pool.search(cr, uid, [
+            ('patient_id', '=', self.patient.id),
+            ('data_model', 'like', 'nh.clinical.notification.%'),
+            ('state', 'not in', ['completed', 'cancelled'])
+        ])
+        return sorted(
+            activity.data_model for activity in
+            self.activity_pool.browse(cr, uid, activity_ids))
+
+    def test_creates_notifications_of_each_values(self):
+        cr, uid = self.cr, self.uid
+        self.api_pool.trigger_notifications_many(cr, uid, [
+            self.get_values([{'model': 'nurse', 'groups': ['nurse']}]),
+            self.get_values([{'model': 'hca', 'groups': ['nurse']},
+                             {'model': 'nurse', 'groups': ['hca']}])
+        ])
+        self.assertEqual(self.get_open_data_models(),
+                         ['nh.clinical.notification.hca',
+                          'nh.clinical.notification.nurse'])
+
+    def test_leaves_latest_frequency_notification_open(self):
+        cr, uid = self.cr, self.uid
+        frequency = [{'model': 'frequency', 'groups': ['nurse']}]
+        self.api_pool.trigger_notifications(
+            cr, uid, self.get_values(frequency))
+        self.api_pool.trigger_notifications_many(cr, uid, [
+            self.get_values(frequency),
+            self.get_values(frequency)
+        ])
+        self.assertEqual(self.get_open_data_models(),
+                         ['nh.clinical.notification.frequency'])
@@ -4,3 +4,5 @@
 from . import test_get_formatted_obs
 from . import test_get_triggered_tasks
 
+from . import test_read_formatting
+from . import test_read_formatting_benchmark
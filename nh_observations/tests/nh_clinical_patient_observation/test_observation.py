@@ -40,8 +40,8 @@ class TestObservation(common.SingleTransactionCase):
             cr, uid, {'patient_id': self.patient_id})
         height_values = self.height_pool.read(
             cr, uid, height_id, ['none_values', 'null_values'])
-        self.assertEqual(height_values.get('none_values'), "['height']")
-        self.assertEqual(height_values.get('null_values'), "['height']")
+        self.assertEqual(height_values.get('none_values'), '["height"]')
+        self.assertEqual(height_values.get('null_values'), '["height"]')
 
     def test_02_create_activity_raises_without_admitted_patient_id(self):
         cr, uid = self.cr, self.uid
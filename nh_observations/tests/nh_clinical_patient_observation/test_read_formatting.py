@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+from openerp.tests.common import TransactionCase
+
+
+class TestReadFormatting(TransactionCase):
+
+    def setUp(self):
+        super(TestReadFormatting, self).setUp()
+        test_utils = self.env['nh.clinical.test_utils']
+        test_utils.create_patient_and_spell()
+        test_utils.copy_instance_variables(self)
+        self.blood_product_model = \
+            self.env['nh.clinical.patient.observation.blood_product']
+
+    def test_null_values_stored_as_json(self):
+        obs = self.blood_product_model.create({
+            'patient_id': self.patient.id,
+            'product': 'rbc'
+        })
+        values = obs.read(['none_values', 'null_values'])[0]
+        self.assertEqual(values['none_values'], '["vol"]')
+        self.assertEqual(values['null_values'], '["vol"]')
+
+    def test_null_numeric_field_read_as_false(self):
+        obs = self.blood_product_model.create({
+            'patient_id': self.patient.id,
+            'product': 'rbc'
+        })
+        self.assertIs(obs.read(['vol'])[0]['vol'], False)
+
+    def test_floats_rounded_to_column_digits(self):
+        obs = self.blood_product_model.create({
+            'patient_id': self.patient.id,
+            'product': 'rbc',
+            'vol': 12.34
+        })
+        self.assertEqual(obs.read(['vol'])[0]['vol'], 12.3)
+
+    def test_legacy_null_values_read(self):
+        obs = self.blood_product_model.create({
+            'patient_id': self.patient.id,
+            'product': 'rbc',
+            'vol': 0
+        })
+        self.env.cr.execute("""
+            UPDATE nh_clinical_patient_observation_blood_product
+            SET null_values = %s WHERE id = %s
+        """, ("[u'vol']", obs.id))
+        obs.invalidate_cache()
+        self.assertIs(obs.read(['vol'])[0]['vol'], False)
+
+    def test_load_field_list(self):
+        load = self.blood_product_model._load_field_list
+        self.assertEqual(load('["vol", "product"]'), ['vol', 'product'])
+        self.assertEqual(load("[u'vol', 'product']"), ['vol', 'product'])
+        self.assertEqual(load(False), [])
+
+    def test_format_tables_built_for_model(self):
+        tables = self.blood_product_model._get_format_tables()
+        self.assertEqual(tables['floats']['vol'], 1)
+        self.assertIs(tables, self.blood_product_model._get_format_tables())
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Compares the old per-row ``eval`` formatting of observation reads with the
+lookup table based formatting. Too slow for the regular run so only
+enabled when ``NH_BENCHMARK`` is set, e.g.::
+
+    NH_BENCHMARK=1 NH_BENCHMARK_OBSERVATIONS=20000 openerp-server ...
+"""
+import logging
+import os
+import time
+import unittest
+
+from openerp import models
+from openerp.tests.common import TransactionCase
+
+_logger = logging.getLogger(__name__)
+
+OBSERVATION_COUNT = int(os.environ.get('NH_BENCHMARK_OBSERVATIONS', 20000))
+
+
+def legacy_format(model, res):
+    for d in res:
+        for key in d.keys():
+            if key in model._columns \
+                    and model._columns[key]._type == 'float':
+                if model._columns[key].digits:
+                    d[key] = round(d[key], model._columns[key].digits[1])
+    for obs in res:
+        for nv in eval(obs['null_values'] or '{}'):
+            if nv in obs.keys():
+                obs[nv] = False
+
+
+@unittest.skipUnless(os.environ.get('NH_BENCHMARK'),
+                     'set NH_BENCHMARK to run benchmarks')
+class TestReadFormattingBenchmark(TransactionCase):
+
+    def setUp(self):
+        super(TestReadFormattingBenchmark, self).setUp()
+        test_utils = self.env['nh.clinical.test_utils']
+        test_utils.create_patient_and_spell()
+        test_utils.copy_instance_variables(self)
+        self.model = \
+            self.env['nh.clinical.patient.observation.blood_product']
+        self.env.cr.execute("""
+            INSERT INTO nh_clinical_patient_observation_blood_product
+                (patient_id, product, vol, none_values, null_values,
+                 create_uid, write_uid, create_date, write_date)
+            SELECT
+                %s,
+                (array['rbc', 'ffp', 'platelets'])[1 + i %% 3],
+                CASE WHEN i %% 4 = 0 THEN NULL ELSE i / 7.0 END,
+                '[]',
+                CASE WHEN i %% 4 = 0 THEN '["vol"]' ELSE '[]' END,
+                1, 1, now() at time zone 'UTC', now() at time zone 'UTC'
+            FROM generate_series(1, %s) i
+        """, (self.patient.id, OBSERVATION_COUNT))
+        self.ids = self.model.search(
+            [('patient_id', '=', self.patient.id)]).ids
+
+    def timed(self, label, method):
+        start = time.time()
+        result = method()
+        _logger.info('%s: %.3fs for %s observations',
+                     label, time.time() - start, OBSERVATION_COUNT)
+        return result
+
+    def test_format_read_rows(self):
+        model = self.model
+        # Unformatted rows straight from the ORM
+        rows = models.BaseModel.read(
+            model.browse(self.ids), ['vol', 'product', 'null_values'])
+        legacy_rows = [dict(row) for row in rows]
+        self.timed('eval per row', lambda: legacy_format(model, legacy_rows))
+        self.timed('lookup tables', lambda: model._format_read_rows(rows))
+        self.assertEqual(rows, legacy_rows)
@@ -91,6 +91,12 @@ def parse(self, cr, uid, context):
                 return [(left, 'in', left_model.search(
                     cr, uid, doms, context=context))]
             return doms
+        elif getattr(left_model, '_closure_table', None) and \
+                (parent or left_model._parent_name) == left_model._parent_name:
+            # the model maintains an ancestor/descendant closure table so
+            # the whole subtree is resolved in a single query
+            return [(left, 'in', left_model.get_descendant_ids(
+                cr, uid, ids, context=context))]
         else:
             def recursive_children(ids, model, parent_field):
                 if not ids:
@@ -77,11 +77,10 @@ class NhClinicalPatientObservationWeight(models.Model):
     ]
 
     @api.model
-    def get_form_description(self, patient_id):
+    def build_form_description(self):
         """
         Override of `nh.clinical.patient.observation_scored` method.
 
-        :param patient_id:
         :return:
         """
         form_description = deepcopy(self._form_description)